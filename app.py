@@ -10,6 +10,7 @@ Features:
 - Graph-based cybersecurity intelligence
 - Real-time data ingestion from multiple authoritative sources
 - Cross-framework relationship analysis
+- Optional Prometheus /metrics endpoint (METRICS_PORT)
 
 Supported Frameworks:
 - MITRE ATT&CK: Threat tactics, techniques, and procedures
@@ -23,11 +24,14 @@ Usage:
     streamlit run app.py
 """
 
+import atexit
 import streamlit as st
 
 # Import application modules
+from src.config.settings import METRICS_PORT, METRICS_ADDRESS
 from src.knowledge_base.database import create_graph_connection
 from src.api.llm_service import get_llm
+from src.utils import metrics
 from src.utils.initialization import initialize_knowledge_base
 from src.web.ui import get_css
 from src.web.components import chat_tab, knowledge_base_tab, sidebar_components
@@ -64,6 +68,42 @@ def render_header():
     """, unsafe_allow_html=True)
 
 
+def _graph_is_healthy(graph):
+    """Validate the shared graph connection, closing it if the database is unreachable."""
+    if graph.is_healthy():
+        return True
+    graph.close()
+    return False
+
+
+@st.cache_resource(show_spinner="🔌 Connecting to Neo4j...", validate=_graph_is_healthy)
+def get_graph_connection():
+    """
+    Return the Neo4j connection shared by every session and rerun.
+    
+    The connection is re-validated at most once per health check interval
+    and recreated if the database became unreachable. The driver is closed
+    when the process exits.
+    """
+    graph = create_graph_connection()
+    atexit.register(graph.close)
+    return graph
+
+
+@st.cache_resource(show_spinner=False)
+def get_chat_llm():
+    """Return the chat model shared by every session and rerun."""
+    return get_llm()
+
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_endpoint():
+    """Start the Prometheus metrics endpoint once per process, if METRICS_PORT is set."""
+    if METRICS_PORT > 0:
+        return metrics.start_http_server(METRICS_PORT, METRICS_ADDRESS)
+    return None
+
+
 def initialize_session_state():
     """Initialize Streamlit session state variables."""
     if "messages" not in st.session_state:
@@ -107,14 +147,17 @@ def main():
     # Initialize session state
     initialize_session_state()
     
+    # Serve metrics next to the app (no-op unless METRICS_PORT is set)
+    start_metrics_endpoint()
+    
     try:
         # Initialize core application components
         with st.spinner("🔄 Initializing multi-framework application components..."):
-            # Create Neo4j database connection
-            graph = create_graph_connection()
+            # Shared Neo4j database connection (created once per process)
+            graph = get_graph_connection()
             
-            # Initialize language model
-            llm = get_llm()
+            # Shared language model (created once per process)
+            llm = get_chat_llm()
             
             # Initialize comprehensive cybersecurity knowledge base
             # This now includes ATT&CK, CIS, NIST, HIPAA, FFIEC, and PCI DSS
@@ -0,0 +1,15 @@
+"""
+Performance Benchmarks Package
+
+Command line benchmarks for the knowledge base. They run offline against the
+in-memory graph (synthetic or loaded from a snapshot) or against a Neo4j
+instance, and write machine-readable JSON results that can be compared
+between commits.
+
+Modules:
+    common: Shared graph setup, operation counting and result reporting
+    retrieval: Chat retrieval latency over recorded and synthetic questions
+    ingestion: ATT&CK processing and ingestion throughput over synthetic bundles
+    stix_fixtures: Synthetic ATT&CK STIX bundle generator
+    load_test: Chat throughput and latency under concurrent sessions
+"""
@@ -0,0 +1,473 @@
+"""
+Shared Benchmark Utilities Module
+
+This module provides what every benchmark needs: a graph to run against,
+counts of the graph operations a workload performs, latency percentiles and
+JSON result files tagged with the commit they were measured on.
+
+Features:
+- Deterministic synthetic multi-framework graph in memory
+- Graph selection: synthetic, snapshot file or the configured Neo4j database
+- Counting wrappers around any graph repository or Cypher connection
+- Peak resident memory sampling
+- Percentile summaries and baseline comparison of JSON results
+
+Classes:
+    CountingRepository: GraphRepository that counts delegated operations
+    CountingConnection: Connection stand-in that counts Cypher statements
+    MemorySampler: Background sampler of the process's peak resident memory
+
+Functions:
+    build_synthetic_graph: Populate an in-memory graph with generated frameworks
+    open_graph: Graph for a benchmark run
+    percentile: Nearest-rank percentile
+    latency_summary: Latency percentiles in milliseconds
+    environment_info: Commit, interpreter and host of a run
+    write_results: Save results as JSON
+    compare_results: Relative change of metrics against a baseline
+    timed: Call a function and measure it
+"""
+
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from src.knowledge_base.context_builder import FRAMEWORK_NODE_MAPPING
+from src.knowledge_base.memory_graph import InMemoryGraph
+from src.knowledge_base.repository import GraphRepository, get_repository
+
+# Words synthetic names and descriptions are drawn from
+SYNTHETIC_VOCABULARY = [
+    'access', 'account', 'application', 'asset', 'audit', 'authentication', 'backup', 'boundary',
+    'configuration', 'credential', 'data', 'defense', 'detection', 'discovery', 'encryption', 'execution',
+    'exfiltration', 'firewall', 'identity', 'incident', 'injection', 'integrity', 'inventory', 'lateral',
+    'logging', 'malware', 'monitoring', 'network', 'password', 'patch', 'persistence', 'phishing',
+    'privilege', 'process', 'protection', 'recovery', 'remote', 'response', 'risk', 'scanning',
+    'segmentation', 'service', 'software', 'token', 'training', 'vulnerability', 'wireless'
+]
+
+# Identifier property and pattern per synthetic label
+_SYNTHETIC_IDENTIFIERS = {
+    'Technique': ('technique_id', 'T{:04d}'),
+    'Mitigation': ('mitigation_id', 'M{:04d}'),
+    'ThreatGroup': ('id', 'G{:04d}'),
+    'Malware': ('id', 'S{:04d}'),
+    'Tool': ('id', 'S{:04d}'),
+    'CIS_Control': ('control_id', 'CIS-{}'),
+    'HIPAA_Regulation': ('regulation_id', '164.{}')
+}
+
+# Relative number of nodes per label at scale 1
+_SYNTHETIC_LABEL_WEIGHTS = {
+    'Technique': 600, 'Malware': 600, 'ThreatGroup': 150, 'Tool': 80, 'Mitigation': 45,
+    'DataSource': 40, 'Campaign': 30, 'CIS_Control': 18, 'CIS_Safeguard': 150,
+    'NIST_Function': 6, 'NIST_Category': 22, 'NIST_Subcategory': 110, 'PCI_DSS_Requirement': 12
+}
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(SYNTHETIC_VOCABULARY) for _ in range(words))
+
+
+def build_synthetic_graph(scale: float = 1.0, seed: int = 7) -> InMemoryGraph:
+    """
+    Populate an in-memory graph with generated nodes for every framework.
+
+    Sizes at scale 1 roughly match the enterprise ATT&CK bundle plus the
+    document frameworks; names and descriptions are drawn from a fixed
+    security vocabulary, so keyword searches hit realistic fractions of
+    nodes. The same scale and seed always produce the same graph.
+
+    Args:
+        scale: Multiplier applied to every label's node count
+        seed: Random seed
+
+    Returns:
+        InMemoryGraph: The populated graph
+    """
+    rng = random.Random(seed)
+    graph = InMemoryGraph()
+    labels = [label for mapping in FRAMEWORK_NODE_MAPPING.values() for label in mapping.values()]
+
+    ids_by_label = {}
+    for label in labels:
+        count = max(1, int(_SYNTHETIC_LABEL_WEIGHTS.get(label, 40) * scale))
+        id_key, id_pattern = _SYNTHETIC_IDENTIFIERS.get(label, ('id', label.lower() + '-{}'))
+        rows = []
+        for index in range(count):
+            row = {
+                'id': f"{label.lower()}--{index}",
+                'name': _sentence(rng, 3).title(),
+                'description': _sentence(rng, rng.randint(20, 120)),
+                'source': 'synthetic'
+            }
+            row[id_key] = id_pattern.format(1000 + index if label in ('Technique', 'Mitigation') else index + 1)
+            if label == 'Technique':
+                row['platforms'] = rng.sample(['Windows', 'Linux', 'macOS', 'Network', 'Containers'], 2)
+                row['tactics'] = rng.sample(['execution', 'persistence', 'defense-evasion', 'discovery'], 1)
+            rows.append(row)
+        graph.create_nodes(label, rows)
+        ids_by_label[label] = [row['id'] for row in rows]
+
+    def link(rel_type, source_label, target_label, per_source):
+        rows = [
+            {'source': source_id, 'target': target_id}
+            for source_id in ids_by_label[source_label]
+            for target_id in rng.sample(ids_by_label[target_label], min(per_source, len(ids_by_label[target_label])))
+        ]
+        graph.link(rel_type, rows, source_label, 'id', target_label, 'id')
+
+    link('USES', 'ThreatGroup', 'Technique', 25)
+    link('USES', 'Malware', 'Technique', 10)
+    link('MITIGATES', 'Mitigation', 'Technique', 20)
+    link('HAS_SAFEGUARD', 'CIS_Control', 'CIS_Safeguard', 8)
+    link('HAS_CATEGORY', 'NIST_Function', 'NIST_Category', 4)
+    link('HAS_SUBCATEGORY', 'NIST_Category', 'NIST_Subcategory', 5)
+    return graph
+
+
+def open_graph(backend: str = 'synthetic', snapshot: Optional[str] = None, scale: float = 1.0, seed: int = 7):
+    """
+    Get the graph a benchmark runs against.
+
+    Args:
+        backend: 'synthetic' (generated in memory), 'memory' (snapshot loaded
+            in memory) or 'neo4j' (the configured database, used as is)
+        snapshot: Snapshot file for the 'memory' backend
+        scale: Synthetic graph scale
+        seed: Synthetic graph seed
+
+    Returns:
+        tuple: (graph, description of the graph for the results)
+    """
+    if backend == 'synthetic':
+        graph = build_synthetic_graph(scale, seed)
+        return graph, {'backend': 'synthetic', 'scale': scale, 'seed': seed, 'nodes': graph.count_nodes()}
+    if backend == 'memory':
+        if not snapshot:
+            raise ValueError("The memory backend needs a snapshot file")
+        graph = InMemoryGraph()
+        counts = graph.load_snapshot(snapshot)
+        return graph, {'backend': 'memory', 'snapshot': os.path.basename(snapshot), **counts}
+    if backend == 'neo4j':
+        from src.knowledge_base.database import create_graph_connection
+        graph = create_graph_connection()
+        return graph, {'backend': 'neo4j', 'nodes': get_repository(graph).count_nodes()}
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+class CountingRepository(GraphRepository):
+    """
+    Repository that delegates to another one and counts each operation.
+
+    Pass it wherever a graph is expected: get_repository returns it as is.
+    """
+
+    def __init__(self, graph):
+        """
+        Initialize the wrapper.
+
+        Args:
+            graph: Graph connection or repository to delegate to
+        """
+        self.repository = get_repository(graph)
+        self.counts: Counter = Counter()
+
+    def _delegate(self, operation: str, *args, **kwargs):
+        self.counts[operation] += 1
+        return getattr(self.repository, operation)(*args, **kwargs)
+
+    def reset(self) -> Dict[str, int]:
+        """Return the counts so far and start counting from zero."""
+        counts = dict(self.counts)
+        self.counts.clear()
+        return counts
+
+    def close(self):
+        close = getattr(self.repository, 'close', None)
+        if close:
+            close()
+
+    def clear(self):
+        return self._delegate('clear')
+
+    def ensure_unique(self, *args, **kwargs):
+        return self._delegate('ensure_unique', *args, **kwargs)
+
+    def ensure_index(self, *args, **kwargs):
+        return self._delegate('ensure_index', *args, **kwargs)
+
+    def create_nodes(self, *args, **kwargs):
+        return self._delegate('create_nodes', *args, **kwargs)
+
+    def upsert_nodes(self, *args, **kwargs):
+        return self._delegate('upsert_nodes', *args, **kwargs)
+
+    def update_nodes(self, *args, **kwargs):
+        return self._delegate('update_nodes', *args, **kwargs)
+
+    def link(self, *args, **kwargs):
+        return self._delegate('link', *args, **kwargs)
+
+    def delete_nodes(self, *args, **kwargs):
+        return self._delegate('delete_nodes', *args, **kwargs)
+
+    def get_node(self, *args, **kwargs):
+        return self._delegate('get_node', *args, **kwargs)
+
+    def nodes(self, *args, **kwargs):
+        return self._delegate('nodes', *args, **kwargs)
+
+    def relationships(self, *args, **kwargs):
+        return self._delegate('relationships', *args, **kwargs)
+
+    def neighbors(self, *args, **kwargs):
+        return self._delegate('neighbors', *args, **kwargs)
+
+    def find_nodes_containing(self, *args, **kwargs):
+        return self._delegate('find_nodes_containing', *args, **kwargs)
+
+    def dump_nodes(self):
+        return self._delegate('dump_nodes')
+
+    def dump_relationships(self):
+        return self._delegate('dump_relationships')
+
+    def label_counts(self, *args, **kwargs):
+        return self._delegate('label_counts', *args, **kwargs)
+
+    def count_nodes(self):
+        return self._delegate('count_nodes')
+
+    def count_relationships(self):
+        return self._delegate('count_relationships')
+
+    def search_nodes(self, *args, **kwargs):
+        return self._delegate('search_nodes', *args, **kwargs)
+
+
+class CountingConnection:
+    """
+    Connection stand-in counting the Cypher statements sent to the database.
+
+    Wraps a Neo4jConnection, or with no connection acts as a dry run that
+    answers every statement with no records, so the statements a workload
+    would send can be counted without a server.
+    """
+
+    def __init__(self, graph=None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            graph: Connection to delegate to, or None for a dry run
+        """
+        self.graph = graph
+        self.statements = 0
+        self.rows = 0
+
+    def query(self, query, params=None, max_retries=3):
+        self.statements += 1
+        rows = (params or {}).get('rows')
+        self.rows += len(rows) if isinstance(rows, list) else 0
+        if self.graph is None:
+            return []
+        return self.graph.query(query, params, max_retries)
+
+    def reset(self) -> Dict[str, int]:
+        """Return the statement and parameter row counts so far and start counting from zero."""
+        counts = {'statements': self.statements, 'rows': self.rows}
+        self.statements = self.rows = 0
+        return counts
+
+    def close(self):
+        if self.graph is not None:
+            self.graph.close()
+
+    def is_healthy(self, max_age=None):
+        return self.graph is None or self.graph.is_healthy(max_age)
+
+
+class MemorySampler:
+    """
+    Background sampler of the peak resident set size of this process.
+
+    Reads /proc/self/statm every few milliseconds; where it is missing the
+    process-wide maximum from getrusage is reported instead, which never
+    goes down between phases.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self._page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        self._peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def current(self) -> int:
+        """Resident set size in bytes."""
+        try:
+            with open('/proc/self/statm') as file:
+                return int(file.read().split()[1]) * self._page_size
+        except (OSError, IndexError, ValueError):
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Kilobytes on Linux, bytes on macOS
+            return peak if sys.platform == 'darwin' else peak * 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, self.current())
+
+    def start(self) -> 'MemorySampler':
+        """Start sampling in a daemon thread."""
+        self._peak = self.current()
+        self._thread = threading.Thread(target=self._run, name='memory-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def mark(self) -> int:
+        """Return the peak in bytes since the previous mark and start a new interval."""
+        current = self.current()
+        peak = max(self._peak, current)
+        self._peak = current
+        return peak
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: Samples
+        percent: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile, or 0.0 without samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(-(-percent * len(ordered) // 100)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def latency_summary(seconds: Iterable[float]) -> Dict[str, float]:
+    """
+    Summarize latencies.
+
+    Args:
+        seconds: Latencies in seconds
+
+    Returns:
+        dict: count, mean_ms, p50_ms, p95_ms, p99_ms and max_ms
+    """
+    samples = [value * 1000 for value in seconds]
+    return {
+        'count': len(samples),
+        'mean_ms': round(sum(samples) / len(samples), 3) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'max_ms': round(max(samples), 3) if samples else 0.0
+    }
+
+
+def environment_info() -> Dict[str, Any]:
+    """
+    Describe where and on which commit a benchmark ran.
+
+    Returns:
+        dict: commit (None outside a git checkout), python, platform and started_at
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'started_at': datetime.now(timezone.utc).isoformat()
+    }
+
+
+def write_results(path: str, results: Dict[str, Any]):
+    """Save benchmark results as indented JSON ('-' writes to stdout)."""
+    text = json.dumps(results, indent=2, sort_keys=True, default=str)
+    if path == '-':
+        print(text)
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(text + "\n")
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    metrics: Sequence[str] = ('p50_ms', 'p95_ms', 'p99_ms')) -> List[Dict[str, Any]]:
+    """
+    Compare latency metrics of two result files section by section.
+
+    Every dictionary holding the given metrics is compared with the
+    dictionary at the same path in the baseline.
+
+    Args:
+        current: Results of this run
+        baseline: Results of an earlier run
+        metrics: Metric names to compare
+
+    Returns:
+        list: {'path', 'metric', 'baseline', 'current', 'change'} entries,
+        change being the relative difference (0.1 = 10% slower)
+    """
+    changes = []
+
+    def walk(current_node, baseline_node, path):
+        if not isinstance(current_node, dict) or not isinstance(baseline_node, dict):
+            return
+        for metric in metrics:
+            if metric in current_node and metric in baseline_node:
+                before, after = baseline_node[metric], current_node[metric]
+                changes.append({
+                    'path': path,
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': (after - before) / before if before else 0.0
+                })
+        for key, value in current_node.items():
+            walk(value, baseline_node.get(key), f"{path}.{key}" if path else key)
+
+    walk(current, baseline, '')
+    return changes
+
+
+def timed(func, *args, **kwargs):
+    """Call a function and return (result, elapsed seconds)."""
+    started_at = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started_at
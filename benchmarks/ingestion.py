@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+ATT&CK Ingestion Benchmark
+
+Runs AttackIngestion.process_attack_objects and ingest_to_neo4j over
+synthetic STIX bundles (see stix_fixtures) of increasing size and reports,
+per phase, the elapsed time, throughput, peak resident memory and the
+database round trips issued.
+
+Phases:
+- load: json.load of the fixture file, as fetch_attack_data parses the download
+- process: process_attack_objects
+- schema: clearing the graph and creating constraints and indexes
+- nodes: batched node writes
+- relationships: batched relationship writes
+- statistics: the closing node and relationship counts
+
+Backends:
+- memory: the in-memory graph; round trips are repository operations
+- dry-run: the Neo4j repository with a connection that only counts the
+  Cypher statements it would send (client-side cost and exact round trips)
+- neo4j: the configured database; ingestion CLEARS it, so --allow-clear
+  is required
+
+Usage:
+    python -m benchmarks.ingestion                                # 10k objects, in memory
+    python -m benchmarks.ingestion --objects 10000 --objects 100000 --objects 500000
+    python -m benchmarks.ingestion --backend dry-run --fixture-dir .fixtures
+    python -m benchmarks.ingestion --output results/ingestion.json --baseline results/main.json
+
+Peak memory is that of the whole process; sizes run smallest first, so for
+clean memory figures of a large size run it on its own. Exit status is 1
+when a baseline is given and a phase got slower by more than
+--max-regression, 0 otherwise.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import (
+    CountingConnection, CountingRepository, MemorySampler, compare_results, environment_info, write_results
+)
+from benchmarks.stix_fixtures import write_attack_bundle
+from src.cybersecurity.attack_ingestion import AttackIngestion
+from src.knowledge_base.memory_graph import InMemoryGraph
+from src.knowledge_base.repository import Neo4jRepository
+from src.utils.progress import ProgressReporter, ProgressTracker
+
+BACKENDS = ('memory', 'dry-run', 'neo4j')
+
+# Progress bar label -> phase it starts, as reported by ingest_to_neo4j
+_PHASE_LABELS = {
+    'Ingesting ATT&CK nodes': 'nodes',
+    'Ingesting ATT&CK relationships': 'relationships'
+}
+
+
+class PhaseRecorder:
+    """Time, peak memory and round trips of consecutive benchmark phases."""
+
+    def __init__(self, sampler: MemorySampler, repository: CountingRepository,
+                 connection: Optional[CountingConnection] = None):
+        self.sampler = sampler
+        self.repository = repository
+        self.connection = connection
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[str] = None
+        self._started_at = 0.0
+
+    def start(self, name: str):
+        """Finish the running phase, if any, and start ``name``."""
+        self.finish()
+        self._current = name
+        self._started_at = time.perf_counter()
+        self.sampler.mark()
+        self.repository.reset()
+        if self.connection:
+            self.connection.reset()
+
+    def finish(self):
+        """Finish the running phase."""
+        if self._current is None:
+            return
+        operations = self.repository.reset()
+        phase = {
+            'seconds': round(time.perf_counter() - self._started_at, 4),
+            'peak_rss_mb': round(self.sampler.mark() / 2 ** 20, 1),
+            'operations': sum(operations.values()),
+            'operations_by_type': operations
+        }
+        if self.connection:
+            phase.update(self.connection.reset())
+        self.phases[self._current] = phase
+        self._current = None
+
+
+class _PhaseTracker(ProgressTracker):
+    """Progress bar that starts the statistics phase once relationships are written."""
+
+    def close(self):
+        if self.reporter.recorder._current == 'relationships':
+            self.reporter.recorder.start('statistics')
+
+
+class PhaseReporter(ProgressReporter):
+    """Silent reporter switching phases on ingest_to_neo4j's progress bars."""
+
+    def __init__(self, recorder: PhaseRecorder):
+        self.recorder = recorder
+
+    def progress(self, label: str) -> ProgressTracker:
+        if label in _PHASE_LABELS:
+            self.recorder.start(_PHASE_LABELS[label])
+        return _PhaseTracker(self, label)
+
+    def _message(self, level: str, message: str):
+        pass
+
+    def _report_progress(self, label: str, fraction: float):
+        pass
+
+
+def fixture_path(directory: str, objects: int, relationship_ratio: float, seed: int) -> str:
+    """Fixture file for the given size, generated unless it already exists."""
+    path = os.path.join(directory, f"attack-{objects}-r{relationship_ratio:g}-s{seed}.json")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        write_attack_bundle(path, objects, relationship_ratio, seed)
+    return path
+
+
+def open_backend(backend: str):
+    """
+    Graph and statement counter for a backend.
+
+    Returns:
+        tuple: (graph passed to ingest_to_neo4j, CountingConnection or None)
+    """
+    if backend == 'memory':
+        return InMemoryGraph(), None
+    if backend == 'dry-run':
+        connection = CountingConnection()
+        return Neo4jRepository(connection), connection
+    if backend == 'neo4j':
+        from src.knowledge_base.database import create_graph_connection
+        connection = CountingConnection(create_graph_connection())
+        return Neo4jRepository(connection), connection
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def run_size(path: str, backend: str, sampler: MemorySampler) -> Dict[str, Any]:
+    """
+    Load, process and ingest one fixture file.
+
+    Returns:
+        dict: Object counts, per-phase measurements and the ingestion statistics
+    """
+    graph, connection = open_backend(backend)
+    repository = CountingRepository(graph)
+    recorder = PhaseRecorder(sampler, repository, connection)
+    ingestion = AttackIngestion(reporter=PhaseReporter(recorder))
+
+    try:
+        recorder.start('load')
+        with open(path, encoding='utf-8') as file:
+            stix_data = json.load(file)
+
+        recorder.start('process')
+        processed = ingestion.process_attack_objects(stix_data)
+
+        recorder.start('schema')
+        statistics = ingestion.ingest_to_neo4j(repository, processed)
+        recorder.finish()
+    finally:
+        repository.close()
+
+    counts = {
+        'stix_objects': len(stix_data['objects']),
+        'nodes': len(processed['nodes']),
+        'relationships': len(processed['relationships'])
+    }
+    per_phase_items = {
+        'load': counts['stix_objects'],
+        'process': counts['stix_objects'],
+        'nodes': counts['nodes'],
+        'relationships': counts['relationships']
+    }
+    for name, items in per_phase_items.items():
+        phase = recorder.phases.get(name)
+        if phase:
+            phase['items'] = items
+            phase['items_per_s'] = round(items / phase['seconds']) if phase['seconds'] else None
+
+    total = sum(phase['seconds'] for phase in recorder.phases.values())
+    return {
+        **counts,
+        'total_seconds': round(total, 4),
+        'objects_per_s': round(counts['stix_objects'] / total) if total else None,
+        'phases': recorder.phases,
+        'statistics': statistics
+    }
+
+
+def print_summary(results: Dict[str, Any], stream=sys.stderr):
+    """Print a readable table of the per-size, per-phase results."""
+    print(f"{'objects':>9}  {'phase':<14}{'seconds':>9}{'items/s':>11}{'peak MB':>9}{'trips':>8}", file=stream)
+    for size, run in results['sizes'].items():
+        for name, phase in run['phases'].items():
+            trips = phase.get('statements', phase['operations'])
+            rate = phase.get('items_per_s') or ''
+            print(f"{size:>9}  {name:<14}{phase['seconds']:>9.3f}{rate:>11}{phase['peak_rss_mb']:>9}{trips:>8}",
+                  file=stream)
+        print(f"{size:>9}  {'total':<14}{run['total_seconds']:>9.3f}{run['objects_per_s']:>11}", file=stream)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark ATT&CK STIX processing and graph ingestion.")
+    parser.add_argument("--objects", type=int, action="append", dest="sizes",
+                        help="STIX objects per bundle (repeatable; default: 10000).")
+    parser.add_argument("--relationship-ratio", type=float, default=0.75,
+                        help="Share of objects that are relationships (default: 0.75).")
+    parser.add_argument("--seed", type=int, default=7, help="Fixture seed (default: 7).")
+    parser.add_argument("--backend", choices=BACKENDS, default="memory",
+                        help="Graph to ingest into (default: memory).")
+    parser.add_argument("--allow-clear", action="store_true",
+                        help="Confirm that the Neo4j database may be cleared (--backend neo4j).")
+    parser.add_argument("--fixture-dir", metavar="PATH",
+                        help="Keep generated fixtures here and reuse them (default: temporary directory).")
+    parser.add_argument("--output", metavar="PATH", help="Write JSON results here ('-' for stdout).")
+    parser.add_argument("--baseline", metavar="PATH", help="Earlier JSON results to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed relative phase time increase over the baseline (default: 0.2).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark and return the process exit status."""
+    args = parse_args(argv)
+    if args.backend == 'neo4j' and not args.allow_clear:
+        print("The neo4j backend deletes every node in the configured database; "
+              "pass --allow-clear to confirm", file=sys.stderr)
+        return 2
+
+    sizes: List[int] = sorted(set(args.sizes or [10000]))
+    sampler = MemorySampler().start()
+    runs = {}
+    with tempfile.TemporaryDirectory() as temporary:
+        directory = args.fixture_dir or temporary
+        try:
+            for size in sizes:
+                path = fixture_path(directory, size, args.relationship_ratio, args.seed)
+                gc.collect()
+                runs[str(size)] = run_size(path, args.backend, sampler)
+        finally:
+            sampler.stop()
+
+    results = {
+        'benchmark': 'ingestion',
+        'environment': environment_info(),
+        'backend': args.backend,
+        'fixture': {'relationship_ratio': args.relationship_ratio, 'seed': args.seed},
+        'sizes': runs
+    }
+    print_summary(results)
+    if args.output:
+        write_results(args.output, results)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = [
+            change for change in compare_results(results['sizes'], baseline.get('sizes', {}), ('seconds',))
+            if change['change'] > args.max_regression
+        ]
+        for change in regressions:
+            print(f"Regression: {change['path']} {change['metric']} "
+                  f"{change['baseline']} -> {change['current']} ({change['change']:+.0%})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
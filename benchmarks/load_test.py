@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Concurrent Chat Load Test
+
+Drives the chat pipeline the way the app does (ChatPipeline.run_sync on a
+session's own thread, with a shared graph connection and a shared LLM
+gateway) from a growing number of simulated concurrent sessions, and reports
+for each concurrency level the answered turns per second, latency
+percentiles per pipeline stage and time spent waiting on the LLM rate
+limiter, plus the level at which the instance saturates.
+
+The model is a local stub: query analysis prompts get the recorded (or
+keyword) analysis of benchmarks.retrieval, answer prompts a fixed text, each
+after a configurable, jittered latency. It sits behind an LLMGateway with
+the configured limits (LLM_REQUESTS_PER_MINUTE, LLM_BURST,
+LLM_MAX_CONCURRENCY unless overridden), so the measured capacity includes
+the gateway's queuing. Each level starts with fresh limits.
+
+A level saturates when adding sessions raises throughput by less than
+--min-gain, or when its p95 turn latency exceeds --max-latency-factor times
+that of the first level.
+
+Usage:
+    python -m benchmarks.load_test                                  # 1-32 sessions, synthetic graph
+    python -m benchmarks.load_test --sessions 4 --sessions 8 --duration 60
+    python -m benchmarks.load_test --analysis-latency 1.2 --generation-latency 4 --max-concurrency 8
+    python -m benchmarks.load_test --requests-per-minute 0          # no provider rate limit
+    python -m benchmarks.load_test --backend neo4j --output results/load.json
+
+Exit status is 1 when a baseline is given and a p95 latency regressed by
+more than --max-regression, 0 otherwise.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import (
+    MemorySampler, compare_results, environment_info, latency_summary, open_graph, write_results
+)
+from benchmarks.retrieval import DEFAULT_WORKLOAD, ReplayAnalysisLLM, load_workload
+from src.api.chat_pipeline import ChatPipeline
+from src.api.llm_gateway import GatewayLimits, LLMGateway
+from src.config.settings import LLM_REQUESTS_PER_MINUTE, LLM_BURST, LLM_MAX_CONCURRENCY
+
+DEFAULT_SESSIONS = (1, 2, 4, 8, 16, 32)
+
+# Marker of the query analysis prompt (query_analysis_template)
+_ANALYSIS_MARKER = "cybersecurity query analyzer"
+
+_ANSWER_TEXT = (
+    "Based on the knowledge base context, the relevant controls address the question as follows. "
+    "Apply the listed safeguards, monitor for the related techniques and review the mapped "
+    "requirements of each framework in scope. "
+)
+
+
+class LoadTestLLM(ReplayAnalysisLLM):
+    """Stub model answering analysis and answer prompts after a simulated latency."""
+
+    def __init__(self, recorded: Dict[str, Dict[str, Any]], analysis_latency: float = 0.5,
+                 generation_latency: float = 1.5, response_chars: int = 1500, jitter: float = 0.2,
+                 seed: int = 7):
+        """
+        Initialize the stub.
+
+        Args:
+            recorded: Recorded analysis per question text
+            analysis_latency: Mean seconds per query analysis call
+            generation_latency: Mean seconds per answer call
+            response_chars: Length of each answer
+            jitter: Relative spread of the latencies (0.2 = +/-20%)
+            seed: Seed of the latency jitter
+        """
+        super().__init__(recorded)
+        self.analysis_latency = analysis_latency
+        self.generation_latency = generation_latency
+        self.response = (_ANSWER_TEXT * (response_chars // len(_ANSWER_TEXT) + 1))[:response_chars]
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _wait(self, seconds: float):
+        if seconds <= 0:
+            return
+        with self._rng_lock:
+            factor = self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+        time.sleep(seconds * factor)
+
+    def invoke(self, prompt):
+        text = prompt if isinstance(prompt, str) else prompt.to_string()
+        if _ANALYSIS_MARKER in text:
+            self._wait(self.analysis_latency)
+            return super().invoke(text)
+        self._wait(self.generation_latency)
+        return SimpleNamespace(content=self.response)
+
+
+def run_level(graph, model, questions: List[Dict[str, Any]], sessions: int, duration: float,
+              limits: Dict[str, float], think_time: float = 0.0, comprehensive: bool = False,
+              seed: int = 7, sampler: Optional[MemorySampler] = None) -> Dict[str, Any]:
+    """
+    Run one concurrency level.
+
+    Every session starts turns until ``duration`` has passed; turns already
+    started are finished and counted.
+
+    Args:
+        graph: Graph connection shared by the sessions
+        model: Stub model shared by the sessions
+        questions: Workload from load_workload
+        sessions: Concurrent sessions
+        duration: Seconds during which sessions start new turns
+        limits: requests_per_minute, burst and max_concurrency of the gateway
+        think_time: Seconds a session waits between its turns
+        comprehensive: Use Comprehensive Search instead of Smart Selective Search
+        seed: Seed of each session's question order
+        sampler: Memory sampler marked around the level
+
+    Returns:
+        dict: Turns, errors, throughput, latency per stage and gateway counters
+    """
+    llm = LLMGateway(model, limits=GatewayLimits(**limits))
+    timings: List[Dict[str, float]] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+    start = threading.Barrier(sessions + 1)
+    deadline = [0.0]
+
+    def session(index: int):
+        rng = random.Random(seed * 1000 + index)
+        order = list(range(len(questions)))
+        rng.shuffle(order)
+        start.wait()
+        turn = 0
+        while time.perf_counter() < deadline[0]:
+            entry = questions[order[turn % len(order)]]
+            turn += 1
+            try:
+                # A pipeline per turn, as the chat tab creates one per message
+                result = ChatPipeline(graph, llm).run_sync(entry['question'], entry['framework_scope'],
+                                                           comprehensive)
+                with lock:
+                    timings.append(result.timings)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}")
+            if think_time:
+                time.sleep(think_time)
+
+    threads = [threading.Thread(target=session, args=(index,), name=f'session-{index}', daemon=True)
+               for index in range(sessions)]
+    for thread in threads:
+        thread.start()
+    if sampler:
+        sampler.mark()
+    started_at = time.perf_counter()
+    deadline[0] = started_at + duration
+    start.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started_at
+
+    by_stage = defaultdict(list)
+    for turn in timings:
+        for stage, seconds in turn.items():
+            by_stage[stage].append(seconds)
+    stats = llm.stats()
+    turns = len(timings)
+    return {
+        'sessions': sessions,
+        'turns': turns,
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:5],
+        'elapsed_s': round(elapsed, 3),
+        'turns_per_s': round(turns / elapsed, 3) if elapsed else 0.0,
+        'latency': {stage: latency_summary(values) for stage, values in sorted(by_stage.items())},
+        'llm': {
+            'calls': stats['calls'],
+            'retries': stats['retries'],
+            'throttled_s_per_turn': round(stats['throttled_seconds'] / turns, 3) if turns else 0.0
+        },
+        'peak_rss_mb': round(sampler.mark() / 2 ** 20, 1) if sampler else None
+    }
+
+
+def find_saturation(levels: List[Dict[str, Any]], min_gain: float = 0.1,
+                    max_latency_factor: float = 2.0) -> Dict[str, Any]:
+    """
+    Locate the concurrency level at which the instance saturates.
+
+    Args:
+        levels: run_level results in increasing session order
+        min_gain: Smallest relative throughput increase that still counts as scaling
+        max_latency_factor: Largest p95 turn latency, relative to the first level,
+            that still counts as unsaturated
+
+    Returns:
+        dict: sessions and reason of the first saturated level (None if none
+        saturated), and the best throughput with its session count
+    """
+    best = max(levels, key=lambda level: level['turns_per_s'])
+    result = {
+        'sessions': None,
+        'reason': None,
+        'max_turns_per_s': best['turns_per_s'],
+        'max_turns_per_s_sessions': best['sessions']
+    }
+    base_p95 = levels[0]['latency'].get('total', {}).get('p95_ms', 0.0)
+    for previous, level in zip(levels, levels[1:]):
+        p95 = level['latency'].get('total', {}).get('p95_ms', 0.0)
+        if level['turns_per_s'] < previous['turns_per_s'] * (1 + min_gain):
+            result.update(sessions=level['sessions'],
+                          reason=f"throughput gain below {min_gain:.0%} over {previous['sessions']} sessions")
+            break
+        if base_p95 and p95 > base_p95 * max_latency_factor:
+            result.update(sessions=level['sessions'],
+                          reason=f"p95 latency above {max_latency_factor:g}x that of {levels[0]['sessions']} session(s)")
+            break
+    return result
+
+
+def print_summary(results: Dict[str, Any], stream=sys.stderr):
+    """Print a readable table of the per-level results."""
+    print(f"{'sessions':>8}{'turns':>7}{'errors':>7}{'turns/s':>9}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'gen p95':>10}{'throttle s':>11}", file=stream)
+    for level in results['levels']:
+        total = level['latency'].get('total', {})
+        generation = level['latency'].get('generation', {})
+        print(f"{level['sessions']:>8}{level['turns']:>7}{level['errors']:>7}{level['turns_per_s']:>9}"
+              f"{total.get('p50_ms', 0):>10}{total.get('p95_ms', 0):>10}{total.get('p99_ms', 0):>10}"
+              f"{generation.get('p95_ms', 0):>10}{level['llm']['throttled_s_per_turn']:>11}", file=stream)
+    saturation = results['saturation']
+    if saturation['sessions']:
+        print(f"Saturated at {saturation['sessions']} sessions: {saturation['reason']}", file=stream)
+    else:
+        print("No saturation within the tested levels", file=stream)
+    print(f"Best throughput {saturation['max_turns_per_s']} turns/s "
+          f"at {saturation['max_turns_per_s_sessions']} sessions", file=stream)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Load test the chat pipeline with concurrent sessions.")
+    parser.add_argument("--sessions", type=int, action="append", dest="levels",
+                        help=f"Concurrent sessions of a level (repeatable; default: {DEFAULT_SESSIONS}).")
+    parser.add_argument("--duration", type=float, default=20.0,
+                        help="Seconds each level starts new turns (default: 20).")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Seconds a session waits between turns (default: 0).")
+    parser.add_argument("--comprehensive", action="store_true",
+                        help="Use Comprehensive Search instead of Smart Selective Search.")
+    parser.add_argument("--analysis-latency", type=float, default=0.5,
+                        help="Mean seconds of a query analysis call (default: 0.5).")
+    parser.add_argument("--generation-latency", type=float, default=1.5,
+                        help="Mean seconds of an answer call (default: 1.5).")
+    parser.add_argument("--latency-jitter", type=float, default=0.2,
+                        help="Relative spread of the model latencies (default: 0.2).")
+    parser.add_argument("--response-chars", type=int, default=1500, help="Answer length (default: 1500).")
+    parser.add_argument("--requests-per-minute", type=float, default=LLM_REQUESTS_PER_MINUTE,
+                        help=f"Gateway rate limit; 0 disables it (default: {LLM_REQUESTS_PER_MINUTE:g}).")
+    parser.add_argument("--burst", type=int, default=LLM_BURST, help=f"Gateway burst (default: {LLM_BURST}).")
+    parser.add_argument("--max-concurrency", type=int, default=LLM_MAX_CONCURRENCY,
+                        help=f"LLM calls in flight at once (default: {LLM_MAX_CONCURRENCY}).")
+    parser.add_argument("--backend", choices=["synthetic", "memory", "neo4j"], default="synthetic",
+                        help="Graph to search (default: synthetic in-memory graph).")
+    parser.add_argument("--snapshot", metavar="PATH", help="Snapshot file for --backend memory.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Synthetic graph scale (default: 1).")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for graph, questions and latencies.")
+    parser.add_argument("--workload", default=DEFAULT_WORKLOAD, help="Recorded question file.")
+    parser.add_argument("--synthetic-questions", type=int, default=50,
+                        help="Generated questions added to the recorded ones (default: 50).")
+    parser.add_argument("--min-gain", type=float, default=0.1,
+                        help="Throughput gain below which a level counts as saturated (default: 0.1).")
+    parser.add_argument("--max-latency-factor", type=float, default=2.0,
+                        help="p95 growth over the first level at which a level counts as saturated (default: 2).")
+    parser.add_argument("--output", metavar="PATH", help="Write JSON results here ('-' for stdout).")
+    parser.add_argument("--baseline", metavar="PATH", help="Earlier JSON results to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed relative p95 increase over the baseline (default: 0.2).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the load test and return the process exit status."""
+    args = parse_args(argv)
+    graph, graph_info = open_graph(args.backend, args.snapshot, args.scale, args.seed)
+    questions = load_workload(args.workload, args.synthetic_questions, args.seed)
+    model = LoadTestLLM(
+        {entry['question']: entry['analysis'] for entry in questions if entry.get('analysis')},
+        args.analysis_latency, args.generation_latency, args.response_chars, args.latency_jitter, args.seed
+    )
+    limits = {
+        'requests_per_minute': args.requests_per_minute,
+        'burst': args.burst,
+        'max_concurrency': args.max_concurrency
+    }
+
+    sampler = MemorySampler().start()
+    levels = []
+    try:
+        for sessions in sorted(set(args.levels or DEFAULT_SESSIONS)):
+            levels.append(run_level(graph, model, questions, sessions, args.duration, limits,
+                                    args.think_time, args.comprehensive, args.seed, sampler))
+            print(f"{sessions} sessions: {levels[-1]['turns_per_s']} turns/s", file=sys.stderr)
+    finally:
+        sampler.stop()
+        graph.close()
+
+    results = {
+        'benchmark': 'load_test',
+        'environment': environment_info(),
+        'graph': graph_info,
+        'workload': {
+            'questions': len(questions),
+            'mode': 'comprehensive' if args.comprehensive else 'smart',
+            'duration_s': args.duration,
+            'think_time_s': args.think_time
+        },
+        'llm': {
+            'analysis_latency_s': args.analysis_latency,
+            'generation_latency_s': args.generation_latency,
+            'latency_jitter': args.latency_jitter,
+            'response_chars': args.response_chars,
+            **limits
+        },
+        'levels': levels,
+        'saturation': find_saturation(levels, args.min_gain, args.max_latency_factor)
+    }
+    print_summary(results)
+    if args.output:
+        write_results(args.output, results)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        current = {str(level['sessions']): level['latency'] for level in levels}
+        previous = {str(level['sessions']): level['latency'] for level in baseline.get('levels', [])}
+        regressions = [
+            change for change in compare_results(current, previous, ('p95_ms',))
+            if change['change'] > args.max_regression
+        ]
+        for change in regressions:
+            print(f"Regression: {change['path']} {change['metric']} "
+                  f"{change['baseline']} -> {change['current']} ({change['change']:+.0%})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
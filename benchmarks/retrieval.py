@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Chat Retrieval Benchmark
+
+Replays chat questions through the retrieval half of the chat pipeline and
+reports how long it takes, how many graph searches it issues and how much
+context it produces, per search mode.
+
+Recorded questions (benchmarks/workloads/chat_questions.json) carry the
+query analysis the LLM returned when they were asked; a stub model replays
+those analyses through analyze_user_query, so runs need no network or API
+key and always search the same keywords. Synthetic questions built from the
+synthetic graph's vocabulary can be added to widen the workload.
+
+Search modes:
+- smart: analyze_user_query, then get_framework_aware_context over the
+  analyzed keywords and object types (Smart Selective Search)
+- comprehensive: keywords taken from the question and every object type of
+  the scope (Comprehensive Search)
+
+Usage:
+    python -m benchmarks.retrieval                          # synthetic graph, recorded questions
+    python -m benchmarks.retrieval --scale 5 --synthetic-questions 200
+    python -m benchmarks.retrieval --backend memory --snapshot kb.ndjson.gz
+    python -m benchmarks.retrieval --output results/retrieval.json --baseline results/main.json
+
+Exit status is 1 when a baseline is given and a p95 latency regressed by
+more than --max-regression, 0 otherwise.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from benchmarks.common import (
+    SYNTHETIC_VOCABULARY, CountingRepository, compare_results, environment_info,
+    latency_summary, open_graph, percentile, timed, write_results
+)
+from src.api.chat_pipeline import COMPREHENSIVE_TYPES, extract_keywords
+from src.api.llm_service import DEFAULT_RELEVANT_TYPES, analyze_user_query
+from src.knowledge_base.context_builder import FRAMEWORK_NODE_MAPPING, estimate_tokens
+from src.knowledge_base.graph_operations import get_framework_aware_context
+
+DEFAULT_WORKLOAD = os.path.join(os.path.dirname(__file__), 'workloads', 'chat_questions.json')
+SEARCH_MODES = ('smart', 'comprehensive')
+
+_QUESTION_PATTERN = re.compile(r"\*\*User Question:\*\* (.*)")
+
+
+class ReplayAnalysisLLM:
+    """
+    Stub model answering query analysis prompts.
+
+    Recorded questions get their recorded analysis; any other question gets
+    the keywords of the question itself and the scope's default object types.
+    """
+
+    def __init__(self, recorded: Dict[str, Dict[str, Any]], latency: float = 0.0):
+        """
+        Initialize the stub.
+
+        Args:
+            recorded: Recorded analysis per question text
+            latency: Seconds each call sleeps, to simulate model latency
+        """
+        self.recorded = recorded
+        self.latency = latency
+
+    def invoke(self, prompt):
+        text = prompt if isinstance(prompt, str) else prompt.to_string()
+        match = _QUESTION_PATTERN.search(text)
+        question = match.group(1).strip() if match else ''
+        scope_match = re.search(r"\*\*Framework Scope:\*\* (.*)", text)
+        scope = scope_match.group(1).strip() if scope_match else "All Frameworks"
+
+        analysis = self.recorded.get(question) or {
+            'relevant_types': DEFAULT_RELEVANT_TYPES.get(scope, DEFAULT_RELEVANT_TYPES["All Frameworks"]),
+            'keywords': extract_keywords(question, limit=5),
+            'focus': 'synthetic question'
+        }
+        if self.latency:
+            time.sleep(self.latency)
+        return SimpleNamespace(content=json.dumps({**analysis, 'framework_filter': scope}))
+
+
+def load_workload(path: str, synthetic_questions: int = 0, seed: int = 7) -> List[Dict[str, Any]]:
+    """
+    Load recorded questions and add generated ones.
+
+    Args:
+        path: Recorded question file
+        synthetic_questions: Number of generated questions to add
+        seed: Random seed for generated questions
+
+    Returns:
+        list: {'question', 'framework_scope', 'analysis' (None for generated), 'source'}
+    """
+    with open(path, encoding='utf-8') as file:
+        recorded = json.load(file)['questions']
+    questions = [{**entry, 'source': 'recorded'} for entry in recorded]
+
+    rng = random.Random(seed)
+    scopes = list(FRAMEWORK_NODE_MAPPING) + ["All Frameworks"]
+    templates = [
+        "How do I improve {} {}?",
+        "What covers {} and {}?",
+        "Explain {} {} controls",
+        "Which guidance addresses {} {} risks?"
+    ]
+    for _ in range(synthetic_questions):
+        words = rng.sample(SYNTHETIC_VOCABULARY, 2)
+        questions.append({
+            'question': rng.choice(templates).format(*words),
+            'framework_scope': rng.choice(scopes),
+            'analysis': None,
+            'source': 'synthetic'
+        })
+    return questions
+
+
+def run_question(graph: CountingRepository, llm, entry: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """
+    Run one question through one search mode.
+
+    Returns:
+        dict: analysis_s, retrieval_s, total_s, searches, operations,
+        context_chars and context_tokens
+    """
+    question, scope = entry['question'], entry['framework_scope']
+    analysis_seconds = 0.0
+
+    if mode == 'smart':
+        analysis, analysis_seconds = timed(analyze_user_query, llm, question, scope)
+        keywords, relevant_types = analysis['keywords'], analysis['relevant_types']
+    else:
+        keywords = extract_keywords(question, limit=5)
+        relevant_types = COMPREHENSIVE_TYPES.get(scope, COMPREHENSIVE_TYPES["All Frameworks"])
+
+    graph.reset()
+    context, retrieval_seconds = timed(get_framework_aware_context, graph, keywords, relevant_types, scope)
+    operations = graph.reset()
+
+    return {
+        'analysis_s': analysis_seconds,
+        'retrieval_s': retrieval_seconds,
+        'total_s': analysis_seconds + retrieval_seconds,
+        'searches': operations.get('search_nodes', 0),
+        'operations': sum(operations.values()),
+        'context_chars': len(context),
+        'context_tokens': estimate_tokens(context)
+    }
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        'mean': round(sum(values) / len(values), 2) if values else 0.0,
+        'p95': percentile(values, 95),
+        'max': max(values) if values else 0
+    }
+
+
+def summarize(samples: List[Dict[str, Any]], scopes: List[str]) -> Dict[str, Any]:
+    """Aggregate the samples of one search mode."""
+    by_scope = defaultdict(list)
+    for sample, scope in zip(samples, scopes):
+        by_scope[scope].append(sample['retrieval_s'])
+
+    return {
+        'analysis': latency_summary(sample['analysis_s'] for sample in samples),
+        'retrieval': latency_summary(sample['retrieval_s'] for sample in samples),
+        'total': latency_summary(sample['total_s'] for sample in samples),
+        'searches_per_question': _distribution([sample['searches'] for sample in samples]),
+        'operations_per_question': _distribution([sample['operations'] for sample in samples]),
+        'context_tokens': _distribution([sample['context_tokens'] for sample in samples]),
+        'context_chars': _distribution([sample['context_chars'] for sample in samples]),
+        'retrieval_by_scope': {scope: latency_summary(values) for scope, values in sorted(by_scope.items())}
+    }
+
+
+def run_benchmark(graph, questions: List[Dict[str, Any]], modes=SEARCH_MODES, repeat: int = 3,
+                  warmup: int = 1, llm_latency: float = 0.0) -> Dict[str, Any]:
+    """
+    Replay the questions through each search mode.
+
+    Args:
+        graph: Graph connection or repository
+        questions: Workload from load_workload
+        modes: Search modes to run
+        repeat: Measured passes over the workload per mode
+        warmup: Unmeasured passes per mode run first
+        llm_latency: Seconds the stub model sleeps per analysis call
+
+    Returns:
+        dict: Summary per search mode
+    """
+    counting = CountingRepository(graph)
+    llm = ReplayAnalysisLLM(
+        {entry['question']: entry['analysis'] for entry in questions if entry.get('analysis')}, llm_latency
+    )
+
+    results = {}
+    for mode in modes:
+        for _ in range(warmup):
+            for entry in questions:
+                run_question(counting, llm, entry, mode)
+
+        samples, scopes = [], []
+        for _ in range(repeat):
+            for entry in questions:
+                samples.append(run_question(counting, llm, entry, mode))
+                scopes.append(entry['framework_scope'])
+        results[mode] = summarize(samples, scopes)
+    return results
+
+
+def print_summary(results: Dict[str, Any], stream=sys.stderr):
+    """Print a readable table of the per-mode results."""
+    print(f"{'mode':<14}{'stage':<11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'searches':>10}{'tokens':>9}", file=stream)
+    for mode, summary in results['modes'].items():
+        for stage in ('analysis', 'retrieval', 'total'):
+            latency = summary[stage]
+            extra = ""
+            if stage == 'retrieval':
+                extra = f"{summary['searches_per_question']['mean']:>10}{summary['context_tokens']['mean']:>9}"
+            print(f"{mode:<14}{stage:<11}{latency['p50_ms']:>10}{latency['p95_ms']:>10}{latency['p99_ms']:>10}{extra}",
+                  file=stream)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark chat retrieval latency.")
+    parser.add_argument("--backend", choices=["synthetic", "memory", "neo4j"], default="synthetic",
+                        help="Graph to search (default: synthetic in-memory graph).")
+    parser.add_argument("--snapshot", metavar="PATH", help="Snapshot file for --backend memory.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Synthetic graph scale (default: 1).")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for synthetic graph and questions.")
+    parser.add_argument("--workload", default=DEFAULT_WORKLOAD, help="Recorded question file.")
+    parser.add_argument("--synthetic-questions", type=int, default=0,
+                        help="Generated questions added to the recorded ones.")
+    parser.add_argument("--mode", action="append", choices=SEARCH_MODES, dest="modes",
+                        help="Search mode to run (repeatable; default: all).")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured passes over the workload.")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured passes before measuring.")
+    parser.add_argument("--llm-latency", type=float, default=0.0,
+                        help="Seconds the stub model waits per analysis call.")
+    parser.add_argument("--output", metavar="PATH", help="Write JSON results here ('-' for stdout).")
+    parser.add_argument("--baseline", metavar="PATH", help="Earlier JSON results to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed relative p95 increase over the baseline (default: 0.2).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark and return the process exit status."""
+    args = parse_args(argv)
+    graph, graph_info = open_graph(args.backend, args.snapshot, args.scale, args.seed)
+    questions = load_workload(args.workload, args.synthetic_questions, args.seed)
+
+    try:
+        modes = run_benchmark(
+            graph, questions, args.modes or SEARCH_MODES, args.repeat, args.warmup, args.llm_latency
+        )
+    finally:
+        graph.close()
+
+    results = {
+        'benchmark': 'retrieval',
+        'environment': environment_info(),
+        'graph': graph_info,
+        'workload': {
+            'recorded': sum(1 for entry in questions if entry['source'] == 'recorded'),
+            'synthetic': args.synthetic_questions,
+            'repeat': args.repeat,
+            'warmup': args.warmup,
+            'llm_latency_s': args.llm_latency
+        },
+        'modes': modes
+    }
+    print_summary(results)
+    if args.output:
+        write_results(args.output, results)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = [
+            change for change in compare_results(results['modes'], baseline.get('modes', {}), ('p95_ms',))
+            if change['change'] > args.max_regression
+        ]
+        for change in regressions:
+            print(f"Regression: {change['path']} {change['metric']} "
+                  f"{change['baseline']} -> {change['current']} ({change['change']:+.0%})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
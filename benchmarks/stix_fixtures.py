@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Synthetic ATT&CK STIX Fixture Generator
+
+This module generates STIX 2.1 bundles shaped like the MITRE ATT&CK
+enterprise bundle at any size, for ingestion benchmarks and offline
+development. Object mix, sub-technique share, relationship types and
+density, kill chain phases, platforms and external references follow the
+proportions of the published enterprise bundle (about three quarters of its
+objects are relationships), so processing and writing costs scale the same
+way they would with real data.
+
+Objects are generated lazily and written to disk one at a time, so a
+500k-object fixture can be produced without holding it in memory.
+
+Usage:
+    python -m benchmarks.stix_fixtures --objects 100000 --output fixtures/attack-100k.json
+
+Functions:
+    iter_attack_objects: Yield the objects of a synthetic bundle
+    generate_attack_bundle: Build a synthetic bundle in memory
+    write_attack_bundle: Write a synthetic bundle to a JSON file
+"""
+
+import argparse
+import json
+import random
+import sys
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List
+
+# Share of non-relationship objects per STIX type, from the enterprise bundle
+ENTITY_MIX = {
+    'attack-pattern': 0.38,
+    'malware': 0.29,
+    'course-of-action': 0.13,
+    'intrusion-set': 0.08,
+    'x-mitre-data-component': 0.05,
+    'tool': 0.04,
+    'x-mitre-data-source': 0.02,
+    'campaign': 0.01
+}
+
+# Share of relationships per (relationship type, source type, target type)
+RELATIONSHIP_MIX = [
+    (0.36, 'uses', 'intrusion-set', 'attack-pattern'),
+    (0.30, 'uses', 'malware', 'attack-pattern'),
+    (0.05, 'uses', 'tool', 'attack-pattern'),
+    (0.07, 'uses', 'intrusion-set', 'malware'),
+    (0.03, 'uses', 'campaign', 'attack-pattern'),
+    (0.08, 'mitigates', 'course-of-action', 'attack-pattern'),
+    (0.09, 'detects', 'x-mitre-data-component', 'attack-pattern'),
+    (0.02, 'attributed-to', 'campaign', 'intrusion-set')
+]
+
+# Share of techniques that are sub-techniques
+SUBTECHNIQUE_SHARE = 0.6
+
+TACTICS = [
+    'reconnaissance', 'resource-development', 'initial-access', 'execution', 'persistence',
+    'privilege-escalation', 'defense-evasion', 'credential-access', 'discovery', 'lateral-movement',
+    'collection', 'command-and-control', 'exfiltration', 'impact'
+]
+
+PLATFORMS = ['Windows', 'Linux', 'macOS', 'Network', 'Containers', 'IaaS', 'SaaS', 'Office Suite', 'Identity Provider']
+
+_WORDS = [
+    'adversaries', 'may', 'abuse', 'legitimate', 'system', 'processes', 'to', 'execute', 'malicious',
+    'code', 'credentials', 'network', 'traffic', 'registry', 'service', 'account', 'remote', 'access',
+    'command', 'scripting', 'interpreter', 'persistence', 'defense', 'evasion', 'collection', 'data',
+    'exfiltration', 'encrypted', 'channel', 'privilege', 'escalation', 'token', 'manipulation', 'the',
+    'of', 'and', 'in', 'with', 'from', 'which', 'detection', 'monitor', 'for', 'unusual', 'activity'
+]
+
+_PREFIXES = {
+    'attack-pattern': 'T', 'malware': 'S', 'tool': 'S', 'intrusion-set': 'G',
+    'course-of-action': 'M', 'campaign': 'C', 'x-mitre-data-source': 'DS'
+}
+
+
+def _text(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(low, high))).capitalize() + "."
+
+
+def _uuid(rng: random.Random) -> str:
+    value = "%032x" % rng.getrandbits(128)
+    return f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
+
+
+def _external_references(rng: random.Random, external_id: str, citations: int) -> List[Dict[str, str]]:
+    references = [{
+        'source_name': 'mitre-attack',
+        'external_id': external_id,
+        'url': f"https://attack.mitre.org/{external_id.replace('.', '/')}"
+    }]
+    for _ in range(citations):
+        author = rng.choice(['Microsoft', 'Mandiant', 'CrowdStrike', 'Unit 42', 'Kaspersky', 'Talos'])
+        year = rng.randint(2012, 2025)
+        references.append({
+            'source_name': f"{author} {year}",
+            'url': f"https://example.com/{author.lower().replace(' ', '-')}/{rng.getrandbits(32):x}",
+            'description': f"{author}. ({year}). {_text(rng, 4, 10)}"
+        })
+    return references
+
+
+def _entity_counts(entities: int) -> Dict[str, int]:
+    return {stix_type: max(1, int(entities * share)) for stix_type, share in ENTITY_MIX.items()}
+
+
+def iter_attack_objects(objects: int, relationship_ratio: float = 0.75, seed: int = 7,
+                        domain: str = 'enterprise') -> Iterator[Dict[str, Any]]:
+    """
+    Yield the objects of a synthetic ATT&CK bundle.
+
+    Args:
+        objects: Approximate total number of objects
+        relationship_ratio: Share of objects that are relationships
+        seed: Random seed; the same arguments always yield the same objects
+        domain: Value of x_attack_domain, as set by fetch_attack_data
+
+    Yields:
+        dict: STIX objects, entities first, then relationships
+    """
+    rng = random.Random(seed)
+    relationships = int(objects * relationship_ratio)
+    counts = _entity_counts(max(objects - relationships, len(ENTITY_MIX) + len(TACTICS) + 1))
+    timestamp = "2024-04-23T00:00:00.000Z"
+    ids: Dict[str, List[str]] = defaultdict(list)
+
+    def base(stix_type: str, name: str, external_id: str, citations: int) -> Dict[str, Any]:
+        stix_id = f"{stix_type}--{_uuid(rng)}"
+        ids[stix_type].append(stix_id)
+        return {
+            'type': stix_type,
+            'id': stix_id,
+            'spec_version': '2.1',
+            'created': timestamp,
+            'modified': timestamp,
+            'name': name,
+            'description': _text(rng, 30, 140),
+            'external_references': _external_references(rng, external_id, citations),
+            'x_mitre_version': f"1.{rng.randint(0, 4)}",
+            'x_mitre_domains': [f"{domain}-attack"],
+            'x_attack_domain': domain
+        }
+
+    for tactic in TACTICS:
+        obj = base('x-mitre-tactic', tactic.replace('-', ' ').title(), f"TA{len(ids['x-mitre-tactic']):04d}", 0)
+        obj['x_mitre_shortname'] = tactic
+        yield obj
+
+    parents = max(1, int(counts['attack-pattern'] * (1 - SUBTECHNIQUE_SHARE)))
+    parent_ids = []
+    for index in range(counts['attack-pattern']):
+        if index < parents:
+            external_id = f"T{1000 + index}"
+            parent_ids.append(external_id)
+        else:
+            parent = parent_ids[(index - parents) % parents]
+            external_id = f"{parent}.{(index - parents) // parents + 1:03d}"
+        obj = base('attack-pattern', _text(rng, 2, 4).rstrip('.').title(), external_id, rng.randint(0, 6))
+        obj.update({
+            'kill_chain_phases': [
+                {'kill_chain_name': 'mitre-attack', 'phase_name': tactic}
+                for tactic in rng.sample(TACTICS, rng.choice([1, 1, 1, 2, 3]))
+            ],
+            'x_mitre_platforms': rng.sample(PLATFORMS, rng.randint(1, 4)),
+            'x_mitre_data_sources': [f"{_text(rng, 1, 2).rstrip('.')}: {_text(rng, 2, 3).rstrip('.')}"
+                                     for _ in range(rng.randint(0, 4))],
+            'x_mitre_detection': _text(rng, 20, 80),
+            'x_mitre_permissions_required': rng.sample(['User', 'Administrator', 'SYSTEM', 'root'], rng.randint(0, 2)),
+            'x_mitre_defense_bypassed': rng.sample(['Anti-virus', 'Application control', 'Firewall'], rng.randint(0, 2)),
+            'x_mitre_is_subtechnique': '.' in external_id
+        })
+        yield obj
+
+    for stix_type in ('malware', 'tool', 'intrusion-set', 'course-of-action', 'x-mitre-data-source', 'campaign'):
+        for index in range(counts[stix_type]):
+            prefix = _PREFIXES[stix_type]
+            offset = counts['malware'] if stix_type == 'tool' else 0
+            obj = base(stix_type, _text(rng, 1, 2).rstrip('.').title(), f"{prefix}{offset + index:04d}",
+                       rng.randint(0, 8))
+            if stix_type in ('malware', 'tool'):
+                obj['labels'] = [stix_type]
+                obj['x_mitre_aliases'] = [obj['name']]
+                obj['x_mitre_platforms'] = rng.sample(PLATFORMS, rng.randint(1, 3))
+            elif stix_type in ('intrusion-set', 'campaign'):
+                obj['aliases'] = [obj['name']] + [_text(rng, 1, 2).rstrip('.').title() for _ in range(rng.randint(0, 3))]
+                if stix_type == 'campaign':
+                    obj['first_seen'] = "2021-01-01T00:00:00.000Z"
+                    obj['last_seen'] = "2023-06-01T00:00:00.000Z"
+            elif stix_type == 'x-mitre-data-source':
+                obj['x_mitre_platforms'] = rng.sample(PLATFORMS, rng.randint(1, 3))
+                obj['x_mitre_collection_layers'] = rng.sample(['Host', 'Network', 'Cloud Control Plane'], 1)
+            yield obj
+
+    for _ in range(counts['x-mitre-data-component']):
+        obj = base('x-mitre-data-component', _text(rng, 2, 3).rstrip('.').title(), "DC0000", 0)
+        obj['x_mitre_data_source_ref'] = rng.choice(ids['x-mitre-data-source'])
+        obj['external_references'] = []
+        yield obj
+
+    # Sub-technique links come from the technique IDs, the rest from the mix
+    technique_ids = ids['attack-pattern']
+    subtechnique_links = [
+        (technique_ids[index], technique_ids[(index - parents) % parents])
+        for index in range(parents, len(technique_ids))
+    ][:relationships]
+    for source_ref, target_ref in subtechnique_links:
+        yield _relationship(rng, 'subtechnique-of', source_ref, target_ref, timestamp)
+
+    remaining = relationships - len(subtechnique_links)
+    weights = [share for share, *_ in RELATIONSHIP_MIX]
+    for _ in range(max(remaining, 0)):
+        _, rel_type, source_type, target_type = rng.choices(RELATIONSHIP_MIX, weights)[0]
+        yield _relationship(rng, rel_type, rng.choice(ids[source_type]), rng.choice(ids[target_type]), timestamp)
+
+
+def _relationship(rng: random.Random, rel_type: str, source_ref: str, target_ref: str, timestamp: str) -> Dict[str, Any]:
+    return {
+        'type': 'relationship',
+        'id': f"relationship--{_uuid(rng)}",
+        'spec_version': '2.1',
+        'created': timestamp,
+        'modified': timestamp,
+        'relationship_type': rel_type,
+        'source_ref': source_ref,
+        'target_ref': target_ref,
+        'description': _text(rng, 8, 40),
+        'external_references': [
+            {'source_name': f"Report {rng.getrandbits(16)}", 'url': f"https://example.com/r/{rng.getrandbits(32):x}"}
+        ]
+    }
+
+
+def generate_attack_bundle(objects: int, relationship_ratio: float = 0.75, seed: int = 7) -> Dict[str, Any]:
+    """
+    Build a synthetic bundle in memory, in the format fetch_attack_data returns.
+
+    Args:
+        objects: Approximate total number of objects
+        relationship_ratio: Share of objects that are relationships
+        seed: Random seed
+
+    Returns:
+        dict: STIX bundle
+    """
+    return {
+        'type': 'bundle',
+        'id': f"bundle--synthetic-{objects}-{seed}",
+        'objects': list(iter_attack_objects(objects, relationship_ratio, seed))
+    }
+
+
+def write_attack_bundle(path: str, objects: int, relationship_ratio: float = 0.75, seed: int = 7) -> int:
+    """
+    Write a synthetic bundle to a JSON file, one object at a time.
+
+    Args:
+        path: Output file
+        objects: Approximate total number of objects
+        relationship_ratio: Share of objects that are relationships
+        seed: Random seed
+
+    Returns:
+        int: Number of objects written
+    """
+    written = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('{"type": "bundle", "id": "bundle--synthetic-%d-%d", "objects": [\n' % (objects, seed))
+        for obj in iter_attack_objects(objects, relationship_ratio, seed):
+            if written:
+                file.write(",\n")
+            file.write(json.dumps(obj))
+            written += 1
+        file.write("\n]}\n")
+    return written
+
+
+def main(argv=None):
+    """Write a fixture file and return the process exit status."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic ATT&CK STIX bundle.")
+    parser.add_argument("--objects", type=int, default=25000, help="Approximate number of objects (default: 25000).")
+    parser.add_argument("--relationship-ratio", type=float, default=0.75,
+                        help="Share of objects that are relationships (default: 0.75).")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed (default: 7).")
+    parser.add_argument("--output", required=True, help="Bundle file to write.")
+    args = parser.parse_args(argv)
+
+    written = write_attack_bundle(args.output, args.objects, args.relationship_ratio, args.seed)
+    print(f"Wrote {written:,} STIX objects to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ Features:
 - Property analysis and standardization
 - Export capabilities for comprehensive documentation
 - Framework interoperability analysis
+- Optional memory profiling of data fetching and analysis (RSS and top allocation sites)
 
 Supported Frameworks:
 - MITRE ATT&CK: Threat intelligence and adversary tactics
@@ -33,9 +34,25 @@ import plotly.express as px
 import plotly.graph_objects as go
 import os
 from collections import defaultdict, Counter
+from contextlib import nullcontext
 from datetime import datetime
+from functools import wraps
 from typing import Dict, List, Any, Optional
 
+from src.utils.memory_profiler import MemoryProfiler
+
+
+def profiled(stage_name):
+    """Record a method as a memory stage when the analyzer has a memory profiler."""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = self.memory_profiler
+            with profiler.stage(stage_name) if profiler else nullcontext():
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
 
 class MultiFrameworkDataAnalyzer:
     """
@@ -46,8 +63,14 @@ class MultiFrameworkDataAnalyzer:
     and cross-framework mappings.
     """
     
-    def __init__(self):
-        """Initialize the analyzer with framework data sources."""
+    def __init__(self, memory_profiler: Optional[MemoryProfiler] = None):
+        """
+        Initialize the analyzer with framework data sources.
+        
+        Args:
+            memory_profiler: Records memory per fetch and analysis step when given
+        """
+        self.memory_profiler = memory_profiler
         # MITRE ATT&CK URLs
         self.base_url = "https://raw.githubusercontent.com/mitre/cti/master"
         self.enterprise_url = f"{self.base_url}/enterprise-attack/enterprise-attack.json"
@@ -103,6 +126,7 @@ class MultiFrameworkDataAnalyzer:
             }
         }
     
+    @profiled("Fetch ATT&CK data")
     def fetch_attack_data(self, dataset="enterprise"):
         """
         Fetch raw ATT&CK data from MITRE repository.
@@ -128,6 +152,7 @@ class MultiFrameworkDataAnalyzer:
             st.error(f"❌ Failed to fetch {dataset} data: {e}")
             return None
     
+    @profiled("Analyze object types")
     def analyze_object_types(self, data):
         """
         Analyze all object types in the ATT&CK data.
@@ -155,6 +180,7 @@ class MultiFrameworkDataAnalyzer:
         
         return analysis
     
+    @profiled("Analyze object schema")
     def analyze_object_schema(self, objects, obj_type):
         """
         Analyze the schema of a specific object type.
@@ -205,6 +231,7 @@ class MultiFrameworkDataAnalyzer:
             'sample_object': filtered_objects[0] if filtered_objects else None
         }
     
+    @profiled("Analyze relationships")
     def analyze_relationships(self, objects):
         """
         Analyze relationship patterns in ATT&CK data.
@@ -358,6 +385,23 @@ def main():
         ["Overview", "Object Types", "Schema Deep Dive", "Relationships", "Export Documentation", "Cross-Framework Analysis"] if framework == "ATT&CK" else ["Framework Overview", "Document Structure", "Schema Analysis", "Export Documentation"]
     )
     
+    # Memory profiling
+    profile_memory = st.sidebar.checkbox(
+        "🧠 Profile memory",
+        help="Record RSS and top allocation sites of data fetching and analysis (slows analysis down)"
+    )
+    if profile_memory:
+        analyzer.memory_profiler = st.session_state.setdefault('memory_profiler', MemoryProfiler())
+    
+    try:
+        render_analysis(analyzer, framework, dataset, analysis_mode)
+    finally:
+        if profile_memory:
+            render_memory_profile(analyzer.memory_profiler)
+
+
+def render_analysis(analyzer, framework, dataset, analysis_mode):
+    """Fetch the selected framework data and render the selected analysis."""
     # Fetch data
     cache_key = f"{framework}_{dataset if dataset else 'default'}"
     if cache_key not in st.session_state or st.sidebar.button("🔄 Refresh Data"):
@@ -422,6 +466,44 @@ def main():
             st.info("Please ensure the document is available in the documents/ folder.")
 
 
+
+def render_memory_profile(profiler):
+    """Render the memory recorded per fetch and analysis step."""
+    with st.sidebar.expander("🧠 Memory Profile", expanded=True):
+        records = profiler.records()
+        if not records:
+            st.info("No steps recorded yet.")
+            return
+        
+        st.dataframe(pd.DataFrame([
+            {
+                'Step': record.stage,
+                'Time (s)': record.seconds,
+                'RSS Peak (MB)': record.rss_peak_mb,
+                'RSS Change (MB)': round(record.rss_end_mb - record.rss_start_mb, 1),
+                'Traced Peak (MB)': record.traced_peak_mb,
+                'Retained (MB)': record.retained_mb
+            }
+            for record in reversed(records)
+        ]), hide_index=True)
+        
+        index = st.selectbox(
+            "Top allocation sites of",
+            range(len(records) - 1, -1, -1),
+            format_func=lambda i: f"{records[i].stage} ({records[i].traced_peak_mb} MB peak)"
+        )
+        sites = records[index].top_sites
+        if sites:
+            st.dataframe(pd.DataFrame(sites).rename(
+                columns={'site': 'Site', 'size_mb': 'Size (MB)', 'count': 'Blocks'}
+            ), hide_index=True)
+        else:
+            st.caption("No allocations retained at the end of this step.")
+        
+        if st.button("Clear Memory Profile"):
+            profiler.clear()
+            st.rerun()
+
 def render_overview(analyzer, data, objects):
     """Render the overview analysis."""
     st.header("📊 Dataset Overview")
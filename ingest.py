@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Cybersecurity Knowledge Base Ingestion Command Line Tool
+
+This script builds the multi-framework knowledge base without the Streamlit
+app, so the graph can be pre-built in a deployment job and the web app starts
+without blocking on ingestion.
+
+Usage:
+    python ingest.py                              # ingest missing or stale frameworks
+    python ingest.py --framework cis --framework nist
+    python ingest.py --refresh                    # clear the graph and rebuild everything
+    python ingest.py --reporter json --workers 6  # JSON lines progress output
+    python ingest.py --export-snapshot kb.ndjson.gz   # build, then save a snapshot
+    python ingest.py --from-snapshot kb.ndjson.gz     # populate an empty database from a snapshot
+    python ingest.py --push-metrics http://pushgateway:9091   # push Prometheus metrics when done
+    python ingest.py --memory-profile             # report RSS and top allocation sites per stage
+
+Exit status is 0 when every requested framework was ingested, 1 otherwise.
+"""
+
+import argparse
+import logging
+import sys
+
+from src.config.settings import (
+    INGESTION_MAX_WORKERS, METRICS_PUSHGATEWAY_URL, MEMORY_PROFILE, MEMORY_PROFILE_TOP, MEMORY_PROFILE_FRAMES
+)
+from src.cybersecurity.attack_ingestion import AttackIngestion
+from src.knowledge_base.database import create_graph_connection, clear_knowledge_base
+from src.knowledge_base.ingestion_manifest import FRAMEWORK_MANIFEST_SPECS
+from src.knowledge_base.snapshot import export_snapshot, import_snapshot
+from src.utils import memory_profiler, metrics
+from src.utils.initialization import build_knowledge_base, ingest_individual_framework
+from src.utils.progress import create_reporter
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build the cybersecurity knowledge base in Neo4j.")
+    parser.add_argument(
+        "--framework", action="append", choices=list(FRAMEWORK_MANIFEST_SPECS), dest="frameworks",
+        help="Re-ingest only this framework (repeatable). Without it, missing or stale frameworks are ingested."
+    )
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help="Clear the whole knowledge base before ingesting every framework."
+    )
+    parser.add_argument(
+        "--from-snapshot", metavar="PATH",
+        help="Load a snapshot into an empty database, then ingest only frameworks it is missing."
+    )
+    parser.add_argument(
+        "--export-snapshot", metavar="PATH",
+        help="Write a snapshot of the knowledge base after a successful ingestion."
+    )
+    parser.add_argument(
+        "--reporter", choices=["console", "json", "log"], default="console",
+        help="Progress output format (default: console)."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=INGESTION_MAX_WORKERS,
+        help=f"Concurrent ingestion tasks (default: {INGESTION_MAX_WORKERS})."
+    )
+    parser.add_argument(
+        "--push-metrics", metavar="URL", default=METRICS_PUSHGATEWAY_URL or None,
+        help="Push Prometheus metrics to this Pushgateway when done (default: METRICS_PUSHGATEWAY_URL)."
+    )
+    parser.add_argument(
+        "--memory-profile", action="store_true", default=MEMORY_PROFILE,
+        help="Report RSS and the top allocation sites of each ingestion stage (default: MEMORY_PROFILE)."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the requested ingestion and return the process exit status."""
+    args = parse_args(argv)
+    if args.reporter == "log":
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    reporter = create_reporter(args.reporter)
+    if args.memory_profile:
+        memory_profiler.enable(MEMORY_PROFILE_TOP, MEMORY_PROFILE_FRAMES)
+
+    try:
+        graph = create_graph_connection()
+    except ConnectionError as e:
+        reporter.error(f"❌ {e}")
+        return 1
+
+    try:
+        if args.refresh:
+            with reporter.stage("🗑️ Clearing existing knowledge base..."):
+                clear_knowledge_base(graph)
+
+        if args.from_snapshot:
+            with reporter.stage(f"📦 Importing snapshot {args.from_snapshot}..."):
+                success, message = import_snapshot(
+                    graph, args.from_snapshot, reporter=reporter,
+                    schema_setup=AttackIngestion(reporter)._create_database_schema
+                )
+            if not success:
+                reporter.error(f"❌ {message}")
+                return 1
+            reporter.success(f"✅ {message}")
+
+        if args.frameworks:
+            success = True
+            for framework in args.frameworks:
+                with reporter.stage(f"🔄 Ingesting {FRAMEWORK_MANIFEST_SPECS[framework]['name']}..."):
+                    framework_success, message = ingest_individual_framework(graph, framework, reporter)
+                if framework_success:
+                    reporter.success(f"✅ {message}")
+                else:
+                    reporter.error(f"❌ {message}")
+                success = success and framework_success
+        else:
+            success, message = build_knowledge_base(graph, reporter, args.workers)
+
+        if args.export_snapshot:
+            if not success:
+                reporter.warning("⚠️ Not exporting a snapshot because ingestion did not complete")
+            else:
+                with reporter.stage(f"📦 Exporting snapshot {args.export_snapshot}..."):
+                    export_snapshot(graph, args.export_snapshot, reporter=reporter)
+
+        return 0 if success else 1
+
+    except Exception as e:
+        reporter.error(f"❌ Error during knowledge base ingestion: {str(e)}")
+        return 1
+
+    finally:
+        graph.close()
+        if args.push_metrics:
+            pushed, message = metrics.push_to_gateway(args.push_metrics, 'knowledge_base_ingest')
+            if pushed:
+                reporter.info(message)
+            else:
+                reporter.warning(f"⚠️ {message}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
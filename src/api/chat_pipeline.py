@@ -0,0 +1,273 @@
+"""
+Asynchronous Chat Pipeline Module
+
+This module runs the chat pipeline (query analysis, knowledge base retrieval,
+response generation) with overlapping stages. While the LLM analyzes the
+question, a cheap keyword retrieval over the scope's default object types
+starts speculatively from the raw question. When the analysis returns, the
+speculative results are reused if they already cover the analyzed keywords
+and object types; otherwise a targeted retrieval runs and both result sets
+are merged. Speculative searches that are no longer needed are cancelled.
+
+Features:
+- Query analysis and speculative retrieval run concurrently
+- Reuse, merge or cancellation of speculative results
+- Per-stage wall-clock timings and a span trace for every answer
+- Prometheus metrics of chat turns and stage latency
+- Synchronous wrapper for Streamlit scripts
+
+Classes:
+    ChatResult: Response, context and timings of one answer
+    ChatPipeline: Overlapped analysis, retrieval and generation
+
+Functions:
+    extract_keywords: Keywords taken directly from a question
+"""
+
+import asyncio
+import contextvars
+import functools
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.api.llm_service import DEFAULT_RELEVANT_TYPES, analyze_user_query, chat_with_knowledge_base
+from src.config.settings import CONTEXT_CANDIDATES_PER_TYPE
+from src.knowledge_base.context_builder import (
+    ContextResult, merge_candidates, pack_context, retrieve_candidates
+)
+from src.utils import metrics, tracing
+
+TURNS = metrics.counter(
+    'chat_turns_total', "Answered chat turns", ['scope', 'mode', 'speculation', 'outcome']
+)
+STAGE_SECONDS = metrics.histogram(
+    'chat_stage_seconds', "Wall time of chat pipeline stages ('total' for the whole turn)", ['stage']
+)
+
+# Object types searched by Comprehensive Search per framework scope
+COMPREHENSIVE_TYPES = {
+    "ATT&CK Only": ["techniques", "malware", "threat_groups", "tools", "mitigations", "data_sources", "campaigns"],
+    "CIS Controls": ["cis_controls", "cis_safeguards"],
+    "NIST CSF": ["nist_functions", "nist_categories", "nist_subcategories"],
+    "HIPAA": ["hipaa_regulations", "hipaa_sections", "hipaa_requirements"],
+    "FFIEC": ["ffiec_sections", "ffiec_procedures", "ffiec_examination_steps"],
+    "PCI DSS": ["pci_requirements", "pci_sub_requirements", "pci_testing_procedures"],
+    "All Frameworks": ["techniques", "malware", "threat_groups", "tools", "mitigations",
+                       "cis_controls", "cis_safeguards", "nist_functions", "nist_categories",
+                       "hipaa_regulations", "hipaa_sections", "pci_requirements"]
+}
+
+# Words that never make useful search keywords
+STOPWORDS = {
+    'about', 'and', 'are', 'can', 'does', 'explain', 'for', 'from', 'how', 'into', 'me',
+    'tell', 'that', 'the', 'their', 'there', 'these', 'this', 'what', 'when', 'where',
+    'which', 'who', 'why', 'with', 'you', 'your'
+}
+
+SPECULATIVE_KEYWORD_LIMIT = 8
+
+
+def extract_keywords(question: str, limit: int = SPECULATIVE_KEYWORD_LIMIT) -> List[str]:
+    """
+    Take search keywords directly from a question without calling the LLM.
+
+    Args:
+        question: User question
+        limit: Maximum number of keywords
+
+    Returns:
+        list: Distinct words longer than two characters that are not stopwords,
+        in question order (identifiers such as T1055 or PR.AC are kept intact)
+    """
+    keywords = []
+    for word in re.findall(r"[A-Za-z0-9][\w.\-]*[A-Za-z0-9]", question):
+        if len(word) > 2 and word.lower() not in STOPWORDS and word.lower() not in keywords:
+            keywords.append(word.lower())
+    return keywords[:limit]
+
+
+@dataclass
+class ChatResult:
+    """
+    Outcome of one pass through the chat pipeline.
+
+    Attributes:
+        response: Generated answer
+        context: Knowledge base context the answer was generated from
+        analysis: Query analysis (Smart Selective Search only)
+        keywords: Keywords the context was retrieved with
+        relevant_types: Object types searched
+        speculation: What happened to the speculative retrieval: 'reused',
+            'merged', 'cancelled' or None when none ran
+        timings: Wall-clock seconds per stage, plus 'total'
+        trace: Spans of the answer (stages, searches, LLM calls) with
+            Neo4j query and row counts
+    """
+    response: str
+    context: ContextResult
+    analysis: Optional[Dict[str, Any]]
+    keywords: List[str]
+    relevant_types: List[str]
+    speculation: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    trace: Optional[tracing.Trace] = None
+
+
+class ChatPipeline:
+    """
+    Chat pipeline with overlapped analysis and retrieval.
+
+    Blocking LLM and Neo4j calls run on worker threads so the stages can
+    overlap on one event loop.
+    """
+
+    def __init__(self, graph, llm, candidates_per_type: int = CONTEXT_CANDIDATES_PER_TYPE):
+        """
+        Initialize the pipeline.
+
+        Args:
+            graph: Neo4j database connection instance
+            llm: Configured language model instance
+            candidates_per_type: Candidates retrieved per object type before ranking
+        """
+        self.graph = graph
+        self.llm = llm
+        self.candidates_per_type = candidates_per_type
+
+    async def _timed(self, timings: Dict[str, float], stage: str, func, *args):
+        """Run a blocking call on a worker thread and record its duration and span."""
+        started_at = time.perf_counter()
+        try:
+            with tracing.span(stage):
+                # asyncio.to_thread (Python 3.9+) does the same: run in the default
+                # executor with a copy of the context, so spans nest across threads
+                context = contextvars.copy_context()
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(context.run, func, *args)
+                )
+        finally:
+            timings[stage] = time.perf_counter() - started_at
+
+    def _retrieve(self, keywords, relevant_types, framework_scope, should_stop=None):
+        return retrieve_candidates(
+            self.graph, keywords, relevant_types, framework_scope, self.candidates_per_type, should_stop
+        )
+
+    async def run(self, question: str, framework_scope: str = "All Frameworks",
+                  comprehensive: bool = False) -> ChatResult:
+        """
+        Answer a question.
+
+        Args:
+            question: User question
+            framework_scope: Framework scope, or "All Frameworks"
+            comprehensive: Search every object type of the scope instead of
+                the types chosen by query analysis
+
+        Returns:
+            ChatResult: Response, context, per-stage timings and trace
+        """
+        mode = 'comprehensive' if comprehensive else 'smart'
+        try:
+            with tracing.span('chat_turn', framework_scope=framework_scope, mode=mode,
+                              question_chars=len(question)) as span:
+                result = await self._run(question, framework_scope, comprehensive)
+                span.set(speculation=result.speculation, context_tokens=result.context.tokens_used,
+                         response_chars=len(result.response))
+        except Exception:
+            TURNS.inc(scope=framework_scope, mode=mode, speculation='none', outcome='error')
+            raise
+        result.trace = span.trace
+        TURNS.inc(scope=framework_scope, mode=mode, speculation=result.speculation or 'none', outcome='success')
+        for stage, seconds in result.timings.items():
+            STAGE_SECONDS.observe(seconds, stage=stage)
+        return result
+
+    async def _run(self, question: str, framework_scope: str, comprehensive: bool) -> ChatResult:
+        """Body of run, inside the turn's root span."""
+        started_at = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        if comprehensive:
+            keywords = extract_keywords(question, limit=5)
+            relevant_types = COMPREHENSIVE_TYPES.get(framework_scope, COMPREHENSIVE_TYPES["All Frameworks"])
+            candidates = await self._timed(
+                timings, 'retrieval', self._retrieve, keywords, relevant_types, framework_scope
+            )
+            analysis, speculation = None, None
+        else:
+            analysis, keywords, relevant_types, candidates, speculation = await self._analyze_and_retrieve(
+                question, framework_scope, timings
+            )
+
+        packing_started_at = time.perf_counter()
+        context = pack_context(candidates, keywords, framework_scope)
+        timings['packing'] = time.perf_counter() - packing_started_at
+
+        response = await self._timed(
+            timings, 'generation', chat_with_knowledge_base, self.llm, context.text, question, framework_scope
+        )
+        timings['total'] = time.perf_counter() - started_at
+
+        return ChatResult(
+            response=response,
+            context=context,
+            analysis=analysis,
+            keywords=keywords,
+            relevant_types=relevant_types,
+            speculation=speculation,
+            timings=timings
+        )
+
+    async def _analyze_and_retrieve(self, question: str, framework_scope: str, timings: Dict[str, float]):
+        """
+        Run query analysis and speculative retrieval side by side.
+
+        Returns:
+            tuple: (analysis, keywords, relevant_types, candidates, speculation)
+        """
+        speculative_keywords = extract_keywords(question)
+        speculative_types = DEFAULT_RELEVANT_TYPES.get(framework_scope, DEFAULT_RELEVANT_TYPES["All Frameworks"])
+        stop = threading.Event()
+
+        analysis_task = asyncio.create_task(self._timed(
+            timings, 'analysis', analyze_user_query, self.llm, question, framework_scope
+        ))
+        speculative_task = asyncio.create_task(self._timed(
+            timings, 'speculative_retrieval', self._retrieve,
+            speculative_keywords, speculative_types, framework_scope, stop.is_set
+        ))
+
+        analysis = await analysis_task
+        keywords = analysis['keywords']
+        relevant_types = analysis['relevant_types']
+
+        # Analyzed keywords are covered when every word of them was searched speculatively
+        searched_words = set(speculative_keywords)
+        keywords_covered = all(
+            set(extract_keywords(keyword, limit=len(keyword))) <= searched_words for keyword in keywords
+        )
+        if keywords_covered and set(relevant_types) <= set(speculative_types):
+            candidates = [c for c in await speculative_task if c.obj_type in relevant_types]
+            return analysis, speculative_keywords, relevant_types, candidates, 'reused'
+
+        targeted = await self._timed(
+            timings, 'retrieval', self._retrieve, keywords, relevant_types, framework_scope
+        )
+
+        if speculative_task.done():
+            speculative = [c for c in speculative_task.result() if c.obj_type in relevant_types]
+            return analysis, keywords, relevant_types, merge_candidates(targeted, speculative), 'merged'
+
+        # The targeted search finished first; stop the remaining speculative queries
+        stop.set()
+        speculative_task.cancel()
+        return analysis, keywords, relevant_types, targeted, 'cancelled'
+
+    def run_sync(self, question: str, framework_scope: str = "All Frameworks",
+                 comprehensive: bool = False) -> ChatResult:
+        """Answer a question from synchronous code such as a Streamlit script."""
+        return asyncio.run(self.run(question, framework_scope, comprehensive))
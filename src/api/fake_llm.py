@@ -0,0 +1,417 @@
+"""
+Deterministic Fake Chat Model Module
+
+This module provides a local stand-in for the Gemini chat model so ingestion,
+chat and benchmarks run without network access or an API key
+(LLM_PROVIDER=fake). Every answer depends only on the prompt, so repeated
+runs produce identical graphs and transcripts.
+
+Answers are chosen in this order:
+1. A recorded response for the prompt's SHA-256 hash (LLM_FAKE_RECORDINGS,
+   written by RecordingChatModel around a real model)
+2. For query analysis prompts, an analysis of the question: object types of
+   the framework scope named in the question, and its keywords
+3. For prompts containing a JSON template (the ingesters' extraction and
+   summary prompts), JSON following the template: nested lists get a few
+   items with hierarchical ids, descriptions are sentences of the source
+   text quoted in the prompt
+4. Otherwise a plain text answer built from the prompt's context
+
+A configurable latency before the first token plus a token throughput
+simulate the provider's response time.
+
+Features:
+- Replay of recorded responses keyed by prompt hash
+- Schema-following JSON for extraction prompts
+- Query analysis answers for the chat pipeline
+- Simulated latency and token throughput, with usage metadata
+
+Classes:
+    FakeMessage: Response with content and token usage
+    FakeChatModel: Deterministic chat model exposing invoke(prompt)
+    RecordingChatModel: Wrapper recording a real model's responses for replay
+
+Functions:
+    prompt_hash: Hash recorded responses are keyed by
+    prompt_text: Text of a prompt string or prompt value
+    load_recordings: Read a recording file
+    default_recordings: Recordings from LLM_FAKE_RECORDINGS, loaded once
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.config.settings import (
+    LLM_FAKE_LATENCY_SECONDS, LLM_FAKE_TOKENS_PER_SECOND, LLM_FAKE_RECORDINGS, LLM_FAKE_LIST_ITEMS
+)
+
+# Marker and fields of the chat pipeline's query analysis prompt
+_ANALYSIS_MARKER = "cybersecurity query analyzer"
+_QUESTION = re.compile(r"\*\*User Question:\*\* (.*)")
+_SCOPE = re.compile(r"\*\*Framework Scope:\*\* (.*)")
+
+# Source text quoted by the extraction prompts
+_SOURCE_TEXT = re.compile(r"(?:PDF Text|Sections|Context|Knowledge Base Context)[^:\n]*:\s*(.*)", re.DOTALL)
+_SECTION_IDS = re.compile(r"^\s*\[([^\]\n]+)\]", re.MULTILINE)
+_OPTIONS = re.compile(r"\(([^()]*[,/][^()]*)\)")
+_EXAMPLE = re.compile(r"\(e\.g\.,?\s*([^,()]+)[,)]")
+_PLACEHOLDER_ID = re.compile(r"^[XYZ](?:\.[XYZ])*$")
+_CONTEXT = re.compile(r"\*\*Context from [^*]*:\*\*\s*(.*?)\*\*User Question:\*\*", re.DOTALL)
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9-]{2,}")
+
+_STOPWORDS = {
+    'about', 'all', 'and', 'any', 'are', 'can', 'does', 'explain', 'for', 'from', 'how', 'into',
+    'me', 'most', 'should', 'tell', 'that', 'the', 'their', 'there', 'this', 'what', 'when',
+    'which', 'who', 'why', 'with', 'you', 'your'
+}
+
+
+def prompt_text(prompt: Any) -> str:
+    """Text of a prompt string or LangChain prompt value."""
+    if isinstance(prompt, str):
+        return prompt
+    if hasattr(prompt, 'to_string'):
+        return prompt.to_string()
+    return str(prompt)
+
+
+def prompt_hash(prompt: Any) -> str:
+    """SHA-256 hex digest of a prompt's text, the key of recorded responses."""
+    return hashlib.sha256(prompt_text(prompt).encode('utf-8')).hexdigest()
+
+
+def load_recordings(path: str) -> Dict[str, str]:
+    """
+    Read recorded responses.
+
+    Args:
+        path: JSON lines file of {"prompt_hash", "response"} records
+
+    Returns:
+        dict: Response text per prompt hash (the last record of a hash wins)
+    """
+    recordings = {}
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                recordings[record['prompt_hash']] = record['response']
+    return recordings
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+@dataclass
+class FakeMessage:
+    """
+    Response of the fake model, shaped like a LangChain AIMessage.
+
+    Attributes:
+        content: Response text
+        usage_metadata: input_tokens, output_tokens and total_tokens (estimated)
+        response_metadata: Which rule produced the response
+    """
+    content: str
+    usage_metadata: Dict[str, int] = field(default_factory=dict)
+    response_metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class FakeChatModel:
+    """
+    Deterministic chat model exposing invoke(prompt).
+
+    Thread-safe; one instance can serve every session and ingestion worker.
+    """
+
+    def __init__(self, recordings: Optional[Dict[str, str]] = None,
+                 latency_seconds: float = LLM_FAKE_LATENCY_SECONDS,
+                 tokens_per_second: float = LLM_FAKE_TOKENS_PER_SECOND,
+                 list_items: int = LLM_FAKE_LIST_ITEMS, answer_chars: int = 1200,
+                 sleep=time.sleep):
+        """
+        Initialize the model.
+
+        Args:
+            recordings: Response text per prompt hash (see load_recordings)
+            latency_seconds: Delay before the first token
+            tokens_per_second: Output token rate; 0 returns the whole response
+                after the first-token delay
+            list_items: Items generated for each list of objects in a JSON template
+            answer_chars: Length of plain text answers
+            sleep: Sleep function, replaceable in tests
+        """
+        self.recordings = recordings or {}
+        self.latency_seconds = latency_seconds
+        self.tokens_per_second = tokens_per_second
+        self.list_items = max(list_items, 1)
+        self.answer_chars = answer_chars
+        self.sleep = sleep
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def calls(self) -> int:
+        """Number of invoke calls answered."""
+        with self._lock:
+            return self._calls
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> FakeMessage:
+        """
+        Answer a prompt.
+
+        Args:
+            prompt: Prompt string or LangChain prompt value
+            *args, **kwargs: Ignored invoke options
+
+        Returns:
+            FakeMessage: Response with estimated token usage
+        """
+        text = prompt_text(prompt)
+        key = prompt_hash(text)
+        if key in self.recordings:
+            content, source = self.recordings[key], 'recording'
+        elif _ANALYSIS_MARKER in text:
+            content, source = json.dumps(self._analysis(text)), 'analysis'
+        else:
+            template = self._json_template(text)
+            if template is not None:
+                content, source = json.dumps(self._fill(template, text, key), indent=2), 'json'
+            else:
+                content, source = self._answer(text, key), 'text'
+
+        output_tokens = _estimate_tokens(content)
+        delay = self.latency_seconds
+        if self.tokens_per_second > 0:
+            delay += output_tokens / self.tokens_per_second
+        if delay > 0:
+            self.sleep(delay)
+        with self._lock:
+            self._calls += 1
+
+        input_tokens = _estimate_tokens(text)
+        return FakeMessage(
+            content=content,
+            usage_metadata={'input_tokens': input_tokens, 'output_tokens': output_tokens,
+                            'total_tokens': input_tokens + output_tokens},
+            response_metadata={'model_name': 'fake', 'source': source}
+        )
+
+    def _analysis(self, text: str) -> Dict[str, Any]:
+        """Query analysis of the question in an analysis prompt."""
+        from src.knowledge_base.context_builder import FRAMEWORK_NODE_MAPPING
+
+        question_match = _QUESTION.search(text)
+        scope_match = _SCOPE.search(text)
+        question = question_match.group(1).strip() if question_match else ''
+        scope = scope_match.group(1).strip() if scope_match else "All Frameworks"
+
+        frameworks = [scope] if scope in FRAMEWORK_NODE_MAPPING else list(FRAMEWORK_NODE_MAPPING)
+        words = {word.lower().rstrip('s') for word in _WORD.findall(question)}
+        relevant = [
+            obj_type for framework in frameworks for obj_type in FRAMEWORK_NODE_MAPPING[framework]
+            if set(obj_type.rstrip('s').split('_')) & words
+        ]
+        if not relevant:
+            # The first two object types of each framework in scope
+            relevant = [obj_type for framework in frameworks for obj_type in list(FRAMEWORK_NODE_MAPPING[framework])[:2]]
+
+        return {
+            'relevant_types': relevant,
+            'keywords': self._keywords(question),
+            'focus': question[:120],
+            'framework_filter': scope
+        }
+
+    @staticmethod
+    def _keywords(text: str, limit: int = 5) -> List[str]:
+        keywords = []
+        for word in _WORD.findall(text):
+            lowered = word.lower()
+            if lowered not in _STOPWORDS and lowered not in keywords:
+                keywords.append(lowered)
+        return keywords[:limit]
+
+    @staticmethod
+    def _json_template(text: str) -> Optional[Any]:
+        """The first JSON object in a prompt that parses, or None."""
+        start = text.find('{')
+        while start != -1:
+            depth = 0
+            for index in range(start, len(text)):
+                if text[index] == '{':
+                    depth += 1
+                elif text[index] == '}':
+                    depth -= 1
+                    if depth == 0:
+                        try:
+                            return json.loads(text[start:index + 1])
+                        except ValueError:
+                            break
+            start = text.find('{', start + 1)
+        return None
+
+    def _fill(self, template: Any, text: str, key: str) -> Any:
+        """JSON following a template, with content drawn from the prompt's source text."""
+        rng = random.Random(key)
+        source = _SOURCE_TEXT.search(text)
+        sentences = [
+            sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+|\n{2,}", source.group(1) if source else text)
+            if len(sentence.split()) >= 4
+        ] or ["Synthetic content generated offline."]
+
+        # A single placeholder key ("SECTION-ID": "Summary") maps every id quoted in the prompt
+        if isinstance(template, dict) and len(template) == 1:
+            (placeholder, value), = template.items()
+            ids = _SECTION_IDS.findall(text)
+            if placeholder.isupper() and 'ID' in placeholder and ids:
+                return self._summaries(text)
+
+        def fill(value, name, path, parent_id, depth):
+            if isinstance(value, dict):
+                result = {}
+                own_id = None
+                if 'id' in value:
+                    own_id = self._identifier(value['id'], path, parent_id)
+                for field_name, field_value in value.items():
+                    if field_name == 'id':
+                        result['id'] = own_id
+                    else:
+                        result[field_name] = fill(field_value, field_name, path, own_id or parent_id, depth + 1)
+                return result
+            if isinstance(value, list):
+                if value and isinstance(value[0], dict):
+                    return [fill(value[0], name, path + [index + 1], parent_id, depth)
+                            for index in range(self.list_items)]
+                return list(value)
+            if isinstance(value, str):
+                example = _EXAMPLE.search(value)
+                if example:
+                    return example.group(1).strip()
+                if depth <= 1:
+                    # Top-level scalars (titles, dates) are usually literal in the template
+                    return value
+                options = _OPTIONS.search(value)
+                if options and 'e.g.' not in options.group(1):
+                    choices = [choice.strip() for choice in re.split(r"[,/]", options.group(1)) if choice.strip()]
+                    return choices[(path[-1] - 1) % len(choices)] if path else choices[0]
+                sentence = sentences[rng.randrange(len(sentences))]
+                if name in ('name', 'title'):
+                    return " ".join(sentence.split()[:6]).rstrip('.,;:')
+                return sentence[:400]
+            return value
+
+        return fill(template, None, [], None, 0)
+
+    @staticmethod
+    def _identifier(template: Any, path: List[int], parent_id: Optional[str]) -> str:
+        """Hierarchical id for a generated list item."""
+        template = str(template)
+        if _PLACEHOLDER_ID.match(template):
+            # "X.Y": the item's position in the hierarchy
+            return ".".join(map(str, path[-len(template.split('.')):]))
+        if parent_id:
+            return f"{parent_id}.{path[-1]}"
+        options = _OPTIONS.search(template)
+        if options and 'e.g.' not in options.group(1):
+            choices = [choice.strip() for choice in options.group(1).split(',') if choice.strip()]
+            if path and path[-1] <= len(choices):
+                return choices[path[-1] - 1]
+        prefix = re.match(r"[A-Z]{2,}(?:-[A-Z]+)*?(?=-|$)", template.split()[0] if template.split() else '')
+        number = ".".join(map(str, path)) or "1"
+        return f"{prefix.group(0)}-{number}" if prefix else number
+
+    @staticmethod
+    def _summaries(text: str) -> Dict[str, str]:
+        """First sentence of each "[id] title" block of a summary prompt, per id."""
+        summaries = {}
+        blocks = _SECTION_IDS.split(text)
+        for section_id, block in zip(blocks[1::2], blocks[2::2]):
+            body = block.split('\n', 1)[1] if '\n' in block else block
+            sentence = re.split(r"(?<=[.!?])\s+", " ".join(body.split()))[0]
+            summaries[section_id] = sentence[:300]
+        return summaries
+
+    def _answer(self, text: str, key: str) -> str:
+        """Plain text answer quoting the prompt's context."""
+        rng = random.Random(key)
+        question = _QUESTION.search(text)
+        context = _CONTEXT.search(text)
+        lines = [line.strip() for line in (context.group(1) if context else text).splitlines()
+                 if len(line.split()) >= 4]
+        rng.shuffle(lines)
+        opening = f"Regarding \"{question.group(1).strip()}\": " if question else ""
+        answer = opening + "Based on the knowledge base context, " + " ".join(lines)
+        return answer[:self.answer_chars]
+
+
+class RecordingChatModel:
+    """
+    Wrapper appending a model's responses to a recording file.
+
+    Run ingestion or chat once against the real model with recording
+    enabled (LLM_RECORD_PATH); LLM_FAKE_RECORDINGS pointing at the file then
+    replays those responses offline.
+    """
+
+    def __init__(self, llm, path: str):
+        """
+        Initialize the wrapper.
+
+        Args:
+            llm: Model exposing invoke(prompt)
+            path: JSON lines file responses are appended to
+        """
+        self.llm = llm
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        llm = self.__dict__.get('llm')
+        if llm is None:
+            raise AttributeError(name)
+        return getattr(llm, name)
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> Any:
+        response = self.llm.invoke(prompt, *args, **kwargs)
+        content = getattr(response, 'content', response)
+        if isinstance(content, str):
+            line = json.dumps({'prompt_hash': prompt_hash(prompt), 'response': content})
+            try:
+                with self._lock:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    with open(self.path, 'a', encoding='utf-8') as file:
+                        file.write(line + "\n")
+            except OSError as e:
+                logging.warning(f"Could not record LLM response: {e}")
+        return response
+
+
+_default_recordings: Optional[Dict[str, str]] = None
+_recordings_lock = threading.Lock()
+
+
+def default_recordings() -> Dict[str, str]:
+    """Recordings from LLM_FAKE_RECORDINGS, loaded once per process."""
+    global _default_recordings
+    with _recordings_lock:
+        if _default_recordings is None:
+            _default_recordings = {}
+            if LLM_FAKE_RECORDINGS:
+                try:
+                    _default_recordings = load_recordings(LLM_FAKE_RECORDINGS)
+                    logging.info(f"Loaded {len(_default_recordings):,} recorded LLM responses")
+                except (OSError, ValueError, KeyError) as e:
+                    logging.warning(f"Could not load LLM recordings {LLM_FAKE_RECORDINGS}: {e}")
+        return _default_recordings
@@ -0,0 +1,179 @@
+"""
+LLM Response Cache Module
+
+This module provides a durable, size-bounded cache for LLM responses so that
+expensive document extraction prompts are not re-sent to the model when an
+ingestion is repeated with unchanged text (for example after a failed Neo4j
+write).
+
+Features:
+- SQLite storage that survives application restarts
+- Keys derived from model name, temperature and a SHA-256 hash of the prompt
+- Raw response text and parsed JSON stored side by side
+- Least-recently-used eviction once the cache exceeds its size limit
+
+Classes:
+    LLMResponseCache: Persistent prompt/response cache
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of LLM responses keyed by model, temperature and prompt.
+
+    Each entry holds the raw response text and, once a caller has parsed it,
+    the parsed JSON. Entries are evicted least-recently-used first when the
+    total stored size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Initialize the cache database.
+
+        Args:
+            path: SQLite database file
+            max_bytes: Upper bound on the size of stored responses
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    temperature REAL NOT NULL,
+                    response TEXT NOT NULL,
+                    parsed_json TEXT,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection for one operation, which keeps the cache thread-safe.
+
+        The transaction is committed on success and rolled back on error, and
+        the connection is closed either way (sqlite3's own context manager
+        leaves it open until garbage collection).
+        """
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model: str, temperature: float, prompt: str) -> str:
+        """Build the cache key for a prompt sent to a given model configuration."""
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return f"{model}:{float(temperature)}:{prompt_hash}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Dictionary with 'response' and 'parsed_json' (None until parsed),
+            or None on a cache miss
+        """
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT response, parsed_json FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (time.time(), key))
+
+            return {
+                'response': row[0],
+                'parsed_json': json.loads(row[1]) if row[1] is not None else None
+            }
+        except Exception as e:
+            logging.warning(f"LLM cache read failed: {e}")
+            return None
+
+    def put(self, key: str, model: str, temperature: float, response: str, parsed_json: Any = None):
+        """
+        Store a response, replacing any existing entry for the key.
+
+        Args:
+            key: Cache key from make_key
+            model: Model name the response came from
+            temperature: Sampling temperature used
+            response: Raw response text
+            parsed_json: Parsed JSON payload, if already available
+        """
+        parsed_text = json.dumps(parsed_json) if parsed_json is not None else None
+        size = len(response.encode('utf-8')) + len((parsed_text or '').encode('utf-8'))
+        now = time.time()
+
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO llm_cache
+                        (key, model, temperature, response, parsed_json, size, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (key, model, float(temperature), response, parsed_text, size, now, now))
+                self._evict(conn)
+        except Exception as e:
+            logging.warning(f"LLM cache write failed: {e}")
+
+    def invalidate(self, key: str):
+        """Remove a single entry, e.g. a response that could not be parsed."""
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        except Exception as e:
+            logging.warning(f"LLM cache invalidation failed: {e}")
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of entries and their total size in bytes."""
+        with self._lock, self._connect() as conn:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return {'entries': entries, 'size_bytes': total, 'max_bytes': self.max_bytes}
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used_at ASC"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+        logging.info(f"Evicted {len(evicted)} LLM cache entries")
@@ -0,0 +1,341 @@
+"""
+LLM Gateway Module
+
+This module guards every call to the language model. All Streamlit sessions
+and ingestion workers share one set of limits, so bursts of chat turns or
+concurrent document extraction queue up instead of tripping provider rate
+limits and failing the request.
+
+Features:
+- Token-bucket rate limiting shared across the process
+- Bounded number of calls in flight at once
+- Retry with exponential backoff and jitter on rate limit (429) and
+  unavailable (503) errors
+- Coalescing of identical in-flight prompts into a single model call
+- Works with any object exposing invoke(prompt), e.g. a local fake model
+- A tracing span per call with prompt/response sizes, coalescing and retries
+- Prometheus metrics for requests, latency, tokens, retries and throttling
+
+Classes:
+    TokenBucket: Thread-safe token-bucket rate limiter
+    GatewayLimits: Rate limiter and concurrency limit shared by gateways
+    LLMGateway: Drop-in wrapper around a chat model
+
+Functions:
+    shared_limits: Process-wide limits built from the settings
+    is_retryable_error: Whether a model error is worth retrying
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from src.config.settings import (
+    LLM_REQUESTS_PER_MINUTE, LLM_BURST, LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES, LLM_BACKOFF_SECONDS, LLM_BACKOFF_MAX_SECONDS
+)
+from src.utils import metrics, tracing
+
+REQUESTS = metrics.counter('llm_requests_total', "Model calls by outcome", ['outcome'])
+REQUEST_SECONDS = metrics.histogram('llm_request_seconds', "Model call latency, excluding rate limiter waits")
+TOKENS = metrics.counter(
+    'llm_tokens_total', "Model tokens by direction, from usage metadata or estimated as characters / 4", ['direction']
+)
+RETRIES = metrics.counter('llm_retries_total', "Model calls retried after a 429/503 error")
+COALESCED = metrics.counter('llm_coalesced_total', "Calls answered by an identical prompt already in flight")
+THROTTLED_SECONDS = metrics.counter('llm_throttled_seconds_total', "Time spent waiting for the rate limiter")
+IN_FLIGHT = metrics.gauge('llm_calls_in_flight', "Model calls currently running")
+MAX_CONCURRENCY = metrics.gauge('llm_max_concurrency', "Model calls allowed in flight at once")
+
+# HTTP status codes and gRPC status names reported for transient overload
+RETRYABLE_STATUS_CODES = {429, 503}
+RETRYABLE_MARKERS = ('429', '503', 'RESOURCE_EXHAUSTED', 'UNAVAILABLE', 'rate limit', 'overloaded')
+RETRYABLE_EXCEPTIONS = {'ResourceExhausted', 'ServiceUnavailable', 'TooManyRequests'}
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Tokens are added continuously at ``rate`` per second up to ``capacity``;
+    each call takes one token and blocks until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: int,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second; 0 disables rate limiting
+            capacity: Maximum burst size
+            clock: Monotonic clock, replaceable in tests
+            sleep: Sleep function, replaceable in tests
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting for it if necessary.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+
+class GatewayLimits:
+    """Rate limiter and concurrency limit shared by LLM gateways."""
+
+    def __init__(self, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE, burst: int = LLM_BURST,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the limits.
+
+        Args:
+            requests_per_minute: Sustained request rate; 0 disables rate limiting
+            burst: Requests allowed back to back before the rate applies
+            max_concurrency: Model calls allowed in flight at once
+            clock: Monotonic clock, replaceable in tests
+            sleep: Sleep function, replaceable in tests
+        """
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst, clock, sleep)
+        self.semaphore = threading.BoundedSemaphore(max(max_concurrency, 1))
+        self.max_concurrency = max(max_concurrency, 1)
+        MAX_CONCURRENCY.set(self.max_concurrency)
+
+
+_shared_limits: Optional[GatewayLimits] = None
+_shared_limits_lock = threading.Lock()
+
+
+def shared_limits() -> GatewayLimits:
+    """
+    Get the process-wide limits used by gateways created without their own.
+
+    Returns:
+        GatewayLimits: Limits configured from the LLM_* settings
+    """
+    global _shared_limits
+    with _shared_limits_lock:
+        if _shared_limits is None:
+            _shared_limits = GatewayLimits()
+        return _shared_limits
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Whether a model error signals transient overload (HTTP 429/503).
+
+    Provider SDKs report these differently (status attributes, gRPC
+    exception classes or only the message), so all of them are checked.
+
+    Args:
+        error: Exception raised by the model call
+
+    Returns:
+        bool: True if the call should be retried
+    """
+    for attribute in ('status_code', 'code', 'status'):
+        value = getattr(error, attribute, None)
+        value = value() if callable(value) else value
+        if isinstance(value, int) and value in RETRYABLE_STATUS_CODES:
+            return True
+    if type(error).__name__ in RETRYABLE_EXCEPTIONS:
+        return True
+    message = str(error)
+    return any(marker.lower() in message.lower() for marker in RETRYABLE_MARKERS)
+
+
+class LLMGateway:
+    """
+    Rate-limited, retrying, coalescing wrapper around a chat model.
+
+    Exposes the model's invoke method, so it can be passed anywhere the model
+    itself was used. Other attributes are delegated to the wrapped model.
+    """
+
+    def __init__(self, llm, limits: Optional[GatewayLimits] = None,
+                 max_retries: int = LLM_MAX_RETRIES,
+                 backoff_seconds: float = LLM_BACKOFF_SECONDS,
+                 backoff_max_seconds: float = LLM_BACKOFF_MAX_SECONDS,
+                 sleep: Callable[[float], None] = time.sleep,
+                 jitter: Callable[[float, float], float] = random.uniform):
+        """
+        Initialize the gateway.
+
+        Args:
+            llm: Model exposing invoke(prompt), e.g. ChatGoogleGenerativeAI or a fake
+            limits: Limits to enforce (defaults to the process-wide shared_limits)
+            max_retries: Retries after a 429/503 error before giving up
+            backoff_seconds: Delay before the first retry, doubled on each retry
+            backoff_max_seconds: Upper bound of a single retry delay
+            sleep: Sleep function, replaceable in tests
+            jitter: Random factor source, replaceable in tests
+        """
+        self.llm = llm
+        self.limits = limits or shared_limits()
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.sleep = sleep
+        self.jitter = jitter
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats = {'calls': 0, 'coalesced': 0, 'retries': 0, 'failures': 0, 'throttled_seconds': 0.0}
+        self._stats_lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes the gateway does not define itself
+        llm = self.__dict__.get('llm')
+        if llm is None:
+            raise AttributeError(name)
+        return getattr(llm, name)
+
+    @staticmethod
+    def _prompt_key(prompt: Any) -> str:
+        """Text identifying a prompt for coalescing."""
+        if isinstance(prompt, str):
+            return prompt
+        if hasattr(prompt, 'to_string'):
+            return prompt.to_string()
+        return repr(prompt)
+
+    def _count(self, stat: str, amount: float = 1):
+        with self._stats_lock:
+            self._stats[stat] += amount
+
+    def _count_tokens(self, prompt: Any, response: Any):
+        """Add a response's token usage to the metrics, estimating it when the model reports none."""
+        usage = getattr(response, 'usage_metadata', None) or {}
+        input_tokens = usage.get('input_tokens')
+        output_tokens = usage.get('output_tokens')
+        if input_tokens is None:
+            input_tokens = len(self._prompt_key(prompt)) // 4
+        if output_tokens is None:
+            content = getattr(response, 'content', response)
+            output_tokens = len(content) // 4 if isinstance(content, str) else 0
+        TOKENS.inc(input_tokens, direction='input')
+        TOKENS.inc(output_tokens, direction='output')
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get call counters.
+
+        Returns:
+            dict: calls (sent to the model), coalesced, retries, failures and
+            throttled_seconds (time spent waiting for the rate limiter)
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> Any:
+        """
+        Call the model, sharing the result with identical prompts already in flight.
+
+        Args:
+            prompt: Prompt passed to the model's invoke
+            *args, **kwargs: Extra invoke arguments; calls with extras are not coalesced
+
+        Returns:
+            The model response
+        """
+        key = self._prompt_key(prompt)
+        with tracing.child_span('llm.invoke', prompt_chars=len(key)) as span:
+            response = self._invoke(key, prompt, *args, **kwargs)
+            content = getattr(response, 'content', None)
+            if isinstance(content, str):
+                span.set(response_chars=len(content))
+            span.count('llm.calls')
+            return response
+
+    def _invoke(self, key: str, prompt: Any, *args, **kwargs) -> Any:
+        if args or kwargs:
+            return self._call(prompt, *args, **kwargs)
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            self._count('coalesced')
+            COALESCED.inc()
+            tracing.annotate(coalesced=True)
+            return future.result()
+
+        try:
+            result = self._call(prompt)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _call(self, prompt: Any, *args, **kwargs) -> Any:
+        """Call the model within the limits, retrying transient overload errors."""
+        attempt = 0
+        while True:
+            throttled = self.limits.bucket.acquire()
+            self._count('throttled_seconds', throttled)
+            if throttled:
+                tracing.count('llm.throttled_ms', round(throttled * 1000, 1))
+                THROTTLED_SECONDS.inc(throttled)
+            try:
+                with self.limits.semaphore:
+                    self._count('calls')
+                    IN_FLIGHT.inc()
+                    started_at = time.perf_counter()
+                    try:
+                        response = self.llm.invoke(prompt, *args, **kwargs)
+                    finally:
+                        REQUEST_SECONDS.observe(time.perf_counter() - started_at)
+                        IN_FLIGHT.dec()
+                REQUESTS.inc(outcome='success')
+                self._count_tokens(prompt, response)
+                return response
+            except Exception as e:
+                retryable = is_retryable_error(e)
+                REQUESTS.inc(outcome='rate_limited' if retryable else 'error')
+                if attempt >= self.max_retries or not retryable:
+                    self._count('failures')
+                    raise
+                delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** attempt)
+                delay *= self.jitter(0.5, 1.0)
+                attempt += 1
+                self._count('retries')
+                tracing.count('llm.retries')
+                RETRIES.inc()
+                logging.warning(f"LLM call rate limited or unavailable ({e}); retry {attempt} in {delay:.1f}s")
+                self.sleep(delay)
@@ -0,0 +1,139 @@
+"""
+LLM Provider Module
+
+This module selects the chat model behind the LLM gateway. The chat pipeline
+and the document ingesters only call invoke(prompt) on the model, so any
+provider returning an object with that method can serve them: Google Gemini
+through LangChain in production, or the deterministic local fake (see
+fake_llm) for offline development, benchmarks and load tests.
+
+The provider is chosen with LLM_PROVIDER. With LLM_RECORD_PATH set, the
+responses of the configured provider are also recorded so the fake provider
+can replay them later (LLM_FAKE_RECORDINGS).
+
+Features:
+- Provider interface with Gemini and fake implementations
+- Provider selection by name from the settings
+- Optional recording of responses for offline replay
+
+Classes:
+    LLMProvider: Abstract chat model provider
+    GeminiProvider: Google Gemini via langchain-google-genai
+    FakeProvider: Deterministic local fake model
+
+Functions:
+    get_provider: Provider for a name
+    create_chat_model: Chat model of the configured provider
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Type
+
+from src.config.settings import MODEL_NAME, GEMINI_API_KEY, LLM_PROVIDER, LLM_RECORD_PATH
+
+
+class LLMProvider(ABC):
+    """Source of chat models exposing invoke(prompt)."""
+
+    name = 'abstract'
+
+    @property
+    @abstractmethod
+    def model_id(self) -> str:
+        """Identifier of the model, used to keep cached responses of different models apart."""
+
+    @abstractmethod
+    def create(self, temperature: float) -> Any:
+        """
+        Create a chat model.
+
+        Args:
+            temperature: Sampling temperature
+
+        Returns:
+            Model exposing invoke(prompt) and returning an object with .content
+        """
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through LangChain."""
+
+    name = 'gemini'
+
+    def __init__(self, model_name: str = MODEL_NAME, api_key: Optional[str] = GEMINI_API_KEY):
+        self.model_name = model_name
+        self.api_key = api_key
+
+    @property
+    def model_id(self) -> str:
+        return self.model_name
+
+    def create(self, temperature: float) -> Any:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        return ChatGoogleGenerativeAI(
+            model=self.model_name,
+            temperature=temperature,
+            google_api_key=self.api_key
+        )
+
+
+class FakeProvider(LLMProvider):
+    """Deterministic local model; needs no network or API key."""
+
+    name = 'fake'
+
+    @property
+    def model_id(self) -> str:
+        return 'fake'
+
+    def create(self, temperature: float) -> Any:
+        from src.api.fake_llm import FakeChatModel, default_recordings
+
+        # Answers depend only on the prompt, so the temperature is ignored
+        return FakeChatModel(recordings=default_recordings())
+
+
+PROVIDERS: Dict[str, Type[LLMProvider]] = {
+    GeminiProvider.name: GeminiProvider,
+    FakeProvider.name: FakeProvider
+}
+
+
+def get_provider(name: str = LLM_PROVIDER) -> LLMProvider:
+    """
+    Get the provider for a name.
+
+    Args:
+        name: Provider name ('gemini' or 'fake')
+
+    Returns:
+        LLMProvider: The provider
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    provider = PROVIDERS.get(name)
+    if provider is None:
+        raise ValueError(f"Unknown LLM provider {name!r}; expected one of {', '.join(PROVIDERS)}")
+    return provider()
+
+
+def create_chat_model(temperature: float, provider: Optional[LLMProvider] = None,
+                      record_path: Optional[str] = LLM_RECORD_PATH) -> Any:
+    """
+    Create a chat model of the configured provider.
+
+    Args:
+        temperature: Sampling temperature
+        provider: Provider to use (defaults to LLM_PROVIDER)
+        record_path: Append responses to this file for later replay (LLM_RECORD_PATH)
+
+    Returns:
+        Model exposing invoke(prompt)
+    """
+    model = (provider or get_provider()).create(temperature)
+    if record_path:
+        from src.api.fake_llm import RecordingChatModel
+        model = RecordingChatModel(model, record_path)
+    return model
@@ -7,11 +7,14 @@ prompt templating, and context-aware response generation using the MITRE ATT&CK
 knowledge base.
 
 Features:
-- Google Gemini LLM integration via LangChain
+- Google Gemini LLM integration via LangChain, or an offline fake (see llm_provider)
 - Cybersecurity-specialized prompt templates
 - Context-aware response generation
 - ATT&CK knowledge base integration
 - Document parsing and extraction services
+- Persistent cache of extraction responses (see llm_cache)
+- Rate limiting, retries and request coalescing (see llm_gateway)
+- Tracing spans around query analysis and response generation
 
 Functions:
     get_llm: LLM factory and configuration
@@ -21,78 +24,159 @@ Classes:
     LLMService: Main service class for document extraction and analysis
 """
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
-from src.config.settings import MODEL_NAME, GEMINI_API_KEY
+from src.config.settings import (
+    LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_MB
+)
+from src.api.llm_cache import LLMResponseCache
+from src.api.llm_gateway import LLMGateway
+from src.api.llm_provider import create_chat_model, get_provider
+from src.utils import metrics, tracing
+from typing import Any, Optional
+import json
 import logging
 
 # Suppress LangChain warnings
 import os
 os.environ['LANGCHAIN_TRACING_V2'] = 'false'
 
+CACHE_REQUESTS = metrics.counter('llm_cache_requests_total', "LLM response cache lookups by result", ['result'])
+
 
 class LLMService:
     """
     Service class for LLM-based document parsing and analysis.
     
     Provides methods for extracting structured data from cybersecurity
-    framework documents using Google Gemini LLM.
+    framework documents using the configured LLM provider. Responses are
+    cached on disk by model, temperature and prompt so that repeating an
+    ingestion with unchanged document text does not call the model again.
     """
     
-    def __init__(self):
-        """Initialize the LLM service."""
+    temperature = 0.1  # Low temperature for consistent extraction
+    
+    def __init__(self, use_cache: bool = LLM_CACHE_ENABLED):
+        """
+        Initialize the LLM service.
+        
+        Args:
+            use_cache: Read and write the persistent response cache
+        """
+        self.provider = get_provider()
+        self.model_id = self.provider.model_id
         self.llm = self._get_llm()
+        self.use_cache = use_cache
+        self.cache = LLMResponseCache(LLM_CACHE_PATH, LLM_CACHE_MAX_MB * 1024 * 1024) if use_cache else None
     
     def _get_llm(self):
-        """Initialize and configure the Google Gemini LLM instance."""
-        return ChatGoogleGenerativeAI(
-            model=MODEL_NAME,
-            temperature=0.1,  # Low temperature for consistent extraction
-            google_api_key=GEMINI_API_KEY
-        )
+        """Initialize the configured provider's model behind the shared gateway."""
+        return LLMGateway(create_chat_model(self.temperature, self.provider))
+    
+    def _cache_enabled(self, use_cache: Optional[bool]) -> bool:
+        """Resolve the per-call bypass flag against the service setting."""
+        return self.cache is not None and (self.use_cache if use_cache is None else use_cache)
     
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: str, use_cache: Optional[bool] = None) -> str:
         """
         Generate a response from the LLM based on the given prompt.
         
         Args:
             prompt (str): The input prompt for the LLM
+            use_cache (bool, optional): Set False to bypass the response cache
             
         Returns:
             str: The LLM's response
         """
+        cache_key = LLMResponseCache.make_key(self.model_id, self.temperature, prompt)
+        if self._cache_enabled(use_cache):
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logging.info("LLM response served from cache")
+                tracing.count('llm.cache_hits')
+                CACHE_REQUESTS.inc(result='hit')
+                return cached['response']
+            CACHE_REQUESTS.inc(result='miss')
+        
         try:
             response = self.llm.invoke(prompt)
             if hasattr(response, 'content'):
                 content = response.content
                 if isinstance(content, str):
-                    return content
+                    text = content
                 elif isinstance(content, list):
-                    return str(content)
+                    text = str(content)
                 else:
-                    return str(content)
+                    text = str(content)
             else:
-                return str(response)
+                text = str(response)
         except Exception as e:
             logging.error(f"LLM generation failed: {e}")
             raise
+        
+        if self._cache_enabled(use_cache):
+            self.cache.put(cache_key, self.model_id, self.temperature, text)
+        return text
+    
+    def generate_json_response(self, prompt: str, use_cache: Optional[bool] = None) -> Any:
+        """
+        Generate a response and parse the JSON payload it contains.
+        
+        The parsed JSON is cached alongside the raw response. A response
+        that cannot be parsed is removed from the cache so the next call
+        asks the model again.
+        
+        Args:
+            prompt (str): The input prompt for the LLM
+            use_cache (bool, optional): Set False to bypass the response cache
+            
+        Returns:
+            The parsed JSON value
+            
+        Raises:
+            json.JSONDecodeError: If the response does not contain valid JSON
+        """
+        cache_key = LLMResponseCache.make_key(self.model_id, self.temperature, prompt)
+        if self._cache_enabled(use_cache):
+            cached = self.cache.get(cache_key)
+            if cached is not None and cached['parsed_json'] is not None:
+                logging.info("Parsed LLM response served from cache")
+                tracing.count('llm.cache_hits')
+                CACHE_REQUESTS.inc(result='hit')
+                return cached['parsed_json']
+        
+        response = self.generate_response(prompt, use_cache=use_cache)
+        
+        # Parse JSON response
+        if '```json' in response:
+            json_str = response.split('```json')[1].split('```')[0]
+        else:
+            json_str = response
+        
+        try:
+            parsed = json.loads(json_str)
+        except json.JSONDecodeError:
+            if self._cache_enabled(use_cache):
+                self.cache.invalidate(cache_key)
+            raise
+        
+        if self._cache_enabled(use_cache):
+            self.cache.put(cache_key, self.model_id, self.temperature, response, parsed)
+        return parsed
 
 
 def get_llm():
     """
-    Initialize and configure the Google Gemini LLM instance.
+    Initialize and configure the chat LLM instance.
     
-    Creates a ChatGoogleGenerativeAI instance with cybersecurity-optimized
-    settings including temperature control for consistent responses.
+    Creates the configured provider's model (Google Gemini, or the offline
+    fake with LLM_PROVIDER=fake) with temperature 0 for consistent
+    responses. Calls go through an LLMGateway sharing the process-wide rate
+    and concurrency limits, with retries on rate limit errors.
     
     Returns:
-        ChatGoogleGenerativeAI: Configured LLM instance for chat operations
+        LLMGateway: Configured LLM instance for chat operations
     """
-    return ChatGoogleGenerativeAI(
-        model=MODEL_NAME,
-        temperature=0,  # Deterministic responses for cybersecurity accuracy
-        google_api_key=GEMINI_API_KEY
-    )
+    return LLMGateway(create_chat_model(temperature=0))  # Deterministic responses for cybersecurity accuracy
 
 
 # Framework-specific chat prompt templates
@@ -261,6 +345,18 @@ You have access to comprehensive PCI DSS information including:
 chat_template = framework_templates["All Frameworks"]
 
 
+# Object types searched per framework scope when the query analysis gives none
+DEFAULT_RELEVANT_TYPES = {
+    "ATT&CK Only": ['techniques', 'malware', 'threat_groups'],
+    "CIS Controls": ['cis_controls', 'cis_safeguards'],
+    "NIST CSF": ['nist_functions', 'nist_categories'],
+    "HIPAA": ['hipaa_regulations', 'hipaa_sections'],
+    "FFIEC": ['ffiec_sections', 'ffiec_procedures'],
+    "PCI DSS": ['pci_requirements', 'pci_sub_requirements'],
+    "All Frameworks": ['techniques', 'cis_controls', 'nist_functions']
+}
+
+
 # Framework-aware query analysis prompt template
 query_analysis_template = ChatPromptTemplate.from_template("""
 You are a cybersecurity query analyzer. Your task is to analyze user questions and determine which cybersecurity object types are most relevant within the specified framework scope.
@@ -269,11 +365,11 @@ You are a cybersecurity query analyzer. Your task is to analyze user questions a
 
 **Available Object Types by Framework:**
 - ATT&CK: techniques, malware, threat_groups, tools, mitigations, data_sources, campaigns
-- CIS Controls: cis_controls, cis_safeguards, implementation_groups
+- CIS Controls: cis_controls, cis_safeguards
 - NIST CSF: nist_functions, nist_categories, nist_subcategories
 - HIPAA: hipaa_regulations, hipaa_sections, hipaa_requirements
-- FFIEC: ffiec_categories, ffiec_procedures, ffiec_guidance
-- PCI DSS: pci_requirements, pci_procedures, pci_controls
+- FFIEC: ffiec_sections, ffiec_procedures, ffiec_examination_steps
+- PCI DSS: pci_requirements, pci_sub_requirements, pci_testing_procedures
 
 **User Question:** {question}
 
@@ -319,6 +415,14 @@ def analyze_user_query(llm, user_question, framework_scope="All Frameworks"):
     Returns:
         dict: Analysis results with relevant_types, keywords, focus, and framework_filter
     """
+    with tracing.span('analyze_user_query', framework_scope=framework_scope) as span:
+        analysis = _analyze_user_query(llm, user_question, framework_scope)
+        span.set(keywords=len(analysis['keywords']), relevant_types=len(analysis['relevant_types']))
+        return analysis
+
+
+def _analyze_user_query(llm, user_question, framework_scope):
+    """Body of analyze_user_query, run inside its tracing span."""
     try:
         response = llm.invoke(query_analysis_template.format(
             question=user_question,
@@ -332,20 +436,9 @@ def analyze_user_query(llm, user_question, framework_scope="All Frameworks"):
         # Validate the response structure
         if not isinstance(analysis.get('relevant_types'), list):
             # Provide framework-specific defaults
-            if framework_scope == "ATT&CK Only":
-                analysis['relevant_types'] = ['techniques', 'malware', 'threat_groups']
-            elif framework_scope == "CIS Controls":
-                analysis['relevant_types'] = ['cis_controls', 'cis_safeguards']
-            elif framework_scope == "NIST CSF":
-                analysis['relevant_types'] = ['nist_functions', 'nist_categories']
-            elif framework_scope == "HIPAA":
-                analysis['relevant_types'] = ['hipaa_regulations', 'hipaa_sections']
-            elif framework_scope == "FFIEC":
-                analysis['relevant_types'] = ['ffiec_categories', 'ffiec_procedures']
-            elif framework_scope == "PCI DSS":
-                analysis['relevant_types'] = ['pci_requirements', 'pci_procedures']
-            else:
-                analysis['relevant_types'] = ['techniques', 'cis_controls', 'nist_functions']
+            analysis['relevant_types'] = list(
+                DEFAULT_RELEVANT_TYPES.get(framework_scope, DEFAULT_RELEVANT_TYPES["All Frameworks"])
+            )
                 
         if not isinstance(analysis.get('keywords'), list):
             analysis['keywords'] = [user_question]
@@ -358,6 +451,7 @@ def analyze_user_query(llm, user_question, framework_scope="All Frameworks"):
         
     except Exception as e:
         # Fallback to framework-specific analysis if LLM fails
+        tracing.annotate(fallback=type(e).__name__)
         if framework_scope == "ATT&CK Only":
             return {
                 'relevant_types': ['techniques', 'malware', 'threat_groups'],
@@ -397,14 +491,16 @@ def chat_with_knowledge_base(llm, context, user_question, framework_scope="All F
     Returns:
         str: Generated response with framework-specific cybersecurity intelligence
     """
-    try:
-        # Select the appropriate template based on framework scope
-        template = framework_templates.get(framework_scope, framework_templates["All Frameworks"])
-        
-        response = llm.invoke(template.format(
-            context=context, 
-            question=user_question
-        ))
-        return response.content
-    except Exception as e:
-        return f"❌ Error generating response: {e}"
+    with tracing.span('chat_with_knowledge_base', framework_scope=framework_scope, context_chars=len(context)) as span:
+        try:
+            # Select the appropriate template based on framework scope
+            template = framework_templates.get(framework_scope, framework_templates["All Frameworks"])
+            
+            response = llm.invoke(template.format(
+                context=context, 
+                question=user_question
+            ))
+            return response.content
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            return f"❌ Error generating response: {e}"
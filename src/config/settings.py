@@ -11,10 +11,56 @@ Environment Variables Required:
     NEO4J_PASSWORD: Neo4j database password
     GEMINI_API_KEY: Google Gemini API key for LLM integration
     MODEL_NAME: (Optional) Gemini model name, defaults to gemini-2.5-flash-preview-05-20
+    LLM_PROVIDER: (Optional) Chat model provider, 'gemini' or 'fake' (deterministic, offline), defaults to gemini
+    LLM_FAKE_LATENCY_SECONDS: (Optional) Fake model delay before the first token, defaults to 0
+    LLM_FAKE_TOKENS_PER_SECOND: (Optional) Fake model output token rate (0 for no delay), defaults to 0
+    LLM_FAKE_LIST_ITEMS: (Optional) Items the fake model generates per list in extraction JSON, defaults to 3
+    LLM_FAKE_RECORDINGS: (Optional) JSON lines file of recorded responses the fake model replays
+    LLM_RECORD_PATH: (Optional) Append every LLM response to this file for later replay
+    LLM_CACHE_ENABLED: (Optional) Cache LLM responses on disk, defaults to true
+    LLM_CACHE_PATH: (Optional) Cache database file, defaults to .cache/llm_cache.sqlite3
+    LLM_CACHE_MAX_MB: (Optional) Cache size limit in megabytes, defaults to 256
+    LLM_REQUESTS_PER_MINUTE: (Optional) Sustained LLM request rate per process (0 disables), defaults to 60
+    LLM_BURST: (Optional) LLM requests allowed back to back, defaults to 10
+    LLM_MAX_CONCURRENCY: (Optional) LLM calls in flight at once, defaults to 4
+    LLM_MAX_RETRIES: (Optional) Retries of rate limited (429/503) LLM calls, defaults to 3
+    LLM_BACKOFF_SECONDS: (Optional) First retry delay, doubled per retry, defaults to 1
+    LLM_BACKOFF_MAX_SECONDS: (Optional) Longest retry delay, defaults to 30
+    INGESTION_MAX_WORKERS: (Optional) Frameworks ingested concurrently, defaults to 4
+    NEO4J_HEALTH_CHECK_SECONDS: (Optional) Minimum interval between connection health checks, defaults to 60
+    NEO4J_PROFILE_QUERIES: (Optional) Record every Cypher query's shape, time and rows, defaults to false
+    NEO4J_PROFILE_BUFFER: (Optional) Recent queries kept by the profiler, defaults to 1000
+    NEO4J_SLOW_QUERY_MS: (Optional) Wall time from which profiled queries are logged as slow, defaults to 500
+    NEO4J_PROFILE_PLANS: (Optional) Slowest query shapes whose PROFILE plan is captured (0 disables), defaults to 5
+    NEO4J_MAX_CONNECTION_POOL_SIZE: (Optional) Connections the Neo4j driver keeps per process, defaults to 100
+    GRAPH_BACKEND: (Optional) Graph store, 'neo4j' or 'memory' (embedded, for development), defaults to neo4j
+    MEMORY_GRAPH_SNAPSHOT: (Optional) Snapshot file loaded into the in-memory graph at startup
+    STATISTICS_CACHE_SECONDS: (Optional) Lifetime of cached knowledge base statistics, defaults to 300
+    CONTEXT_TOKEN_BUDGET: (Optional) Estimated tokens of knowledge base context per chat prompt, defaults to 2000
+    CONTEXT_FRAMEWORK_QUOTA: (Optional) Largest budget share of one framework under All Frameworks, defaults to 0.5
+    CONTEXT_CANDIDATES_PER_TYPE: (Optional) Candidates ranked per object type, defaults to 10
+    TRACE_EXPORT: (Optional) Export chat traces: 'otlp' (OTLP/JSON file), 'log' (JSON log records) or none, defaults to none
+    TRACE_EXPORT_PATH: (Optional) OTLP/JSON trace file, defaults to logs/traces.jsonl
+    METRICS_PORT: (Optional) Port of the Prometheus /metrics endpoint started with the app (0 disables), defaults to 0
+    METRICS_ADDRESS: (Optional) Interface the metrics endpoint binds, defaults to 0.0.0.0
+    METRICS_PUSHGATEWAY_URL: (Optional) Prometheus Pushgateway receiving the metrics of headless ingestion runs
+    MEMORY_PROFILE: (Optional) Record RSS and tracemalloc figures per ingestion stage, defaults to false
+    MEMORY_PROFILE_TOP: (Optional) Allocation sites reported per stage, defaults to 10
+    MEMORY_PROFILE_FRAMES: (Optional) Stack frames per allocation site, defaults to 1
+    MEMORY_PROFILE_PATH: (Optional) JSON lines file receiving the per-stage figures of each ingestion run
 
 Configuration Groups:
     - Neo4j Database Settings
     - Google Gemini LLM Settings
+    - LLM Provider Settings
+    - LLM Response Cache Settings
+    - LLM Gateway Settings
+    - Knowledge Base Ingestion Settings
+    - Knowledge Base Explorer Settings
+    - Chat Context Settings
+    - Tracing Settings
+    - Metrics Settings
+    - Memory Profiling Settings
 """
 
 import os
@@ -27,7 +73,62 @@ load_dotenv()
 NEO4J_URI = os.getenv("NEO4J_URI")
 NEO4J_USERNAME = os.getenv("NEO4J_USERNAME") 
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+NEO4J_HEALTH_CHECK_SECONDS = float(os.getenv("NEO4J_HEALTH_CHECK_SECONDS", "60"))
+NEO4J_PROFILE_QUERIES = os.getenv("NEO4J_PROFILE_QUERIES", "false").lower() in ("1", "true", "yes")
+NEO4J_PROFILE_BUFFER = int(os.getenv("NEO4J_PROFILE_BUFFER", "1000"))
+NEO4J_SLOW_QUERY_MS = float(os.getenv("NEO4J_SLOW_QUERY_MS", "500"))
+NEO4J_PROFILE_PLANS = int(os.getenv("NEO4J_PROFILE_PLANS", "5"))
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", "100"))
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "neo4j").lower()
+MEMORY_GRAPH_SNAPSHOT = os.getenv("MEMORY_GRAPH_SNAPSHOT")
 
 # --- Google Gemini LLM Configuration ---
 MODEL_NAME = os.getenv("MODEL_NAME", "gemini-2.5-flash-preview-05-20")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# --- LLM Provider Configuration ---
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+LLM_FAKE_LATENCY_SECONDS = float(os.getenv("LLM_FAKE_LATENCY_SECONDS", "0"))
+LLM_FAKE_TOKENS_PER_SECOND = float(os.getenv("LLM_FAKE_TOKENS_PER_SECOND", "0"))
+LLM_FAKE_LIST_ITEMS = int(os.getenv("LLM_FAKE_LIST_ITEMS", "3"))
+LLM_FAKE_RECORDINGS = os.getenv("LLM_FAKE_RECORDINGS")
+LLM_RECORD_PATH = os.getenv("LLM_RECORD_PATH")
+
+# --- LLM Response Cache Configuration ---
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+
+# --- LLM Gateway Configuration ---
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+
+# --- Knowledge Base Ingestion Configuration ---
+INGESTION_MAX_WORKERS = int(os.getenv("INGESTION_MAX_WORKERS", "4"))
+
+# --- Knowledge Base Explorer Configuration ---
+STATISTICS_CACHE_SECONDS = float(os.getenv("STATISTICS_CACHE_SECONDS", "300"))
+
+# --- Chat Context Configuration ---
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+CONTEXT_FRAMEWORK_QUOTA = float(os.getenv("CONTEXT_FRAMEWORK_QUOTA", "0.5"))
+CONTEXT_CANDIDATES_PER_TYPE = int(os.getenv("CONTEXT_CANDIDATES_PER_TYPE", "10"))
+
+# --- Tracing Configuration ---
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "none").lower()
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", os.path.join("logs", "traces.jsonl"))
+
+# --- Metrics Configuration ---
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_ADDRESS = os.getenv("METRICS_ADDRESS", "0.0.0.0")
+METRICS_PUSHGATEWAY_URL = os.getenv("METRICS_PUSHGATEWAY_URL", "")
+
+# --- Memory Profiling Configuration ---
+MEMORY_PROFILE = os.getenv("MEMORY_PROFILE", "false").lower() in ("1", "true", "yes")
+MEMORY_PROFILE_TOP = int(os.getenv("MEMORY_PROFILE_TOP", "10"))
+MEMORY_PROFILE_FRAMES = int(os.getenv("MEMORY_PROFILE_FRAMES", "1"))
+MEMORY_PROFILE_PATH = os.getenv("MEMORY_PROFILE_PATH")
@@ -17,13 +17,28 @@ Key Features:
 - Citation extraction for every node from external references
 - Support for all ATT&CK domains (enterprise, mobile, ics)
 - Neo4j graph database storage with optimized constraints and indexes
+- Compact slot-based node records and columnar relationships between
+  processing and writing, with repeated values interned (see stix_records)
+- Memory profiling of the fetch, processing and write stages (MEMORY_PROFILE)
 - Backward compatibility with existing ingestion interfaces
 """
 
-import streamlit as st
 import requests
 import json
+from collections import defaultdict
 from typing import Dict, List, Any, Optional, Tuple
+from src.cybersecurity.stix_records import (
+    NODE_RECORDS, STIX_ENDPOINTS, SUBTECHNIQUE_ENDPOINTS, TACTIC_ENDPOINTS,
+    DerivedTacticRecord, NodeRecord, NodeRows, RelationshipColumns, TechniqueRecord, ValuePool
+)
+from src.knowledge_base.repository import get_repository
+from src.utils import memory_profiler
+from src.utils.progress import ProgressReporter
+
+# Node types counted in the ingestion statistics
+ATTACK_NODE_TYPES = [
+    'Technique', 'Malware', 'ThreatGroup', 'Tool', 'Mitigation', 'Tactic', 'DataSource', 'DataComponent', 'Campaign'
+]
 
 
 class AttackIngestion:
@@ -35,8 +50,14 @@ class AttackIngestion:
     and citation extraction.
     """
     
-    def __init__(self):
-        """Initialize the ingestion system with STIX configuration."""
+    def __init__(self, reporter: Optional[ProgressReporter] = None):
+        """
+        Initialize the ingestion system with STIX configuration.
+        
+        Args:
+            reporter: Progress reporter for status messages (defaults to logging)
+        """
+        self.reporter = reporter or ProgressReporter()
         self.base_url = "https://raw.githubusercontent.com/mitre/cti/master"
         self.stix_type_mapping = {
             'attack-pattern': 'Technique',
@@ -49,6 +70,7 @@ class AttackIngestion:
             'x-mitre-data-component': 'DataComponent',
             'campaign': 'Campaign'
         }
+        self.values = ValuePool()
 
     def fetch_attack_data(self, domains: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -66,37 +88,38 @@ class AttackIngestion:
         
         all_objects = []
         
-        st.info(f"🌐 Fetching ATT&CK STIX data from {len(domains)} domain(s)...")
+        self.reporter.info(f"🌐 Fetching ATT&CK STIX data from {len(domains)} domain(s)...")
         
-        for domain in domains:
-            domain_url = f"{self.base_url}/{domain}-attack/{domain}-attack.json"
-            
-            try:
-                st.info(f"📡 Downloading {domain} domain data...")
-                response = requests.get(domain_url, timeout=30)
-                response.raise_for_status()
+        with memory_profiler.stage("ATT&CK fetch"):
+            for domain in domains:
+                domain_url = f"{self.base_url}/{domain}-attack/{domain}-attack.json"
+                
+                try:
+                    self.reporter.info(f"📡 Downloading {domain} domain data...")
+                    response = requests.get(domain_url, timeout=30)
+                    response.raise_for_status()
                 
-                domain_data = response.json()
-                domain_objects = domain_data.get('objects', [])
+                    domain_data = response.json()
+                    domain_objects = domain_data.get('objects', [])
                 
-                # Add domain metadata to objects
-                for obj in domain_objects:
-                    obj['x_attack_domain'] = domain
+                    # Add domain metadata to objects
+                    for obj in domain_objects:
+                        obj['x_attack_domain'] = domain
                 
-                all_objects.extend(domain_objects)
-                st.success(f"✅ Fetched {len(domain_objects):,} objects from {domain} domain")
+                    all_objects.extend(domain_objects)
+                    self.reporter.success(f"✅ Fetched {len(domain_objects):,} objects from {domain} domain")
                 
-            except requests.RequestException as e:
-                st.error(f"❌ Failed to fetch {domain} domain data: {e}")
-                continue
-            except json.JSONDecodeError as e:
-                st.error(f"❌ Failed to parse {domain} domain JSON: {e}")
-                continue
+                except requests.RequestException as e:
+                    self.reporter.error(f"❌ Failed to fetch {domain} domain data: {e}")
+                    continue
+                except json.JSONDecodeError as e:
+                    self.reporter.error(f"❌ Failed to parse {domain} domain JSON: {e}")
+                    continue
         
         if not all_objects:
             raise Exception("No STIX data could be fetched from any domain")
         
-        st.success(f"🎯 Total STIX objects fetched: {len(all_objects):,}")
+        self.reporter.success(f"🎯 Total STIX objects fetched: {len(all_objects):,}")
         
         return {
             'type': 'bundle',
@@ -149,49 +172,58 @@ class AttackIngestion:
             stix_data: Raw STIX bundle data
             
         Returns:
-            Dict containing processed nodes, relationships, and statistics
+            Dict containing processed nodes (NodeRecord list), relationships
+            (RelationshipColumns), and statistics
         """
         objects = stix_data.get('objects', [])
         nodes = []
-        relationships = []
-        
-        # Create object cache for relationship processing
-        object_cache = {obj.get('id'): obj for obj in objects if obj.get('id')}
+        relationships = RelationshipColumns()
+        # Repeated values are shared within one processing run
+        self.values = ValuePool()
         
-        st.info(f"⚙️ Processing {len(objects):,} STIX objects...")
+        self.reporter.info(f"⚙️ Processing {len(objects):,} STIX objects...")
         
-        # Process each object type
-        for obj in objects:
-            obj_type = obj.get('type')
+        with memory_profiler.stage("ATT&CK process objects"):
+            # Create object cache for relationship processing
+            object_cache = {obj.get('id'): obj for obj in objects if obj.get('id')}
             
-            if not obj_type:
-                continue
-            
-            # Map STIX type to graph node type
-            node_type = self.stix_type_mapping.get(obj_type)
-            
-            if node_type:
-                # Process object into node
-                node = self._process_stix_object(obj, node_type)
-                if node:
-                    nodes.append(node)
+            # Process each object type
+            for obj in objects:
+                obj_type = obj.get('type')
+                
+                if not obj_type:
+                    continue
+                
+                # Map STIX type to graph node type
+                node_type = self.stix_type_mapping.get(obj_type)
+                
+                if node_type:
+                    # Process object into node
+                    node = self._process_stix_object(obj, node_type)
+                    if node:
+                        nodes.append(node)
+                
+                # Process relationships separately
+                elif obj_type == 'relationship':
+                    relationship = self._process_relationship(obj, object_cache)
+                    if relationship:
+                        relationships.add(*relationship)
+            del object_cache
+        
+        with memory_profiler.stage("ATT&CK tactics and subtechniques"):
+            # Add tactic nodes and technique-tactic relationships
+            tactic_nodes, tactic_relationships = self._process_tactics(nodes)
+            nodes.extend(tactic_nodes)
+            relationships.extend(tactic_relationships)
             
-            # Process relationships separately
-            elif obj_type == 'relationship':
-                relationship = self._process_relationship(obj, object_cache)
-                if relationship:
-                    relationships.append(relationship)
+            # Add subtechnique relationships
+            subtechnique_relationships = self._process_subtechniques(nodes)
+            relationships.extend(subtechnique_relationships)
         
-        # Add tactic nodes and technique-tactic relationships
-        tactic_nodes, tactic_relationships = self._process_tactics(nodes)
-        nodes.extend(tactic_nodes)
-        relationships.extend(tactic_relationships)
+        # The records keep the shared values; the pool's lookup tables are no longer needed
+        self.values = ValuePool()
         
-        # Add subtechnique relationships
-        subtechnique_relationships = self._process_subtechniques(nodes)
-        relationships.extend(subtechnique_relationships)
-        
-        st.success(f"✅ Processed {len(nodes):,} nodes and {len(relationships):,} relationships")
+        self.reporter.success(f"✅ Processed {len(nodes):,} nodes and {len(relationships):,} relationships")
         
         return {
             'nodes': nodes,
@@ -199,7 +231,7 @@ class AttackIngestion:
             'total_objects': len(objects)
         }
 
-    def _process_stix_object(self, obj: Dict, node_type: str) -> Optional[Dict]:
+    def _process_stix_object(self, obj: Dict, node_type: str) -> Optional[NodeRecord]:
         """
         Process individual STIX object into graph node.
         
@@ -208,25 +240,24 @@ class AttackIngestion:
             node_type: Target graph node type
             
         Returns:
-            Processed node dictionary or None
+            Node record of the type's class or None
         """
         if not obj.get('id') or not obj.get('name'):
             return None
         
-        # Extract citations for this object
-        citations = self.extract_citations(obj)
-        
-        # Base node structure
-        node = {
-            'type': node_type,
-            'id': obj.get('id'),
-            'name': obj.get('name', ''),
-            'description': obj.get('description', ''),
-            'created': obj.get('created'),
-            'modified': obj.get('modified'),
-            'citations': citations,
-            'domain': obj.get('x_attack_domain', 'enterprise')
-        }
+        values = self.values
+        
+        # Base node structure; citations repeat across objects, so they are interned
+        node = NODE_RECORDS[node_type](
+            id=obj.get('id'),
+            name=obj.get('name', ''),
+            description=obj.get('description', ''),
+            created=values.text(obj.get('created')),
+            modified=values.text(obj.get('modified')),
+            citations=values.strings(self.extract_citations(obj)),
+            domain=values.text(obj.get('x_attack_domain', 'enterprise')),
+            version=values.text(obj.get('x_mitre_version', '1.0'))
+        )
         
         # Add type-specific properties
         if node_type == 'Technique':
@@ -250,8 +281,10 @@ class AttackIngestion:
         
         return node
 
-    def _enrich_technique_node(self, node: Dict, obj: Dict):
+    def _enrich_technique_node(self, node: TechniqueRecord, obj: Dict):
         """Add technique-specific properties."""
+        values = self.values
+        
         # Extract technique ID
         technique_id = None
         for ref in obj.get('external_references', []):
@@ -265,53 +298,38 @@ class AttackIngestion:
             if phase.get('kill_chain_name') == 'mitre-attack':
                 tactics.append(phase.get('phase_name'))
         
-        node.update({
-            'technique_id': technique_id,
-            'tactics': tactics,
-            'platforms': obj.get('x_mitre_platforms', []),
-            'data_sources': obj.get('x_mitre_data_sources', []),
-            'permissions_required': obj.get('x_mitre_permissions_required', []),
-            'effective_permissions': obj.get('x_mitre_effective_permissions', []),
-            'system_requirements': obj.get('x_mitre_system_requirements', []),
-            'defense_bypassed': obj.get('x_mitre_defense_bypassed', []),
-            'detection': obj.get('x_mitre_detection', ''),
-            'is_subtechnique': '.' in (technique_id or ''),
-            'version': obj.get('x_mitre_version', '1.0')
-        })
+        node.technique_id = technique_id
+        node.tactics = values.strings(tactics)
+        node.platforms = values.strings(obj.get('x_mitre_platforms', []))
+        node.data_sources = values.strings(obj.get('x_mitre_data_sources', []))
+        node.permissions_required = values.strings(obj.get('x_mitre_permissions_required', []))
+        node.effective_permissions = values.strings(obj.get('x_mitre_effective_permissions', []))
+        node.system_requirements = values.strings(obj.get('x_mitre_system_requirements', []))
+        node.defense_bypassed = values.strings(obj.get('x_mitre_defense_bypassed', []))
+        node.detection = obj.get('x_mitre_detection', '')
+        node.is_subtechnique = '.' in (technique_id or '')
 
-    def _enrich_tactic_node(self, node: Dict, obj: Dict):
+    def _enrich_tactic_node(self, node: NodeRecord, obj: Dict):
         """Add tactic-specific properties."""
-        node.update({
-            'short_name': obj.get('x_mitre_shortname', ''),
-            'version': obj.get('x_mitre_version', '1.0')
-        })
+        node.short_name = self.values.text(obj.get('x_mitre_shortname', ''))
 
-    def _enrich_malware_node(self, node: Dict, obj: Dict):
+    def _enrich_malware_node(self, node: NodeRecord, obj: Dict):
         """Add malware-specific properties."""
-        node.update({
-            'labels': obj.get('labels', []),
-            'aliases': obj.get('x_mitre_aliases', []),
-            'platforms': obj.get('x_mitre_platforms', []),
-            'version': obj.get('x_mitre_version', '1.0')
-        })
+        node.labels = self.values.strings(obj.get('labels', []))
+        node.aliases = self.values.strings(obj.get('x_mitre_aliases', []))
+        node.platforms = self.values.strings(obj.get('x_mitre_platforms', []))
 
-    def _enrich_threat_group_node(self, node: Dict, obj: Dict):
+    def _enrich_threat_group_node(self, node: NodeRecord, obj: Dict):
         """Add threat group-specific properties."""
-        node.update({
-            'aliases': obj.get('aliases', []),
-            'version': obj.get('x_mitre_version', '1.0')
-        })
+        node.aliases = self.values.strings(obj.get('aliases', []))
 
-    def _enrich_tool_node(self, node: Dict, obj: Dict):
+    def _enrich_tool_node(self, node: NodeRecord, obj: Dict):
         """Add tool-specific properties."""
-        node.update({
-            'labels': obj.get('labels', []),
-            'aliases': obj.get('x_mitre_aliases', []),
-            'platforms': obj.get('x_mitre_platforms', []),
-            'version': obj.get('x_mitre_version', '1.0')
-        })
+        node.labels = self.values.strings(obj.get('labels', []))
+        node.aliases = self.values.strings(obj.get('x_mitre_aliases', []))
+        node.platforms = self.values.strings(obj.get('x_mitre_platforms', []))
 
-    def _enrich_mitigation_node(self, node: Dict, obj: Dict):
+    def _enrich_mitigation_node(self, node: NodeRecord, obj: Dict):
         """Add mitigation-specific properties."""
         # Extract mitigation ID
         mitigation_id = None
@@ -320,35 +338,23 @@ class AttackIngestion:
                 mitigation_id = ref.get('external_id')
                 break
         
-        node.update({
-            'mitigation_id': mitigation_id,
-            'version': obj.get('x_mitre_version', '1.0')
-        })
+        node.mitigation_id = mitigation_id
 
-    def _enrich_data_source_node(self, node: Dict, obj: Dict):
+    def _enrich_data_source_node(self, node: NodeRecord, obj: Dict):
         """Add data source-specific properties."""
-        node.update({
-            'platforms': obj.get('x_mitre_platforms', []),
-            'collection_layers': obj.get('x_mitre_collection_layers', []),
-            'version': obj.get('x_mitre_version', '1.0')
-        })
+        node.platforms = self.values.strings(obj.get('x_mitre_platforms', []))
+        node.collection_layers = self.values.strings(obj.get('x_mitre_collection_layers', []))
 
-    def _enrich_data_component_node(self, node: Dict, obj: Dict):
-        """Add data component-specific properties."""
-        node.update({
-            'version': obj.get('x_mitre_version', '1.0')
-        })
+    def _enrich_data_component_node(self, node: NodeRecord, obj: Dict):
+        """Add data component-specific properties (none beyond the common ones)."""
 
-    def _enrich_campaign_node(self, node: Dict, obj: Dict):
+    def _enrich_campaign_node(self, node: NodeRecord, obj: Dict):
         """Add campaign-specific properties."""
-        node.update({
-            'aliases': obj.get('aliases', []),
-            'first_seen': obj.get('first_seen'),
-            'last_seen': obj.get('last_seen'),
-            'version': obj.get('x_mitre_version', '1.0')
-        })
+        node.aliases = self.values.strings(obj.get('aliases', []))
+        node.first_seen = obj.get('first_seen')
+        node.last_seen = obj.get('last_seen')
 
-    def _process_tactics(self, nodes: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    def _process_tactics(self, nodes: List[NodeRecord]) -> Tuple[List[NodeRecord], RelationshipColumns]:
         """
         Process tactics from technique kill chain phases.
         
@@ -359,45 +365,34 @@ class AttackIngestion:
             Tuple of (tactic_nodes, tactic_relationships)
         """
         tactic_nodes = []
-        tactic_relationships = []
+        tactic_relationships = RelationshipColumns()
         processed_tactics = set()
         
         for node in nodes:
-            if node.get('type') == 'Technique':
-                technique_id = node.get('id')
-                tactics = node.get('tactics', [])
+            if isinstance(node, TechniqueRecord):
+                technique_id = node.id
                 
-                for tactic_short_name in tactics:
+                for tactic_short_name in node.tactics:
                     if tactic_short_name and tactic_short_name not in processed_tactics:
-                        # Create tactic node
-                        tactic_node = {
-                            'type': 'Tactic',
-                            'id': f"tactic--{tactic_short_name}",
-                            'name': tactic_short_name.replace('-', ' ').title(),
-                            'short_name': tactic_short_name,
-                            'description': f"ATT&CK tactic: {tactic_short_name}",
-                            'citations': [],  # Tactics inherit from framework
-                            'domain': node.get('domain', 'enterprise')
-                        }
+                        # Create tactic node; tactics inherit citations from the framework
+                        tactic_node = DerivedTacticRecord(
+                            id=f"tactic--{tactic_short_name}",
+                            name=tactic_short_name.replace('-', ' ').title(),
+                            short_name=tactic_short_name,
+                            description=f"ATT&CK tactic: {tactic_short_name}",
+                            domain=node.domain
+                        )
                         
                         tactic_nodes.append(tactic_node)
                         processed_tactics.add(tactic_short_name)
                     
                     # Create technique-to-tactic relationship
                     if tactic_short_name:
-                        relationship = {
-                            'type': 'PART_OF_TACTIC',
-                            'source_id': technique_id,
-                            'target_id': f"tactic--{tactic_short_name}",
-                            'target_tactic': tactic_short_name,
-                            'source_type': 'Technique',
-                            'target_type': 'Tactic'
-                        }
-                        tactic_relationships.append(relationship)
+                        tactic_relationships.add('PART_OF_TACTIC', TACTIC_ENDPOINTS, technique_id, tactic_short_name)
         
         return tactic_nodes, tactic_relationships
 
-    def _process_subtechniques(self, nodes: List[Dict]) -> List[Dict]:
+    def _process_subtechniques(self, nodes: List[NodeRecord]) -> RelationshipColumns:
         """
         Process parent-subtechnique relationships.
         
@@ -405,49 +400,42 @@ class AttackIngestion:
             nodes: List of processed nodes
             
         Returns:
-            List of subtechnique relationships
+            Subtechnique relationships
         """
-        relationships = []
+        relationships = RelationshipColumns()
         
         # Build technique ID mapping
         technique_mapping = {}
         for node in nodes:
-            if node.get('type') == 'Technique':
-                technique_id = node.get('technique_id')
-                if technique_id:
-                    technique_mapping[technique_id] = node.get('id')
+            if isinstance(node, TechniqueRecord) and node.technique_id:
+                technique_mapping[node.technique_id] = node.id
         
         # Find subtechniques and create relationships
         for node in nodes:
-            if node.get('type') == 'Technique' and node.get('is_subtechnique'):
-                technique_id = node.get('technique_id', '')
+            if isinstance(node, TechniqueRecord) and node.is_subtechnique:
+                technique_id = node.technique_id or ''
                 if '.' in technique_id:
-                    parent_id = technique_id.split('.')[0]
+                    parent_id = self.values.text(technique_id.split('.')[0])
                     parent_uuid = technique_mapping.get(parent_id)
                     
                     if parent_uuid:
-                        relationship = {
-                            'type': 'HAS_SUBTECHNIQUE',
-                            'source_id': parent_uuid,
-                            'target_id': node.get('id'),
-                            'source_technique_id': parent_id,
-                            'source_type': 'Technique',
-                            'target_type': 'Technique'
-                        }
-                        relationships.append(relationship)
+                        relationships.add('HAS_SUBTECHNIQUE', SUBTECHNIQUE_ENDPOINTS, parent_id, node.id)
         
         return relationships
 
-    def _process_relationship(self, obj: Dict, object_cache: Dict) -> Optional[Dict]:
+    def _process_relationship(self, obj: Dict, object_cache: Dict) -> Optional[Tuple[str, Tuple, str, str]]:
         """
         Process STIX relationship object.
         
+        Only what the writer links on is kept: the relationship's
+        description and timestamps are not written to the graph.
+        
         Args:
             obj: STIX relationship object
             object_cache: Cache of all STIX objects by ID
             
         Returns:
-            Processed relationship dictionary or None
+            Tuple of (relationship type, link endpoints, source id, target id) or None
         """
         source_ref = obj.get('source_ref')
         target_ref = obj.get('target_ref')
@@ -482,183 +470,123 @@ class AttackIngestion:
         if not source_obj or not target_obj:
             return None
         
-        relationship = {
-            'type': mapped_type,
-            'source_id': source_ref,
-            'target_id': target_ref,
-            'source_type': self.stix_type_mapping.get(source_obj.get('type')),
-            'target_type': self.stix_type_mapping.get(target_obj.get('type')),
-            'description': obj.get('description', ''),
-            'created': obj.get('created'),
-            'modified': obj.get('modified')
-        }
-        
-        return relationship
+        # The objects' own id strings are shared with their nodes instead of keeping copies
+        return self.values.text(mapped_type), STIX_ENDPOINTS, source_obj['id'], target_obj['id']
 
     def ingest_to_neo4j(self, graph, processed_data: Dict[str, Any]) -> Dict[str, int]:
         """
         Ingest processed STIX data into Neo4j database.
         
+        Nodes are written in batches per node type and relationships in
+        batches per relationship type through the graph repository, so the
+        same code populates Neo4j or the in-memory graph. Property
+        dictionaries are built from the records one write batch at a time.
+        
         Args:
             graph: Neo4j database connection
-            processed_data: Processed STIX data with nodes and relationships
+            processed_data: Output of process_attack_objects
             
         Returns:
             Dict with ingestion statistics
         """
         nodes = processed_data['nodes']
         relationships = processed_data['relationships']
+        repository = get_repository(graph)
         
-        st.info("🗄️ Ingesting data into Neo4j...")
+        self.reporter.info("🗄️ Ingesting data into Neo4j...")
         
         # Clear existing data
-        st.info("🧹 Clearing existing data...")
-        graph.query("MATCH (n) DETACH DELETE n")
+        self.reporter.info("🧹 Clearing existing data...")
+        repository.clear()
         
         # Create constraints and indexes
         self._create_database_schema(graph)
         
         # Ingest nodes
-        stats = {}
-        progress_bar = st.progress(0)
+        progress_bar = self.reporter.progress("Ingesting ATT&CK nodes")
         
-        for i, node in enumerate(nodes):
-            self._create_node(graph, node)
-            progress_bar.progress((i + 1) / len(nodes))
-        
-        progress_bar.empty()
-        st.success(f"✅ Ingested {len(nodes)} nodes")
+        with memory_profiler.stage("ATT&CK write nodes"):
+            nodes_by_type = defaultdict(list)
+            for node in nodes:
+                nodes_by_type[node.label].append(node)
+            
+            written = 0
+            for node_type, records in nodes_by_type.items():
+                rows = NodeRows(records)
+                try:
+                    repository.create_nodes(node_type, rows)
+                except Exception as e:
+                    self.reporter.warning(f"Failed to create {node_type} nodes: {e}")
+                written += len(rows)
+                progress_bar.update(written / len(nodes))
+        
+        progress_bar.close()
+        self.reporter.success(f"✅ Ingested {len(nodes)} nodes")
         
         # Ingest relationships
-        progress_bar = st.progress(0)
-        
-        for i, rel in enumerate(relationships):
-            self._create_relationship(graph, rel)
-            progress_bar.progress((i + 1) / len(relationships))
-        
-        progress_bar.empty()
-        st.success(f"✅ Ingested {len(relationships)} relationships")
-        
-        # Calculate final statistics
-        for node_type in ['Technique', 'Malware', 'ThreatGroup', 'Tool', 'Mitigation', 'Tactic', 'DataSource', 'DataComponent', 'Campaign']:
-            result = graph.query(f"MATCH (n:{node_type}) RETURN count(n) as count")
-            stats[node_type.lower()] = result[0]['count'] if result else 0
-        
-        rel_result = graph.query("MATCH ()-[r]->() RETURN count(r) as count")
-        stats['relationships'] = rel_result[0]['count'] if rel_result else 0
-        
+        progress_bar = self.reporter.progress("Ingesting ATT&CK relationships")
+        
+        with memory_profiler.stage("ATT&CK write relationships"):
+            written = 0
+            for (rel_type, endpoints), rows in relationships.batches():
+                try:
+                    repository.link(rel_type, rows, *endpoints, merge=False)
+                except Exception as e:
+                    self.reporter.warning(f"Failed to create {rel_type} relationships: {e}")
+                written += len(rows)
+                progress_bar.update(written / len(relationships))
+        
+        progress_bar.close()
+        self.reporter.success(f"✅ Ingested {len(relationships)} relationships")
+        
+        return self._statistics(graph)
+
+    def _statistics(self, graph) -> Dict[str, int]:
+        """Count ATT&CK nodes per type and all relationships."""
+        repository = get_repository(graph)
+        stats = {node_type.lower(): count for node_type, count in repository.label_counts(ATTACK_NODE_TYPES).items()}
+        stats['relationships'] = repository.count_relationships()
         return stats
 
     def _create_database_schema(self, graph):
         """Create database constraints and indexes."""
-        st.info("📋 Creating database schema...")
+        self.reporter.info("📋 Creating database schema...")
+        repository = get_repository(graph)
         
         # Create constraints for unique IDs
         constraints = [
-            "CREATE CONSTRAINT technique_id IF NOT EXISTS FOR (t:Technique) REQUIRE t.id IS UNIQUE",
-            "CREATE CONSTRAINT malware_id IF NOT EXISTS FOR (m:Malware) REQUIRE m.id IS UNIQUE", 
-            "CREATE CONSTRAINT tool_id IF NOT EXISTS FOR (t:Tool) REQUIRE t.id IS UNIQUE",
-            "CREATE CONSTRAINT group_id IF NOT EXISTS FOR (g:ThreatGroup) REQUIRE g.id IS UNIQUE",
-            "CREATE CONSTRAINT mitigation_id IF NOT EXISTS FOR (m:Mitigation) REQUIRE m.id IS UNIQUE",
-            "CREATE CONSTRAINT tactic_id IF NOT EXISTS FOR (t:Tactic) REQUIRE t.id IS UNIQUE",
-            "CREATE CONSTRAINT datasource_id IF NOT EXISTS FOR (d:DataSource) REQUIRE d.id IS UNIQUE",
-            "CREATE CONSTRAINT datacomponent_id IF NOT EXISTS FOR (d:DataComponent) REQUIRE d.id IS UNIQUE",
-            "CREATE CONSTRAINT campaign_id IF NOT EXISTS FOR (c:Campaign) REQUIRE c.id IS UNIQUE"
+            ('Technique', 'id', 'technique_id'),
+            ('Malware', 'id', 'malware_id'),
+            ('Tool', 'id', 'tool_id'),
+            ('ThreatGroup', 'id', 'group_id'),
+            ('Mitigation', 'id', 'mitigation_id'),
+            ('Tactic', 'id', 'tactic_id'),
+            ('DataSource', 'id', 'datasource_id'),
+            ('DataComponent', 'id', 'datacomponent_id'),
+            ('Campaign', 'id', 'campaign_id')
         ]
         
-        for constraint in constraints:
+        for label, key, name in constraints:
             try:
-                graph.query(constraint)
+                repository.ensure_unique(label, key, name)
             except Exception as e:
-                st.warning(f"Constraint creation failed: {e}")
+                self.reporter.warning(f"Constraint creation failed: {e}")
         
         # Create indexes for performance
         indexes = [
-            "CREATE INDEX technique_name IF NOT EXISTS FOR (t:Technique) ON (t.name)",
-            "CREATE INDEX technique_technique_id IF NOT EXISTS FOR (t:Technique) ON (t.technique_id)",
-            "CREATE INDEX malware_name IF NOT EXISTS FOR (m:Malware) ON (m.name)",
-            "CREATE INDEX group_name IF NOT EXISTS FOR (g:ThreatGroup) ON (g.name)",
-            "CREATE INDEX mitigation_name IF NOT EXISTS FOR (m:Mitigation) ON (m.name)"
+            ('Technique', 'name', 'technique_name'),
+            ('Technique', 'technique_id', 'technique_technique_id'),
+            ('Tactic', 'short_name', 'tactic_short_name'),
+            ('Malware', 'name', 'malware_name'),
+            ('ThreatGroup', 'name', 'group_name'),
+            ('Mitigation', 'name', 'mitigation_name')
         ]
         
-        for index in indexes:
+        for label, key, name in indexes:
             try:
-                graph.query(index)
+                repository.ensure_index(label, key, name)
             except Exception as e:
-                st.warning(f"Index creation failed: {e}")
-
-    def _create_node(self, graph, node: Dict):
-        """Create a single node in Neo4j."""
-        node_type = node['type']
-        
-        # Convert lists to string format for Neo4j
-        for key, value in node.items():
-            if isinstance(value, list):
-                node[key] = value  # Neo4j handles lists natively
-        
-        # Create Cypher query
-        query = f"""
-        CREATE (n:{node_type})
-        SET n += $properties
-        """
-        
-        try:
-            graph.query(query, params={'properties': node})
-        except Exception as e:
-            st.warning(f"Failed to create node {node.get('name', 'Unknown')}: {e}")
-
-    def _create_relationship(self, graph, rel: Dict):
-        """Create a single relationship in Neo4j."""
-        rel_type = rel['type']
-        source_id = rel['source_id']
-        target_id = rel['target_id']
-        
-        # Handle special relationship types
-        if rel_type == 'PART_OF_TACTIC':
-            # Technique to Tactic relationship
-            query = """
-            MATCH (t:Technique {id: $source_id})
-            MATCH (tactic:Tactic {short_name: $target_tactic})
-            CREATE (t)-[:PART_OF_TACTIC]->(tactic)
-            """
-            try:
-                graph.query(query, params={
-                    'source_id': source_id,
-                    'target_tactic': rel.get('target_tactic')
-                })
-            except Exception as e:
-                st.warning(f"Failed to create tactic relationship: {e}")
-        
-        elif rel_type == 'HAS_SUBTECHNIQUE':
-            # Parent technique to subtechnique relationship
-            query = """
-            MATCH (parent:Technique {technique_id: $parent_id})
-            MATCH (sub:Technique {id: $target_id})
-            CREATE (parent)-[:HAS_SUBTECHNIQUE]->(sub)
-            """
-            try:
-                graph.query(query, params={
-                    'parent_id': rel.get('source_technique_id'),
-                    'target_id': target_id
-                })
-            except Exception as e:
-                st.warning(f"Failed to create subtechnique relationship: {e}")
-        
-        else:
-            # Standard relationships - escape relationship types with hyphens using backticks
-            escaped_rel_type = f"`{rel_type}`" if '-' in rel_type else rel_type
-            query = f"""
-            MATCH (source {{id: $source_id}})
-            MATCH (target {{id: $target_id}})
-            CREATE (source)-[:{escaped_rel_type}]->(target)
-            """
-            try:
-                graph.query(query, params={
-                    'source_id': source_id,
-                    'target_id': target_id
-                })
-            except Exception as e:
-                st.warning(f"Failed to create relationship {rel_type}: {e}")
+                self.reporter.warning(f"Index creation failed: {e}")
 
     def ingest_attack_data(self, graph, domains: Optional[List[str]] = None) -> Tuple[bool, str]:
         """
@@ -713,15 +641,7 @@ class AttackIngestion:
             raise Exception(message)
         
         # Return statistics for compatibility
-        stats = {}
-        for node_type in ['Technique', 'Malware', 'ThreatGroup', 'Tool', 'Mitigation', 'Tactic', 'DataSource', 'DataComponent', 'Campaign']:
-            result = graph.query(f"MATCH (n:{node_type}) RETURN count(n) as count")
-            stats[node_type.lower()] = result[0]['count'] if result else 0
-        
-        rel_result = graph.query("MATCH ()-[r]->() RETURN count(r) as count")
-        stats['relationships'] = rel_result[0]['count'] if rel_result else 0
-        
-        return stats
+        return self._statistics(graph)
 
 
 # Backward compatibility function for existing code
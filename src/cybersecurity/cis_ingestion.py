@@ -14,15 +14,15 @@ Features:
 - Create relationships with ATT&CK mitigations
 """
 
-from typing import Dict, Any, Tuple
-import streamlit as st
+from typing import Dict, Any, List, Optional, Tuple
 import os
 import logging
-import json
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.api.llm_service import LLMService
+from src.utils.progress import ProgressReporter
+from src.knowledge_base.database import bulk_upsert_nodes, bulk_merge_relationships, create_citation, link_to_mitigations
 
 
 class CISIngestion:
@@ -33,8 +33,14 @@ class CISIngestion:
     citation tracking and relationship mapping to existing ATT&CK data.
     """
     
-    def __init__(self):
-        """Initialize CIS Controls ingestion system."""
+    def __init__(self, reporter: Optional[ProgressReporter] = None):
+        """
+        Initialize CIS Controls ingestion system.
+        
+        Args:
+            reporter: Progress reporter for status messages (defaults to logging)
+        """
+        self.reporter = reporter or ProgressReporter()
         self.document_path = os.path.join("documents", "CIS_Controls__v8.1_Guide__2024_06.pdf")
         self.llm_service = LLMService()
         self.ingestion_stats = {
@@ -51,6 +57,8 @@ class CISIngestion:
         Args:
             graph: Neo4j database connection
             **kwargs: CIS-specific parameters
+                parsed_data: Structure already returned by _parse_cis_document(),
+                    e.g. when parsing ran ahead of the database write
             
         Returns:
             Tuple of (success_boolean, status_message)
@@ -60,10 +68,10 @@ class CISIngestion:
             if not os.path.exists(self.document_path):
                 return False, f"CIS Controls document not found at {self.document_path}"
             
-            st.info("🔄 Starting CIS Controls ingestion...")
+            self.reporter.info("🔄 Starting CIS Controls ingestion...")
             
             # Parse CIS Controls structure from document
-            cis_data = self._parse_cis_document()
+            cis_data = kwargs.get('parsed_data') or self._parse_cis_document()
             
             # Create nodes and relationships
             self._create_cis_nodes(graph, cis_data)
@@ -197,15 +205,7 @@ class CISIngestion:
         """
         
         try:
-            response = self.llm_service.generate_response(extraction_prompt)
-            
-            # Parse JSON response
-            if '```json' in response:
-                json_str = response.split('```json')[1].split('```')[0]
-            else:
-                json_str = response
-            
-            cis_data = json.loads(json_str)
+            cis_data = self.llm_service.generate_json_response(extraction_prompt)
             
             # Validate structure
             if 'controls' in cis_data and len(cis_data['controls']) > 0:
@@ -523,75 +523,74 @@ class CISIngestion:
             ]
         }
     
-    def _create_cis_nodes(self, graph, cis_data: Dict[str, Any]):
-        """Create CIS Control and Safeguard nodes."""
+    def _flatten_cis_hierarchy(self, cis_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Flatten CIS Controls data into parent/child rows for each level."""
+        
+        hierarchy = {'controls': [], 'safeguards': []}
         
         for control in cis_data['controls']:
-            # Create CIS_Control node
-            graph.query("""
-                MERGE (c:CIS_Control {id: $id})
-                SET c.name = $name,
-                    c.description = $description,
-                    c.source = 'CIS Controls v8.1',
-                    c.ingested_at = datetime()
-            """, {
+            hierarchy['controls'].append({
                 'id': control['id'],
-                'name': control['name'], 
-                'description': control['description']
+                'properties': {
+                    'name': control['name'],
+                    'description': control['description'],
+                    'source': 'CIS Controls v8.1'
+                }
             })
             
-            self.ingestion_stats['controls_processed'] += 1
-            
-            # Create CIS_Safeguard nodes
             for safeguard in control['safeguards']:
-                graph.query("""MERGE (s:CIS_Safeguard {id: $id})
-                    SET s.description = $description,
-                        s.asset_type = $asset_type,
-                        s.security_function = $security_function,
-                        s.implementation_groups = $implementation_groups,
-                        s.source = 'CIS Controls v8.1',
-                        s.ingested_at = datetime()""", {'id': safeguard['id'], 'description': safeguard['description'], 'asset_type': safeguard['asset_type'], 'security_function': safeguard['security_function'], 'implementation_groups': safeguard['implementation_groups']})
-                
-                self.ingestion_stats['safeguards_processed'] += 1
+                hierarchy['safeguards'].append({
+                    'parent_id': control['id'],
+                    'id': safeguard['id'],
+                    'properties': {
+                        'description': safeguard['description'],
+                        'asset_type': safeguard['asset_type'],
+                        'security_function': safeguard['security_function'],
+                        'implementation_groups': safeguard['implementation_groups'],
+                        'source': 'CIS Controls v8.1'
+                    }
+                })
+        
+        return hierarchy
+    
+    def _create_cis_nodes(self, graph, cis_data: Dict[str, Any]):
+        """Create CIS Control and Safeguard nodes, one batched write per level."""
+        
+        hierarchy = self._flatten_cis_hierarchy(cis_data)
+        
+        self.ingestion_stats['controls_processed'] += bulk_upsert_nodes(graph, 'CIS_Control', hierarchy['controls'])
+        self.ingestion_stats['safeguards_processed'] += bulk_upsert_nodes(graph, 'CIS_Safeguard', hierarchy['safeguards'])
     
     def _create_cis_relationships(self, graph, cis_data: Dict[str, Any]):
         """Create relationships between CIS nodes and with ATT&CK nodes."""
         
-        for control in cis_data['controls']:
-            # Link controls to safeguards
-            for safeguard in control['safeguards']:
-                graph.query("""MATCH (c:CIS_Control {id: $control_id})
-                    MATCH (s:CIS_Safeguard {id: $safeguard_id})
-                    MERGE (c)-[:HAS_SAFEGUARD]->(s)""", {'control_id': control['id'], 'safeguard_id': safeguard['id']})
-                
-                # Create relationships to ATT&CK mitigations (example mappings)
-                if safeguard['id'] in ['1.1', '2.1']:  # Asset inventory safeguards
-                    graph.query("""MATCH (s:CIS_Safeguard {id: $safeguard_id})
-                        MATCH (m:Mitigation)
-                        WHERE m.id STARTS WITH 'M1013' OR m.id STARTS WITH 'M1016'
-                        MERGE (s)-[:IMPLEMENTS]->(m)""", {'safeguard_id': safeguard['id']})
-                
-                self.ingestion_stats['relationships_created'] += 1
+        hierarchy = self._flatten_cis_hierarchy(cis_data)
+        
+        # Link controls to safeguards
+        self.ingestion_stats['relationships_created'] += bulk_merge_relationships(
+            graph, 'CIS_Control', 'HAS_SAFEGUARD', 'CIS_Safeguard', hierarchy['safeguards']
+        )
+        
+        # Create relationships to ATT&CK mitigations (example mappings for asset inventory safeguards)
+        link_to_mitigations(
+            graph, 'CIS_Safeguard', 'IMPLEMENTS',
+            [row['id'] for row in hierarchy['safeguards'] if row['id'] in ['1.1', '2.1']],
+            ('M1013', 'M1016')
+        )
     
     def _create_cis_citations(self, graph):
         """Create citation nodes for CIS Controls."""
         
-        # Create main citation for CIS Controls document
-        graph.query("""
-            MERGE (cit:Citation {reference_name: 'CIS_Controls_v8.1'})
-            SET cit.citation_text = 'Center for Internet Security (CIS) Controls Version 8.1',
-                cit.url = 'https://www.cisecurity.org/controls',
-                cit.publication_date = '2024-06',
-                cit.source_type = 'Official Framework',
-                cit.ingested_at = datetime()
-        """)
-        
-        # Link all CIS nodes to this citation
-        graph.query("""
-            MATCH (n)
-            WHERE n:CIS_Control OR n:CIS_Safeguard
-            MATCH (cit:Citation {reference_name: 'CIS_Controls_v8.1'})
-            MERGE (n)-[:HAS_CITATION]->(cit)
-        """)
+        # Create main citation for CIS Controls document and link the framework's nodes to it
+        create_citation(
+            graph, 'CIS_Controls_v8.1',
+            {
+                'citation_text': 'Center for Internet Security (CIS) Controls Version 8.1',
+                'url': 'https://www.cisecurity.org/controls',
+                'publication_date': '2024-06',
+                'source_type': 'Official Framework'
+            },
+            ['CIS_Control', 'CIS_Safeguard']
+        )
         
         self.ingestion_stats['citations_created'] += 1
@@ -7,22 +7,72 @@ IT Handbook provides IT examination procedures and guidance for financial
 institutions.
 
 Features:
-- Parse FFIEC IT Handbook sections and procedures using LLM
+- Parse the booklet outline (I, II.C.13, ...) and Appendix A examination
+  objectives and procedures deterministically, without the LLM
+- Optionally summarize handbook sections with the LLM
+- Fall back to LLM extraction when the booklet layout is not recognised
 - Extract examination guidance and standards
 - Create citation references for all nodes
 - Map to cybersecurity knowledge base schema
 - Create relationships with regulatory requirements
 """
 
-from typing import Dict, Any, Tuple
-import streamlit as st
+from typing import Dict, Any, List, Optional, Tuple
 import os
+import re
 import logging
-import json
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.api.llm_service import LLMService
+from src.utils.progress import ProgressReporter
+from src.knowledge_base.database import bulk_upsert_nodes, bulk_merge_relationships, create_citation
+
+
+# --- Booklet text patterns ---
+FFIEC_PAGE_HEADER = re.compile(r'^FFIEC IT Examination Handbook Information Security$')
+FFIEC_PAGE_FOOTER = re.compile(r'^[A-Z][a-z]+ \d{4}\s+(?:[ivxlc]+|\d+)$')
+# Chapter tabs ("II") and superscript footnote references split onto their own line
+FFIEC_CHAPTER_TAB = re.compile(r'^(?:IV|I{1,3})$')
+FFIEC_FOOTNOTE_REF = re.compile(r'^\d{1,3}$')
+FFIEC_FOOTNOTE = re.compile(r'^(\d{1,3})\s+\S')
+# Contents entries, e.g. "II.C.13 Control of Information ........ 29"
+FFIEC_TOC_LEADER = re.compile(r'\.{10,}')
+FFIEC_TOC_ENTRY = re.compile(r'^((?:IV|I{1,3})(?:\.[A-Z](?:\.\d+)?)?)\s+(.*?)\s*\.{5,}\s*\d+$')
+FFIEC_TOC_ENTRY_START = re.compile(r'^(?:IV|I{1,3})(?:\.[A-Z](?:\.\d+)?)?\s+\S')
+FFIEC_APPENDIX_A = 'Appendix A: Examination Procedures'
+FFIEC_APPENDIX_B = 'Appendix B: Glossary'
+FFIEC_ACTION_SUMMARY = 'Action Summary'
+# Appendix A work program: "Objective 6: ...", "4. Determine ...", "a. Implements ..."
+FFIEC_OBJECTIVE = re.compile(r'^Objective\s+(\d+):\s*(.*)$')
+FFIEC_STEP = re.compile(r'^(\d{1,2})\.\s+(.*)$')
+FFIEC_SUB_STEP = re.compile(r'^([a-z])\.\s+(.*)$')
+# A sub-step list occasionally starts on the same line as its step
+FFIEC_INLINE_SUB_STEP = re.compile(r'(?<=:)\s+(?=a\.\s)')
+FFIEC_TRAILING_FOOTNOTE_REF = re.compile(r'(?<=[.)”])\d{1,3}(?=\s|$)')
+
+# Handbook section each Appendix A objective examines (2016 booklet)
+FFIEC_OBJECTIVE_SECTIONS = {
+    1: 'APPENDIX-A',
+    2: 'I',
+    3: 'II',
+    4: 'II.A',
+    5: 'II.B',
+    6: 'II.C',
+    7: 'II.D',
+    8: 'III',
+    9: 'IV',
+    10: 'IV.A',
+    11: 'APPENDIX-A'
+}
+
+FFIEC_RISK_AREAS = {
+    'I': 'governance',
+    'II': 'risk management',
+    'III': 'operational',
+    'IV': 'assurance',
+    'APPENDIX-A': 'examination'
+}
 
 
 class FFIECIngestion:
@@ -33,8 +83,14 @@ class FFIECIngestion:
     citation tracking and relationship mapping to existing frameworks.
     """
     
-    def __init__(self):
-        """Initialize FFIEC ingestion system."""
+    def __init__(self, reporter: Optional[ProgressReporter] = None):
+        """
+        Initialize FFIEC ingestion system.
+        
+        Args:
+            reporter: Progress reporter for status messages (defaults to logging)
+        """
+        self.reporter = reporter or ProgressReporter()
         self.document_path = os.path.join("documents", "2016- it-handbook-information-security-booklet.pdf")
         self.llm_service = LLMService()
         self.ingestion_stats = {
@@ -53,6 +109,9 @@ class FFIECIngestion:
         Args:
             graph: Neo4j database connection
             **kwargs: FFIEC-specific parameters
+                parsed_data: Structure already returned by _parse_ffiec_document(),
+                    e.g. when parsing ran ahead of the database write
+                summarize: Add LLM summaries to handbook sections (default False)
             
         Returns:
             Tuple of (success_boolean, status_message)
@@ -62,10 +121,17 @@ class FFIECIngestion:
             if not os.path.exists(self.document_path):
                 return False, f"FFIEC document not found at {self.document_path}"
             
-            st.info("🔄 Starting FFIEC IT Handbook ingestion...")
+            self.reporter.info("🔄 Starting FFIEC IT Handbook ingestion...")
             
             # Parse FFIEC structure
-            ffiec_data = self._parse_ffiec_document()
+            ffiec_data = kwargs.get('parsed_data') or self._parse_ffiec_document()
+            
+            if not ffiec_data or not ffiec_data.get('sections'):
+                return False, "No FFIEC sections found in document"
+            
+            # Summaries are the only part of the tree that needs the LLM
+            if kwargs.get('summarize', False):
+                self._summarize_ffiec_sections(ffiec_data)
             
             # Create nodes and relationships
             self._create_ffiec_nodes(graph, ffiec_data)
@@ -95,12 +161,23 @@ class FFIECIngestion:
     
     def _parse_ffiec_document(self) -> Dict[str, Any]:
         """
-        Parse FFIEC document to extract handbook structure using LLM.
+        Parse FFIEC document to extract handbook structure.
+        
+        The booklet outline and Appendix A work program are parsed locally
+        first; the LLM is only used when the layout is not recognised.
         
         Returns:
             Dictionary containing parsed FFIEC data
         """
         try:
+            # Parse the numbered outline and examination procedures without LLM cost
+            ffiec_data = self._parse_ffiec_booklet(self._extract_pdf_pages())
+            if ffiec_data.get('sections'):
+                logging.info(f"Parsed {len(ffiec_data['sections'])} FFIEC sections from booklet outline")
+                return ffiec_data
+            
+            logging.warning("FFIEC booklet layout not recognised, falling back to LLM extraction")
+            
             # Extract text from PDF
             pdf_text = self._extract_pdf_text()
             
@@ -149,6 +226,379 @@ class FFIECIngestion:
         
         return ""
     
+    def _extract_pdf_pages(self) -> List[str]:
+        """Extract the text of every page of the FFIEC PDF."""
+        try:
+            try:
+                import PyPDF2
+                with open(self.document_path, 'rb') as file:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                    return [page.extract_text() or "" for page in pdf_reader.pages]
+            except ImportError:
+                pass
+            
+            # Alternative extraction using subprocess (pages are separated by form feeds)
+            import subprocess
+            result = subprocess.run(['pdftotext', self.document_path, '-'], 
+                                  capture_output=True, text=True, timeout=60)
+            if result.returncode == 0:
+                return result.stdout.split('\f')
+                
+        except Exception as e:
+            logging.error(f"Error extracting PDF pages: {e}")
+        
+        return []
+    
+    def _parse_ffiec_booklet(self, pages: List[str]) -> Dict[str, Any]:
+        """
+        Parse the Information Security booklet into sections and procedures.
+        
+        The contents pages give the numbered outline (I, I.A, II.C.13, ...),
+        which is located again in the body text to delimit each section.
+        Appendix A is the examination work program: each "Objective N"
+        becomes a procedure, its numbered items become examination steps and
+        their lettered items are kept as sub-steps. Procedures are attached
+        to the handbook section their objective examines.
+        
+        Args:
+            pages: Text of each PDF page
+            
+        Returns:
+            Dictionary in the same shape as the LLM extraction, or an empty
+            dictionary when the booklet layout is not recognised
+        """
+        toc_pages = [i for i, page in enumerate(pages) if len(FFIEC_TOC_LEADER.findall(page)) >= 5]
+        if not toc_pages:
+            return {}
+        
+        outline = self._parse_ffiec_outline(pages[:toc_pages[-1] + 1])
+        body = self._clean_ffiec_body(pages, toc_pages[-1] + 1)
+        if not outline or not body:
+            return {}
+        
+        appendix_start = self._find_ffiec_line(body, FFIEC_APPENDIX_A)
+        appendix_end = self._find_ffiec_line(body, FFIEC_APPENDIX_B, appendix_start or 0)
+        if appendix_start is None:
+            return {}
+        if appendix_end is None:
+            appendix_end = len(body)
+        
+        # Locate each outline heading in reading order
+        headings = []
+        position = 0
+        for number, toc_title in outline:
+            for index in range(position, appendix_start):
+                title = self._match_ffiec_heading(body[index][0], number, toc_title)
+                if title:
+                    headings.append((index, number, title))
+                    position = index + 1
+                    break
+        
+        if not headings:
+            return {}
+        
+        sections = []
+        sections_by_number = {}
+        for i, (index, number, title) in enumerate(headings):
+            end = headings[i + 1][0] if i + 1 < len(headings) else appendix_start
+            lines = [line for line, _ in body[index + 1:end]]
+            # Drop the second line of a wrapped heading
+            if lines and self._normalize_ffiec_text(title).endswith(self._normalize_ffiec_text(lines[0])):
+                lines = lines[1:]
+            action_summary, remainder = self._split_ffiec_action_summary(lines)
+            parent_number = number.rsplit('.', 1)[0] if '.' in number else None
+            
+            section = {
+                'id': f"FFIEC-IS-{number}",
+                'number': number,
+                'title': title,
+                'description': self._join_ffiec_lines(remainder or lines)[:1000],
+                'action_summary': action_summary,
+                'parent_id': f"FFIEC-IS-{parent_number}" if parent_number else None,
+                'level': number.count('.') + 1,
+                'page_start': body[index][1],
+                'page_end': body[max(index, end - 1)][1],
+                'examination_procedures': []
+            }
+            sections.append(section)
+            sections_by_number[number] = section
+        
+        # Appendix A introduction ("Examination Objective") heads its own section
+        appendix_lines = body[appendix_start + 1:appendix_end]
+        intro = []
+        for line, _ in appendix_lines:
+            if FFIEC_OBJECTIVE.match(line):
+                break
+            intro.append(line)
+        appendix = {
+            'id': 'FFIEC-IS-APPENDIX-A',
+            'number': 'APPENDIX-A',
+            'title': 'Examination Procedures',
+            'description': self._join_ffiec_lines(intro)[:1000],
+            'action_summary': '',
+            'parent_id': None,
+            'level': 1,
+            'page_start': body[appendix_start][1],
+            'page_end': body[appendix_end - 1][1],
+            'examination_procedures': []
+        }
+        sections.append(appendix)
+        sections_by_number['APPENDIX-A'] = appendix
+        
+        for procedure in self._parse_ffiec_procedures(appendix_lines):
+            objective = procedure['objective_number']
+            section = sections_by_number.get(FFIEC_OBJECTIVE_SECTIONS.get(objective, ''), appendix)
+            risk_area = FFIEC_RISK_AREAS.get(section['number'].split('.')[0], 'examination')
+            
+            procedure['section_id'] = section['id']
+            for step in procedure['examination_steps']:
+                step['risk_area'] = risk_area
+                step['control_objective'] = procedure['description']
+            section['examination_procedures'].append(procedure)
+        
+        return {
+            "document_title": "FFIEC IT Handbook Information Security Booklet",
+            "publication_year": "2016",
+            "sections": sections
+        }
+    
+    def _parse_ffiec_outline(self, toc_pages: List[str]) -> List[Tuple[str, str]]:
+        """Read the numbered (number, title) outline from the contents pages."""
+        outline = []
+        pending = ''
+        for page in toc_pages:
+            for line in page.split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                # Long titles wrap before their dot leader
+                if pending:
+                    line = f"{pending} {line}"
+                    pending = ''
+                match = FFIEC_TOC_ENTRY.match(line)
+                if match:
+                    outline.append((match.group(1), match.group(2)))
+                elif FFIEC_TOC_ENTRY_START.match(line) and not FFIEC_TOC_LEADER.search(line):
+                    pending = line
+        return outline
+    
+    def _clean_ffiec_body(self, pages: List[str], first_page: int) -> List[Tuple[str, int]]:
+        """
+        Return the body text as (line, page_number) pairs without page furniture.
+        
+        Running headers, footers, chapter tabs and footnotes are removed.
+        Footnotes are numbered consecutively through the booklet, so the
+        footnote block of a page starts at the last line opening with the
+        next expected footnote number; earlier lines starting with that
+        number are superscript references that wrapped onto a new line.
+        """
+        body = []
+        next_footnote = 1
+        for page_index in range(first_page, len(pages)):
+            lines = []
+            for line in pages[page_index].split('\n'):
+                line = line.strip()
+                if not line or FFIEC_PAGE_HEADER.match(line) or FFIEC_PAGE_FOOTER.match(line):
+                    continue
+                if FFIEC_CHAPTER_TAB.match(line) or FFIEC_FOOTNOTE_REF.match(line):
+                    continue
+                lines.append(line)
+            
+            footnote_starts = [i for i, line in enumerate(lines)
+                               if (m := FFIEC_FOOTNOTE.match(line)) and int(m.group(1)) == next_footnote]
+            if footnote_starts:
+                last = next_footnote
+                for line in lines[footnote_starts[-1] + 1:]:
+                    m = FFIEC_FOOTNOTE.match(line)
+                    if m and int(m.group(1)) == last + 1:
+                        last += 1
+                next_footnote = last + 1
+                lines = lines[:footnote_starts[-1]]
+            
+            body.extend((line, page_index + 1) for line in lines)
+        return body
+    
+    def _find_ffiec_line(self, body: List[Tuple[str, int]], text: str, start: int = 0) -> Optional[int]:
+        """Find the index of a body line matching text, ignoring spacing and case."""
+        target = self._normalize_ffiec_text(text)
+        for index in range(start, len(body)):
+            if self._normalize_ffiec_text(body[index][0]) == target:
+                return index
+        return None
+    
+    def _match_ffiec_heading(self, line: str, number: str, toc_title: str) -> Optional[str]:
+        """
+        Return the heading title if line is the body heading for an outline entry.
+        
+        Sub-section headings repeat their number ("II.C.13 Control of
+        Information"). Part headings are printed in title case next to a
+        chapter tab, so the number may be missing from the line.
+        """
+        if line.startswith(number + ' '):
+            title = line[len(number):].strip()
+        elif '.' not in number:
+            title = line
+        else:
+            return None
+        
+        target = self._normalize_ffiec_text(toc_title)
+        candidate = self._normalize_ffiec_text(title)
+        if candidate == target:
+            return title
+        # Sub-section titles may wrap onto a second line in the body
+        if '.' in number and candidate and target.startswith(candidate):
+            return toc_title
+        return None
+    
+    def _split_ffiec_action_summary(self, lines: List[str]) -> Tuple[str, List[str]]:
+        """
+        Split a section's boxed "Action Summary" from its narrative text.
+        
+        The summary is a lead sentence optionally followed by bullets, each
+        ending with a full stop.
+        """
+        if not lines or lines[0] != FFIEC_ACTION_SUMMARY:
+            return '', lines
+        
+        summary = []
+        index = 1
+        # Lead sentence
+        while index < len(lines):
+            summary.append(lines[index])
+            index += 1
+            if lines[index - 1].endswith(('.', ':')):
+                break
+        
+        # Bullets introduced by the lead sentence
+        if summary and summary[-1].endswith(':'):
+            while index < len(lines) and lines[index].startswith('•'):
+                summary.append(lines[index])
+                index += 1
+                while not summary[-1].endswith('.') and index < len(lines) and not lines[index].startswith('•'):
+                    summary.append(lines[index])
+                    index += 1
+        
+        return self._join_ffiec_lines(summary), lines[index:]
+    
+    def _parse_ffiec_procedures(self, lines: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+        """Parse the Appendix A objectives into procedures with examination steps."""
+        procedures = []
+        procedure = None
+        step = None
+        sub_step = None
+        
+        for raw_line, page in lines:
+            for line in FFIEC_INLINE_SUB_STEP.split(raw_line):
+                match = FFIEC_OBJECTIVE.match(line)
+                if match:
+                    procedure = {
+                        'objective_number': int(match.group(1)),
+                        'text': [match.group(2)],
+                        'steps': [],
+                        'page_start': page,
+                        'page_end': page
+                    }
+                    procedures.append(procedure)
+                    step = None
+                    sub_step = None
+                    continue
+                
+                if procedure is None:
+                    continue
+                procedure['page_end'] = page
+                
+                # Items are numbered consecutively, which rejects wrapped lines starting with a number
+                match = FFIEC_STEP.match(line)
+                if match and int(match.group(1)) == len(procedure['steps']) + 1:
+                    step = {'text': [match.group(2)], 'sub_steps': [], 'page_start': page, 'page_end': page}
+                    procedure['steps'].append(step)
+                    sub_step = None
+                    continue
+                
+                match = FFIEC_SUB_STEP.match(line)
+                if match and step is not None and ord(match.group(1)) - ord('a') == len(step['sub_steps']):
+                    sub_step = [match.group(2)]
+                    step['sub_steps'].append(sub_step)
+                    step['page_end'] = page
+                    continue
+                
+                if sub_step is not None:
+                    sub_step.append(line)
+                    step['page_end'] = page
+                elif step is not None:
+                    step['text'].append(line)
+                    step['page_end'] = page
+                else:
+                    procedure['text'].append(line)
+        
+        parsed = []
+        for procedure in procedures:
+            objective = procedure['objective_number']
+            steps = []
+            for number, step in enumerate(procedure['steps'], start=1):
+                steps.append({
+                    'id': f"STEP-OBJ-{objective}-{number}",
+                    'number': f"{objective}.{number}",
+                    'description': self._join_ffiec_lines(step['text']),
+                    'sub_steps': [f"{chr(ord('a') + i)}. {self._join_ffiec_lines(sub_step)}"
+                                  for i, sub_step in enumerate(step['sub_steps'])],
+                    'page_start': step['page_start'],
+                    'page_end': step['page_end']
+                })
+            parsed.append({
+                'id': f"PROC-OBJ-{objective}",
+                'objective_number': objective,
+                'title': f"Objective {objective}",
+                'description': self._join_ffiec_lines(procedure['text']),
+                'page_start': procedure['page_start'],
+                'page_end': procedure['page_end'],
+                'examination_steps': steps
+            })
+        return parsed
+    
+    def _join_ffiec_lines(self, lines: List[str]) -> str:
+        """Join wrapped lines into a single paragraph and drop footnote references."""
+        text = re.sub(r'\s+', ' ', ' '.join(lines))
+        text = FFIEC_TRAILING_FOOTNOTE_REF.sub('', text)
+        text = re.sub(r'\s+([.,;:)])', r'\1', text)
+        return text.strip()
+    
+    def _normalize_ffiec_text(self, text: str) -> str:
+        """Normalize text for heading comparison (PDF extraction splits words)."""
+        return re.sub(r'\s+', '', text).lower()
+    
+    def _summarize_ffiec_sections(self, ffiec_data: Dict[str, Any], batch_size: int = 10):
+        """
+        Add short LLM summaries to parsed handbook sections.
+        
+        Sections are sent in batches; a failed batch leaves those sections
+        without a summary rather than failing the ingestion.
+        """
+        sections = [section for section in ffiec_data['sections'] if section.get('description')]
+        
+        for start in range(0, len(sections), batch_size):
+            batch = sections[start:start + batch_size]
+            section_text = "\n\n".join(
+                f"[{section['id']}] {section['title']}\n{section['description']}" for section in batch
+            )
+            summary_prompt = f"""
+        Summarize each FFIEC IT Handbook section below in one or two sentences for an examiner.
+        Return a JSON object mapping each section id to its summary:
+        
+        {{"SECTION-ID": "Summary"}}
+        
+        Sections:
+        {section_text}
+        """
+            try:
+                summaries = self.llm_service.generate_json_response(summary_prompt)
+                for section in batch:
+                    if summaries.get(section['id']):
+                        section['summary'] = summaries[section['id']]
+                        
+            except Exception as e:
+                logging.warning(f"FFIEC section summarization failed: {e}")
+    
     def _extract_ffiec_structure_with_llm(self, pdf_text: str) -> Dict[str, Any]:
         """Use LLM to extract structured FFIEC data from PDF text."""
         
@@ -198,15 +648,7 @@ class FFIECIngestion:
         """
         
         try:
-            response = self.llm_service.generate_response(extraction_prompt)
-            
-            # Parse JSON response
-            if '```json' in response:
-                json_str = response.split('```json')[1].split('```')[0]
-            else:
-                json_str = response
-            
-            ffiec_data = json.loads(json_str)
+            ffiec_data = self.llm_service.generate_json_response(extraction_prompt)
             
             # Validate structure
             if 'sections' in ffiec_data and len(ffiec_data['sections']) > 0:
@@ -391,77 +833,102 @@ class FFIECIngestion:
             ]
         }
         
-    def _create_ffiec_nodes(self, graph, ffiec_data: Dict[str, Any]):
-        """Create FFIEC section, procedure, and step nodes."""
+    def _flatten_ffiec_hierarchy(self, ffiec_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Flatten FFIEC data into parent/child rows for each level."""
+        
+        hierarchy = {'sections': [], 'procedures': [], 'steps': []}
         
         for section in ffiec_data['sections']:
-            # Create FFIEC_Section node
-            graph.query("""MERGE (s:FFIEC_Section {id: $id})
-                SET s.title = $title,
-                    s.description = $description,
-                    s.source = 'FFIEC IT Handbook',
-                    s.ingested_at = datetime()""", {'id': section['id'], 'title': section['title'], 'description': section['description']})
-            
-            self.ingestion_stats['sections_processed'] += 1
+            hierarchy['sections'].append({
+                'parent_id': section.get('parent_id'),
+                'id': section['id'],
+                'properties': {
+                    'title': section['title'],
+                    'description': section['description'],
+                    'number': section.get('number', ''),
+                    'level': section.get('level', 1),
+                    'action_summary': section.get('action_summary', ''),
+                    'summary': section.get('summary', ''),
+                    'page_start': section.get('page_start'),
+                    'page_end': section.get('page_end'),
+                    'source': 'FFIEC IT Handbook'
+                }
+            })
             
-            # Create FFIEC_Procedure nodes
             for procedure in section['examination_procedures']:
-                graph.query("""MERGE (p:FFIEC_Procedure {id: $id})
-                    SET p.title = $title,
-                        p.description = $description,
-                        p.source = 'FFIEC IT Handbook',
-                        p.ingested_at = datetime()""", {'id': procedure['id'], 'title': procedure['title'], 'description': procedure['description']})
-                
-                self.ingestion_stats['procedures_processed'] += 1
+                hierarchy['procedures'].append({
+                    'parent_id': section['id'],
+                    'id': procedure['id'],
+                    'properties': {
+                        'title': procedure['title'],
+                        'description': procedure['description'],
+                        'objective_number': procedure.get('objective_number'),
+                        'page_start': procedure.get('page_start'),
+                        'page_end': procedure.get('page_end'),
+                        'source': 'FFIEC IT Handbook'
+                    }
+                })
                 
-                # Create FFIEC_ExaminationStep nodes
                 for step in procedure['examination_steps']:
-                    graph.query("""MERGE (step:FFIEC_ExaminationStep {id: $id})
-                        SET step.description = $description,
-                            step.risk_area = $risk_area,
-                            step.control_objective = $control_objective,
-                            step.source = 'FFIEC IT Handbook',
-                            step.ingested_at = datetime()""", {'id': step['id'], 'description': step['description'], 'risk_area': step['risk_area'], 'control_objective': step['control_objective']})
-                    
-                    self.ingestion_stats['instructions_processed'] += 1
+                    hierarchy['steps'].append({
+                        'parent_id': procedure['id'],
+                        'id': step['id'],
+                        'properties': {
+                            'description': step['description'],
+                            'risk_area': step['risk_area'],
+                            'control_objective': step['control_objective'],
+                            'number': step.get('number', ''),
+                            'sub_steps': step.get('sub_steps', []),
+                            'page_start': step.get('page_start'),
+                            'page_end': step.get('page_end'),
+                            'source': 'FFIEC IT Handbook'
+                        }
+                    })
+        
+        return hierarchy
+    
+    def _create_ffiec_nodes(self, graph, ffiec_data: Dict[str, Any]):
+        """Create FFIEC section, procedure, and step nodes, one batched write per level."""
+        
+        hierarchy = self._flatten_ffiec_hierarchy(ffiec_data)
+        
+        self.ingestion_stats['sections_processed'] += bulk_upsert_nodes(graph, 'FFIEC_Section', hierarchy['sections'])
+        self.ingestion_stats['procedures_processed'] += bulk_upsert_nodes(graph, 'FFIEC_Procedure', hierarchy['procedures'])
+        self.ingestion_stats['instructions_processed'] += bulk_upsert_nodes(graph, 'FFIEC_ExaminationStep', hierarchy['steps'])
     
     def _create_ffiec_relationships(self, graph, ffiec_data: Dict[str, Any]):
         """Create relationships between FFIEC nodes."""
         
-        for section in ffiec_data['sections']:
-            # Link sections to procedures
-            for procedure in section['examination_procedures']:
-                graph.query("""MATCH (s:FFIEC_Section {id: $section_id})
-                    MATCH (p:FFIEC_Procedure {id: $procedure_id})
-                    MERGE (s)-[:HAS_PROCEDURE]->(p)""", {'section_id': section['id'], 'procedure_id': procedure['id']})
-                
-                # Link procedures to examination steps
-                for step in procedure['examination_steps']:
-                    graph.query("""MATCH (p:FFIEC_Procedure {id: $procedure_id})
-                        MATCH (step:FFIEC_ExaminationStep {id: $step_id})
-                        MERGE (p)-[:HAS_STEP]->(step)""", {'procedure_id': procedure['id'], 'step_id': step['id']})
-                    
-                    self.ingestion_stats['relationships_created'] += 1
+        hierarchy = self._flatten_ffiec_hierarchy(ffiec_data)
+        
+        # Link parent sections to their sub-sections (I.A -> I.A.1)
+        self.ingestion_stats['relationships_created'] += bulk_merge_relationships(
+            graph, 'FFIEC_Section', 'HAS_SUBSECTION', 'FFIEC_Section', hierarchy['sections']
+        )
+        
+        # Link sections to procedures
+        self.ingestion_stats['relationships_created'] += bulk_merge_relationships(
+            graph, 'FFIEC_Section', 'HAS_PROCEDURE', 'FFIEC_Procedure', hierarchy['procedures']
+        )
+        
+        # Link procedures to examination steps
+        self.ingestion_stats['relationships_created'] += bulk_merge_relationships(
+            graph, 'FFIEC_Procedure', 'HAS_STEP', 'FFIEC_ExaminationStep', hierarchy['steps']
+        )
     
     def _create_ffiec_citations(self, graph):
         """Create citation nodes for FFIEC handbook."""
         
-        # Create main citation for FFIEC handbook
-        graph.query("""
-            MERGE (cit:Citation {reference_name: 'FFIEC_IT_Handbook_Information_Security'})
-            SET cit.citation_text = 'FFIEC IT Examination Handbook Information Security Booklet',
-                cit.url = 'https://ithandbook.ffiec.gov/it-booklets/information-security.aspx',
-                cit.publication_date = '2016',
-                cit.source_type = 'Examination Handbook',
-                cit.ingested_at = datetime()
-        """)
-        
-        # Link all FFIEC nodes to this citation
-        graph.query("""
-            MATCH (n)
-            WHERE n:FFIEC_Section OR n:FFIEC_Procedure OR n:FFIEC_ExaminationStep
-            MATCH (cit:Citation {reference_name: 'FFIEC_IT_Handbook_Information_Security'})
-            MERGE (n)-[:HAS_CITATION]->(cit)
-        """)
+        # Create main citation for FFIEC handbook and link the framework's nodes to it
+        create_citation(
+            graph, 'FFIEC_IT_Handbook_Information_Security',
+            {
+                'citation_text': 'FFIEC IT Examination Handbook Information Security Booklet',
+                'url': 'https://ithandbook.ffiec.gov/it-booklets/information-security.aspx',
+                'publication_date': '2016',
+                'source_type': 'Examination Handbook'
+            },
+            ['FFIEC_Section', 'FFIEC_Procedure', 'FFIEC_ExaminationStep']
+        )
         
         self.ingestion_stats['citations_created'] += 1
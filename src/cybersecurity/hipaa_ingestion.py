@@ -6,22 +6,64 @@ Accountability Act) Administrative Simplification data into the knowledge base.
 HIPAA provides regulatory requirements for healthcare information security and privacy.
 
 Features:
-- Parse HIPAA regulatory document structure using LLM
+- Parse the CFR regulation text deterministically (Part → Subpart → § → paragraph)
+- Fall back to LLM extraction when the CFR structure cannot be recognised
 - Extract regulations, sections, and instructions
+- Track the page span of every section and requirement for citations
 - Create citation references for all nodes
 - Map to cybersecurity knowledge base schema
 - Create relationships with compliance requirements
 """
 
-from typing import Dict, Any, Tuple
-import streamlit as st
+from typing import Dict, Any, List, Optional, Tuple
 import os
+import re
+import bisect
 import logging
-import json
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.api.llm_service import LLMService
+from src.utils.progress import ProgressReporter
+from src.knowledge_base.database import bulk_upsert_nodes, bulk_merge_relationships, create_citation
+
+
+# --- CFR text patterns ---
+# Running header printed at the top of every page of the HHS regulation text
+CFR_PAGE_HEADER = re.compile(r'^\s*HIPAA Administrative Simplification Regulation Text\s*\w+ \d{4}\s*\d+\s')
+# Table-of-contents pages are recognised by their dot leaders
+CFR_TOC_LEADER = re.compile(r'\.{10,}')
+CFR_PART_HEADING = re.compile(r'PART\s+(16\d)\s*—')
+CFR_SUBPART_HEADING = re.compile(r'Subpart\s+([A-Z])\s*—\s*')
+CFR_SECTION_HEADING = re.compile(r'§\s?(16\d\.\d+)\s{2,}')
+CFR_APPENDIX_HEADING = re.compile(r'Appendix [A-Z] to Subpart')
+CFR_PARAGRAPH_MARKER = re.compile(r'\(([a-z]{1,4}|\d{1,2}|[A-Z])\)')
+# A paragraph marker must open a sentence, not continue a cross-reference
+CFR_MARKER_BOUNDARY = re.compile(r'(?:^|[.:;\]]|;\s*(?:and|or))\s*$')
+CFR_SPECIFICATION = re.compile(r'\((Required|Addressable)\)')
+# Federal Register amendment history closing a section, e.g. "[68 FR 8376, Feb. 20, 2003]"
+CFR_AMENDMENT_NOTE = re.compile(r'\[\d+ FR [^\[\]]*\]\s*$')
+
+CFR_PART_TITLES = {
+    '160': 'General Administrative Requirements',
+    '162': 'Administrative Requirements',
+    '164': 'Security and Privacy'
+}
+
+# Paragraph designations nest as (a)(1)(i)(A)
+_ROMAN = ['i', 'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x', 'xi', 'xii', 'xiii',
+          'xiv', 'xv', 'xvi', 'xvii', 'xviii', 'xix', 'xx', 'xxi', 'xxii', 'xxiii', 'xxiv', 'xxv']
+CFR_PARAGRAPH_LEVELS = [
+    [chr(c) for c in range(ord('a'), ord('z') + 1)],
+    [str(n) for n in range(1, 100)],
+    _ROMAN,
+    [chr(c) for c in range(ord('A'), ord('Z') + 1)]
+]
+
+HIPAA_ENTITY_TYPES = [
+    'covered entity', 'business associate', 'health plan',
+    'health care clearinghouse', 'health care provider'
+]
 
 
 class HIPAAIngestion:
@@ -32,8 +74,14 @@ class HIPAAIngestion:
     and relationship mapping to compliance requirements.
     """
     
-    def __init__(self):
-        """Initialize HIPAA ingestion system."""
+    def __init__(self, reporter: Optional[ProgressReporter] = None):
+        """
+        Initialize HIPAA ingestion system.
+        
+        Args:
+            reporter: Progress reporter for status messages (defaults to logging)
+        """
+        self.reporter = reporter or ProgressReporter()
         self.document_path = os.path.join("documents", "hipaa-simplification-201303.pdf")
         self.llm_service = LLMService()
         self.ingestion_stats = {
@@ -52,6 +100,8 @@ class HIPAAIngestion:
         Args:
             graph: Neo4j database connection
             **kwargs: HIPAA-specific parameters
+                parsed_data: Structure already returned by _parse_hipaa_document(),
+                    e.g. when parsing ran ahead of the database write
             
         Returns:
             Tuple of (success_boolean, status_message)
@@ -61,10 +111,10 @@ class HIPAAIngestion:
             if not os.path.exists(self.document_path):
                 return False, f"HIPAA document not found at {self.document_path}"
             
-            st.info("🔄 Starting HIPAA regulatory ingestion...")
+            self.reporter.info("🔄 Starting HIPAA regulatory ingestion...")
             
             # Parse HIPAA structure
-            hipaa_data = self._parse_hipaa_document()
+            hipaa_data = kwargs.get('parsed_data') or self._parse_hipaa_document()
             
             if not hipaa_data or not hipaa_data.get('regulations'):
                 return False, "No HIPAA regulations found in document"
@@ -98,12 +148,23 @@ class HIPAAIngestion:
     
     def _parse_hipaa_document(self) -> Dict[str, Any]:
         """
-        Parse HIPAA document to extract regulatory structure using LLM.
+        Parse HIPAA document to extract regulatory structure.
+        
+        The CFR citation structure is parsed locally first; the LLM is only
+        used when the document layout is not recognised.
         
         Returns:
             Dictionary containing parsed HIPAA data
         """
         try:
+            # Parse the CFR structure across all pages without LLM cost
+            hipaa_data = self._parse_hipaa_cfr_structure(self._extract_pdf_pages())
+            if hipaa_data.get('regulations'):
+                logging.info(f"Parsed {len(hipaa_data['regulations'])} HIPAA regulations from CFR text")
+                return hipaa_data
+            
+            logging.warning("CFR structure not recognised, falling back to LLM extraction")
+            
             # Extract text from PDF
             pdf_text = self._extract_pdf_text()
             
@@ -152,6 +213,294 @@ class HIPAAIngestion:
         
         return ""
     
+    def _extract_pdf_pages(self) -> List[str]:
+        """Extract the text of every page of the HIPAA PDF."""
+        try:
+            try:
+                import PyPDF2
+                with open(self.document_path, 'rb') as file:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                    return [page.extract_text() or "" for page in pdf_reader.pages]
+            except ImportError:
+                pass
+            
+            # Alternative extraction using subprocess (pages are separated by form feeds)
+            import subprocess
+            result = subprocess.run(['pdftotext', '-layout', self.document_path, '-'], 
+                                  capture_output=True, text=True, timeout=60)
+            if result.returncode == 0:
+                return result.stdout.split('\f')
+                
+        except Exception as e:
+            logging.error(f"Error extracting PDF pages: {e}")
+        
+        return []
+    
+    def _parse_hipaa_cfr_structure(self, pages: List[str]) -> Dict[str, Any]:
+        """
+        Parse the 45 CFR Parts 160, 162 and 164 regulation text.
+        
+        Each Part opens with a contents list (Subpart headings followed by
+        their § headings) before the regulation body repeats the same §
+        headings with text. Subparts become regulations, § headings become
+        sections and lettered/numbered paragraphs become requirements keyed
+        by their CFR citation, e.g. 164.308(a)(1)(ii)(A).
+        
+        Args:
+            pages: Text of every PDF page, in order
+            
+        Returns:
+            Dictionary containing parsed HIPAA data (empty regulations if the
+            CFR layout was not recognised)
+        """
+        text, page_offsets = self._join_cfr_pages(pages)
+        
+        tokens = []
+        for pattern, kind in ((CFR_PART_HEADING, 'part'), (CFR_SUBPART_HEADING, 'subpart'),
+                              (CFR_SECTION_HEADING, 'section'), (CFR_APPENDIX_HEADING, 'appendix')):
+            for match in pattern.finditer(text):
+                tokens.append((match.start(), match.end(), kind, match.group(1) if match.groups() else None))
+        tokens.sort()
+        
+        regulations = {}
+        sections = {}
+        section_order = []
+        body_starts = []  # (start, end, section_id) for section headings in the regulation body
+        boundaries = []   # positions where a section body must stop
+        part = None
+        subpart = None
+        in_contents = False
+        
+        for index, (start, end, kind, value) in enumerate(tokens):
+            next_start = tokens[index + 1][0] if index + 1 < len(tokens) else len(text)
+            heading_text = self._clean_cfr_title(text[end:next_start])
+            
+            if kind == 'part':
+                part, subpart, in_contents = value, None, True
+                boundaries.append(start)
+            elif kind == 'appendix':
+                boundaries.append(start)
+            elif kind == 'subpart':
+                boundaries.append(start)
+                if in_contents and part:
+                    subpart = value
+                    regulation_id = f"PART-{part}-SUBPART-{subpart}"
+                    regulations.setdefault(regulation_id, {
+                        'id': regulation_id,
+                        'title': heading_text,
+                        'description': f"45 CFR Part {part} ({CFR_PART_TITLES.get(part, '')}), Subpart {subpart}: {heading_text}",
+                        'cfr_reference': f"45 CFR Part {part}, Subpart {subpart}",
+                        'sections': []
+                    })
+            elif kind == 'section' and part and value.startswith(part + '.'):
+                if in_contents and value not in sections:
+                    sections[value] = {'title': heading_text, 'part': part, 'subpart': subpart}
+                    section_order.append(value)
+                elif value in sections and not sections[value].get('started'):
+                    # The first repeated heading marks the start of the regulation body
+                    in_contents = False
+                    sections[value]['started'] = True
+                    body_starts.append((start, end, value))
+        
+        if not body_starts:
+            return {'document_title': "HIPAA Administrative Simplification", 'regulations': []}
+        
+        # Section bodies run to the next section, subpart, part or appendix heading
+        stops = sorted(set(boundaries + [start for start, _, _ in body_starts] + [len(text)]))
+        bodies = {}
+        for start, end, section_id in body_starts:
+            stop = stops[bisect.bisect_right(stops, start)]
+            bodies[section_id] = (start, end, stop)
+        
+        for section_id in section_order:
+            info = sections[section_id]
+            if section_id not in bodies or '[Reserved]' in info['title']:
+                continue
+            
+            start, end, stop = bodies[section_id]
+            body = text[end:stop]
+            amendment_note = CFR_AMENDMENT_NOTE.search(body)
+            if amendment_note:
+                body = body[:amendment_note.start()]
+            # Drop the repeated section title before the first paragraph
+            title_match = re.match(r'\s*' + r'\s*'.join(map(re.escape, info['title'].split())) + r'\.?', body)
+            body_offset = end + (title_match.end() if title_match else 0)
+            
+            section = {
+                'id': section_id,
+                'title': info['title'],
+                'description': self._clean_cfr_title(text[body_offset:end + len(body)])[:1000],
+                'citation': f"45 CFR {section_id}",
+                'page_start': self._page_for_offset(page_offsets, start),
+                'page_end': self._page_for_offset(page_offsets, max(start, stop - 1)),
+                'requirements': self._parse_cfr_paragraphs(section_id, text[body_offset:end + len(body)], body_offset, page_offsets)
+            }
+            
+            regulation_id = f"PART-{info['part']}-SUBPART-{info['subpart']}" if info['subpart'] else f"PART-{info['part']}"
+            if regulation_id not in regulations:
+                regulations[regulation_id] = {
+                    'id': regulation_id,
+                    'title': CFR_PART_TITLES.get(info['part'], f"Part {info['part']}"),
+                    'description': f"45 CFR Part {info['part']}",
+                    'cfr_reference': f"45 CFR Part {info['part']}",
+                    'sections': []
+                }
+            regulations[regulation_id]['sections'].append(section)
+        
+        return {
+            "document_title": "HIPAA Administrative Simplification",
+            "publication_date": "March 2013",
+            "regulations": [regulation for regulation in regulations.values() if regulation['sections']]
+        }
+    
+    def _join_cfr_pages(self, pages: List[str]) -> Tuple[str, List[Tuple[int, int]]]:
+        """
+        Join page texts into one normalised string, skipping contents pages.
+        
+        Returns:
+            Tuple of (joined_text, page_offsets) where page_offsets holds the
+            (offset, 1-based page number) at which each kept page starts
+        """
+        parts = []
+        page_offsets = []
+        offset = 0
+        
+        for page_number, page_text in enumerate(pages, start=1):
+            if len(CFR_TOC_LEADER.findall(page_text)) >= 3:
+                continue
+            
+            page_text = CFR_PAGE_HEADER.sub('', page_text)
+            # PyPDF2 keeps a trailing space on lines that end a word; other breaks split words
+            page_text = re.sub(r'[ \t]+\n', ' ', page_text).replace('\n', '') + ' '
+            page_offsets.append((offset, page_number))
+            parts.append(page_text)
+            offset += len(page_text)
+        
+        return ''.join(parts), page_offsets
+    
+    def _page_for_offset(self, page_offsets: List[Tuple[int, int]], offset: int) -> int:
+        """Map an offset in the joined text back to a 1-based PDF page number."""
+        index = bisect.bisect_right(page_offsets, (offset, float('inf'))) - 1
+        return page_offsets[max(index, 0)][1] if page_offsets else 0
+    
+    def _clean_cfr_title(self, raw: str) -> str:
+        """Collapse whitespace and trailing punctuation of a heading."""
+        return re.sub(r'\s+', ' ', raw).strip().rstrip('.').strip()
+    
+    def _parse_cfr_paragraphs(self, section_id: str, body: str, body_offset: int,
+                              page_offsets: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """
+        Split a section body into paragraph-level requirements.
+        
+        Paragraph markers are accepted only where they open a sentence and
+        continue the (a)(1)(i)(A) designation sequence, so cross-references
+        such as "paragraph (a)(4) of this section" stay in the text.
+        
+        Args:
+            section_id: CFR section number, e.g. "164.308"
+            body: Section text following the heading
+            body_offset: Offset of the body in the joined document text
+            page_offsets: Page start offsets from _join_cfr_pages
+            
+        Returns:
+            List of requirement dictionaries (the whole section becomes a
+            single requirement when it has no paragraph designations); each
+            parent_id is the nearest enclosing requirement that has text, or
+            the section itself
+        """
+        markers = []  # (marker_start, text_start, path)
+        path = []
+        last_end = None
+        
+        for match in CFR_PARAGRAPH_MARKER.finditer(body):
+            compound = last_end is not None and match.start() == last_end
+            if not compound and not CFR_MARKER_BOUNDARY.search(body[max(0, match.start() - 12):match.start()]):
+                continue
+            
+            level = self._next_cfr_paragraph_level(path, match.group(1))
+            if level is None:
+                continue
+            
+            path = path[:level] + [match.group(1)]
+            markers.append((match.start(), match.end(), list(path)))
+            last_end = match.end()
+        
+        if not markers:
+            markers = [(0, 0, [])]
+        
+        # Entity and information types are inherited from the enclosing paragraph
+        inherited = {section_id: (self._detect_entity_types(body), self._detect_information_type(body))}
+        
+        requirements = []
+        emitted = {section_id}
+        for index, (marker_start, text_start, paragraph_path) in enumerate(markers):
+            text_end = markers[index + 1][0] if index + 1 < len(markers) else len(body)
+            requirement_id = section_id + ''.join(f"({label})" for label in paragraph_path)
+            # Paragraphs without text of their own, e.g. "(b)(1)" directly
+            # followed by "(i)", are skipped, so link to the nearest emitted ancestor
+            ancestors = [
+                section_id + ''.join(f"({label})" for label in paragraph_path[:depth])
+                for depth in range(len(paragraph_path) - 1, -1, -1)
+            ]
+            parent_id = next((ancestor for ancestor in ancestors if ancestor in emitted), section_id)
+            
+            description = self._clean_cfr_title(body[text_start:text_end])
+            parent_entities, parent_information = inherited.get(ancestors[0] if ancestors else section_id, inherited[section_id])
+            entity_type = self._detect_entity_types(description) or parent_entities
+            information_type = self._detect_information_type(description) or parent_information
+            inherited[requirement_id] = (entity_type, information_type)
+            
+            if not description:
+                continue
+            
+            emitted.add(requirement_id)
+            specification = CFR_SPECIFICATION.search(description[:200])
+            requirements.append({
+                'id': requirement_id,
+                'description': description,
+                'entity_type': entity_type,
+                'information_type': information_type,
+                'citation': f"45 CFR {requirement_id}",
+                'parent_id': parent_id,
+                'specification': specification.group(1) if specification else '',
+                'page_start': self._page_for_offset(page_offsets, body_offset + marker_start),
+                'page_end': self._page_for_offset(page_offsets, body_offset + max(marker_start, text_end - 1))
+            })
+        
+        return requirements
+    
+    def _next_cfr_paragraph_level(self, path: List[str], label: str) -> Optional[int]:
+        """
+        Return the nesting level at which a paragraph label continues the path.
+        
+        A label may open the first child of the current paragraph or follow
+        the current paragraph or one of its ancestors; the deepest match wins.
+        """
+        if len(path) < len(CFR_PARAGRAPH_LEVELS) and label == CFR_PARAGRAPH_LEVELS[len(path)][0]:
+            return len(path)
+        
+        for level in range(len(path) - 1, -1, -1):
+            sequence = CFR_PARAGRAPH_LEVELS[level]
+            position = sequence.index(path[level]) if path[level] in sequence else -1
+            if 0 <= position < len(sequence) - 1 and sequence[position + 1] == label:
+                return level
+        
+        return None
+    
+    def _detect_entity_types(self, text: str) -> str:
+        """Return the regulated entity types mentioned in a passage."""
+        lowered = text.lower()
+        return ", ".join(entity for entity in HIPAA_ENTITY_TYPES if entity in lowered)
+    
+    def _detect_information_type(self, text: str) -> str:
+        """Classify a passage as concerning ePHI or PHI."""
+        lowered = text.lower()
+        if 'electronic protected health information' in lowered:
+            return 'ePHI'
+        if 'protected health information' in lowered:
+            return 'PHI'
+        return ''
+    
     def _extract_hipaa_structure_with_llm(self, pdf_text: str) -> Dict[str, Any]:
         """Use LLM to extract structured HIPAA data from PDF text."""
         
@@ -202,15 +551,7 @@ class HIPAAIngestion:
         """
         
         try:
-            response = self.llm_service.generate_response(extraction_prompt)
-            
-            # Parse JSON response
-            if '```json' in response:
-                json_str = response.split('```json')[1].split('```')[0]
-            else:
-                json_str = response
-            
-            hipaa_data = json.loads(json_str)
+            hipaa_data = self.llm_service.generate_json_response(extraction_prompt)
             
             # Validate structure
             if 'regulations' in hipaa_data and len(hipaa_data['regulations']) > 0:
@@ -300,99 +641,105 @@ class HIPAAIngestion:
             ]
         }
         
-    def _create_hipaa_nodes(self, graph, hipaa_data: Dict[str, Any]):
-        """Create HIPAA regulation, section, and requirement nodes."""
+    def _flatten_hipaa_hierarchy(self, hipaa_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Flatten HIPAA data into parent/child rows for each level."""
+        
+        # Requirements nested in another requirement are kept apart so they link to it
+        hierarchy = {'regulations': [], 'sections': [], 'requirements': [], 'sub_requirements': []}
         
         for regulation in hipaa_data['regulations']:
-            # Create HIPAA_Regulation node
-            graph.query("""
-                MERGE (r:HIPAA_Regulation {id: $id})
-                SET r.title = $title,
-                    r.description = $description,
-                    r.cfr_reference = $cfr_reference,
-                    r.source = 'HIPAA Administrative Simplification',
-                    r.ingested_at = datetime()
-            """, {
-                'id': regulation['id'], 
-                'title': regulation['title'], 
-                'description': regulation['description'], 
-                'cfr_reference': regulation.get('cfr_reference', '')
+            hierarchy['regulations'].append({
+                'id': regulation['id'],
+                'properties': {
+                    'title': regulation['title'],
+                    'description': regulation['description'],
+                    'cfr_reference': regulation.get('cfr_reference', ''),
+                    'source': 'HIPAA Administrative Simplification'
+                }
             })
             
-            self.ingestion_stats['regulations_processed'] += 1
-            
-            # Create HIPAA_Section nodes
             for section in regulation['sections']:
-                graph.query("""
-                    MERGE (s:HIPAA_Section {id: $id})
-                    SET s.title = $title,
-                        s.description = $description,
-                        s.source = 'HIPAA Administrative Simplification',
-                        s.ingested_at = datetime()
-                """, {
-                    'id': section['id'], 
-                    'title': section['title'], 
-                    'description': section['description']
+                hierarchy['sections'].append({
+                    'parent_id': regulation['id'],
+                    'id': section['id'],
+                    'properties': {
+                        'title': section['title'],
+                        'description': section['description'],
+                        'citation': section.get('citation', ''),
+                        'page_start': section.get('page_start'),
+                        'page_end': section.get('page_end'),
+                        'source': 'HIPAA Administrative Simplification'
+                    }
                 })
                 
-                self.ingestion_stats['sections_processed'] += 1
-                
-                # Create HIPAA_Requirement nodes - with safe access
-                requirements = section.get('requirements', [])
-                for requirement in requirements:
-                    graph.query("""
-                        MERGE (req:HIPAA_Requirement {id: $id})
-                        SET req.description = $description,
-                            req.entity_type = $entity_type,
-                            req.information_type = $information_type,
-                            req.source = 'HIPAA Administrative Simplification',
-                            req.ingested_at = datetime()
-                    """, {
-                        'id': requirement['id'], 
-                        'description': requirement['description'], 
-                        'entity_type': requirement['entity_type'], 
-                        'information_type': requirement['information_type']
+                # Requirements - with safe access
+                requirement_ids = {requirement['id'] for requirement in section.get('requirements', [])}
+                for requirement in section.get('requirements', []):
+                    parent_id = requirement.get('parent_id')
+                    if parent_id not in requirement_ids:
+                        parent_id = section['id']
+                    level = 'requirements' if parent_id == section['id'] else 'sub_requirements'
+                    hierarchy[level].append({
+                        'parent_id': parent_id,
+                        'id': requirement['id'],
+                        'properties': {
+                            'description': requirement['description'],
+                            'entity_type': requirement['entity_type'],
+                            'information_type': requirement['information_type'],
+                            'citation': requirement.get('citation', ''),
+                            'parent_id': requirement.get('parent_id', ''),
+                            'specification': requirement.get('specification', ''),
+                            'page_start': requirement.get('page_start'),
+                            'page_end': requirement.get('page_end'),
+                            'source': 'HIPAA Administrative Simplification'
+                        }
                     })
-                    
-                    self.ingestion_stats['instructions_processed'] += 1
+        
+        return hierarchy
+    
+    def _create_hipaa_nodes(self, graph, hipaa_data: Dict[str, Any]):
+        """Create HIPAA regulation, section, and requirement nodes, one batched write per level."""
+        
+        hierarchy = self._flatten_hipaa_hierarchy(hipaa_data)
+        
+        self.ingestion_stats['regulations_processed'] += bulk_upsert_nodes(graph, 'HIPAA_Regulation', hierarchy['regulations'])
+        self.ingestion_stats['sections_processed'] += bulk_upsert_nodes(graph, 'HIPAA_Section', hierarchy['sections'])
+        self.ingestion_stats['instructions_processed'] += bulk_upsert_nodes(
+            graph, 'HIPAA_Requirement', hierarchy['requirements'] + hierarchy['sub_requirements']
+        )
     
     def _create_hipaa_relationships(self, graph, hipaa_data: Dict[str, Any]):
         """Create relationships between HIPAA nodes."""
         
-        for regulation in hipaa_data['regulations']:
-            # Link regulations to sections
-            for section in regulation['sections']:
-                graph.query("""MATCH (r:HIPAA_Regulation {id: $regulation_id})
-                    MATCH (s:HIPAA_Section {id: $section_id})
-                    MERGE (r)-[:HAS_SECTION]->(s)""", {'regulation_id': regulation['id'], 'section_id': section['id']})
-                
-                # Link sections to requirements
-                for requirement in section['requirements']:
-                    graph.query("""MATCH (s:HIPAA_Section {id: $section_id})
-                        MATCH (req:HIPAA_Requirement {id: $requirement_id})
-                        MERGE (s)-[:HAS_REQUIREMENT]->(req)""", {'section_id': section['id'], 'requirement_id': requirement['id']})
-                    
-                    self.ingestion_stats['relationships_created'] += 1
+        hierarchy = self._flatten_hipaa_hierarchy(hipaa_data)
+        
+        # Link regulations to sections
+        bulk_merge_relationships(graph, 'HIPAA_Regulation', 'HAS_SECTION', 'HIPAA_Section', hierarchy['sections'])
+        
+        # Link sections to their top-level requirements
+        self.ingestion_stats['relationships_created'] += bulk_merge_relationships(
+            graph, 'HIPAA_Section', 'HAS_REQUIREMENT', 'HIPAA_Requirement', hierarchy['requirements']
+        )
+        
+        # Link nested paragraphs to the requirement they belong to
+        self.ingestion_stats['relationships_created'] += bulk_merge_relationships(
+            graph, 'HIPAA_Requirement', 'HAS_SUB_REQUIREMENT', 'HIPAA_Requirement', hierarchy['sub_requirements']
+        )
     
     def _create_hipaa_citations(self, graph):
         """Create citation nodes for HIPAA regulations."""
         
-        # Create main citation for HIPAA document
-        graph.query("""
-            MERGE (cit:Citation {reference_name: 'HIPAA_Administrative_Simplification'})
-            SET cit.citation_text = 'HIPAA Administrative Simplification Regulation Text',
-            cit.url = 'https://www.hhs.gov/hipaa/for-professionals/security/index.html',
-                cit.publication_date = '2013-03',
-                cit.source_type = 'Federal Regulation',
-                cit.ingested_at = datetime()
-        """)
-        
-        # Link all HIPAA nodes to this citation
-        graph.query("""
-            MATCH (n)
-            WHERE n:HIPAA_Regulation OR n:HIPAA_Section OR n:HIPAA_Requirement
-            MATCH (cit:Citation {reference_name: 'HIPAA_Administrative_Simplification'})
-            MERGE (n)-[:HAS_CITATION]->(cit)
-        """)
+        # Create main citation for HIPAA document; the links carry the cited page span
+        create_citation(
+            graph, 'HIPAA_Administrative_Simplification',
+            {
+                'citation_text': 'HIPAA Administrative Simplification Regulation Text',
+                'url': 'https://www.hhs.gov/hipaa/for-professionals/security/index.html',
+                'publication_date': '2013-03',
+                'source_type': 'Federal Regulation'
+            },
+            ['HIPAA_Regulation', 'HIPAA_Section', 'HIPAA_Requirement'],
+            copied_properties={'cfr_citation': 'citation', 'page_start': 'page_start', 'page_end': 'page_end'}
+        )
         
         self.ingestion_stats['citations_created'] += 1
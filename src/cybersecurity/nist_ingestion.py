@@ -13,15 +13,15 @@ Features:
 - Create relationships with ATT&CK mitigations
 """
 
-from typing import Dict, Any, Tuple
-import streamlit as st
+from typing import Dict, Any, List, Optional, Tuple
 import os
 import logging
-import json
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.api.llm_service import LLMService
+from src.utils.progress import ProgressReporter
+from src.knowledge_base.database import bulk_upsert_nodes, bulk_merge_relationships, create_citation, link_to_mitigations
 
 
 class NISTIngestion:
@@ -32,8 +32,14 @@ class NISTIngestion:
     and relationship mapping to existing ATT&CK data.
     """
     
-    def __init__(self):
-        """Initialize NIST CSF ingestion system."""
+    def __init__(self, reporter: Optional[ProgressReporter] = None):
+        """
+        Initialize NIST CSF ingestion system.
+        
+        Args:
+            reporter: Progress reporter for status messages (defaults to logging)
+        """
+        self.reporter = reporter or ProgressReporter()
         self.document_path = os.path.join("documents", "NIST.CSWP.29.pdf")
         self.llm_service = LLMService()
         self.ingestion_stats = {
@@ -51,6 +57,8 @@ class NISTIngestion:
         Args:
             graph: Neo4j database connection
             **kwargs: NIST-specific parameters
+                parsed_data: Structure already returned by _parse_nist_document(),
+                    e.g. when parsing ran ahead of the database write
             
         Returns:
             Tuple of (success_boolean, status_message)
@@ -60,10 +68,10 @@ class NISTIngestion:
             if not os.path.exists(self.document_path):
                 return False, f"NIST CSF document not found at {self.document_path}"
             
-            st.info("🔄 Starting NIST CSF ingestion...")
+            self.reporter.info("🔄 Starting NIST CSF ingestion...")
             
             # Parse NIST CSF structure from document
-            nist_data = self._parse_nist_document()
+            nist_data = kwargs.get('parsed_data') or self._parse_nist_document()
             
             # Validate parsed data
             if not nist_data or not nist_data.get('functions'):
@@ -208,15 +216,7 @@ class NISTIngestion:
         """
         
         try:
-            response = self.llm_service.generate_response(extraction_prompt)
-            
-            # Parse JSON response
-            if '```json' in response:
-                json_str = response.split('```json')[1].split('```')[0]
-            else:
-                json_str = response
-            
-            nist_data = json.loads(json_str)
+            nist_data = self.llm_service.generate_json_response(extraction_prompt)
             
             # Validate structure
             if 'functions' in nist_data and len(nist_data['functions']) > 0:
@@ -440,106 +440,88 @@ class NISTIngestion:
             ]
         }
         
-    def _create_nist_nodes(self, graph, nist_data: Dict[str, Any]):
-        """Create NIST CSF Function, Category, and Subcategory nodes."""
+    def _flatten_nist_hierarchy(self, nist_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Flatten NIST CSF data into parent/child rows for each level."""
+        
+        hierarchy = {'functions': [], 'categories': [], 'subcategories': []}
         
         for function in nist_data.get('functions', []):
-            # Create NIST_Function node with safe access
-            function_data = {
-                'id': function.get('id', ''),
-                'name': function.get('name', ''),
-                'description': function.get('description', '')
-            }
-            
-            graph.query("""MERGE (f:NIST_Function {id: $id})
-                SET f.name = $name,
-                    f.description = $description,
-                    f.source = 'NIST CSF 2.0',
-                    f.ingested_at = datetime()""", function_data)
-            
-            self.ingestion_stats['functions_processed'] += 1
+            function_id = function.get('id', '')
+            hierarchy['functions'].append({
+                'id': function_id,
+                'properties': {
+                    'name': function.get('name', ''),
+                    'description': function.get('description', ''),
+                    'source': 'NIST CSF 2.0'
+                }
+            })
             
-            # Create NIST_Category nodes
             for category in function.get('categories', []):
-                category_data = {
-                    'id': category.get('id', ''),
-                    'name': category.get('name', ''),
-                    'description': category.get('description', '')
-                }
-                
-                graph.query("""MERGE (c:NIST_Category {id: $id})
-                    SET c.name = $name,
-                        c.description = $description,
-                        c.source = 'NIST CSF 2.0',
-                        c.ingested_at = datetime()""", category_data)
-                
-                self.ingestion_stats['categories_processed'] += 1
+                category_id = category.get('id', '')
+                hierarchy['categories'].append({
+                    'parent_id': function_id,
+                    'id': category_id,
+                    'properties': {
+                        'name': category.get('name', ''),
+                        'description': category.get('description', ''),
+                        'source': 'NIST CSF 2.0'
+                    }
+                })
                 
-                # Create NIST_Subcategory nodes
                 for subcategory in category.get('subcategories', []):
-                    subcategory_data = {
+                    hierarchy['subcategories'].append({
+                        'parent_id': category_id,
                         'id': subcategory.get('id', ''),
-                        'description': subcategory.get('description', '')
-                    }
-                    
-                    graph.query("""MERGE (s:NIST_Subcategory {id: $id})
-                        SET s.description = $description,
-                            s.source = 'NIST CSF 2.0',
-                            s.ingested_at = datetime()""", subcategory_data)
-                    
-                    self.ingestion_stats['subcategories_processed'] += 1
+                        'properties': {
+                            'description': subcategory.get('description', ''),
+                            'source': 'NIST CSF 2.0'
+                        }
+                    })
+        
+        return hierarchy
+    
+    def _create_nist_nodes(self, graph, nist_data: Dict[str, Any]):
+        """Create NIST CSF Function, Category, and Subcategory nodes, one batched write per level."""
+        
+        hierarchy = self._flatten_nist_hierarchy(nist_data)
+        
+        self.ingestion_stats['functions_processed'] += bulk_upsert_nodes(graph, 'NIST_Function', hierarchy['functions'])
+        self.ingestion_stats['categories_processed'] += bulk_upsert_nodes(graph, 'NIST_Category', hierarchy['categories'])
+        self.ingestion_stats['subcategories_processed'] += bulk_upsert_nodes(graph, 'NIST_Subcategory', hierarchy['subcategories'])
     
     def _create_nist_relationships(self, graph, nist_data: Dict[str, Any]):
         """Create relationships between NIST nodes and with ATT&CK nodes."""
         
-        for function in nist_data.get('functions', []):
-            # Link functions to categories
-            for category in function.get('categories', []):
-                function_id = function.get('id', '')
-                category_id = category.get('id', '')
-                
-                if function_id and category_id:
-                    graph.query("""MATCH (f:NIST_Function {id: $function_id})
-                        MATCH (c:NIST_Category {id: $category_id})
-                        MERGE (f)-[:HAS_CATEGORY]->(c)""", {'function_id': function_id, 'category_id': category_id})
-                
-                # Link categories to subcategories
-                for subcategory in category.get('subcategories', []):
-                    subcategory_id = subcategory.get('id', '')
-                    
-                    if category_id and subcategory_id:
-                        graph.query("""MATCH (c:NIST_Category {id: $category_id})
-                            MATCH (s:NIST_Subcategory {id: $subcategory_id})
-                            MERGE (c)-[:HAS_SUBCATEGORY]->(s)""", {'category_id': category_id, 'subcategory_id': subcategory_id})
-                        
-                        # Create relationships to ATT&CK mitigations (example mappings)
-                        if subcategory_id.startswith('PR.AC'):  # Access Control subcategories
-                            graph.query("""MATCH (s:NIST_Subcategory {id: $subcategory_id})
-                                MATCH (m:Mitigation)
-                                WHERE m.id STARTS WITH 'M1026' OR m.id STARTS WITH 'M1018'
-                                MERGE (s)-[:SUPPORTS]->(m)""", {'subcategory_id': subcategory_id})
-                        
-                        self.ingestion_stats['relationships_created'] += 1
+        hierarchy = self._flatten_nist_hierarchy(nist_data)
+        
+        # Link functions to categories
+        bulk_merge_relationships(graph, 'NIST_Function', 'HAS_CATEGORY', 'NIST_Category', hierarchy['categories'])
+        
+        # Link categories to subcategories
+        self.ingestion_stats['relationships_created'] += bulk_merge_relationships(
+            graph, 'NIST_Category', 'HAS_SUBCATEGORY', 'NIST_Subcategory', hierarchy['subcategories']
+        )
+        
+        # Create relationships to ATT&CK mitigations (example mappings for Access Control subcategories)
+        link_to_mitigations(
+            graph, 'NIST_Subcategory', 'SUPPORTS',
+            [row['id'] for row in hierarchy['subcategories'] if row['id'].startswith('PR.AC')],
+            ('M1026', 'M1018')
+        )
     
     def _create_nist_citations(self, graph):
         """Create citation nodes for NIST CSF."""
         
-        # Create main citation for NIST CSF document
-        graph.query("""
-            MERGE (cit:Citation {reference_name: 'NIST_CSF_2.0'})
-            SET cit.citation_text = 'NIST Cybersecurity Framework Version 2.0',
-                cit.url = 'https://doi.org/10.6028/NIST.CSWP.29',
-                cit.publication_date = '2024-02',
-                cit.source_type = 'Official Framework',
-                cit.ingested_at = datetime()
-        """)
-        
-        # Link all NIST nodes to this citation
-        graph.query("""
-            MATCH (n)
-            WHERE n:NIST_Function OR n:NIST_Category OR n:NIST_Subcategory
-            MATCH (cit:Citation {reference_name: 'NIST_CSF_2.0'})
-            MERGE (n)-[:HAS_CITATION]->(cit)
-        """)
+        # Create main citation for NIST CSF document and link the framework's nodes to it
+        create_citation(
+            graph, 'NIST_CSF_2.0',
+            {
+                'citation_text': 'NIST Cybersecurity Framework Version 2.0',
+                'url': 'https://doi.org/10.6028/NIST.CSWP.29',
+                'publication_date': '2024-02',
+                'source_type': 'Official Framework'
+            },
+            ['NIST_Function', 'NIST_Category', 'NIST_Subcategory']
+        )
         
         self.ingestion_stats['citations_created'] += 1
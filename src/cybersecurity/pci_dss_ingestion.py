@@ -6,22 +6,58 @@ Security Standard) data into the knowledge base. PCI DSS provides security
 standards for organizations that handle credit card transactions.
 
 Features:
-- Parse PCI DSS requirements and sub-requirements using LLM
+- Reconstruct the requirement/testing-procedure tables from PDF text positions
+- Fall back to LLM extraction when the table layout cannot be recognised
 - Extract testing procedures and guidance
 - Create citation references for all nodes
 - Map to cybersecurity knowledge base schema
 - Create relationships with ATT&CK techniques where applicable
 """
 
-from typing import Dict, Any, Tuple
-import streamlit as st
+from typing import Dict, Any, List, Optional, Tuple
 import os
+import re
+import bisect
 import logging
-import json
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.api.llm_service import LLMService
+from src.utils.progress import ProgressReporter
+from src.knowledge_base.database import bulk_upsert_nodes, bulk_merge_relationships, create_citation
+
+
+# --- PCI DSS table layout patterns ---
+PCI_REQUIREMENT_COLUMN_HEADER = 'Defined Approach Requirements'
+PCI_TESTING_COLUMN_HEADER = 'Defined Approach Testing Procedures'
+PCI_GUIDANCE_COLUMN_HEADER = 'Guidance'
+# Fragments on the same row can differ by a point or two of baseline
+PCI_ROW_TOLERANCE = 2.0
+PCI_COLUMN_MARGIN = 4.0
+PCI_PRINCIPAL_HEADING = re.compile(r'^Requirement (\d{1,2}):\s*(.+)$')
+# 1.1 (section), 8.3.6 (requirement) and 12.5.2.1 (additional requirement)
+PCI_REQUIREMENT_ROW = re.compile(r'^(\d{1,2}(?:\.\d{1,2}){1,3})\s+(\S.*)$')
+# 8.3.6 or 8.3.6.a
+PCI_TESTING_ROW = re.compile(r'^(\d{1,2}(?:\.\d{1,2}){1,3})(?:\.([a-z]))?\s+(\S.*)$')
+# Running headers and footers repeated on every page
+PCI_PAGE_FURNITURE = re.compile(r'^(?:Payment Card Industry Data Security Standard|PCI DSS v4\.0\.1\b|©|Page \d+$)')
+PCI_REQUIREMENT_NOTES = re.compile(r'(Customized Approach Objective|Applicability Notes?)\s*')
+
+# Principal requirements grouped by PCI DSS goal
+PCI_PRINCIPAL_REQUIREMENTS = {
+    '1': ('Install and Maintain Network Security Controls', 'Build and Maintain a Secure Network and Systems'),
+    '2': ('Apply Secure Configurations to All System Components', 'Build and Maintain a Secure Network and Systems'),
+    '3': ('Protect Stored Account Data', 'Protect Account Data'),
+    '4': ('Protect Cardholder Data with Strong Cryptography During Transmission Over Open, Public Networks', 'Protect Account Data'),
+    '5': ('Protect All Systems and Networks from Malicious Software', 'Maintain a Vulnerability Management Program'),
+    '6': ('Develop and Maintain Secure Systems and Software', 'Maintain a Vulnerability Management Program'),
+    '7': ('Restrict Access to System Components and Cardholder Data by Business Need to Know', 'Implement Strong Access Control Measures'),
+    '8': ('Identify Users and Authenticate Access to System Components', 'Implement Strong Access Control Measures'),
+    '9': ('Restrict Physical Access to Cardholder Data', 'Implement Strong Access Control Measures'),
+    '10': ('Log and Monitor All Access to System Components and Cardholder Data', 'Regularly Monitor and Test Networks'),
+    '11': ('Test Security of Systems and Networks Regularly', 'Regularly Monitor and Test Networks'),
+    '12': ('Support Information Security with Organizational Policies and Programs', 'Maintain an Information Security Policy')
+}
 
 
 class PCIDSSIngestion:
@@ -32,8 +68,14 @@ class PCIDSSIngestion:
     and relationship mapping to existing cybersecurity frameworks.
     """
     
-    def __init__(self):
-        """Initialize PCI DSS ingestion system."""
+    def __init__(self, reporter: Optional[ProgressReporter] = None):
+        """
+        Initialize PCI DSS ingestion system.
+        
+        Args:
+            reporter: Progress reporter for status messages (defaults to logging)
+        """
+        self.reporter = reporter or ProgressReporter()
         self.document_path = os.path.join("documents", "PCI-DSS-v4_0_1.pdf")
         self.llm_service = LLMService()
         self.ingestion_stats = {
@@ -52,6 +94,8 @@ class PCIDSSIngestion:
         Args:
             graph: Neo4j database connection
             **kwargs: PCI DSS-specific parameters
+                parsed_data: Structure already returned by _parse_pci_dss_document(),
+                    e.g. when parsing ran ahead of the database write
             
         Returns:
             Tuple of (success_boolean, status_message)
@@ -61,10 +105,10 @@ class PCIDSSIngestion:
             if not os.path.exists(self.document_path):
                 return False, f"PCI DSS document not found at {self.document_path}"
             
-            st.info("🔄 Starting PCI DSS v4.0.1 ingestion...")
+            self.reporter.info("🔄 Starting PCI DSS v4.0.1 ingestion...")
             
             # Parse PCI DSS structure
-            pci_data = self._parse_pci_dss_document()
+            pci_data = kwargs.get('parsed_data') or self._parse_pci_dss_document()
             
             # Create nodes and relationships
             self._create_pci_dss_nodes(graph, pci_data)
@@ -94,12 +138,23 @@ class PCIDSSIngestion:
     
     def _parse_pci_dss_document(self) -> Dict[str, Any]:
         """
-        Parse PCI DSS document to extract requirements structure using LLM.
+        Parse PCI DSS document to extract requirements structure.
+        
+        The requirement tables are reconstructed locally from text positions;
+        the LLM is only used when the table layout is not recognised.
         
         Returns:
             Dictionary containing parsed PCI DSS data
         """
         try:
+            # Rebuild the requirement tables deterministically
+            pci_data = self._parse_pci_dss_tables(self._extract_pdf_fragments())
+            if pci_data.get('requirements'):
+                logging.info(f"Parsed {len(pci_data['requirements'])} PCI DSS requirements from table layout")
+                return pci_data
+            
+            logging.warning("PCI DSS table layout not recognised, falling back to LLM extraction")
+            
             # Extract text from PDF
             pdf_text = self._extract_pdf_text()
             
@@ -148,6 +203,300 @@ class PCIDSSIngestion:
         
         return ""
     
+    def _extract_pdf_fragments(self) -> List[List[Tuple[float, float, str]]]:
+        """
+        Extract positioned text fragments from every page of the PCI DSS PDF.
+        
+        Returns:
+            One list per page of (x, y, text) fragments in PDF user space
+        """
+        pages = []
+        try:
+            import PyPDF2
+            with open(self.document_path, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                for page in pdf_reader.pages:
+                    fragments = []
+                    
+                    def visit_text(text, cm, tm, font_dict, font_size):
+                        if not text or not text.strip():
+                            return
+                        # Map the text matrix origin through the current transformation matrix
+                        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+                        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+                        for offset, line in enumerate(text.splitlines()):
+                            if line.strip():
+                                fragments.append((x, y - offset * font_size, line.strip()))
+                    
+                    page.extract_text(visitor_text=visit_text)
+                    pages.append(fragments)
+        except ImportError:
+            logging.warning("PyPDF2 not available for PCI DSS table extraction")
+        except Exception as e:
+            logging.error(f"Error extracting PDF fragments: {e}")
+        
+        return pages
+    
+    def _parse_pci_dss_tables(self, pages: List[List[Tuple[float, float, str]]]) -> Dict[str, Any]:
+        """
+        Reconstruct requirement, sub-requirement and testing-procedure rows.
+        
+        Requirement tables have a "Defined Approach Requirements" column, a
+        "Defined Approach Testing Procedures" column and a "Guidance" column.
+        Each column is read as one continuous stream across pages, so rows
+        split by a page break are stitched back together before the numbered
+        rows (8.3.6, 8.3.6.a) are matched up.
+        
+        Args:
+            pages: Positioned text fragments per page from _extract_pdf_fragments
+            
+        Returns:
+            Dictionary containing parsed PCI DSS data (empty requirements if the
+            table layout was not recognised)
+        """
+        requirement_lines, testing_lines, guidance_lines = self._split_pci_dss_columns(pages)
+        
+        requirements = {}
+        sub_requirements = {}
+        anchors = []  # ((page, -y), sub_requirement_id) where each row starts
+        section = None
+        current = None
+        
+        for page_number, y, line in requirement_lines:
+            heading = PCI_PRINCIPAL_HEADING.match(line)
+            if heading and heading.group(1) in PCI_PRINCIPAL_REQUIREMENTS:
+                self._get_pci_principal_requirement(requirements, heading.group(1))
+                section = current = None
+                continue
+            
+            row = PCI_REQUIREMENT_ROW.match(line)
+            if row and self._is_next_pci_row(row.group(1), section, current, sub_requirements):
+                row_id, row_text = row.group(1), row.group(2)
+                principal = self._get_pci_principal_requirement(requirements, row_id.split('.')[0])
+                
+                if row_id.count('.') == 1:
+                    section = {'id': row_id, 'title': row_text}
+                    current = None
+                    continue
+                
+                current = {
+                    'id': f"REQ-{row_id}",
+                    'number': row_id,
+                    'description': row_text,
+                    'section_id': section['id'] if section else '',
+                    'section_title': section['title'] if section else '',
+                    'guidance': '',
+                    'page_start': page_number,
+                    'page_end': page_number,
+                    'testing_procedures': []
+                }
+                sub_requirements[row_id] = current
+                principal['sub_requirements'].append(current)
+                anchors.append(((page_number, -y), row_id))
+                continue
+            
+            # Continuation lines, possibly carried over a page break
+            if current:
+                current['description'] += ' ' + line
+                current['page_end'] = page_number
+            elif section:
+                section['title'] += ' ' + line
+        
+        # Testing procedures reference the requirement number they verify and
+        # start level with its row; numbers quoted in wrapped text do neither
+        row_starts = {row_id: key for key, row_id in anchors}
+        procedure = None
+        procedure_key = None
+        for page_number, y, line in testing_lines:
+            row = PCI_TESTING_ROW.match(line)
+            key = (row.group(1), row.group(2) or '') if row else None
+            if row and self._is_next_pci_testing_row(key, procedure_key, (page_number, -y), row_starts):
+                procedure_key = key
+                suffix = f".{row.group(2)}" if row.group(2) else ''
+                procedure = {
+                    'id': f"TEST-{row.group(1)}{suffix}",
+                    'description': row.group(3),
+                    'guidance': ''
+                }
+                sub_requirements[row.group(1)]['testing_procedures'].append(procedure)
+            elif procedure:
+                procedure['description'] += ' ' + line
+        
+        # Guidance cells have no numbering; attach them to the row they sit beside
+        anchor_keys = [key for key, _ in anchors]
+        for page_number, y, line in guidance_lines:
+            index = bisect.bisect_right(anchor_keys, (page_number, -y)) - 1
+            if index >= 0:
+                sub_requirement = sub_requirements[anchors[index][1]]
+                sub_requirement['guidance'] = (sub_requirement['guidance'] + ' ' + line).strip()
+        
+        for sub_requirement in sub_requirements.values():
+            self._split_pci_requirement_notes(sub_requirement)
+        
+        return {
+            "document_title": "PCI DSS v4.0.1",
+            "publication_date": "June 2024",
+            "requirements": [
+                requirement for _, requirement in sorted(requirements.items(), key=lambda item: int(item[0]))
+                if requirement['sub_requirements']
+            ]
+        }
+    
+    def _split_pci_dss_columns(self, pages: List[List[Tuple[float, float, str]]]):
+        """
+        Assign positioned fragments to the three table columns.
+        
+        Column boundaries come from the repeated table header; pages without
+        a header reuse the previous page's boundaries, which is how tables
+        continue after a page break.
+        
+        Returns:
+            Tuple of (requirement_lines, testing_lines, guidance_lines), each a
+            list of (page_number, y, text) in reading order
+        """
+        columns = ([], [], [])
+        boundaries = None
+        
+        for page_number, fragments in enumerate(pages, start=1):
+            header = self._find_pci_column_boundaries(fragments)
+            if header:
+                boundaries, header_y = header
+            elif boundaries:
+                header_y = None
+            else:
+                continue
+            
+            # Group fragments into rows from the top of the page down
+            rows = []
+            for x, y, text in sorted(fragments, key=lambda fragment: (-fragment[1], fragment[0])):
+                if PCI_PAGE_FURNITURE.match(text):
+                    continue
+                if header_y is not None and y >= header_y - PCI_ROW_TOLERANCE:
+                    # Page title, principal requirement heading or table header
+                    if PCI_PRINCIPAL_HEADING.match(text):
+                        columns[0].append((page_number, y, text))
+                    continue
+                if rows and abs(rows[-1][0] - y) <= PCI_ROW_TOLERANCE:
+                    rows[-1][1].append((x, text))
+                else:
+                    rows.append((y, [(x, text)]))
+            
+            for y, cells in rows:
+                row_text = [[], [], []]
+                for x, text in sorted(cells):
+                    row_text[bisect.bisect_right(boundaries, x) - 1 if x >= boundaries[0] else 0].append(text)
+                for column, texts in zip(columns, row_text):
+                    if texts:
+                        column.append((page_number, y, ' '.join(texts)))
+        
+        return columns
+    
+    def _find_pci_column_boundaries(self, fragments: List[Tuple[float, float, str]]):
+        """
+        Locate the table header on a page.
+        
+        Returns:
+            Tuple of ([requirement_x, testing_x, guidance_x], header_y) or None
+        """
+        requirement_x = testing_x = guidance_x = None
+        header_y = None
+        
+        for x, y, text in fragments:
+            if PCI_TESTING_COLUMN_HEADER in text:
+                testing_x = x
+                header_y = y if header_y is None else min(header_y, y)
+            elif PCI_REQUIREMENT_COLUMN_HEADER in text:
+                requirement_x = x
+                header_y = y if header_y is None else min(header_y, y)
+        
+        if requirement_x is None or testing_x is None:
+            return None
+        
+        for x, y, text in fragments:
+            if text.startswith(PCI_GUIDANCE_COLUMN_HEADER) and x > testing_x:
+                guidance_x = x
+                break
+        
+        boundaries = [requirement_x - PCI_COLUMN_MARGIN, testing_x - PCI_COLUMN_MARGIN,
+                      (guidance_x if guidance_x is not None else float('inf')) - PCI_COLUMN_MARGIN]
+        return boundaries, header_y
+    
+    def _get_pci_principal_requirement(self, requirements: Dict[str, Dict[str, Any]], number: str) -> Dict[str, Any]:
+        """Return the principal requirement node for a requirement number, creating it if needed."""
+        if number not in requirements:
+            title, goal = PCI_PRINCIPAL_REQUIREMENTS.get(number, (f"Requirement {number}", ''))
+            requirements[number] = {
+                'id': f"REQ-{number}",
+                'title': title,
+                'description': f"{goal}: {title}" if goal else title,
+                'goal': goal,
+                'sub_requirements': []
+            }
+        return requirements[number]
+    
+    def _is_next_pci_row(self, row_id: str, section: Optional[Dict[str, Any]],
+                         current: Optional[Dict[str, Any]], sub_requirements: Dict[str, Any]) -> bool:
+        """
+        Check that a numbered line opens a new row rather than continuing text.
+        
+        Row numbers only move forward within a principal requirement or on to
+        the next one, so numbers quoted inside a requirement's text are ignored.
+        """
+        if row_id in sub_requirements or (section and row_id == section['id']):
+            return False
+        
+        principal = row_id.split('.')[0]
+        if principal not in PCI_PRINCIPAL_REQUIREMENTS:
+            return False
+        
+        previous = current['number'] if current else (section['id'] if section else None)
+        if previous is None:
+            return True
+        
+        return self._follows_pci_row(previous, row_id)
+    
+    def _is_next_pci_testing_row(self, key: Tuple[str, str], previous: Optional[Tuple[str, str]],
+                                 position: Tuple[int, float], row_starts: Dict[str, Tuple[int, float]]) -> bool:
+        """
+        Check that a numbered testing-column line opens a new testing procedure.
+        
+        The number must belong to a parsed requirement, move forward like
+        requirement rows do (8.3.6.a, 8.3.6.b, 8.3.7) and sit no higher than
+        the requirement row it verifies.
+        
+        Args:
+            key: (requirement number, letter or '') of the line
+            previous: Key of the current testing procedure, or None
+            position: (page, -y) of the line
+            row_starts: (page, -y) at which each requirement row starts
+        """
+        number, letter = key
+        row_start = row_starts.get(number)
+        if row_start is None or position < (row_start[0], row_start[1] - PCI_ROW_TOLERANCE):
+            return False
+        if previous is None:
+            return True
+        if number == previous[0]:
+            return letter > previous[1]
+        return self._follows_pci_row(previous[0], number)
+    
+    def _follows_pci_row(self, previous: str, row_id: str) -> bool:
+        """Check that a row number comes after the previous one, in its principal requirement or the next."""
+        previous_principal = int(previous.split('.')[0])
+        return int(row_id.split('.')[0]) in (previous_principal, previous_principal + 1) and \
+            tuple(map(int, row_id.split('.'))) > tuple(map(int, previous.split('.')))
+    
+    def _split_pci_requirement_notes(self, sub_requirement: Dict[str, Any]):
+        """Move the Customized Approach Objective and Applicability Notes out of the description."""
+        parts = PCI_REQUIREMENT_NOTES.split(sub_requirement['description'])
+        sub_requirement['description'] = parts[0].strip()
+        sub_requirement['customized_approach_objective'] = ''
+        sub_requirement['applicability_notes'] = ''
+        
+        for label, text in zip(parts[1::2], parts[2::2]):
+            key = 'customized_approach_objective' if label.startswith('Customized') else 'applicability_notes'
+            sub_requirement[key] = (sub_requirement[key] + ' ' + text.strip()).strip()
+    
     def _extract_pci_dss_structure_with_llm(self, pdf_text: str) -> Dict[str, Any]:
         """Use LLM to extract structured PCI DSS data from PDF text."""
         
@@ -195,15 +544,7 @@ class PCIDSSIngestion:
         """
         
         try:
-            response = self.llm_service.generate_response(extraction_prompt)
-            
-            # Parse JSON response
-            if '```json' in response:
-                json_str = response.split('```json')[1].split('```')[0]
-            else:
-                json_str = response
-            
-            pci_data = json.loads(json_str)
+            pci_data = self.llm_service.generate_json_response(extraction_prompt)
             
             # Validate structure
             if 'requirements' in pci_data and len(pci_data['requirements']) > 0:
@@ -420,81 +761,92 @@ class PCIDSSIngestion:
             ]
         }
         
-    def _create_pci_dss_nodes(self, graph, pci_data: Dict[str, Any]):
-        """Create PCI DSS requirement, sub-requirement, and testing procedure nodes."""
+    def _flatten_pci_dss_hierarchy(self, pci_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Flatten PCI DSS data into parent/child rows for each level."""
+        
+        hierarchy = {'requirements': [], 'sub_requirements': [], 'testing_procedures': []}
         
         for requirement in pci_data['requirements']:
-            # Create PCI_DSS_Requirement node
-            graph.query("""MERGE (r:PCI_DSS_Requirement {id: $id})
-                SET r.title = $title,
-                    r.description = $description,
-                    r.source = 'PCI DSS v4.0.1',
-                    r.ingested_at = datetime()""", {'id': requirement['id'], 'title': requirement['title'], 'description': requirement['description']})
-            
-            self.ingestion_stats['requirements_processed'] += 1
+            hierarchy['requirements'].append({
+                'id': requirement['id'],
+                'properties': {
+                    'title': requirement['title'],
+                    'description': requirement['description'],
+                    'goal': requirement.get('goal', ''),
+                    'source': 'PCI DSS v4.0.1'
+                }
+            })
             
-            # Create PCI_DSS_SubRequirement nodes
             for sub_req in requirement['sub_requirements']:
-                graph.query("""MERGE (sr:PCI_DSS_SubRequirement {id: $id})
-                    SET sr.description = $description,
-                        sr.source = 'PCI DSS v4.0.1',
-                        sr.ingested_at = datetime()""", {'id': sub_req['id'], 'description': sub_req['description']})
-                
-                self.ingestion_stats['sub_requirements_processed'] += 1
+                hierarchy['sub_requirements'].append({
+                    'parent_id': requirement['id'],
+                    'id': sub_req['id'],
+                    'properties': {
+                        'description': sub_req['description'],
+                        'section_id': sub_req.get('section_id', ''),
+                        'section_title': sub_req.get('section_title', ''),
+                        'guidance': sub_req.get('guidance', ''),
+                        'customized_approach_objective': sub_req.get('customized_approach_objective', ''),
+                        'applicability_notes': sub_req.get('applicability_notes', ''),
+                        'page_start': sub_req.get('page_start'),
+                        'page_end': sub_req.get('page_end'),
+                        'source': 'PCI DSS v4.0.1'
+                    }
+                })
                 
-                # Create PCI_DSS_TestingProcedure nodes
                 for test_proc in sub_req['testing_procedures']:
-                    graph.query("""
-                        MERGE (tp:PCI_DSS_TestingProcedure {id: $id})
-                        SET tp.description = $description,
-                            tp.guidance = $guidance,
-                            tp.source = 'PCI DSS v4.0.1',
-                            tp.ingested_at = datetime()
-                    """, {
-                        'id': test_proc['id'], 
-                        'description': test_proc['description'], 
-                        'guidance': test_proc.get('guidance', '')
+                    hierarchy['testing_procedures'].append({
+                        'parent_id': sub_req['id'],
+                        'id': test_proc['id'],
+                        'properties': {
+                            'description': test_proc['description'],
+                            'guidance': test_proc.get('guidance', ''),
+                            'source': 'PCI DSS v4.0.1'
+                        }
                     })
-                    
-                    self.ingestion_stats['instructions_processed'] += 1
+        
+        return hierarchy
+    
+    def _create_pci_dss_nodes(self, graph, pci_data: Dict[str, Any]):
+        """Create PCI DSS requirement, sub-requirement, and testing procedure nodes, one batched write per level."""
+        
+        hierarchy = self._flatten_pci_dss_hierarchy(pci_data)
+        
+        self.ingestion_stats['requirements_processed'] += bulk_upsert_nodes(
+            graph, 'PCI_DSS_Requirement', hierarchy['requirements'])
+        self.ingestion_stats['sub_requirements_processed'] += bulk_upsert_nodes(
+            graph, 'PCI_DSS_SubRequirement', hierarchy['sub_requirements'])
+        self.ingestion_stats['instructions_processed'] += bulk_upsert_nodes(
+            graph, 'PCI_DSS_TestingProcedure', hierarchy['testing_procedures'])
     
     def _create_pci_dss_relationships(self, graph, pci_data: Dict[str, Any]):
         """Create relationships between PCI DSS nodes."""
         
-        for requirement in pci_data['requirements']:
-            # Link requirements to sub-requirements
-            for sub_req in requirement['sub_requirements']:
-                graph.query("""MATCH (r:PCI_DSS_Requirement {id: $requirement_id})
-                    MATCH (sr:PCI_DSS_SubRequirement {id: $sub_req_id})
-                    MERGE (r)-[:HAS_SUB_REQUIREMENT]->(sr)""", {'requirement_id': requirement['id'], 'sub_req_id': sub_req['id']})
-                
-                # Link sub-requirements to testing procedures
-                for test_proc in sub_req['testing_procedures']:
-                    graph.query("""MATCH (sr:PCI_DSS_SubRequirement {id: $sub_req_id})
-                        MATCH (tp:PCI_DSS_TestingProcedure {id: $test_proc_id})
-                        MERGE (sr)-[:HAS_TESTING_PROCEDURE]->(tp)""", {'sub_req_id': sub_req['id'], 'test_proc_id': test_proc['id']})
-                    
-                    self.ingestion_stats['relationships_created'] += 1
+        hierarchy = self._flatten_pci_dss_hierarchy(pci_data)
+        
+        # Link requirements to sub-requirements
+        bulk_merge_relationships(graph, 'PCI_DSS_Requirement', 'HAS_SUB_REQUIREMENT', 'PCI_DSS_SubRequirement',
+                                 hierarchy['sub_requirements'])
+        
+        # Link sub-requirements to testing procedures
+        self.ingestion_stats['relationships_created'] += bulk_merge_relationships(
+            graph, 'PCI_DSS_SubRequirement', 'HAS_TESTING_PROCEDURE', 'PCI_DSS_TestingProcedure',
+            hierarchy['testing_procedures']
+        )
     
     def _create_pci_dss_citations(self, graph):
         """Create citation nodes for PCI DSS standard."""
         
-        # Create main citation for PCI DSS v4.0.1
-        graph.query("""
-            MERGE (cit:Citation {reference_name: 'PCI_DSS_v4_0_1'})
-            SET cit.citation_text = 'Payment Card Industry Data Security Standard v4.0.1',
-                cit.url = 'https://www.pcisecuritystandards.org/document_library/',
-                cit.publication_date = '2022-12',
-                cit.source_type = 'Industry Standard',
-                cit.ingested_at = datetime()
-        """)
-        
-        # Link all PCI DSS nodes to this citation
-        graph.query("""
-            MATCH (n)
-            WHERE n:PCI_DSS_Requirement OR n:PCI_DSS_SubRequirement OR n:PCI_DSS_TestingProcedure
-            MATCH (cit:Citation {reference_name: 'PCI_DSS_v4_0_1'})
-            MERGE (n)-[:HAS_CITATION]->(cit)
-        """)
+        # Create main citation for PCI DSS v4.0.1 and link the framework's nodes to it
+        create_citation(
+            graph, 'PCI_DSS_v4_0_1',
+            {
+                'citation_text': 'Payment Card Industry Data Security Standard v4.0.1',
+                'url': 'https://www.pcisecuritystandards.org/document_library/',
+                'publication_date': '2022-12',
+                'source_type': 'Industry Standard'
+            },
+            ['PCI_DSS_Requirement', 'PCI_DSS_SubRequirement', 'PCI_DSS_TestingProcedure']
+        )
         
         self.ingestion_stats['citations_created'] += 1
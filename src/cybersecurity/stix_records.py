@@ -0,0 +1,350 @@
+"""
+Compact Records for Processed STIX Data
+
+This module holds the in-flight representation of ATT&CK data between
+process_attack_objects and the bulk writer in ingest_to_neo4j. A full
+ATT&CK bundle yields hundreds of thousands of nodes and relationships that
+are all kept until the write, so their per-object overhead decides the
+memory an ingestion worker needs.
+
+Nodes are slot-based records with one class per label instead of property
+dictionaries. Relationships are stored column-wise per link batch: one list
+of source keys and one of target keys, sharing the id strings of the STIX
+objects. Repeated values (platforms, tactics, labels, versions, citations)
+are interned through a ValuePool so every occurrence refers to one object.
+
+Property dictionaries for the repository are only built batch by batch
+while writing, through the lazy NodeRows and LinkRows sequences.
+
+Features:
+- __slots__ node records per ATT&CK label
+- Columnar relationship storage grouped by link batch
+- Interning of repeated strings and string lists
+- Lazy repository rows built per write batch
+
+Classes:
+    ValuePool: Canonical instances of repeated values
+    NodeRecord: Properties common to every ATT&CK node
+    RelationshipColumns: Relationships as source/target columns per link batch
+    NodeRows: Repository rows of node records, built on access
+    LinkRows: Repository link rows of one relationship batch, built on access
+"""
+
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Link endpoints (source label, source key, target label, target key) per kind of relationship
+STIX_ENDPOINTS = (None, 'id', None, 'id')
+TACTIC_ENDPOINTS = ('Technique', 'id', 'Tactic', 'short_name')
+SUBTECHNIQUE_ENDPOINTS = ('Technique', 'technique_id', 'Technique', 'id')
+
+
+class ValuePool:
+    """
+    Canonical instances of values repeated across STIX objects.
+
+    Equal strings and equal string lists (as tuples) are replaced by one
+    shared object, e.g. the platforms of thousands of techniques or a
+    report cited by many of them. The pool's own tables are freed with the
+    pool, unlike sys.intern's process-wide table, which never shrinks.
+    """
+
+    __slots__ = ('_strings', '_tuples')
+
+    def __init__(self):
+        self._strings: Dict[str, str] = {}
+        self._tuples: Dict[Tuple, Tuple] = {}
+
+    def text(self, value: Any) -> Any:
+        """Canonical string; other values are returned unchanged."""
+        if type(value) is not str:
+            return value
+        return self._strings.setdefault(value, value)
+
+    def strings(self, values: Optional[Iterable[Any]]) -> Tuple:
+        """
+        Canonical tuple of canonical strings.
+
+        Args:
+            values: List of values, or None
+
+        Returns:
+            tuple: Shared tuple with the same values
+        """
+        if not values:
+            return ()
+        pooled = tuple(self.text(value) for value in values)
+        try:
+            return self._tuples.setdefault(pooled, pooled)
+        except TypeError:
+            # Unhashable values (nested objects) are kept as they are
+            return pooled
+
+
+class NodeRecord:
+    """
+    Properties common to every ATT&CK node.
+
+    Subclasses add the slots of their label's properties and list them with
+    their defaults in ``defaults``, in the order they are written. Tuples
+    are written as lists, so rows look exactly like the property
+    dictionaries of nodes.
+    """
+
+    __slots__ = ('id', 'name', 'description', 'citations', 'domain')
+
+    label = ''
+    # Optional properties and their defaults, in row order
+    defaults: Dict[str, Any] = {'citations': (), 'domain': 'enterprise'}
+
+    def __init__(self, id: str, name: str, description: str, **properties: Any):
+        """
+        Initialize the record.
+
+        Args:
+            id: STIX id (or generated id of derived nodes)
+            name: Node name
+            description: Node description
+            **properties: Optional properties named in ``defaults``
+
+        Raises:
+            TypeError: If a property is not one of the label's
+        """
+        self.id = id
+        self.name = name
+        self.description = description
+        for key, default in self.defaults.items():
+            setattr(self, key, properties.pop(key, default))
+        if properties:
+            raise TypeError(f"Unknown {type(self).__name__} properties: {', '.join(properties)}")
+
+    def to_row(self) -> Dict[str, Any]:
+        """Property dictionary written to the graph, including the 'type' property."""
+        row = {'type': self.label, 'id': self.id, 'name': self.name, 'description': self.description}
+        for key in self.defaults:
+            value = getattr(self, key)
+            row[key] = list(value) if type(value) is tuple else value
+        return row
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, name={self.name!r})"
+
+
+class DerivedTacticRecord(NodeRecord):
+    """Tactic created from the kill chain phases of techniques."""
+
+    __slots__ = ('short_name',)
+
+    label = 'Tactic'
+    defaults = {**NodeRecord.defaults, 'short_name': ''}
+
+
+class StixNodeRecord(NodeRecord):
+    """Node created from a STIX object."""
+
+    __slots__ = ('created', 'modified', 'version')
+
+    defaults = {**NodeRecord.defaults, 'created': None, 'modified': None, 'version': '1.0'}
+
+
+class TechniqueRecord(StixNodeRecord):
+    """ATT&CK technique or sub-technique."""
+
+    __slots__ = (
+        'technique_id', 'tactics', 'platforms', 'data_sources', 'permissions_required',
+        'effective_permissions', 'system_requirements', 'defense_bypassed', 'detection', 'is_subtechnique'
+    )
+
+    label = 'Technique'
+    defaults = {
+        **StixNodeRecord.defaults,
+        'technique_id': None,
+        'tactics': (),
+        'platforms': (),
+        'data_sources': (),
+        'permissions_required': (),
+        'effective_permissions': (),
+        'system_requirements': (),
+        'defense_bypassed': (),
+        'detection': '',
+        'is_subtechnique': False
+    }
+
+
+class TacticRecord(StixNodeRecord):
+    """ATT&CK tactic from its STIX object."""
+
+    __slots__ = ('short_name',)
+
+    label = 'Tactic'
+    defaults = {**StixNodeRecord.defaults, 'short_name': ''}
+
+
+class SoftwareRecord(StixNodeRecord):
+    """Properties shared by malware and tools."""
+
+    __slots__ = ('labels', 'aliases', 'platforms')
+
+    defaults = {**StixNodeRecord.defaults, 'labels': (), 'aliases': (), 'platforms': ()}
+
+
+class MalwareRecord(SoftwareRecord):
+    """ATT&CK malware."""
+
+    __slots__ = ()
+
+    label = 'Malware'
+
+
+class ToolRecord(SoftwareRecord):
+    """ATT&CK tool."""
+
+    __slots__ = ()
+
+    label = 'Tool'
+
+
+class ThreatGroupRecord(StixNodeRecord):
+    """ATT&CK group (intrusion set)."""
+
+    __slots__ = ('aliases',)
+
+    label = 'ThreatGroup'
+    defaults = {**StixNodeRecord.defaults, 'aliases': ()}
+
+
+class MitigationRecord(StixNodeRecord):
+    """ATT&CK mitigation (course of action)."""
+
+    __slots__ = ('mitigation_id',)
+
+    label = 'Mitigation'
+    defaults = {**StixNodeRecord.defaults, 'mitigation_id': None}
+
+
+class DataSourceRecord(StixNodeRecord):
+    """ATT&CK data source."""
+
+    __slots__ = ('platforms', 'collection_layers')
+
+    label = 'DataSource'
+    defaults = {**StixNodeRecord.defaults, 'platforms': (), 'collection_layers': ()}
+
+
+class DataComponentRecord(StixNodeRecord):
+    """ATT&CK data component."""
+
+    __slots__ = ()
+
+    label = 'DataComponent'
+
+
+class CampaignRecord(StixNodeRecord):
+    """ATT&CK campaign."""
+
+    __slots__ = ('aliases', 'first_seen', 'last_seen')
+
+    label = 'Campaign'
+    defaults = {**StixNodeRecord.defaults, 'aliases': (), 'first_seen': None, 'last_seen': None}
+
+
+# Record class per node label of STIX objects
+NODE_RECORDS = {
+    record.label: record
+    for record in (
+        TechniqueRecord, TacticRecord, MalwareRecord, ToolRecord, ThreatGroupRecord,
+        MitigationRecord, DataSourceRecord, DataComponentRecord, CampaignRecord
+    )
+}
+
+
+class RelationshipColumns:
+    """
+    Relationships grouped into link batches, stored as parallel columns.
+
+    A batch is keyed by (relationship type, endpoints) as expected by
+    GraphRepository.link, where endpoints is (source label, source key,
+    target label, target key).
+    """
+
+    def __init__(self):
+        self._batches: Dict[Tuple[str, Tuple], Tuple[List[str], List[str]]] = {}
+        self._count = 0
+
+    def add(self, rel_type: str, endpoints: Tuple, source: str, target: str):
+        """
+        Add one relationship.
+
+        Args:
+            rel_type: Relationship type
+            endpoints: (source label, source key, target label, target key)
+            source: Key value of the source node
+            target: Key value of the target node
+        """
+        batch = self._batches.get((rel_type, endpoints))
+        if batch is None:
+            batch = self._batches[(rel_type, endpoints)] = ([], [])
+        batch[0].append(source)
+        batch[1].append(target)
+        self._count += 1
+
+    def extend(self, other: 'RelationshipColumns'):
+        """Add every relationship of another set."""
+        for (rel_type, endpoints), (sources, targets) in other._batches.items():
+            for source, target in zip(sources, targets):
+                self.add(rel_type, endpoints, source, target)
+
+    def batches(self) -> Iterator[Tuple[Tuple[str, Tuple], 'LinkRows']]:
+        """
+        Iterate over the link batches.
+
+        Yields:
+            tuple: ((relationship type, endpoints), link rows of the batch)
+        """
+        for key, (sources, targets) in self._batches.items():
+            yield key, LinkRows(sources, targets)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class NodeRows(Sequence):
+    """Repository rows of node records, each built when it is accessed."""
+
+    def __init__(self, records: List[NodeRecord]):
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [record.to_row() for record in self.records[index]]
+        return self.records[index].to_row()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for record in self.records:
+            yield record.to_row()
+
+
+class LinkRows(Sequence):
+    """Repository link rows ({'source', 'target'}) of one batch, each built when it is accessed."""
+
+    def __init__(self, sources: List[str], targets: List[str]):
+        self.sources = sources
+        self.targets = targets
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [
+                {'source': source, 'target': target}
+                for source, target in zip(self.sources[index], self.targets[index])
+            ]
+        return {'source': self.sources[index], 'target': self.targets[index]}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for source, target in zip(self.sources, self.targets):
+            yield {'source': source, 'target': target}
@@ -0,0 +1,400 @@
+"""
+Token-Budgeted Context Builder Module
+
+This module assembles the knowledge base context injected into chat prompts.
+Instead of a fixed number of results per object type with fixed description
+truncation, candidates from every searched type are scored against the
+question keywords, ranked together and packed greedily into a token budget.
+Strong matches get full descriptions, weak matches only get in if the budget
+has room left, and under "All Frameworks" a per-framework quota keeps a
+single framework from crowding out the others.
+
+Features:
+- Keyword search through the graph repository returning a relevance score per candidate
+- Cross-type ranking (identifier, name and description matches)
+- Greedy packing into a configurable token budget with per-framework quotas
+- Reporting of tokens used per framework
+- Tracing spans per retrieval, per search and for packing (see utils.tracing)
+
+Classes:
+    ContextCandidate: A knowledge base object that matched the keywords
+    ContextResult: Assembled context text and token accounting
+
+Functions:
+    build_context: Retrieve, rank and pack context for a question
+    retrieve_candidates: Scored keyword search over the requested object types
+    merge_candidates: Deduplicate candidates from several searches
+    pack_context: Rank candidates and pack them into the token budget
+    estimate_tokens: Approximate token count of a text
+"""
+
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.settings import (
+    CONTEXT_TOKEN_BUDGET, CONTEXT_FRAMEWORK_QUOTA, CONTEXT_CANDIDATES_PER_TYPE
+)
+from src.knowledge_base.repository import get_repository
+from src.utils import tracing
+
+# Framework to node type mapping
+FRAMEWORK_NODE_MAPPING = {
+    "ATT&CK Only": {
+        "techniques": "Technique",
+        "malware": "Malware",
+        "threat_groups": "ThreatGroup",
+        "tools": "Tool",
+        "mitigations": "Mitigation",
+        "data_sources": "DataSource",
+        "campaigns": "Campaign"
+    },
+    "CIS Controls": {
+        "cis_controls": "CIS_Control",
+        "cis_safeguards": "CIS_Safeguard"
+    },
+    "NIST CSF": {
+        "nist_functions": "NIST_Function",
+        "nist_categories": "NIST_Category",
+        "nist_subcategories": "NIST_Subcategory"
+    },
+    "HIPAA": {
+        "hipaa_regulations": "HIPAA_Regulation",
+        "hipaa_sections": "HIPAA_Section",
+        "hipaa_requirements": "HIPAA_Requirement"
+    },
+    "FFIEC": {
+        "ffiec_sections": "FFIEC_Section",
+        "ffiec_procedures": "FFIEC_Procedure",
+        "ffiec_examination_steps": "FFIEC_ExaminationStep"
+    },
+    "PCI DSS": {
+        "pci_requirements": "PCI_DSS_Requirement",
+        "pci_sub_requirements": "PCI_DSS_SubRequirement",
+        "pci_testing_procedures": "PCI_DSS_TestingProcedure"
+    }
+}
+
+# Heading icon per framework
+FRAMEWORK_ICONS = {
+    "ATT&CK Only": "🎯",
+    "CIS Controls": "🛡️",
+    "NIST CSF": "📋",
+    "HIPAA": "🏥",
+    "FFIEC": "🏦",
+    "PCI DSS": "💳"
+}
+
+# Additional properties rendered for some labels: (heading, property)
+EXTRA_FIELDS = {
+    "Technique": [("Tactics", "tactics"), ("Platforms", "platforms")],
+    "Malware": [("Type", "labels")],
+    "CIS_Control": [("Asset Type", "asset_type"), ("Security Function", "security_function")],
+    "CIS_Safeguard": [("Asset Type", "asset_type"), ("Security Function", "security_function"),
+                      ("Implementation Groups", "implementation_groups")],
+    "HIPAA_Regulation": [("Category", "category")],
+    "FFIEC_ExaminationStep": [("Risk Area", "risk_area"), ("Control Objective", "control_objective")],
+    "PCI_DSS_Requirement": [("Goal", "goal")],
+    "PCI_DSS_SubRequirement": [("Section", "section_title")]
+}
+
+# Relevance weight of a keyword matching each part of a node
+ID_MATCH_WEIGHT = 5.0
+NAME_MATCH_WEIGHT = 3.0
+DESCRIPTION_MATCH_WEIGHT = 1.0
+
+# Description length limits per entry, in tokens
+MAX_DESCRIPTION_TOKENS = 150
+MIN_DESCRIPTION_TOKENS = 20
+
+# Average characters per token for English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the number of tokens in a text.
+
+    Uses the ~4 characters per token ratio of English text, which is close
+    enough for budgeting without a model-specific tokenizer.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class ContextCandidate:
+    """
+    A knowledge base object matching the question keywords.
+
+    Attributes:
+        framework: Framework scope name (key of FRAMEWORK_NODE_MAPPING)
+        obj_type: Object type, e.g. 'techniques'
+        label: Node label
+        identifier: Framework identifier (technique ID, control ID, ...)
+        name: Name or title
+        description: Full description
+        extras: Additional properties from EXTRA_FIELDS
+        score: Relevance score, higher is better
+    """
+    framework: str
+    obj_type: str
+    label: str
+    identifier: Optional[str]
+    name: Optional[str]
+    description: str
+    extras: Dict[str, Any] = field(default_factory=dict)
+    score: float = 0.0
+
+    def heading(self) -> List[str]:
+        """Lines rendered before the description."""
+        icon = FRAMEWORK_ICONS.get(self.framework, "📋")
+        display_type = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', self.label).replace('_', ' ')
+        title = " - ".join(part for part in (self.identifier, self.name) if part) or "Unknown"
+        lines = [f"\n{icon} {display_type}: {title}"]
+        for heading, key in EXTRA_FIELDS.get(self.label, []):
+            value = self.extras.get(key)
+            if value:
+                lines.append(f"   {heading}: {', '.join(value) if isinstance(value, list) else value}")
+        return lines
+
+
+@dataclass
+class ContextResult:
+    """
+    Context assembled for a chat prompt.
+
+    Attributes:
+        text: Context injected into the prompt
+        tokens_used: Estimated tokens of the text
+        token_budget: Budget the text was packed into
+        candidates: Number of candidates retrieved
+        included: Number of candidates that fit the budget
+        framework_tokens: Estimated tokens used per framework
+    """
+    text: str
+    tokens_used: int
+    token_budget: int
+    candidates: int = 0
+    included: int = 0
+    framework_tokens: Dict[str, int] = field(default_factory=dict)
+
+
+def _scope_frameworks(framework_scope: str) -> List[str]:
+    """Frameworks searched for a framework scope."""
+    if framework_scope == "All Frameworks":
+        return list(FRAMEWORK_NODE_MAPPING)
+    return [framework_scope]
+
+
+def retrieve_candidates(graph, keywords: List[str], relevant_types: List[str],
+                        framework_scope: str = "All Frameworks",
+                        candidates_per_type: int = CONTEXT_CANDIDATES_PER_TYPE,
+                        should_stop: Optional[Callable[[], bool]] = None) -> List[ContextCandidate]:
+    """
+    Run one scored keyword search per requested (framework, object type).
+
+    Args:
+        graph: Neo4j database connection instance
+        keywords (list): Search keywords/terms
+        relevant_types (list): Object types to search
+        framework_scope (str): Framework scope, or "All Frameworks"
+        candidates_per_type: Candidates retrieved per object type
+        should_stop: Checked before each search; returning True abandons the
+            remaining searches (used to cancel speculative retrieval)
+
+    Returns:
+        list: ContextCandidate objects, unranked
+    """
+    with tracing.span('retrieve_candidates', framework_scope=framework_scope,
+                      keywords=len(keywords), relevant_types=len(relevant_types)) as span:
+        candidates = _retrieve_candidates(graph, keywords, relevant_types, framework_scope,
+                                          candidates_per_type, should_stop)
+        span.set(candidates=len(candidates))
+        return candidates
+
+
+def _retrieve_candidates(graph, keywords, relevant_types, framework_scope, candidates_per_type, should_stop):
+    """Body of retrieve_candidates, run inside its tracing span."""
+    repository = get_repository(graph)
+    keywords = [keyword.lower() for keyword in keywords if keyword]
+    weights = (ID_MATCH_WEIGHT, NAME_MATCH_WEIGHT, DESCRIPTION_MATCH_WEIGHT)
+    candidates = []
+    for framework in _scope_frameworks(framework_scope):
+        for obj_type in relevant_types:
+            label = FRAMEWORK_NODE_MAPPING.get(framework, {}).get(obj_type)
+            if not label:
+                continue
+            if should_stop and should_stop():
+                tracing.annotate(stopped=True)
+                return candidates
+            try:
+                with tracing.span('search_nodes', label=label) as span:
+                    records = repository.search_nodes(
+                        label, keywords, weights, candidates_per_type,
+                        extra_keys=[key for _, key in EXTRA_FIELDS.get(label, [])]
+                    )
+                    span.set(matches=len(records))
+            except Exception as e:
+                logging.warning(f"Context search for {label} failed: {e}")
+                continue
+            candidates.extend(
+                ContextCandidate(
+                    framework=framework,
+                    obj_type=obj_type,
+                    label=label,
+                    identifier=record['identifier'],
+                    name=record['name'],
+                    description=record['description'] or '',
+                    extras=record['extras'] or {},
+                    score=record['score']
+                )
+                for record in records
+            )
+    return candidates
+
+
+def merge_candidates(*candidate_lists: List[ContextCandidate]) -> List[ContextCandidate]:
+    """
+    Merge candidate lists from several searches.
+
+    A node found by more than one search is kept once with its best score.
+
+    Returns:
+        list: Deduplicated ContextCandidate objects
+    """
+    merged: Dict[tuple, ContextCandidate] = {}
+    for candidates in candidate_lists:
+        for candidate in candidates:
+            key = (candidate.label, candidate.identifier, candidate.name)
+            if key not in merged or candidate.score > merged[key].score:
+                merged[key] = candidate
+    return list(merged.values())
+
+
+def _trim_to_tokens(text: str, tokens: int) -> str:
+    """Cut text to roughly the given token count at a word boundary."""
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit - 3].rsplit(' ', 1)[0] + "..."
+
+
+def _pack(candidates: List[ContextCandidate], token_budget: int, framework_limit: int):
+    """
+    Pack the highest scoring candidates into the budget.
+
+    Returns:
+        tuple: ({framework: [entry lines]}, {framework: tokens}, included count)
+    """
+    sections: Dict[str, List[str]] = {}
+    framework_tokens: Dict[str, int] = {}
+    used = 0
+    included = 0
+
+    # Best first; among equal scores prefer shorter entries so more of them fit
+    for candidate in sorted(candidates, key=lambda c: (-c.score, len(c.description))):
+        header_cost = 0 if candidate.framework in sections else estimate_tokens(
+            f"\n=== {candidate.framework.upper()} FRAMEWORK ===\n"
+        )
+        available = min(
+            token_budget - used,
+            framework_limit - framework_tokens.get(candidate.framework, 0)
+        ) - header_cost
+
+        lines = candidate.heading()
+        cost = estimate_tokens("\n".join(lines) + "\n")
+        if cost > available:
+            continue
+
+        description_tokens = min(MAX_DESCRIPTION_TOKENS, available - cost)
+        if candidate.description and description_tokens >= MIN_DESCRIPTION_TOKENS:
+            line = f"   Description: {_trim_to_tokens(candidate.description, description_tokens)}"
+            line_cost = estimate_tokens(line + "\n")
+            if cost + line_cost <= available:
+                lines.append(line)
+                cost += line_cost
+
+        sections.setdefault(candidate.framework, []).extend(lines)
+        framework_tokens[candidate.framework] = framework_tokens.get(candidate.framework, 0) + cost + header_cost
+        used += cost + header_cost
+        included += 1
+
+    return sections, framework_tokens, included
+
+
+def pack_context(candidates: List[ContextCandidate], keywords: List[str],
+                 framework_scope: str = "All Frameworks",
+                 token_budget: int = CONTEXT_TOKEN_BUDGET,
+                 framework_quota: float = CONTEXT_FRAMEWORK_QUOTA) -> ContextResult:
+    """
+    Rank candidates and pack them into the token budget.
+
+    Args:
+        candidates (list): ContextCandidate objects from retrieve_candidates
+        keywords (list): Search keywords, named in the message when nothing matched
+        framework_scope (str): Framework scope, or "All Frameworks"
+        token_budget: Maximum estimated tokens of the context
+        framework_quota: Largest share of the budget one framework may use
+            when several frameworks are searched
+
+    Returns:
+        ContextResult: Context text with token accounting
+    """
+    frameworks = _scope_frameworks(framework_scope)
+    framework_limit = token_budget if len(frameworks) == 1 else int(token_budget * framework_quota)
+    with tracing.span('pack_context', candidates=len(candidates)) as span:
+        sections, framework_tokens, included = _pack(candidates, token_budget, framework_limit)
+        span.set(included=included, tokens=sum(framework_tokens.values()))
+
+    context = []
+    for framework in frameworks:
+        if framework in sections:
+            context.append(f"\n=== {framework.upper()} FRAMEWORK ===")
+            context.extend(sections[framework])
+
+    if context:
+        text = "\n".join(context)
+    else:
+        text = f"No relevant information found for '{', '.join(keywords)}' in {framework_scope}."
+
+    return ContextResult(
+        text=text,
+        tokens_used=estimate_tokens(text),
+        token_budget=token_budget,
+        candidates=len(candidates),
+        included=included,
+        framework_tokens=framework_tokens
+    )
+
+
+def build_context(graph, keywords: List[str], relevant_types: List[str],
+                  framework_scope: str = "All Frameworks",
+                  token_budget: int = CONTEXT_TOKEN_BUDGET,
+                  framework_quota: float = CONTEXT_FRAMEWORK_QUOTA,
+                  candidates_per_type: int = CONTEXT_CANDIDATES_PER_TYPE) -> ContextResult:
+    """
+    Retrieve, rank and pack knowledge base context for a question.
+
+    Args:
+        graph: Neo4j database connection instance
+        keywords (list): Search keywords/terms
+        relevant_types (list): Object types to search
+        framework_scope (str): Framework scope, or "All Frameworks"
+        token_budget: Maximum estimated tokens of the context
+        framework_quota: Largest share of the budget one framework may use
+            when several frameworks are searched
+        candidates_per_type: Candidates retrieved per object type before ranking
+
+    Returns:
+        ContextResult: Context text with token accounting
+    """
+    candidates = retrieve_candidates(graph, keywords, relevant_types, framework_scope, candidates_per_type)
+    return pack_context(candidates, keywords, framework_scope, token_budget, framework_quota)
@@ -20,10 +20,34 @@ Functions:
     create_graph_connection: Factory function for database connections
     clear_knowledge_base: Database cleanup utility
     clear_framework_data: Framework-specific data cleanup
+    bulk_upsert_nodes: Batched UNWIND MERGE of one node level
+    bulk_merge_relationships: Batched UNWIND MERGE of parent-child links
+    create_citation: Citation node linked to the nodes of a framework
+    link_to_mitigations: Links from framework nodes to ATT&CK mitigations
 """
 
+import logging
+import time
 from neo4j import GraphDatabase
-from src.config.settings import NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD
+from src.config.settings import (
+    NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, NEO4J_HEALTH_CHECK_SECONDS,
+    NEO4J_MAX_CONNECTION_POOL_SIZE, GRAPH_BACKEND, MEMORY_GRAPH_SNAPSHOT
+)
+from src.knowledge_base.query_profiler import create_profiler, plan_mode, query_shape, summarize_plan
+from src.knowledge_base.repository import BULK_BATCH_SIZE, get_repository
+from src.knowledge_base.statistics import invalidate_statistics_cache
+from src.utils import metrics, tracing
+
+QUERY_SECONDS = metrics.histogram(
+    'neo4j_query_seconds', "Cypher query wall time including retries, per query shape", ['shape']
+)
+QUERY_SHAPES = metrics.gauge(
+    'neo4j_query_shape_info', "Query shape ids seen (value is always 1); the query profiler lists their text", ['shape']
+)
+QUERY_ERRORS = metrics.counter('neo4j_query_errors_total', "Cypher queries failing after every retry", ['shape'])
+QUERY_RETRIES = metrics.counter('neo4j_query_retries_total', "Retried Cypher query attempts")
+SESSIONS_IN_USE = metrics.gauge('neo4j_sessions_in_use', "Driver sessions currently running a query")
+POOL_SIZE = metrics.gauge('neo4j_max_connection_pool_size', "Connections the Neo4j driver may open")
 
 
 class Neo4jConnection:
@@ -44,9 +68,10 @@ class Neo4jConnection:
     
     Attributes:
         driver: Neo4j driver instance for database communication
+        profiler: QueryProfiler recording every query, or None
     """
     
-    def __init__(self, uri, username, password):
+    def __init__(self, uri, username, password, profiler=None, max_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE):
         """
         Initialize Neo4j connection with authentication.
         
@@ -54,13 +79,45 @@ class Neo4jConnection:
             uri (str): Neo4j database URI
             username (str): Database username
             password (str): Database password
+            profiler (QueryProfiler, optional): Records executed queries (see query_profiler)
+            max_pool_size (int): Connections the driver may open
         """
-        self.driver = GraphDatabase.driver(uri, auth=(username, password))
+        self.driver = GraphDatabase.driver(uri, auth=(username, password), max_connection_pool_size=max_pool_size)
+        POOL_SIZE.set(max_pool_size)
+        self._last_healthy_at = 0.0
+        self.profiler = profiler
     
     def close(self):
         """Close the database connection and release resources."""
         if self.driver:
             self.driver.close()
+            self.driver = None
+    
+    def is_healthy(self, max_age=NEO4J_HEALTH_CHECK_SECONDS):
+        """
+        Check that the connection can still reach the database.
+        
+        A successful query or check within the last ``max_age`` seconds
+        counts as healthy, so long-lived shared connections are not probed
+        on every use.
+        
+        Args:
+            max_age (float): Seconds a previous successful round trip stays valid
+            
+        Returns:
+            bool: True if the database is reachable
+        """
+        if not self.driver:
+            return False
+        if time.monotonic() - self._last_healthy_at < max_age:
+            return True
+        
+        try:
+            self.driver.verify_connectivity()
+        except Exception:
+            return False
+        self._last_healthy_at = time.monotonic()
+        return True
     
     def query(self, query, params=None, max_retries=3):
         """
@@ -74,42 +131,110 @@ class Neo4jConnection:
         Returns:
             list: Query results as list of dictionaries
         """
-        import time
         last_exception = None
+        started_at = time.perf_counter()
         
         for attempt in range(max_retries + 1):
             try:
-                with self.driver.session() as session:
-                    result = session.run(query, params or {})
-                    return [record.data() for record in result]
+                SESSIONS_IN_USE.inc()
+                try:
+                    with self.driver.session() as session:
+                        result = session.run(query, params or {})
+                        records = [record.data() for record in result]
+                finally:
+                    SESSIONS_IN_USE.dec()
+                self._last_healthy_at = time.monotonic()
+                tracing.count('db.queries')
+                tracing.count('db.rows', len(records))
+                self._observe(query, time.perf_counter() - started_at)
+                if self.profiler:
+                    self._profile(query, params, time.perf_counter() - started_at, len(records), attempt)
+                return records
             except Exception as e:
                 last_exception = e
                 if attempt < max_retries:
+                    tracing.count('db.retries')
+                    QUERY_RETRIES.inc()
                     # Wait before retrying (exponential backoff)
                     wait_time = 2 ** attempt
                     time.sleep(wait_time)
                     continue
                 else:
+                    self._observe(query, time.perf_counter() - started_at, failed=True)
+                    if self.profiler:
+                        self.profiler.record(query, params, time.perf_counter() - started_at, 0, attempt, str(e))
                     # Re-raise the last exception if all retries failed
                     raise last_exception
+    
+    @staticmethod
+    def _observe(query, seconds, failed=False):
+        """Record a finished query in the per-shape latency metrics."""
+        _, shape_id = query_shape(query)
+        QUERY_SECONDS.observe(seconds, shape=shape_id)
+        QUERY_SHAPES.set(1, shape=shape_id)
+        if failed:
+            QUERY_ERRORS.inc(shape=shape_id)
+    
+    def _profile(self, query, params, seconds, rows, retries):
+        """
+        Record a successful query and capture its plan if it is among the slowest shapes.
+        
+        Read-only queries run again under PROFILE; writes are only planned
+        with EXPLAIN, never executed a second time.
+        """
+        entry = self.profiler.record(query, params, seconds, rows, retries)
+        if not self.profiler.wants_plan(entry):
+            return
+        mode = plan_mode(entry.shape)
+        try:
+            with self.driver.session() as session:
+                if mode == 'PROFILE':
+                    # A read transaction, so the server refuses a write the shape check missed
+                    summary = session.execute_read(
+                        lambda transaction: transaction.run(f"PROFILE {query}", params or {}).consume()
+                    )
+                    plan = summary.profile
+                else:
+                    plan = session.run(f"EXPLAIN {query}", params or {}).consume().plan
+            self.profiler.add_plan(entry, {'mode': mode, **summarize_plan(plan)})
+        except Exception as e:
+            logging.warning(f"Could not capture {mode} plan for query [{entry.shape_id}]: {e}")
 
 
 def create_graph_connection():
     """
-    Create and return a validated Neo4j graph connection.
+    Create and return a validated graph connection.
     
     Establishes connection to Neo4j database using configuration settings
     and performs connection validation. The connection supports operations
     for all cybersecurity frameworks in the knowledge base.
     
+    With GRAPH_BACKEND=memory an embedded InMemoryGraph is returned instead,
+    loaded from MEMORY_GRAPH_SNAPSHOT when that is set.
+    
     Returns:
-        Neo4jConnection: Validated database connection instance
+        Neo4jConnection or InMemoryGraph: Validated database connection instance
         
     Raises:
         ConnectionError: If database connection fails
     """
+    if GRAPH_BACKEND == 'memory':
+        from src.knowledge_base.memory_graph import InMemoryGraph
+        
+        connection = InMemoryGraph()
+        if MEMORY_GRAPH_SNAPSHOT:
+            try:
+                counts = connection.load_snapshot(MEMORY_GRAPH_SNAPSHOT)
+            except Exception as e:
+                raise ConnectionError(f"Failed to load snapshot {MEMORY_GRAPH_SNAPSHOT}: {e}")
+            logging.info(
+                f"Loaded {counts['nodes']:,} nodes and {counts['relationships']:,} relationships "
+                f"into the in-memory graph"
+            )
+        return connection
+    
     try:
-        connection = Neo4jConnection(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)
+        connection = Neo4jConnection(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, create_profiler())
         
         # Validate connection with simple test query
         connection.query("RETURN 1 as test")
@@ -143,7 +268,8 @@ def clear_knowledge_base(graph):
         Exception: If database cleanup fails
     """
     try:
-        graph.query("MATCH (n) DETACH DELETE n")
+        get_repository(graph).clear()
+        invalidate_statistics_cache()
         return True
     except Exception as e:
         raise Exception(f"Could not clear existing data: {e}")
@@ -214,3 +340,126 @@ def clear_framework_data(graph, framework_name):
             
     except Exception as e:
         raise Exception(f"Could not clear {framework_name} framework data: {e}")
+
+
+def bulk_upsert_nodes(graph, label, rows, batch_size=BULK_BATCH_SIZE):
+    """
+    Create or update one level of a framework hierarchy in batches.
+    
+    Each batch is written with a single UNWIND ... MERGE statement instead
+    of one round trip per node. Rows use the flattened hierarchy format
+    shared with bulk_merge_relationships:
+    
+        {'parent_id': 'CIS-1', 'id': '1.1', 'properties': {...}}
+    
+    Only 'id' and 'properties' are used here. Properties are applied with
+    SET n += properties and every node gets a fresh ingested_at timestamp.
+    
+    Args:
+        graph (Neo4jConnection): Database connection instance
+        label (str): Node label for this level, e.g. 'CIS_Safeguard'
+        rows (list): Flattened hierarchy rows
+        batch_size (int): Rows per UNWIND statement
+        
+    Returns:
+        int: Number of rows written
+    """
+    rows = [{**row.get('properties', {}), 'id': row['id']} for row in rows if row.get('id')]
+    return get_repository(graph).upsert_nodes(
+        label, 'id', rows, timestamp_property='ingested_at', batch_size=batch_size
+    )
+
+
+def bulk_merge_relationships(graph, parent_label, relationship, child_label, rows, batch_size=BULK_BATCH_SIZE):
+    """
+    Link one level of a framework hierarchy to its parents in batches.
+    
+    Uses the same flattened rows as bulk_upsert_nodes; rows without a
+    parent_id are skipped. Relationship properties may be supplied under
+    'relationship_properties'.
+    
+    Args:
+        graph (Neo4jConnection): Database connection instance
+        parent_label (str): Label of the parent level, e.g. 'CIS_Control'
+        relationship (str): Relationship type, e.g. 'HAS_SAFEGUARD'
+        child_label (str): Label of the child level, e.g. 'CIS_Safeguard'
+        rows (list): Flattened hierarchy rows
+        batch_size (int): Rows per UNWIND statement
+        
+    Returns:
+        int: Number of parent-child pairs submitted
+    """
+    rows = [
+        {'source': row['parent_id'], 'target': row['id'], 'properties': row.get('relationship_properties', {})}
+        for row in rows if row.get('parent_id') and row.get('id')
+    ]
+    return get_repository(graph).link(
+        relationship, rows, parent_label, 'id', child_label, 'id', batch_size=batch_size
+    )
+
+
+def create_citation(graph, reference_name, properties, labels, copied_properties=None):
+    """
+    Record the source document of a framework and link it to the framework's nodes.
+    
+    The Citation node is merged on reference_name and stamped with
+    ingested_at; every node carrying one of ``labels`` gets a HAS_CITATION
+    relationship to it.
+    
+    Args:
+        graph (Neo4jConnection): Database connection instance
+        reference_name (str): Unique citation name
+        properties (dict): Citation properties, e.g. citation_text, url
+        labels (list): Labels of the nodes to link, e.g. ['CIS_Control', 'CIS_Safeguard']
+        copied_properties (dict, optional): Relationship property -> node property
+            copied onto each HAS_CITATION relationship, e.g. {'page_start': 'page_start'}
+        
+    Returns:
+        int: Number of nodes linked
+    """
+    copied_properties = copied_properties or {}
+    repository = get_repository(graph)
+    repository.upsert_nodes(
+        'Citation', 'reference_name', [{**properties, 'reference_name': reference_name}],
+        timestamp_property='ingested_at'
+    )
+    
+    linked = 0
+    for label in labels:
+        rows = [
+            {
+                'source': node['id'],
+                'target': reference_name,
+                'properties': {
+                    rel_key: node[node_key] for rel_key, node_key in copied_properties.items()
+                    if node[node_key] is not None
+                }
+            }
+            for node in repository.nodes(label, ['id', *copied_properties.values()])
+            if node['id'] is not None
+        ]
+        linked += repository.link('HAS_CITATION', rows, label, 'id', 'Citation', 'reference_name')
+    return linked
+
+
+def link_to_mitigations(graph, source_label, relationship, source_ids, mitigation_prefixes):
+    """
+    Link framework nodes to the ATT&CK mitigations whose id starts with one of the prefixes.
+    
+    Args:
+        graph (Neo4jConnection): Database connection instance
+        source_label (str): Label of the framework nodes, e.g. 'CIS_Safeguard'
+        relationship (str): Relationship type, e.g. 'IMPLEMENTS'
+        source_ids (list): Ids of the framework nodes to link
+        mitigation_prefixes (tuple): Mitigation id prefixes, e.g. ('M1013', 'M1016')
+        
+    Returns:
+        int: Number of links submitted
+    """
+    repository = get_repository(graph)
+    mitigation_ids = [
+        node['id'] for node in repository.nodes('Mitigation', ['id'])
+        if node['id'] and node['id'].startswith(tuple(mitigation_prefixes))
+    ]
+    rows = [{'source': source_id, 'target': mitigation_id} for source_id in source_ids for mitigation_id in mitigation_ids]
+    return repository.link(relationship, rows, source_label, 'id', 'Mitigation', 'id')
@@ -0,0 +1,248 @@
+"""
+Knowledge Base Ingestion Manifest Module
+
+This module records which frameworks have been ingested into the Neo4j
+knowledge base, from which source and when. Initialization reads the manifest
+to resume only the frameworks that are missing or stale instead of
+rebuilding the whole graph after a partial failure.
+
+Each framework has one IngestionManifest node in the graph holding:
+- framework: Framework key ('attack', 'cis', 'nist', 'hipaa', 'ffiec', 'pci_dss')
+- source_hash: SHA-256 of the source document (or of the ATT&CK source URLs)
+- version: Framework version ingested
+- schema_version: Ingestion output version, bumped when node layout changes
+  (0 for frameworks found in a graph built before manifests existed)
+- node_counts: JSON object of node counts per label
+- completed_at: Completion time of the ingestion
+
+Functions:
+    file_sha256: Hash a source document
+    text_sha256: Hash a source descriptor such as a URL list
+    read_manifest: Load all manifest entries
+    delete_framework_nodes: Remove a framework's nodes before it is loaded again
+    record_framework_ingestion: Write the manifest entry after a successful load
+    find_stale_frameworks: Compare the manifest with the current sources
+    find_missing_sources: Frameworks whose source document is absent
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.knowledge_base.repository import get_repository
+from src.utils import metrics
+
+FRAMEWORK_NODES = metrics.gauge('ingestion_framework_nodes', "Nodes recorded in a framework's manifest", ['framework'])
+LAST_SUCCESS = metrics.gauge(
+    'ingestion_last_success_timestamp_seconds', "Time a framework last finished ingesting", ['framework']
+)
+
+# Bump when an ingester changes the nodes it writes so existing graphs are rebuilt
+MANIFEST_SCHEMA_VERSION = 2  # 2: HIPAA requirements nest under their parent paragraph
+
+# Schema version recorded for frameworks adopted from a graph built before manifests
+PRE_MANIFEST_SCHEMA_VERSION = 0
+
+# Labels owned by each framework, used for node counts
+FRAMEWORK_MANIFEST_SPECS = {
+    'attack': {
+        'name': 'ATT&CK',
+        'version': 'MITRE ATT&CK (mitre/cti master)',
+        'labels': ['Technique', 'Malware', 'ThreatGroup', 'Tool', 'Mitigation', 'Tactic',
+                   'DataSource', 'DataComponent', 'Campaign']
+    },
+    'cis': {
+        'name': 'CIS',
+        'version': 'CIS Controls v8.1',
+        'labels': ['CIS_Control', 'CIS_Safeguard']
+    },
+    'nist': {
+        'name': 'NIST',
+        'version': 'NIST CSF 2.0',
+        'labels': ['NIST_Function', 'NIST_Category', 'NIST_Subcategory']
+    },
+    'hipaa': {
+        'name': 'HIPAA',
+        'version': 'HIPAA Administrative Simplification (March 2013)',
+        'labels': ['HIPAA_Regulation', 'HIPAA_Section', 'HIPAA_Requirement']
+    },
+    'ffiec': {
+        'name': 'FFIEC',
+        'version': 'FFIEC IT Handbook Information Security (2016)',
+        'labels': ['FFIEC_Section', 'FFIEC_Procedure', 'FFIEC_ExaminationStep']
+    },
+    'pci_dss': {
+        'name': 'PCI DSS',
+        'version': 'PCI DSS v4.0.1',
+        'labels': ['PCI_DSS_Requirement', 'PCI_DSS_SubRequirement', 'PCI_DSS_TestingProcedure']
+    }
+}
+
+
+def file_sha256(path: str) -> Optional[str]:
+    """
+    Hash a source document.
+
+    Args:
+        path: Path to the document
+
+    Returns:
+        Hex digest, or None if the file does not exist
+    """
+    if not os.path.exists(path):
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_sha256(text: str) -> str:
+    """Hash a source descriptor such as the list of ATT&CK bundle URLs."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def read_manifest(graph) -> Dict[str, Dict]:
+    """
+    Load all manifest entries from the graph.
+
+    Args:
+        graph: Neo4j database connection instance
+
+    Returns:
+        Dictionary mapping framework key to its manifest entry
+    """
+    records = get_repository(graph).nodes(
+        'IngestionManifest', ['framework', 'source_hash', 'version', 'schema_version', 'node_counts', 'completed_at']
+    )
+
+    manifest = {}
+    for record in records:
+        entry = dict(record)
+        completed_at = entry['completed_at']
+        if completed_at is not None:
+            # Neo4j DateTime prints as ISO 8601; the in-memory graph stores Python datetimes
+            entry['completed_at'] = completed_at.isoformat() if isinstance(completed_at, datetime) else str(completed_at)
+        try:
+            entry['node_counts'] = json.loads(entry['node_counts'] or '{}')
+        except (TypeError, ValueError):
+            entry['node_counts'] = {}
+        manifest[entry['framework']] = entry
+    return manifest
+
+
+def count_framework_nodes(graph, framework: str) -> Dict[str, int]:
+    """Count the nodes of each label owned by a framework."""
+    labels = FRAMEWORK_MANIFEST_SPECS[framework]['labels']
+    return get_repository(graph).label_counts(labels)
+
+
+def delete_framework_nodes(graph, framework: str) -> int:
+    """
+    Delete the nodes of every label owned by a framework, with their relationships.
+
+    A stale framework is removed this way before it is loaded again, so
+    nodes whose ids no longer appear in its source do not linger.
+
+    Args:
+        graph: Neo4j database connection instance
+        framework: Framework key
+
+    Returns:
+        Number of nodes deleted
+    """
+    deleted = get_repository(graph).delete_nodes(FRAMEWORK_MANIFEST_SPECS[framework]['labels'])
+    if deleted:
+        logging.info(f"Deleted {deleted:,} existing {framework} nodes before reloading")
+    return deleted
+
+
+def record_framework_ingestion(graph, framework: str, source_hash: Optional[str],
+                               schema_version: int = MANIFEST_SCHEMA_VERSION) -> Dict[str, int]:
+    """
+    Write the manifest entry for a framework that finished loading.
+
+    Args:
+        graph: Neo4j database connection instance
+        framework: Framework key
+        source_hash: Hash of the source the framework was ingested from
+        schema_version: Ingestion output version of the framework's nodes
+
+    Returns:
+        Node counts per label recorded in the manifest
+    """
+    node_counts = count_framework_nodes(graph, framework)
+    get_repository(graph).upsert_nodes('IngestionManifest', 'framework', [{
+        'framework': framework,
+        'source_hash': source_hash,
+        'version': FRAMEWORK_MANIFEST_SPECS[framework]['version'],
+        'schema_version': schema_version,
+        'node_counts': json.dumps(node_counts)
+    }], timestamp_property='completed_at')
+    logging.info(f"Recorded ingestion manifest for {framework}: {node_counts}")
+    FRAMEWORK_NODES.set(sum(node_counts.values()), framework=framework)
+    LAST_SUCCESS.set(time.time(), framework=framework)
+    return node_counts
+
+
+def find_stale_frameworks(manifest: Dict[str, Dict], source_hashes: Dict[str, Optional[str]],
+                          frameworks: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Determine which frameworks need to be (re-)ingested.
+
+    A framework is stale when it has no manifest entry, was ingested from a
+    different source or by an older schema version, or recorded no nodes.
+    Frameworks whose source document is absent (no current source hash) are
+    never stale: ingesting them would fail on every start. Their nodes, if
+    any, are kept until the document is added back.
+
+    Args:
+        manifest: Entries returned by read_manifest
+        source_hashes: Current source hash per framework key, None for an absent document
+        frameworks: Framework keys to check (defaults to all)
+
+    Returns:
+        Dictionary mapping each stale framework key to the reason
+    """
+    stale = {}
+    for framework in frameworks or list(FRAMEWORK_MANIFEST_SPECS):
+        if source_hashes.get(framework) is None:
+            continue
+        entry = manifest.get(framework)
+        if entry is None:
+            stale[framework] = 'not ingested'
+        elif entry.get('schema_version') == PRE_MANIFEST_SCHEMA_VERSION:
+            stale[framework] = 'built before ingestion manifests'
+        elif entry.get('schema_version') != MANIFEST_SCHEMA_VERSION:
+            stale[framework] = 'ingestion schema changed'
+        elif entry.get('version') != FRAMEWORK_MANIFEST_SPECS[framework]['version']:
+            stale[framework] = 'framework version changed'
+        elif source_hashes.get(framework) != entry.get('source_hash'):
+            stale[framework] = 'source changed'
+        elif not sum(entry.get('node_counts', {}).values()):
+            stale[framework] = 'no nodes recorded'
+    return stale
+
+
+def find_missing_sources(source_hashes: Dict[str, Optional[str]],
+                         frameworks: Optional[List[str]] = None) -> List[str]:
+    """
+    Determine which frameworks have no source document to ingest from.
+
+    Args:
+        source_hashes: Current source hash per framework key, None for an absent document
+        frameworks: Framework keys to check (defaults to all)
+
+    Returns:
+        Framework keys skipped by find_stale_frameworks
+    """
+    return [
+        framework for framework in frameworks or list(FRAMEWORK_MANIFEST_SPECS)
+        if source_hashes.get(framework) is None
+    ]
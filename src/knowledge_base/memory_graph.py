@@ -0,0 +1,426 @@
+"""
+In-Memory Graph Backend Module
+
+This module provides an embedded graph store implementing the GraphRepository
+operations, so ingestion, statistics, technique profiles and chat context
+retrieval run without a Neo4j server. Nodes are kept in a dictionary with a
+per-label index and lazily built property indexes; relationships are kept in
+outgoing and incoming adjacency lists.
+
+Use it as a local development backend (GRAPH_BACKEND=memory, optionally
+loading a snapshot file at startup) and as the reproducible baseline for
+benchmarks. Raw Cypher is not interpreted; every knowledge base feature
+goes through the GraphRepository operations instead.
+
+Features:
+- Dict-of-label indexes and on-demand property indexes
+- Adjacency lists per relationship type for both directions
+- Thread-safe reads and writes
+- Loading of knowledge base snapshot files (see snapshot)
+
+Classes:
+    Node: Stored node
+    Relationship: Stored relationship
+    InMemoryGraph: GraphRepository implementation and connection stand-in
+"""
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.knowledge_base.repository import (
+    BULK_BATCH_SIZE, SEARCH_IDENTIFIER_KEYS, SEARCH_NAME_KEYS, GraphRepository
+)
+
+
+@dataclass
+class Node:
+    """
+    A stored node.
+
+    Attributes:
+        node_id: Internal identifier
+        labels: Node labels
+        properties: Property values
+    """
+    node_id: int
+    labels: Set[str]
+    properties: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Relationship:
+    """
+    A stored relationship.
+
+    Attributes:
+        rel_type: Relationship type
+        source: Internal identifier of the start node
+        target: Internal identifier of the end node
+        properties: Property values
+    """
+    rel_type: str
+    source: int
+    target: int
+    properties: Dict[str, Any] = field(default_factory=dict)
+
+
+def _coalesce(properties: Dict[str, Any], keys: Sequence[str]) -> Any:
+    """First non-null property among ``keys``, like Cypher coalesce()."""
+    for key in keys:
+        value = properties.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _project(properties: Dict[str, Any], keys: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Copy of the properties, limited to ``keys`` (missing keys map to None) when given."""
+    if keys is None:
+        return dict(properties)
+    return {key: properties.get(key) for key in keys}
+
+
+class InMemoryGraph(GraphRepository):
+    """
+    Embedded graph store implementing GraphRepository.
+
+    Also provides the parts of the Neo4jConnection interface the application
+    relies on (close, is_healthy), so it can be passed wherever a graph
+    connection is expected.
+    """
+
+    def __init__(self):
+        """Initialize an empty graph."""
+        self._nodes: Dict[int, Node] = {}
+        self._by_label: Dict[str, Set[int]] = defaultdict(set)
+        # (label or None, key) -> value -> node ids; built on first lookup, then maintained
+        self._indexes: Dict[Tuple[Optional[str], str], Dict[Hashable, Set[int]]] = {}
+        self._outgoing: Dict[int, Dict[str, List[Relationship]]] = defaultdict(lambda: defaultdict(list))
+        self._incoming: Dict[int, Dict[str, List[Relationship]]] = defaultdict(lambda: defaultdict(list))
+        self._by_type: Dict[str, List[Relationship]] = defaultdict(list)
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+    # --- Connection interface ---
+
+    def query(self, query, params=None, max_retries=3):
+        """Raw Cypher is not supported by the in-memory backend."""
+        raise NotImplementedError(
+            "The in-memory graph does not execute Cypher; this feature requires the Neo4j backend"
+        )
+
+    def close(self):
+        """Nothing to release; kept for interface compatibility."""
+
+    def is_healthy(self, max_age=None):
+        """The in-memory graph is always reachable."""
+        return True
+
+    # --- Index maintenance ---
+
+    @staticmethod
+    def _hashable(value: Any) -> bool:
+        return isinstance(value, Hashable)
+
+    def _index(self, label: Optional[str], key: str) -> Dict[Hashable, Set[int]]:
+        """Property index for (label, key), built from the current nodes on first use."""
+        index = self._indexes.get((label, key))
+        if index is None:
+            index = defaultdict(set)
+            node_ids = self._by_label.get(label, set()) if label else self._nodes.keys()
+            for node_id in node_ids:
+                value = self._nodes[node_id].properties.get(key)
+                if value is not None and self._hashable(value):
+                    index[value].add(node_id)
+            self._indexes[(label, key)] = index
+        return index
+
+    def _reindex(self, node: Node, old_properties: Dict[str, Any]):
+        """Update property indexes after a node was created or changed."""
+        for (label, key), index in self._indexes.items():
+            if label is not None and label not in node.labels:
+                continue
+            old_value = old_properties.get(key)
+            new_value = node.properties.get(key)
+            if old_value == new_value and old_properties:
+                continue
+            if old_value is not None and self._hashable(old_value):
+                index[old_value].discard(node.node_id)
+            if new_value is not None and self._hashable(new_value):
+                index[new_value].add(node.node_id)
+
+    def _find(self, label: Optional[str], key: str, value: Any) -> List[Node]:
+        if value is None or not self._hashable(value):
+            return []
+        return [self._nodes[node_id] for node_id in self._index(label, key).get(value, ())]
+
+    def _add_node(self, labels: Iterable[str], properties: Dict[str, Any]) -> Node:
+        node = Node(self._next_id, set(labels), dict(properties))
+        self._next_id += 1
+        self._nodes[node.node_id] = node
+        for label in node.labels:
+            self._by_label[label].add(node.node_id)
+        self._reindex(node, {})
+        return node
+
+    def _set_properties(self, node: Node, properties: Dict[str, Any]):
+        old_properties = dict(node.properties)
+        node.properties.update(properties)
+        self._reindex(node, old_properties)
+
+    def _add_relationship(self, rel_type: str, source: Node, target: Node,
+                          properties: Dict[str, Any], merge: bool):
+        if merge:
+            for existing in self._outgoing[source.node_id].get(rel_type, ()):
+                if existing.target == target.node_id:
+                    existing.properties.update(properties)
+                    return
+        relationship = Relationship(rel_type, source.node_id, target.node_id, dict(properties))
+        self._outgoing[source.node_id][rel_type].append(relationship)
+        self._incoming[target.node_id][rel_type].append(relationship)
+        self._by_type[rel_type].append(relationship)
+
+    # --- Writes ---
+
+    def clear(self):
+        with self._lock:
+            self._nodes.clear()
+            self._by_label.clear()
+            self._indexes.clear()
+            self._outgoing.clear()
+            self._incoming.clear()
+            self._by_type.clear()
+
+    def ensure_unique(self, label, key, name=None):
+        with self._lock:
+            self._index(label, key)
+
+    def ensure_index(self, label, key, name=None):
+        with self._lock:
+            self._index(label, key)
+
+    def create_nodes(self, label, rows, batch_size=BULK_BATCH_SIZE):
+        with self._lock:
+            for row in rows:
+                self._add_node([label], row)
+        return len(rows)
+
+    def upsert_nodes(self, label, key, rows, timestamp_property=None, batch_size=BULK_BATCH_SIZE):
+        with self._lock:
+            for row in rows:
+                properties = dict(row)
+                if timestamp_property:
+                    properties[timestamp_property] = datetime.now(timezone.utc)
+                existing = self._find(label, key, row[key])
+                if existing:
+                    for node in existing:
+                        self._set_properties(node, properties)
+                else:
+                    self._add_node([label], properties)
+        return len(rows)
+
+    def update_nodes(self, label, key, rows, batch_size=BULK_BATCH_SIZE):
+        with self._lock:
+            for row in rows:
+                for node in self._find(label, key, row[key]):
+                    self._set_properties(node, row)
+        return len(rows)
+
+    def link(self, rel_type, rows, source_label, source_key, target_label, target_key,
+             merge=True, batch_size=BULK_BATCH_SIZE):
+        with self._lock:
+            for row in rows:
+                sources = self._find(source_label, source_key, row['source'])
+                targets = self._find(target_label, target_key, row['target'])
+                for source in sources:
+                    for target in targets:
+                        self._add_relationship(rel_type, source, target, row.get('properties') or {}, merge)
+        return len(rows)
+
+    def delete_nodes(self, labels):
+        with self._lock:
+            doomed = set()
+            for label in labels:
+                doomed |= self._by_label.get(label, set())
+            if not doomed:
+                return 0
+
+            for node_id in doomed:
+                node = self._nodes.pop(node_id)
+                for label in node.labels:
+                    self._by_label[label].discard(node_id)
+                for (label, key), index in self._indexes.items():
+                    value = node.properties.get(key)
+                    if value is not None and self._hashable(value):
+                        index[value].discard(node_id)
+
+            # Relationships touching a deleted node go from both adjacency lists and the type lists
+            def kept(relationship):
+                return relationship.source not in doomed and relationship.target not in doomed
+
+            for adjacency in (self._outgoing, self._incoming):
+                for node_id in doomed:
+                    adjacency.pop(node_id, None)
+                for by_type in adjacency.values():
+                    for rel_type, relationships in by_type.items():
+                        by_type[rel_type] = [relationship for relationship in relationships if kept(relationship)]
+            for rel_type, relationships in self._by_type.items():
+                self._by_type[rel_type] = [relationship for relationship in relationships if kept(relationship)]
+            return len(doomed)
+
+    # --- Reads ---
+
+    def get_node(self, label, key, value):
+        with self._lock:
+            nodes = self._find(label, key, value)
+            return dict(nodes[0].properties) if nodes else None
+
+    def nodes(self, label, keys=None):
+        with self._lock:
+            return [_project(self._nodes[node_id].properties, keys) for node_id in self._by_label.get(label, ())]
+
+    def relationships(self, rel_type, source_label=None, target_label=None, source_keys=None, target_keys=None):
+        with self._lock:
+            pairs = []
+            for relationship in self._by_type.get(rel_type, ()):
+                source = self._nodes[relationship.source]
+                target = self._nodes[relationship.target]
+                if source_label and source_label not in source.labels:
+                    continue
+                if target_label and target_label not in target.labels:
+                    continue
+                pairs.append((_project(source.properties, source_keys), _project(target.properties, target_keys)))
+            return pairs
+
+    def neighbors(self, label, key, value, rel_type=None, direction='out', neighbor_label=None, keys=None):
+        if direction not in ('out', 'in'):
+            raise ValueError(f"Invalid direction: {direction!r}")
+        adjacency = self._outgoing if direction == 'out' else self._incoming
+        with self._lock:
+            related = []
+            for node in self._find(label, key, value):
+                by_type = adjacency.get(node.node_id, {})
+                types = [rel_type] if rel_type else list(by_type)
+                for relationship_type in types:
+                    for relationship in by_type.get(relationship_type, ()):
+                        other = self._nodes[relationship.target if direction == 'out' else relationship.source]
+                        if neighbor_label and neighbor_label not in other.labels:
+                            continue
+                        related.append((relationship_type, _project(other.properties, keys)))
+            return related
+
+    def find_nodes_containing(self, label, terms, properties, list_properties=(), keys=None,
+                              ignore_case=True, limit=None):
+        terms = [term.lower() for term in terms] if ignore_case else list(terms)
+        with self._lock:
+            matches = []
+            node_ids = self._by_label.get(label, ()) if label else self._nodes.keys()
+            for node_id in node_ids:
+                if limit is not None and len(matches) >= limit:
+                    break
+                node = self._nodes[node_id]
+                texts = [node.properties.get(key) for key in properties]
+                for key in list_properties:
+                    values = node.properties.get(key)
+                    if isinstance(values, (list, tuple)):
+                        texts.extend(values)
+                texts = [text.lower() if ignore_case else text for text in texts if isinstance(text, str)]
+                if any(term in text for term in terms for text in texts):
+                    matches.append((sorted(node.labels), _project(node.properties, keys)))
+            return matches
+
+    def dump_nodes(self):
+        with self._lock:
+            return [
+                (str(node.node_id), sorted(node.labels), dict(node.properties))
+                for node in self._nodes.values()
+            ]
+
+    def dump_relationships(self):
+        with self._lock:
+            return [
+                (str(relationship.source), str(relationship.target), rel_type, dict(relationship.properties))
+                for rel_type, relationships in self._by_type.items()
+                for relationship in relationships
+            ]
+
+    def label_counts(self, labels):
+        with self._lock:
+            return {label: len(self._by_label.get(label, ())) for label in labels}
+
+    def count_nodes(self):
+        with self._lock:
+            return len(self._nodes)
+
+    def count_relationships(self):
+        with self._lock:
+            return sum(len(relationships) for relationships in self._by_type.values())
+
+    def search_nodes(self, label, keywords, weights, limit, extra_keys=()):
+        id_weight, name_weight, description_weight = weights
+        with self._lock:
+            matches = []
+            for node_id in self._by_label.get(label, ()):
+                properties = self._nodes[node_id].properties
+                identifier = _coalesce(properties, SEARCH_IDENTIFIER_KEYS)
+                name = _coalesce(properties, SEARCH_NAME_KEYS)
+                description = properties.get('description') or ''
+                identifier_text = str(identifier or '').lower()
+                name_text = str(name or '').lower()
+                description_text = str(description).lower()
+
+                score = 0.0
+                for keyword in keywords:
+                    if identifier_text == keyword:
+                        score += id_weight
+                    if keyword in name_text:
+                        score += name_weight
+                    if keyword in description_text:
+                        score += description_weight
+                if score > 0:
+                    matches.append({
+                        'identifier': identifier,
+                        'name': name,
+                        'description': description,
+                        'extras': _project(properties, extra_keys) if extra_keys else {},
+                        'score': score
+                    })
+
+        matches.sort(key=lambda match: match['score'], reverse=True)
+        return matches[:limit]
+
+    # --- Snapshots ---
+
+    def load_snapshot(self, path: str) -> Dict[str, int]:
+        """
+        Load a knowledge base snapshot written by snapshot.export_snapshot.
+
+        Temporal properties stay ISO strings.
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            dict: Number of nodes and relationships loaded
+        """
+        from src.knowledge_base.snapshot import iter_snapshot_chunks
+
+        counts = {'nodes': 0, 'relationships': 0}
+        snapshot_ids: Dict[str, Node] = {}
+        with self._lock:
+            for chunk in iter_snapshot_chunks(path):
+                if chunk['kind'] == 'nodes':
+                    for row in chunk['rows']:
+                        snapshot_ids[row['sid']] = self._add_node(chunk['labels'], row['properties'])
+                    counts['nodes'] += len(chunk['rows'])
+                elif chunk['kind'] == 'relationships':
+                    for row in chunk['rows']:
+                        source = snapshot_ids.get(row['source'])
+                        target = snapshot_ids.get(row['target'])
+                        if source and target:
+                            self._add_relationship(chunk['type'], source, target, row['properties'], merge=False)
+                            counts['relationships'] += 1
+        return counts
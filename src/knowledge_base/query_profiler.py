@@ -0,0 +1,322 @@
+"""
+Cypher Query Profiler Module
+
+This module records the queries a Neo4jConnection executes when profiling is
+enabled (NEO4J_PROFILE_QUERIES): the query shape with literals normalized
+away, parameter size, wall time, rows returned and retries. Recent queries
+are kept in a ring buffer and aggregated per shape, queries slower than a
+threshold are logged, and the execution plan of the slowest shapes can be
+captured with PROFILE (db hits and rows per operator) to show full scans and
+other expensive patterns without ad-hoc debugging.
+
+PROFILE runs the query a second time, so only read-only shapes are
+profiled. Write shapes (CREATE, MERGE, SET, DELETE, REMOVE, ...) get their
+EXPLAIN plan instead, which is planned but not executed: re-running a
+DETACH DELETE or an UNWIND MERGE batch would repeat its full cost and hold
+its locks even when rolled back. Schema commands are never planned.
+
+Features:
+- Literal normalization into stable query shapes
+- Bounded ring buffer of recent queries and per-shape aggregates
+- Slow query log
+- PROFILE (reads) or EXPLAIN (writes) plan capture for the slowest shapes
+
+Classes:
+    QueryRecord: One executed query
+    QueryProfiler: Ring buffer, aggregates and plan selection
+
+Functions:
+    normalize_query: Query text with literals replaced by '?'
+    query_shape: Normalized query and its short hash
+    plan_mode: Whether a shape is planned with PROFILE, EXPLAIN or not at all
+    summarize_plan: Flatten a PROFILE or EXPLAIN plan into per-operator rows
+    create_profiler: Profiler configured from the settings, or None
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.config.settings import (
+    NEO4J_PROFILE_QUERIES, NEO4J_PROFILE_BUFFER, NEO4J_SLOW_QUERY_MS, NEO4J_PROFILE_PLANS
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$`.])-?\d+(?:\.\d+)?(?![\w`])")
+_LIST_OF_PLACEHOLDERS = re.compile(r"\[\s*\?(?:\s*,\s*\?)*\s*\]")
+_COMMENT = re.compile(r"//[^\n]*")
+_WHITESPACE = re.compile(r"\s+")
+
+# Statements that cannot be planned at all
+_UNPLANNABLE = re.compile(r"^\s*(?:PROFILE|EXPLAIN|CREATE\s+(?:CONSTRAINT|INDEX)|DROP|SHOW)\b", re.IGNORECASE)
+# Clauses that write; a shape containing one is never executed a second time
+_WRITE_CLAUSE = re.compile(r"\b(?:CREATE|MERGE|SET|DELETE|REMOVE|FOREACH|LOAD\s+CSV)\b", re.IGNORECASE)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Reduce a query to its shape.
+
+    String and number literals become '?', literal lists of them a single
+    '[?]', comments are dropped and whitespace is collapsed. Parameters,
+    labels and property names are kept.
+
+    Args:
+        query: Cypher text
+
+    Returns:
+        str: Normalized query text
+    """
+    text = _COMMENT.sub(" ", query)
+    text = _STRING_LITERAL.sub("?", text)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _LIST_OF_PLACEHOLDERS.sub("[?]", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+@lru_cache(maxsize=4096)
+def query_shape(query: str) -> tuple:
+    """
+    Shape of a query and its identifier, memoized per distinct query text.
+
+    Args:
+        query: Cypher text
+
+    Returns:
+        tuple: (normalized query, 12 hex digit hash of it)
+    """
+    shape = normalize_query(query)
+    return shape, hashlib.sha1(shape.encode('utf-8')).hexdigest()[:12]
+
+
+def _params_size(params: Optional[Dict[str, Any]]) -> int:
+    """Approximate size of the parameters in bytes, as JSON."""
+    if not params:
+        return 0
+    try:
+        return len(json.dumps(params, default=str))
+    except (TypeError, ValueError):
+        return len(repr(params))
+
+
+def plan_mode(shape: str) -> Optional[str]:
+    """
+    How the plan of a query shape may be captured.
+
+    Args:
+        shape: Normalized query text
+
+    Returns:
+        str: 'PROFILE' for read-only shapes, 'EXPLAIN' for shapes that
+        write, or None for schema and already prefixed statements
+    """
+    if _UNPLANNABLE.match(shape):
+        return None
+    return 'EXPLAIN' if _WRITE_CLAUSE.search(shape) else 'PROFILE'
+
+
+def summarize_plan(plan: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Flatten a PROFILE or EXPLAIN plan.
+
+    EXPLAIN plans carry no db hits and only the planner's row estimates.
+
+    Args:
+        plan: ResultSummary.profile (or .plan for EXPLAIN) of the Neo4j
+            driver (nested operator dicts)
+
+    Returns:
+        dict: total db_hits and rows, and operators as
+        {'operator', 'depth', 'db_hits', 'rows', 'details'} in plan order
+    """
+    operators = []
+
+    def walk(node, depth):
+        args = node.get('args') or {}
+        operators.append({
+            'operator': node.get('operatorType', '?').split('@')[0],
+            'depth': depth,
+            'db_hits': node.get('dbHits', args.get('DbHits', 0)) or 0,
+            'rows': node.get('rows', args.get('Rows', args.get('EstimatedRows', 0))) or 0,
+            'details': args.get('Details', '')
+        })
+        for child in node.get('children') or []:
+            walk(child, depth + 1)
+
+    if plan:
+        walk(plan, 0)
+    return {
+        'db_hits': sum(operator['db_hits'] for operator in operators),
+        'rows': operators[0]['rows'] if operators else 0,
+        'operators': operators
+    }
+
+
+@dataclass
+class QueryRecord:
+    """
+    One executed query.
+
+    Attributes:
+        shape: Normalized query text
+        shape_id: Short hash of the shape
+        params_bytes: Approximate parameter size
+        seconds: Wall time including retries
+        rows: Records returned
+        retries: Failed attempts before the result (or the final error)
+        error: Error message if every attempt failed
+        at: Epoch seconds when the query finished
+    """
+    shape: str
+    shape_id: str
+    params_bytes: int
+    seconds: float
+    rows: int
+    retries: int
+    error: Optional[str] = None
+    at: float = field(default_factory=time.time)
+
+
+class QueryProfiler:
+    """
+    Records queries into a ring buffer and per-shape aggregates.
+
+    Thread-safe; one profiler is shared by all users of a connection.
+    """
+
+    def __init__(self, capacity: int = NEO4J_PROFILE_BUFFER, slow_ms: float = NEO4J_SLOW_QUERY_MS,
+                 plan_shapes: int = NEO4J_PROFILE_PLANS):
+        """
+        Initialize the profiler.
+
+        Args:
+            capacity: Recent queries kept
+            slow_ms: Wall time from which a query is logged as slow
+            plan_shapes: Number of slowest shapes whose plan is captured
+                (0 disables plan capture)
+        """
+        self.capacity = capacity
+        self.slow_ms = slow_ms
+        self.plan_shapes = plan_shapes
+        self._recent: deque = deque(maxlen=capacity)
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self._plans: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, query: str, params: Optional[Dict[str, Any]], seconds: float, rows: int,
+               retries: int = 0, error: Optional[str] = None) -> QueryRecord:
+        """
+        Record an executed query.
+
+        Args:
+            query: Cypher text
+            params: Query parameters
+            seconds: Wall time including retries
+            rows: Records returned
+            retries: Failed attempts before the result
+            error: Error message if the query failed
+
+        Returns:
+            QueryRecord: The stored record
+        """
+        shape, shape_id = query_shape(query)
+        entry = QueryRecord(shape, shape_id, _params_size(params), seconds, rows, retries, error)
+        slow = seconds * 1000 >= self.slow_ms
+
+        with self._lock:
+            self._recent.append(entry)
+            stats = self._shapes.get(shape_id)
+            if stats is None:
+                stats = self._shapes[shape_id] = {
+                    'shape_id': shape_id, 'shape': shape, 'count': 0, 'total_s': 0.0, 'max_s': 0.0,
+                    'rows': 0, 'params_bytes': 0, 'retries': 0, 'errors': 0, 'slow': 0
+                }
+            stats['count'] += 1
+            stats['total_s'] += seconds
+            stats['max_s'] = max(stats['max_s'], seconds)
+            stats['rows'] += rows
+            stats['params_bytes'] = max(stats['params_bytes'], entry.params_bytes)
+            stats['retries'] += retries
+            stats['errors'] += 1 if error else 0
+            stats['slow'] += 1 if slow else 0
+
+        if slow:
+            logging.warning(
+                f"Slow Cypher query [{shape_id}] {seconds * 1000:.0f} ms, {rows} rows, "
+                f"{entry.params_bytes} parameter bytes, {retries} retries: {shape[:300]}"
+            )
+        return entry
+
+    def wants_plan(self, entry: QueryRecord) -> bool:
+        """
+        Whether the plan of a just recorded query should be captured.
+
+        A slow, successful query gets its plan captured if its shape can be
+        planned (see plan_mode), has no plan yet and is among the
+        ``plan_shapes`` slowest shapes seen.
+        """
+        if not self.plan_shapes or entry.error or entry.seconds * 1000 < self.slow_ms:
+            return False
+        if plan_mode(entry.shape) is None:
+            return False
+        with self._lock:
+            if entry.shape_id in self._plans:
+                return False
+            if len(self._plans) < self.plan_shapes:
+                return True
+            fastest = min(self._plans, key=lambda shape_id: self._shapes[shape_id]['max_s'])
+            return self._shapes[fastest]['max_s'] < entry.seconds
+
+    def add_plan(self, entry: QueryRecord, plan: Dict[str, Any]):
+        """Store a captured plan, evicting the fastest shape's plan beyond the limit."""
+        with self._lock:
+            self._plans[entry.shape_id] = {'captured_at': time.time(), 'seconds': entry.seconds, **plan}
+            while len(self._plans) > self.plan_shapes:
+                fastest = min(self._plans, key=lambda shape_id: self._shapes[shape_id]['max_s'])
+                del self._plans[fastest]
+
+    def recent(self, limit: Optional[int] = None) -> List[QueryRecord]:
+        """Most recent queries, newest first."""
+        with self._lock:
+            records = list(self._recent)
+        records.reverse()
+        return records[:limit] if limit else records
+
+    def shapes(self, order_by: str = 'total_s', limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Per-shape aggregates, most expensive first.
+
+        Args:
+            order_by: Aggregate to sort by: 'total_s', 'max_s', 'count', 'rows' or 'slow'
+            limit: Maximum number of shapes
+
+        Returns:
+            list: Aggregates with mean_ms and the captured plan, if any
+        """
+        with self._lock:
+            shapes = [dict(stats) for stats in self._shapes.values()]
+            plans = dict(self._plans)
+        for stats in shapes:
+            stats['mean_ms'] = round(stats['total_s'] * 1000 / stats['count'], 3)
+            stats['plan'] = plans.get(stats['shape_id'])
+        shapes.sort(key=lambda stats: stats[order_by], reverse=True)
+        return shapes[:limit] if limit else shapes
+
+    def reset(self):
+        """Forget all records, aggregates and plans."""
+        with self._lock:
+            self._recent.clear()
+            self._shapes.clear()
+            self._plans.clear()
+
+
+def create_profiler() -> Optional[QueryProfiler]:
+    """Profiler configured from the settings, or None when profiling is disabled."""
+    return QueryProfiler() if NEO4J_PROFILE_QUERIES else None
@@ -0,0 +1,462 @@
+"""
+Graph Repository Module
+
+This module defines the typed operations the knowledge base performs on its
+graph store: batched node and relationship writes, key lookups, label counts,
+relationship and neighbor listings, substring and scored keyword search, and
+full dumps for snapshots. Ingestion, statistics, technique profiles, chat
+context retrieval, the explorer and snapshot export go through these
+operations instead of raw Cypher, so they run unchanged against Neo4j or
+against the embedded in-memory graph (see memory_graph) used for offline
+development and benchmarks.
+
+Features:
+- Backend-neutral write operations (create, upsert, update, link)
+- Backend-neutral read operations (lookup, listing, neighbors, counts, search, dumps)
+- Neo4j implementation issuing batched UNWIND statements
+
+Classes:
+    GraphRepository: Abstract repository interface
+    Neo4jRepository: Repository backed by a Neo4jConnection
+
+Functions:
+    get_repository: Repository for a graph connection
+    check_identifier: Validate labels and relationship types used in Cypher
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Rows written per UNWIND statement by the bulk helpers
+BULK_BATCH_SIZE = 500
+
+# Labels and relationship types are interpolated into Cypher, so only plain identifiers are allowed
+_CYPHER_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Node properties used, in order, as the identifier and name in keyword search
+SEARCH_IDENTIFIER_KEYS = ('technique_id', 'mitigation_id', 'control_id', 'regulation_id', 'id')
+SEARCH_NAME_KEYS = ('name', 'title')
+
+
+def check_identifier(name: str) -> str:
+    """Validate a label or relationship type before it is interpolated into Cypher."""
+    if not _CYPHER_IDENTIFIER.match(name or ''):
+        raise ValueError(f"Invalid Cypher identifier: {name!r}")
+    return name
+
+
+def _quote(name: str) -> str:
+    """Quote a label or relationship type (STIX types such as SUBTECHNIQUE-OF contain hyphens)."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+class GraphRepository(ABC):
+    """
+    Typed knowledge base operations shared by every graph backend.
+
+    Node properties are plain dictionaries. Nodes are addressed by a label
+    and a key property (e.g. Technique.id or Citation.reference_name); a
+    label of None matches nodes of any label.
+    """
+
+    # --- Writes ---
+
+    @abstractmethod
+    def clear(self):
+        """Delete every node and relationship."""
+
+    @abstractmethod
+    def ensure_unique(self, label: str, key: str, name: Optional[str] = None):
+        """Declare ``key`` unique for ``label`` (and indexed)."""
+
+    @abstractmethod
+    def ensure_index(self, label: str, key: str, name: Optional[str] = None):
+        """Index ``key`` for lookups on ``label``."""
+
+    @abstractmethod
+    def create_nodes(self, label: str, rows: Sequence[Dict[str, Any]], batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        Create one node per property dictionary without checking for duplicates.
+
+        Rows may be any sequence, e.g. one building its dictionaries on access.
+
+        Returns:
+            int: Number of nodes created
+        """
+
+    @abstractmethod
+    def upsert_nodes(self, label: str, key: str, rows: List[Dict[str, Any]],
+                     timestamp_property: Optional[str] = None, batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        Create or update nodes matched on ``key``; properties are merged in.
+
+        Args:
+            label: Node label
+            key: Property identifying the node; every row must contain it
+            rows: Property dictionaries
+            timestamp_property: Property set to the current time on every row
+            batch_size: Rows per write statement
+
+        Returns:
+            int: Number of rows written
+        """
+
+    @abstractmethod
+    def update_nodes(self, label: str, key: str, rows: List[Dict[str, Any]],
+                     batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        Merge properties into existing nodes matched on ``key``; unknown keys are ignored.
+
+        Returns:
+            int: Number of rows submitted
+        """
+
+    @abstractmethod
+    def link(self, rel_type: str, rows: Sequence[Dict[str, Any]],
+             source_label: Optional[str], source_key: str,
+             target_label: Optional[str], target_key: str,
+             merge: bool = True, batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        Create relationships between existing nodes.
+
+        Args:
+            rel_type: Relationship type
+            rows: {'source': key value, 'target': key value, 'properties': optional dict};
+                any sequence, e.g. one building its dictionaries on access
+            source_label: Label of source nodes, or None for any label
+            source_key: Property matched against row['source']
+            target_label: Label of target nodes, or None for any label
+            target_key: Property matched against row['target']
+            merge: Reuse an existing relationship of the same type between the
+                two nodes instead of creating another one
+            batch_size: Rows per write statement
+
+        Returns:
+            int: Number of rows submitted
+        """
+
+    @abstractmethod
+    def delete_nodes(self, labels: Sequence[str]) -> int:
+        """
+        Delete every node with one of ``labels``, together with its relationships.
+
+        Returns:
+            int: Number of nodes deleted
+        """
+
+    # --- Reads ---
+
+    @abstractmethod
+    def get_node(self, label: str, key: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Properties of the node with ``key`` equal to ``value``, or None."""
+
+    @abstractmethod
+    def nodes(self, label: str, keys: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Properties of every node with ``label``, optionally only the given keys."""
+
+    @abstractmethod
+    def relationships(self, rel_type: str, source_label: Optional[str] = None,
+                      target_label: Optional[str] = None,
+                      source_keys: Optional[Sequence[str]] = None,
+                      target_keys: Optional[Sequence[str]] = None) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """(source properties, target properties) of every ``rel_type`` relationship."""
+
+    @abstractmethod
+    def neighbors(self, label: Optional[str], key: str, value: Any, rel_type: Optional[str] = None,
+                  direction: str = 'out', neighbor_label: Optional[str] = None,
+                  keys: Optional[Sequence[str]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Nodes related to the nodes with ``key`` equal to ``value``.
+
+        Args:
+            label: Label of the start nodes, or None for any label
+            key: Property identifying the start nodes
+            value: Value of ``key``
+            rel_type: Relationship type, or None for any type
+            direction: 'out' for relationships starting at the start nodes,
+                'in' for relationships ending there
+            neighbor_label: Label of the related nodes, or None for any label
+            keys: Properties of the related nodes to return (all when None)
+
+        Returns:
+            list: (relationship type, related node properties) per relationship
+
+        Raises:
+            ValueError: If direction is not 'out' or 'in'
+        """
+
+    @abstractmethod
+    def find_nodes_containing(self, label: Optional[str], terms: Sequence[str], properties: Sequence[str],
+                              list_properties: Sequence[str] = (), keys: Optional[Sequence[str]] = None,
+                              ignore_case: bool = True,
+                              limit: Optional[int] = None) -> List[Tuple[List[str], Dict[str, Any]]]:
+        """
+        Nodes where a term is a substring of one of their text properties.
+
+        Args:
+            label: Node label, or None for any label
+            terms: Search terms; a node matches if any term is found
+            properties: String properties searched
+            list_properties: String list properties searched element by element (e.g. aliases)
+            keys: Properties to return (all when None)
+            ignore_case: Compare case-insensitively
+            limit: Maximum number of nodes returned
+
+        Returns:
+            list: (labels, properties) of the matching nodes
+        """
+
+    @abstractmethod
+    def dump_nodes(self) -> List[Tuple[str, List[str], Dict[str, Any]]]:
+        """(internal id, labels, properties) of every node, e.g. for snapshots."""
+
+    @abstractmethod
+    def dump_relationships(self) -> List[Tuple[str, str, str, Dict[str, Any]]]:
+        """(source internal id, target internal id, type, properties) of every relationship."""
+
+    @abstractmethod
+    def label_counts(self, labels: Sequence[str]) -> Dict[str, int]:
+        """Number of nodes per label."""
+
+    @abstractmethod
+    def count_nodes(self) -> int:
+        """Total number of nodes."""
+
+    @abstractmethod
+    def count_relationships(self) -> int:
+        """Total number of relationships."""
+
+    @abstractmethod
+    def search_nodes(self, label: str, keywords: List[str], weights: Tuple[float, float, float],
+                     limit: int, extra_keys: Sequence[str] = ()) -> List[Dict[str, Any]]:
+        """
+        Keyword search over identifier, name and description of ``label`` nodes.
+
+        A keyword equal to the identifier (SEARCH_IDENTIFIER_KEYS) scores
+        weights[0], one contained in the name (SEARCH_NAME_KEYS) weights[1]
+        and one contained in the description weights[2]; matching is case
+        insensitive and keywords are expected in lower case.
+
+        Returns:
+            list: {'identifier', 'name', 'description', 'extras', 'score'} for
+            the ``limit`` best matches, best first
+        """
+
+
+class Neo4jRepository(GraphRepository):
+    """Repository issuing batched Cypher statements through a Neo4jConnection."""
+
+    def __init__(self, graph):
+        """
+        Initialize the repository.
+
+        Args:
+            graph: Neo4jConnection (or any object with a compatible query method)
+        """
+        self.graph = graph
+
+    def _batches(self, query: str, rows: Sequence[Dict[str, Any]], batch_size: int,
+                 prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None) -> int:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            if prepare:
+                batch = [prepare(row) for row in batch]
+            self.graph.query(query, {'rows': batch})
+        return len(rows)
+
+    @staticmethod
+    def _pattern(variable: str, label: Optional[str], key: str, value: str) -> str:
+        label_part = f":{_quote(label)}" if label else ""
+        return f"({variable}{label_part} {{{check_identifier(key)}: {value}}})"
+
+    @staticmethod
+    def _projection(variable: str, keys: Optional[Sequence[str]]) -> str:
+        if keys is None:
+            return f"properties({variable})"
+        return f"{variable} {{{', '.join('.' + check_identifier(key) for key in keys)}}}"
+
+    def clear(self):
+        self.graph.query("MATCH (n) DETACH DELETE n")
+
+    def ensure_unique(self, label, key, name=None):
+        name = check_identifier(name or f"{label.lower()}_{key}")
+        self.graph.query(
+            f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{_quote(label)}) REQUIRE n.{check_identifier(key)} IS UNIQUE"
+        )
+
+    def ensure_index(self, label, key, name=None):
+        name = check_identifier(name or f"{label.lower()}_{key}")
+        self.graph.query(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{_quote(label)}) ON (n.{check_identifier(key)})")
+
+    def create_nodes(self, label, rows, batch_size=BULK_BATCH_SIZE):
+        return self._batches(f"""
+            UNWIND $rows AS row
+            CREATE (n:{_quote(label)})
+            SET n += row
+        """, rows, batch_size)
+
+    def upsert_nodes(self, label, key, rows, timestamp_property=None, batch_size=BULK_BATCH_SIZE):
+        timestamp = f",\n                n.{check_identifier(timestamp_property)} = datetime()" if timestamp_property else ""
+        return self._batches(f"""
+            UNWIND $rows AS row
+            MERGE {self._pattern('n', label, key, f'row.{key}')}
+            SET n += row{timestamp}
+        """, rows, batch_size)
+
+    def update_nodes(self, label, key, rows, batch_size=BULK_BATCH_SIZE):
+        return self._batches(f"""
+            UNWIND $rows AS row
+            MATCH {self._pattern('n', label, key, f'row.{key}')}
+            SET n += row
+        """, rows, batch_size)
+
+    def link(self, rel_type, rows, source_label, source_key, target_label, target_key,
+             merge=True, batch_size=BULK_BATCH_SIZE):
+        return self._batches(f"""
+            UNWIND $rows AS row
+            MATCH {self._pattern('a', source_label, source_key, 'row.source')}
+            MATCH {self._pattern('b', target_label, target_key, 'row.target')}
+            {'MERGE' if merge else 'CREATE'} (a)-[r:{_quote(rel_type)}]->(b)
+            SET r += row.properties
+        """, rows, batch_size, prepare=lambda row: {
+            'source': row['source'], 'target': row['target'], 'properties': row.get('properties') or {}
+        })
+
+    def delete_nodes(self, labels):
+        deleted = 0
+        for label in labels:
+            records = self.graph.query(f"MATCH (n:{_quote(label)}) DETACH DELETE n RETURN count(n) AS count")
+            deleted += records[0]['count'] if records else 0
+        return deleted
+
+    def get_node(self, label, key, value):
+        records = self.graph.query(f"""
+            MATCH {self._pattern('n', label, key, '$value')}
+            RETURN properties(n) AS properties
+            LIMIT 1
+        """, {'value': value})
+        return records[0]['properties'] if records else None
+
+    def nodes(self, label, keys=None):
+        records = self.graph.query(f"MATCH (n:{_quote(label)}) RETURN {self._projection('n', keys)} AS properties")
+        return [record['properties'] for record in records]
+
+    def relationships(self, rel_type, source_label=None, target_label=None, source_keys=None, target_keys=None):
+        source = f"(a:{_quote(source_label)})" if source_label else "(a)"
+        target = f"(b:{_quote(target_label)})" if target_label else "(b)"
+        records = self.graph.query(f"""
+            MATCH {source}-[:{_quote(rel_type)}]->{target}
+            RETURN {self._projection('a', source_keys)} AS source, {self._projection('b', target_keys)} AS target
+        """)
+        return [(record['source'], record['target']) for record in records]
+
+    def neighbors(self, label, key, value, rel_type=None, direction='out', neighbor_label=None, keys=None):
+        if direction not in ('out', 'in'):
+            raise ValueError(f"Invalid direction: {direction!r}")
+        relationship = f"[r:{_quote(rel_type)}]" if rel_type else "[r]"
+        pattern = f"-{relationship}->" if direction == 'out' else f"<-{relationship}-"
+        neighbor = f"(b:{_quote(neighbor_label)})" if neighbor_label else "(b)"
+        records = self.graph.query(f"""
+            MATCH {self._pattern('a', label, key, '$value')}{pattern}{neighbor}
+            RETURN type(r) AS type, {self._projection('b', keys)} AS properties
+        """, {'value': value})
+        return [(record['type'], record['properties']) for record in records]
+
+    def find_nodes_containing(self, label, terms, properties, list_properties=(), keys=None,
+                              ignore_case=True, limit=None):
+        text = (lambda expression: f"toLower({expression})") if ignore_case else (lambda expression: expression)
+        conditions = [f"{text('n.' + check_identifier(key))} CONTAINS term" for key in properties] + [
+            f"ANY(value IN coalesce(n.{check_identifier(key)}, []) WHERE {text('value')} CONTAINS term)"
+            for key in list_properties
+        ]
+        node = f"(n:{_quote(label)})" if label else "(n)"
+        records = self.graph.query(f"""
+            MATCH {node}
+            WHERE ANY(term IN $terms WHERE {' OR '.join(conditions)})
+            RETURN labels(n) AS labels, {self._projection('n', keys)} AS properties
+            {'LIMIT $limit' if limit is not None else ''}
+        """, {
+            'terms': [term.lower() for term in terms] if ignore_case else list(terms),
+            'limit': limit
+        })
+        return [(record['labels'], record['properties']) for record in records]
+
+    def dump_nodes(self):
+        records = self.graph.query("MATCH (n) RETURN elementId(n) AS id, labels(n) AS labels, properties(n) AS properties")
+        return [(record['id'], record['labels'], record['properties']) for record in records]
+
+    def dump_relationships(self):
+        records = self.graph.query("""
+            MATCH (a)-[r]->(b)
+            RETURN elementId(a) AS source, elementId(b) AS target, type(r) AS type, properties(r) AS properties
+        """)
+        return [(record['source'], record['target'], record['type'], record['properties']) for record in records]
+
+    def label_counts(self, labels):
+        # One count-store subquery per label, answered without scanning nodes
+        labels = list(labels)
+        if not labels:
+            return {}
+        subqueries = "\n".join(
+            f"CALL {{ MATCH (n:{_quote(label)}) RETURN count(n) AS c{index} }}"
+            for index, label in enumerate(labels)
+        )
+        columns = ", ".join(f"c{index} AS {_quote(label)}" for index, label in enumerate(labels))
+        records = self.graph.query(f"{subqueries}\nRETURN {columns}")
+        row = records[0] if records else {}
+        return {label: row.get(label, 0) for label in labels}
+
+    def count_nodes(self):
+        records = self.graph.query("MATCH (n) RETURN count(n) AS count")
+        return records[0]['count'] if records else 0
+
+    def count_relationships(self):
+        records = self.graph.query("MATCH ()-[r]->() RETURN count(r) AS count")
+        return records[0]['count'] if records else 0
+
+    def search_nodes(self, label, keywords, weights, limit, extra_keys=()):
+        identifier = "coalesce(" + ", ".join(f"n.{key}" for key in SEARCH_IDENTIFIER_KEYS) + ")"
+        name = "coalesce(" + ", ".join(f"n.{key}" for key in SEARCH_NAME_KEYS) + ")"
+        extras = self._projection('n', extra_keys) if extra_keys else "{}"
+        return self.graph.query(f"""
+            MATCH (n:{_quote(label)})
+            WITH n,
+                 toLower(coalesce({identifier}, '')) AS identifier,
+                 toLower(coalesce({name}, '')) AS name,
+                 toLower(coalesce(n.description, '')) AS description
+            WITH n,
+                 size([keyword IN $keywords WHERE identifier = keyword]) AS id_hits,
+                 size([keyword IN $keywords WHERE name CONTAINS keyword]) AS name_hits,
+                 size([keyword IN $keywords WHERE description CONTAINS keyword]) AS description_hits
+            WHERE id_hits + name_hits + description_hits > 0
+            RETURN {identifier} AS identifier,
+                   {name} AS name,
+                   coalesce(n.description, '') AS description,
+                   {extras} AS extras,
+                   id_hits * $id_weight + name_hits * $name_weight + description_hits * $description_weight AS score
+            ORDER BY score DESC
+            LIMIT $limit
+        """, {
+            'keywords': keywords,
+            'id_weight': weights[0],
+            'name_weight': weights[1],
+            'description_weight': weights[2],
+            'limit': limit
+        })
+
+
+def get_repository(graph) -> GraphRepository:
+    """
+    Get the repository for a graph connection.
+
+    Args:
+        graph: Neo4jConnection, or a backend that implements GraphRepository
+            itself (e.g. InMemoryGraph)
+
+    Returns:
+        GraphRepository: Repository operating on the graph
+    """
+    if isinstance(graph, GraphRepository):
+        return graph
+    return Neo4jRepository(graph)
@@ -0,0 +1,311 @@
+"""
+Knowledge Base Snapshot Module
+
+This module exports the complete knowledge base to a compressed snapshot
+file and imports it into another Neo4j instance or the in-memory graph.
+Restoring a snapshot takes seconds, whereas rebuilding means re-downloading
+ATT&CK STIX data and re-running document extraction, so snapshots are the
+fastest way to populate CI databases, new replicas and local development
+instances.
+
+Snapshot format (gzip-compressed newline-delimited JSON):
+- One header line with the format version, creation time and totals
+- Node chunks: nodes sharing the same label set, up to one batch per line
+- Relationship chunks: relationships sharing the same type, one batch per line
+
+Nodes are identified inside a snapshot by their internal id at export time
+(the element id in Neo4j). Temporal property values (e.g. ingested_at) are
+stored as ISO strings and typed again on import into Neo4j; the in-memory
+graph keeps them as strings.
+
+Functions:
+    export_snapshot: Write the knowledge base to a snapshot file
+    import_snapshot: Load a snapshot file (batched UNWIND statements on Neo4j)
+    read_snapshot_header: Read the header of a snapshot file
+    iter_snapshot_chunks: Read the node and relationship chunks of a snapshot file
+"""
+
+import gzip
+import json
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from neo4j.time import Date, DateTime, Duration, Time
+
+from src.knowledge_base.database import BULK_BATCH_SIZE
+from src.knowledge_base.repository import Neo4jRepository, get_repository
+from src.knowledge_base.statistics import invalidate_statistics_cache
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Temporary label and property linking snapshot ids to imported nodes
+_IMPORT_LABEL = 'SnapshotImport'
+_IMPORT_KEY = '_snapshot_id'
+
+# Cypher function used to restore each temporal type; the Python types are
+# written by the in-memory graph (datetime before its base class date)
+_TEMPORAL_TYPES = [
+    (DateTime, 'datetime'),
+    (Date, 'date'),
+    (Time, 'time'),
+    (Duration, 'duration'),
+    (datetime, 'datetime'),
+    (date, 'date'),
+    (time, 'time')
+]
+
+
+def _quote(name: str) -> str:
+    """Quote a label, relationship type or property key for Cypher."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _encode_properties(properties: Dict[str, Any], temporal: Dict[str, str]) -> Dict[str, Any]:
+    """Make property values JSON-serializable, noting temporal keys in ``temporal``."""
+    encoded = {}
+    for key, value in properties.items():
+        for temporal_type, function in _TEMPORAL_TYPES:
+            if isinstance(value, temporal_type):
+                temporal[key] = function
+                value = value.iso_format() if hasattr(value, 'iso_format') else value.isoformat()
+                break
+        encoded[key] = value
+    return encoded
+
+
+def _restore_temporal_clause(variable: str, temporal: Dict[str, str]) -> str:
+    """Build SET clauses converting ISO strings back to temporal values."""
+    return "".join(
+        f"\n        SET {variable}.{_quote(key)} = {function}({variable}.{_quote(key)})"
+        for key, function in sorted(temporal.items())
+    )
+
+
+def _chunks(rows, batch_size: int):
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+
+def export_snapshot(graph, path: str, batch_size: int = BULK_BATCH_SIZE, reporter=None) -> Dict[str, int]:
+    """
+    Export every node and relationship in the knowledge base.
+
+    Args:
+        graph: Neo4j database connection instance or in-memory graph
+        path: Snapshot file to write (gzip-compressed NDJSON)
+        batch_size: Rows per chunk line, matching the import batch size
+        reporter: Optional progress reporter
+
+    Returns:
+        dict: Number of nodes and relationships exported
+    """
+    repository = get_repository(graph)
+
+    nodes_by_labels = defaultdict(list)
+    for sid, labels, properties in repository.dump_nodes():
+        nodes_by_labels[tuple(sorted(labels))].append({'sid': sid, 'properties': properties})
+
+    relationships_by_type = defaultdict(list)
+    for source, target, rel_type, properties in repository.dump_relationships():
+        relationships_by_type[rel_type].append({'source': source, 'target': target, 'properties': properties})
+
+    counts = {
+        'nodes': sum(len(rows) for rows in nodes_by_labels.values()),
+        'relationships': sum(len(rows) for rows in relationships_by_type.values())
+    }
+
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        header = {
+            'kind': 'header',
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            **counts
+        }
+        file.write(json.dumps(header) + "\n")
+
+        for labels, records in nodes_by_labels.items():
+            for chunk in _chunks(records, batch_size):
+                temporal = {}
+                rows = [
+                    {'sid': record['sid'], 'properties': _encode_properties(record['properties'], temporal)}
+                    for record in chunk
+                ]
+                file.write(json.dumps({'kind': 'nodes', 'labels': list(labels), 'temporal': temporal, 'rows': rows}) + "\n")
+
+        for rel_type, records in relationships_by_type.items():
+            for chunk in _chunks(records, batch_size):
+                temporal = {}
+                rows = [
+                    {
+                        'source': record['source'],
+                        'target': record['target'],
+                        'properties': _encode_properties(record['properties'], temporal)
+                    }
+                    for record in chunk
+                ]
+                file.write(json.dumps({'kind': 'relationships', 'type': rel_type, 'temporal': temporal, 'rows': rows}) + "\n")
+
+    message = f"Exported {counts['nodes']:,} nodes and {counts['relationships']:,} relationships to {path}"
+    logging.info(message)
+    if reporter:
+        reporter.success(f"✅ {message}")
+    return counts
+
+
+def _read_lines(path: str) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_snapshot_header(path: str) -> Dict[str, Any]:
+    """
+    Read the header of a snapshot file.
+
+    Args:
+        path: Snapshot file
+
+    Returns:
+        dict: Header with format_version, created_at, nodes and relationships
+
+    Raises:
+        ValueError: If the file is not a supported snapshot
+    """
+    header = next(_read_lines(path), None)
+    if not header or header.get('kind') != 'header':
+        raise ValueError(f"{path} is not a knowledge base snapshot")
+    if header.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot format version {header.get('format_version')} "
+            f"(expected {SNAPSHOT_FORMAT_VERSION})"
+        )
+    return header
+
+
+def iter_snapshot_chunks(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read the node and relationship chunks of a snapshot file.
+
+    Args:
+        path: Snapshot file
+
+    Yields:
+        dict: Chunks with kind 'nodes' (labels, temporal, rows) or
+        'relationships' (type, temporal, rows), in file order
+
+    Raises:
+        ValueError: If the file is not a supported snapshot
+    """
+    read_snapshot_header(path)
+    for chunk in _read_lines(path):
+        if chunk.get('kind') in ('nodes', 'relationships'):
+            yield chunk
+
+
+def import_snapshot(graph, path: str, replace: bool = False, reporter=None,
+                    schema_setup: Optional[Callable[[Any], None]] = None) -> Tuple[bool, str]:
+    """
+    Load a snapshot into the knowledge base.
+
+    On Neo4j every chunk line is written with one UNWIND statement. Nodes
+    carry a temporary label and snapshot id so relationships can be matched
+    through an index, and both are removed once the import finishes. The
+    in-memory graph reads the file itself (InMemoryGraph.load_snapshot).
+
+    Args:
+        graph: Neo4j database connection instance or in-memory graph
+        path: Snapshot file written by export_snapshot
+        replace: Clear the existing knowledge base first; otherwise the
+            import is refused when the database is not empty
+        reporter: Optional progress reporter
+        schema_setup: Callable receiving the graph to create constraints and
+            indexes before nodes are written
+
+    Returns:
+        tuple: (success_boolean, status_message)
+    """
+    try:
+        header = read_snapshot_header(path)
+        repository = get_repository(graph)
+
+        if repository.count_nodes() > 0:
+            if not replace:
+                return False, "Knowledge base is not empty; clear it or import with replace=True"
+            repository.clear()
+
+        if schema_setup:
+            schema_setup(graph)
+
+        if isinstance(repository, Neo4jRepository):
+            written = _write_chunks(graph, path, header, reporter)
+        else:
+            # Embedded backends read the file themselves
+            written = repository.load_snapshot(path)
+        invalidate_statistics_cache()
+
+        message = (
+            f"Imported {written['nodes']:,} nodes and {written['relationships']:,} relationships "
+            f"from snapshot created {header['created_at']}"
+        )
+        logging.info(message)
+        return True, message
+
+    except Exception as e:
+        logging.error(f"Snapshot import failed: {e}")
+        return False, f"Snapshot import failed: {e}"
+
+
+def _write_chunks(graph, path: str, header: Dict[str, Any], reporter=None) -> Dict[str, int]:
+    """Write the chunks of a snapshot file to Neo4j, one UNWIND statement per chunk."""
+    graph.query(
+        f"CREATE INDEX snapshot_import_id IF NOT EXISTS "
+        f"FOR (n:{_IMPORT_LABEL}) ON (n.{_IMPORT_KEY})"
+    )
+
+    total = header['nodes'] + header['relationships']
+    progress = reporter.progress("Importing snapshot") if reporter else None
+    written = {'nodes': 0, 'relationships': 0}
+
+    for chunk in iter_snapshot_chunks(path):
+        if chunk['kind'] == 'nodes':
+            labels = ":".join(_quote(label) for label in chunk['labels'] + [_IMPORT_LABEL])
+            graph.query(f"""
+                UNWIND $rows AS row
+                CREATE (n:{labels})
+                SET n += row.properties, n.{_IMPORT_KEY} = row.sid{_restore_temporal_clause('n', chunk['temporal'])}
+            """, {'rows': chunk['rows']})
+            written['nodes'] += len(chunk['rows'])
+        else:
+            graph.query(f"""
+                UNWIND $rows AS row
+                MATCH (a:{_IMPORT_LABEL} {{{_IMPORT_KEY}: row.source}})
+                MATCH (b:{_IMPORT_LABEL} {{{_IMPORT_KEY}: row.target}})
+                CREATE (a)-[r:{_quote(chunk['type'])}]->(b)
+                SET r += row.properties{_restore_temporal_clause('r', chunk['temporal'])}
+            """, {'rows': chunk['rows']})
+            written['relationships'] += len(chunk['rows'])
+
+        if progress:
+            progress.update((written['nodes'] + written['relationships']) / max(total, 1))
+
+    _remove_import_markers(graph)
+    if progress:
+        progress.close()
+    return written
+
+
+def _remove_import_markers(graph, batch_size: int = 10000):
+    """Strip the temporary label and snapshot id from imported nodes."""
+    while True:
+        result = graph.query(f"""
+            MATCH (n:{_IMPORT_LABEL})
+            WITH n LIMIT $limit
+            REMOVE n:{_IMPORT_LABEL}, n.{_IMPORT_KEY}
+            RETURN count(n) AS count
+        """, {'limit': batch_size})
+        if not result or result[0]['count'] == 0:
+            break
+    graph.query("DROP INDEX snapshot_import_id IF EXISTS")
@@ -0,0 +1,89 @@
+"""
+Knowledge Base Statistics Module
+
+This module provides the node and relationship counts shown in the
+knowledge base explorer and the sidebar. Node counts come from the graph
+repository's label_counts, which on Neo4j is a single query whose
+subqueries each count one label, a pattern answered from the count store
+without scanning nodes or relationships. Results are cached per connection
+and invalidated whenever ingestion changes the graph.
+
+Features:
+- Per-label node counts for every framework in one round trip
+- Count-store friendly Cypher (no label or relationship scans)
+- Works on every graph backend
+- Process-wide cache with explicit invalidation and a time-based fallback
+
+Functions:
+    get_knowledge_base_statistics: Cached per-label counts
+    invalidate_statistics_cache: Drop cached counts after the graph changes
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from src.config.settings import STATISTICS_CACHE_SECONDS
+from src.knowledge_base.ingestion_manifest import FRAMEWORK_MANIFEST_SPECS
+from src.knowledge_base.repository import get_repository
+from src.utils import metrics
+
+# Every label counted, grouped by framework key
+STATISTICS_LABELS = {
+    framework: spec['labels'] for framework, spec in FRAMEWORK_MANIFEST_SPECS.items()
+}
+STATISTICS_LABELS['citations'] = ['Citation']
+
+_cache: Dict[int, Dict[str, Any]] = {}
+_cache_lock = threading.Lock()
+
+CACHE_REQUESTS = metrics.counter(
+    'statistics_cache_requests_total', "Knowledge base statistics cache lookups by result", ['result']
+)
+
+
+def get_knowledge_base_statistics(graph, max_age: float = STATISTICS_CACHE_SECONDS) -> Dict[str, Any]:
+    """
+    Get per-label node counts for all frameworks.
+
+    Args:
+        graph: Neo4j database connection instance
+        max_age: Seconds a cached result stays valid, covering ingestion
+            run from another process (e.g. the ingest.py command line tool)
+
+    Returns:
+        dict: {'labels': {label: count}, 'frameworks': {framework: {label: count}},
+               'relationships': count, 'total_nodes': count, 'computed_at': epoch seconds}
+    """
+    key = id(graph)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and time.time() - cached['computed_at'] < max_age:
+            CACHE_REQUESTS.inc(result='hit')
+            return cached
+    CACHE_REQUESTS.inc(result='miss')
+
+    repository = get_repository(graph)
+    label_counts = repository.label_counts(
+        [label for labels in STATISTICS_LABELS.values() for label in labels]
+    )
+    statistics = {
+        'labels': label_counts,
+        'frameworks': {
+            framework: {label: label_counts[label] for label in labels}
+            for framework, labels in STATISTICS_LABELS.items()
+        },
+        'relationships': repository.count_relationships(),
+        'total_nodes': sum(label_counts.values()),
+        'computed_at': time.time()
+    }
+
+    with _cache_lock:
+        _cache[key] = statistics
+    return statistics
+
+
+def invalidate_statistics_cache():
+    """Drop cached statistics for every connection after the graph changed."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,182 @@
+"""
+Technique Profile Module
+
+This module materializes a profile document for every ATT&CK technique
+after ingestion: its tactics, parent and sub-techniques, threat groups,
+software, mitigations, data sources and the CIS safeguards and NIST
+subcategories linked through those mitigations. Profiles are stored as a
+JSON property on the Technique node, so showing a technique is a single
+indexed lookup instead of a multi-way OPTIONAL MATCH fan-out.
+
+Features:
+- One relationship listing per relationship kind for all techniques at once,
+  aggregated in Python so profiles build on every graph backend
+- Batched writes of the finished profiles
+- Indexed single-property reads for technique pages
+
+Functions:
+    build_technique_profiles: Build and store profiles for every technique
+    get_technique_profile: Read a stored profile by ATT&CK technique ID
+"""
+
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from src.knowledge_base.repository import BULK_BATCH_SIZE, get_repository
+
+# Profile fields in the order they are stored
+PROFILE_FIELDS = [
+    'tactics', 'parent', 'sub_techniques', 'threat_groups', 'software', 'mitigations',
+    'data_components', 'cis_safeguards', 'cis_controls', 'nist_subcategories'
+]
+
+_TECHNIQUE_KEYS = ['id', 'technique_id', 'name', 'description', 'platforms', 'data_sources',
+                   'detection', 'is_subtechnique']
+
+
+def _sorted_items(items: List[Any]) -> List[Any]:
+    """Sort names or mappings so stored profiles are stable between builds."""
+    return sorted(items, key=lambda item: json.dumps(item, sort_keys=True) if isinstance(item, dict) else str(item))
+
+
+def _collect(repository, rel_type: str, source_label: str, target_label: str,
+             source_keys: List[str], target_keys: List[str], group_by: str, item) -> Dict[Any, List[Any]]:
+    """
+    Group relationship endpoints into profile items.
+
+    Args:
+        group_by: 'source' or 'target', the endpoint whose id keys the result
+        item: Callable (source, target) -> profile item
+
+    Returns:
+        dict: Endpoint id -> distinct items
+    """
+    grouped = defaultdict(list)
+    for source, target in repository.relationships(rel_type, source_label, target_label, source_keys, target_keys):
+        key = source['id'] if group_by == 'source' else target['id']
+        value = item(source, target)
+        if value not in grouped[key]:
+            grouped[key].append(value)
+    return grouped
+
+
+def _through_mitigations(items_by_mitigation: Dict[Any, List[Any]],
+                         techniques_by_mitigation: Dict[Any, List[Any]]) -> Dict[Any, List[Any]]:
+    """Attach items linked to mitigations to the techniques those mitigations mitigate."""
+    grouped = defaultdict(list)
+    for mitigation_id, items in items_by_mitigation.items():
+        for technique_id in techniques_by_mitigation.get(mitigation_id, []):
+            for value in items:
+                if value not in grouped[technique_id]:
+                    grouped[technique_id].append(value)
+    return grouped
+
+
+def _related_items(repository) -> Dict[str, Dict[Any, List[Any]]]:
+    """Profile items per field, keyed by Technique.id."""
+    software = _collect(repository, 'USES', 'Malware', 'Technique', ['name'], ['id'], 'target',
+                        lambda s, t: {'name': s['name'], 'type': 'Malware'})
+    for technique_id, tools in _collect(repository, 'USES', 'Tool', 'Technique', ['name'], ['id'], 'target',
+                                        lambda s, t: {'name': s['name'], 'type': 'Tool'}).items():
+        software[technique_id].extend(tools)
+
+    mitigated = repository.relationships('MITIGATES', 'Mitigation', 'Technique', ['id'], ['id'])
+    techniques_by_mitigation = defaultdict(list)
+    for mitigation, technique in mitigated:
+        techniques_by_mitigation[mitigation['id']].append(technique['id'])
+
+    return {
+        'tactics': _collect(repository, 'PART_OF_TACTIC', 'Technique', 'Tactic', ['id'], ['name'], 'source',
+                            lambda s, t: t['name']),
+        'parent': _collect(repository, 'HAS_SUBTECHNIQUE', 'Technique', 'Technique',
+                           ['technique_id', 'name'], ['id'], 'target',
+                           lambda s, t: {'technique_id': s['technique_id'], 'name': s['name']}),
+        'sub_techniques': _collect(repository, 'HAS_SUBTECHNIQUE', 'Technique', 'Technique',
+                                   ['id'], ['technique_id', 'name'], 'source',
+                                   lambda s, t: {'technique_id': t['technique_id'], 'name': t['name']}),
+        'threat_groups': _collect(repository, 'USES', 'ThreatGroup', 'Technique', ['name'], ['id'], 'target',
+                                  lambda s, t: s['name']),
+        'software': software,
+        'mitigations': _collect(repository, 'MITIGATES', 'Mitigation', 'Technique',
+                                ['mitigation_id', 'name'], ['id'], 'target',
+                                lambda s, t: {'mitigation_id': s['mitigation_id'], 'name': s['name']}),
+        'data_components': _collect(repository, 'DETECTS', 'DataComponent', 'Technique', ['name'], ['id'], 'target',
+                                    lambda s, t: s['name']),
+        'cis_safeguards': _through_mitigations(
+            _collect(repository, 'IMPLEMENTS', 'CIS_Safeguard', 'Mitigation', ['id', 'title'], ['id'], 'target',
+                     lambda s, t: {'id': s['id'], 'title': s['title']}),
+            techniques_by_mitigation
+        ),
+        'cis_controls': _collect(repository, 'MITIGATED_BY', 'Technique', 'CIS_Control', ['id'], ['id', 'title'],
+                                 'source', lambda s, t: {'id': t['id'], 'title': t['title']}),
+        'nist_subcategories': _through_mitigations(
+            _collect(repository, 'SUPPORTS', 'NIST_Subcategory', 'Mitigation', ['id', 'description'], ['id'],
+                     'target', lambda s, t: {'id': s['id'], 'description': s['description']}),
+            techniques_by_mitigation
+        )
+    }
+
+
+def build_technique_profiles(graph, batch_size: int = BULK_BATCH_SIZE) -> int:
+    """
+    Build and store the profile of every technique.
+
+    Run after ATT&CK and the frameworks linked to its mitigations have been
+    ingested; profiles are rebuilt from scratch each time.
+
+    Args:
+        graph: Neo4j database connection instance
+        batch_size: Profiles written per batch
+
+    Returns:
+        int: Number of profiles written
+    """
+    repository = get_repository(graph)
+    techniques = repository.nodes('Technique', _TECHNIQUE_KEYS)
+    if not techniques:
+        return 0
+
+    related = _related_items(repository)
+
+    built_at = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for technique in techniques:
+        profile = {
+            'technique_id': technique['technique_id'],
+            'name': technique['name'],
+            'description': technique['description'],
+            'platforms': technique['platforms'] or [],
+            'is_subtechnique': bool(technique['is_subtechnique']),
+            'data_sources': technique['data_sources'] or [],
+            'detection': technique['detection'] or '',
+            'built_at': built_at
+        }
+        for field in PROFILE_FIELDS:
+            profile[field] = _sorted_items(related[field].get(technique['id'], []))
+        profile['parent'] = profile['parent'][0] if profile['parent'] else None
+        rows.append({'id': technique['id'], 'profile': json.dumps(profile)})
+
+    repository.update_nodes('Technique', 'id', rows, batch_size=batch_size)
+
+    logging.info(f"Built {len(rows)} technique profiles")
+    return len(rows)
+
+
+def get_technique_profile(graph, technique_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the stored profile of a technique.
+
+    Args:
+        graph: Neo4j database connection instance
+        technique_id: ATT&CK technique ID, e.g. 'T1055' or 'T1055.001'
+
+    Returns:
+        dict: Profile document, or None if the technique or its profile does not exist
+    """
+    technique = get_repository(graph).get_node('Technique', 'technique_id', technique_id)
+    if not technique or not technique.get('profile'):
+        return None
+    return json.loads(technique['profile'])
@@ -0,0 +1,215 @@
+"""
+Parallel Ingestion Orchestrator Module
+
+This module runs knowledge base ingestion tasks concurrently while honouring
+the dependencies between them. Document frameworks spend most of their time
+parsing PDFs and waiting on the LLM, so they can proceed side by side; steps
+that need other frameworks in the graph (e.g. cross-framework linking) wait
+until their dependencies have finished.
+
+Features:
+- Dependency graph of named tasks with cycle and unknown-task detection
+- Configurable worker count backed by a thread pool
+- Per-task status events and wall-clock timing, also exported as metrics
+- Dependent tasks are skipped when a dependency fails, unless they opt in
+
+Classes:
+    IngestionTask: A named unit of work and the tasks it depends on
+    TaskResult: Outcome and timing of a single task
+    IngestionOrchestrator: Dependency-aware concurrent task runner
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils import metrics
+
+TASK_SECONDS = metrics.histogram(
+    'ingestion_task_seconds', "Wall time of ingestion tasks", ['framework', 'task', 'status'],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 2400)
+)
+
+
+@dataclass
+class IngestionTask:
+    """
+    A named ingestion step.
+
+    Attributes:
+        name: Unique task name
+        func: Callable run on a worker thread. It receives a dictionary of the
+            return values of its successful dependencies, keyed by task name
+        depends_on: Names of tasks that must finish first
+        run_if_dependencies_fail: Run even if a dependency failed or was skipped
+        framework: Framework the task belongs to, used to aggregate timings
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    depends_on: List[str] = field(default_factory=list)
+    run_if_dependencies_fail: bool = False
+    framework: Optional[str] = None
+
+
+@dataclass
+class TaskResult:
+    """
+    Outcome of an ingestion task.
+
+    Attributes:
+        name: Task name
+        status: 'succeeded', 'failed' or 'skipped'
+        result: Return value of the task function
+        error: Error message for failed or skipped tasks
+        duration: Wall-clock seconds spent running the task
+    """
+    name: str
+    status: str
+    result: Any = None
+    error: Optional[str] = None
+    duration: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the task ran to completion without raising."""
+        return self.status == 'succeeded'
+
+
+class IngestionOrchestrator:
+    """
+    Run ingestion tasks concurrently in dependency order.
+
+    Tasks are submitted to a thread pool as soon as all of their
+    dependencies have finished. Progress is reported through an optional
+    callback invoked from the thread that called run(), which keeps UI
+    updates (e.g. Streamlit elements) on the caller's thread.
+    """
+
+    def __init__(self, tasks: List[IngestionTask], max_workers: int = 4,
+                 on_event: Optional[Callable[[str, str, Optional[TaskResult]], None]] = None,
+                 thread_initializer: Optional[Callable[[], None]] = None):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            tasks: Tasks to run
+            max_workers: Maximum number of tasks running at once
+            on_event: Callback receiving (event, task_name, result) where event
+                is 'started', 'succeeded', 'failed' or 'skipped'
+            thread_initializer: Called once in every worker thread
+
+        Raises:
+            ValueError: If task names repeat, a dependency is unknown or the
+                dependencies contain a cycle
+        """
+        self.tasks = {}
+        for task in tasks:
+            if task.name in self.tasks:
+                raise ValueError(f"Duplicate ingestion task: {task.name}")
+            self.tasks[task.name] = task
+
+        for task in tasks:
+            unknown = [name for name in task.depends_on if name not in self.tasks]
+            if unknown:
+                raise ValueError(f"Task {task.name} depends on unknown task(s): {', '.join(unknown)}")
+
+        self._check_for_cycles()
+
+        self.max_workers = max(1, max_workers)
+        self.on_event = on_event
+        self.thread_initializer = thread_initializer
+        self.results: Dict[str, TaskResult] = {}
+
+    def _check_for_cycles(self):
+        """Raise ValueError if the dependency graph is not acyclic."""
+        visiting, visited = set(), set()
+
+        def visit(name: str, path: List[str]):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Ingestion task dependency cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dependency in self.tasks[name].depends_on:
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.tasks:
+            visit(name, [])
+
+    def _emit(self, event: str, name: str, result: Optional[TaskResult] = None):
+        """Forward a progress event to the callback, never failing the run."""
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(event, name, result)
+        except Exception as e:
+            logging.warning(f"Ingestion progress callback failed: {e}")
+
+    def _run_task(self, task: IngestionTask, inputs: Dict[str, Any]) -> TaskResult:
+        """Execute one task on a worker thread and time it."""
+        start = time.perf_counter()
+        try:
+            result = task.func(inputs)
+            outcome = TaskResult(task.name, 'succeeded', result=result, duration=time.perf_counter() - start)
+        except Exception as e:
+            logging.error(f"Ingestion task {task.name} failed: {e}")
+            outcome = TaskResult(task.name, 'failed', error=str(e), duration=time.perf_counter() - start)
+        TASK_SECONDS.observe(outcome.duration, framework=task.framework or 'none', task=task.name,
+                             status=outcome.status)
+        return outcome
+
+    def run(self) -> Dict[str, TaskResult]:
+        """
+        Run every task and wait for completion.
+
+        Returns:
+            Dictionary mapping task name to its TaskResult
+        """
+        pending = dict(self.tasks)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, initializer=self.thread_initializer) as executor:
+            while pending or running:
+                # Start or skip every task whose dependencies have all finished
+                for name, task in list(pending.items()):
+                    if any(dependency not in self.results for dependency in task.depends_on):
+                        continue
+
+                    failed = [d for d in task.depends_on if not self.results[d].succeeded]
+                    del pending[name]
+
+                    if failed and not task.run_if_dependencies_fail:
+                        result = TaskResult(name, 'skipped', error=f"dependency failed: {', '.join(failed)}")
+                        self.results[name] = result
+                        self._emit('skipped', name, result)
+                        continue
+
+                    inputs = {d: self.results[d].result for d in task.depends_on if self.results[d].succeeded}
+                    running[executor.submit(self._run_task, task, inputs)] = name
+                    self._emit('started', name)
+
+                if not running:
+                    # Skipped tasks may have unblocked others; re-scan
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result = future.result()
+                    self.results[name] = result
+                    self._emit(result.status, name, result)
+
+        return self.results
+
+    def framework_durations(self) -> Dict[str, float]:
+        """Total task time per framework, for tasks tagged with a framework."""
+        durations = {}
+        for name, result in self.results.items():
+            framework = self.tasks[name].framework
+            if framework:
+                durations[framework] = durations.get(framework, 0.0) + result.duration
+        return durations
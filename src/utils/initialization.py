@@ -9,22 +9,33 @@ framework data including complete citation tracking.
 
 Features:
 - Multi-framework automatic knowledge base initialization
+- Concurrent framework ingestion with a dependency graph (see ingestion_orchestrator)
 - STIX-based ATT&CK data ingestion
 - Document-based framework ingestion (CIS, NIST, HIPAA, FFIEC, PCI DSS)
-- Data existence validation and incremental updates
+- Resumable initialization driven by a per-framework ingestion manifest
 - Session state management
-- Progress tracking and user feedback
+- Progress tracking and user feedback through pluggable reporters (see progress)
 - Error handling and recovery
 - Complete schema implementation with citations
 - Cross-framework relationship mapping
+- Precomputed technique profiles (see technique_profiles)
+- Per-stage memory report when memory profiling is enabled (see memory_profiler)
 
 Functions:
-    initialize_knowledge_base: Main multi-framework initialization orchestrator
+    initialize_knowledge_base: Streamlit entry point for knowledge base initialization
+    build_knowledge_base: Headless multi-framework initialization orchestrator (concurrent)
     refresh_knowledge_base: Force refresh of all framework data
     ingest_individual_framework: Single framework ingestion
 """
 
+import time
+from typing import List, Optional, Tuple
 import streamlit as st
+from src.config.settings import (
+    INGESTION_MAX_WORKERS, MEMORY_PROFILE, MEMORY_PROFILE_TOP, MEMORY_PROFILE_FRAMES, MEMORY_PROFILE_PATH
+)
+from src.utils import memory_profiler, metrics
+from src.utils.ingestion_orchestrator import IngestionOrchestrator, IngestionTask
 from src.cybersecurity.attack_ingestion import AttackIngestion
 from src.cybersecurity.cis_ingestion import CISIngestion
 from src.cybersecurity.nist_ingestion import NISTIngestion
@@ -32,15 +43,34 @@ from src.cybersecurity.hipaa_ingestion import HIPAAIngestion
 from src.cybersecurity.ffiec_ingestion import FFIECIngestion
 from src.cybersecurity.pci_dss_ingestion import PCIDSSIngestion
 from src.knowledge_base.database import clear_knowledge_base
+from src.knowledge_base.repository import get_repository
+from src.knowledge_base.statistics import invalidate_statistics_cache
+from src.knowledge_base.technique_profiles import build_technique_profiles
+from src.utils.progress import ProgressReporter, StreamlitReporter
+from src.knowledge_base.ingestion_manifest import (
+    FRAMEWORK_MANIFEST_SPECS, PRE_MANIFEST_SCHEMA_VERSION, count_framework_nodes, delete_framework_nodes,
+    file_sha256, find_missing_sources, find_stale_frameworks, read_manifest, record_framework_ingestion,
+    text_sha256
+)
 
+# ATT&CK domains ingested into the knowledge base
+ATTACK_DOMAINS = ['enterprise']  # Can be expanded to include mobile, ics
 
-def initialize_knowledge_base(graph):
+# Frameworks whose nodes appear in technique profiles
+PROFILE_FRAMEWORKS = ('attack', 'cis', 'nist')
+
+ITEMS_PER_SECOND = metrics.gauge(
+    'ingestion_items_per_second', "Items a framework's ingester reported per second of its last run", ['framework']
+)
+
+
+def initialize_knowledge_base(graph, max_workers: int = INGESTION_MAX_WORKERS, reporter=None):
     """
     Initialize the comprehensive cybersecurity knowledge base with multi-framework support.
     
-    Checks for existing data and performs initialization for all supported frameworks
-    when necessary. Manages session state to prevent redundant initialization attempts
-    and provides detailed progress feedback to users.
+    Streamlit entry point around build_knowledge_base. Manages session state
+    to prevent redundant initialization attempts on reruns and reports
+    progress with Streamlit elements.
     
     Supported Frameworks:
     - MITRE ATT&CK (STIX-based ingestion)
@@ -52,116 +82,352 @@ def initialize_knowledge_base(graph):
     
     Args:
         graph: Neo4j database connection instance
+        max_workers: Number of ingestion tasks allowed to run at once
+        reporter: Progress reporter (defaults to StreamlitReporter)
     """
     # Skip if already initialized in current session
     if st.session_state.knowledge_base_initialized:
         return
     
-    with st.spinner("🔄 Initializing comprehensive cybersecurity knowledge base..."):
+    reporter = reporter or StreamlitReporter()
+    if MEMORY_PROFILE:
+        memory_profiler.enable(MEMORY_PROFILE_TOP, MEMORY_PROFILE_FRAMES)
+    
+    with reporter.stage("🔄 Initializing comprehensive cybersecurity knowledge base..."):
         try:
-            # Validate existing data in Neo4j database
-            check_query = "MATCH (n) RETURN count(n) as count"
-            result = graph.query(check_query)
-            existing_count = result[0]['count'] if result else 0
-            
-            if existing_count > 0:
-                st.info(f"📊 Knowledge base already contains {existing_count:,} nodes. Skipping initialization.")
-                st.session_state.knowledge_base_initialized = True
-                return
-            
-            # Initialize framework ingestion systems
-            st.info("🚀 Starting comprehensive multi-framework data ingestion...")
-            
-            total_stats = {}
-            success_count = 0
-            total_frameworks = 6
-            
-            # 1. ATT&CK Framework (STIX-based)
-            st.info("📡 Ingesting MITRE ATT&CK framework...")
-            attack_ingester = AttackIngestion()
-            domains = ['enterprise']  # Can be expanded to include mobile, ics
-            attack_stats = attack_ingester.run_full_ingestion(graph, domains)
-            total_stats['ATT&CK'] = attack_stats
-            success_count += 1
-            
-            # 2. CIS Controls v8.1
-            st.info("🛡️ Ingesting CIS Controls v8.1...")
-            cis_ingester = CISIngestion()
-            cis_success, cis_msg = cis_ingester.ingest_cis_data(graph)
-            if cis_success:
-                total_stats['CIS'] = cis_ingester.ingestion_stats
-                success_count += 1
-            else:
-                st.warning(f"CIS Controls ingestion: {cis_msg}")
-            
-            # 3. NIST Cybersecurity Framework 2.0
-            st.info("📋 Ingesting NIST Cybersecurity Framework 2.0...")
-            nist_ingester = NISTIngestion()
-            nist_success, nist_msg = nist_ingester.ingest_nist_data(graph)
-            if nist_success:
-                total_stats['NIST'] = nist_ingester.ingestion_stats
-                success_count += 1
-            else:
-                st.warning(f"NIST CSF ingestion: {nist_msg}")
-            
-            # 4. HIPAA Administrative Simplification
-            st.info("🏥 Ingesting HIPAA regulatory framework...")
-            hipaa_ingester = HIPAAIngestion()
-            hipaa_success, hipaa_msg = hipaa_ingester.ingest_hipaa_data(graph)
-            if hipaa_success:
-                total_stats['HIPAA'] = hipaa_ingester.ingestion_stats
-                success_count += 1
-            else:
-                st.warning(f"HIPAA ingestion: {hipaa_msg}")
-            
-            # 5. FFIEC IT Examination Handbook
-            st.info("🏦 Ingesting FFIEC examination procedures...")
-            ffiec_ingester = FFIECIngestion()
-            ffiec_success, ffiec_msg = ffiec_ingester.ingest_ffiec_data(graph)
-            if ffiec_success:
-                total_stats['FFIEC'] = ffiec_ingester.ingestion_stats
-                success_count += 1
-            else:
-                st.warning(f"FFIEC ingestion: {ffiec_msg}")
-            
-            # 6. PCI DSS v4.0.1
-            st.info("💳 Ingesting PCI DSS security standards...")
-            pci_ingester = PCIDSSIngestion()
-            pci_success, pci_msg = pci_ingester.ingest_pci_dss_data(graph)
-            if pci_success:
-                total_stats['PCI DSS'] = pci_ingester.ingestion_stats
-                success_count += 1
-            else:
-                st.warning(f"PCI DSS ingestion: {pci_msg}")
-            
-            # Display comprehensive results
-            st.success(f"✅ Successfully initialized {success_count}/{total_frameworks} cybersecurity frameworks!")
-            
-            # Show detailed breakdown
-            with st.expander("📊 Multi-Framework Ingestion Details"):
-                for framework, stats in total_stats.items():
-                    st.markdown(f"### {framework}")
-                    if isinstance(stats, dict):
-                        for stat_name, count in stats.items():
-                            if count > 0:
-                                st.write(f"- **{stat_name.replace('_', ' ').title()}**: {count:,}")
-                    else:
-                        st.write(f"- **Framework Status**: {stats}")
-            
-            # Create cross-framework relationships
-            if success_count >= 2:
-                st.info("🔗 Creating cross-framework relationships...")
-                _create_cross_framework_relationships(graph)
-            
+            build_knowledge_base(graph, reporter, max_workers)
+            # Frameworks that failed are retried on the next application start
             st.session_state.knowledge_base_initialized = True
-            st.balloons()  # Celebrate successful initialization
                 
         except Exception as e:
-            st.error(f"❌ Error during knowledge base initialization: {str(e)}")
-            st.info("💡 Please check your Neo4j connection and document availability, then try again.")
+            reporter.error(f"❌ Error during knowledge base initialization: {str(e)}")
+            reporter.info("💡 Please check your Neo4j connection and document availability, then try again.")
 
 
-def _create_cross_framework_relationships(graph):
+def build_knowledge_base(graph, reporter=None, max_workers: int = INGESTION_MAX_WORKERS,
+                         frameworks: Optional[List[str]] = None) -> Tuple[bool, str]:
+    """
+    Ingest every missing or stale framework into the knowledge base.
+    
+    Compares the ingestion manifest stored in the graph with the current
+    framework sources and ingests only the frameworks that are missing or
+    stale, so a partially failed initialization resumes where it stopped.
+    Runs without Streamlit, e.g. from the ingest.py command line tool.
+    
+    Frameworks are ingested concurrently. Fetching ATT&CK and parsing the
+    framework documents run side by side; document frameworks are written
+    once ATT&CK has loaded (ATT&CK ingestion starts from an empty graph and
+    the CIS/NIST mappings link to its mitigations), and cross-framework
+    relationships are created after every framework has finished.
+    
+    Args:
+        graph: Neo4j database connection instance
+        reporter: Progress reporter (defaults to logging)
+        max_workers: Number of ingestion tasks allowed to run at once
+        frameworks: Framework keys to consider (defaults to all)
+        
+    Returns:
+        tuple: (success_boolean, status_message); success is False if any framework failed
+        
+    Raises:
+        Exception: If the manifest cannot be read or ingestion cannot start
+    """
+    reporter = reporter or ProgressReporter()
+    ingesters = _create_ingesters(reporter)
+    source_hashes = _current_source_hashes(ingesters)
+    
+    # Validate existing data in Neo4j database against the ingestion manifest
+    manifest = read_manifest(graph)
+    if not manifest:
+        manifest = _adopt_existing_frameworks(graph, source_hashes)
+    
+    missing = find_missing_sources(source_hashes, frameworks)
+    if missing:
+        skipped = ", ".join(FRAMEWORK_MANIFEST_SPECS[framework]['name'] for framework in missing)
+        reporter.info(f"📄 Skipping {skipped}: source document not found in documents/")
+    
+    stale = find_stale_frameworks(manifest, source_hashes, frameworks)
+    if not stale:
+        total_nodes = sum(sum(entry['node_counts'].values()) for entry in manifest.values())
+        message = f"Knowledge base is up to date ({len(manifest)} frameworks, {total_nodes:,} nodes)"
+        reporter.info(f"📊 {message}. Skipping initialization.")
+        return True, message
+    
+    if 'attack' in stale:
+        # ATT&CK ingestion starts from an empty graph, so every framework with a source is rebuilt
+        stale = {
+            framework: stale.get(framework, 'rebuilt with ATT&CK')
+            for framework in FRAMEWORK_MANIFEST_SPECS
+            if source_hashes.get(framework) is not None
+        }
+    
+    if len(stale) < len(FRAMEWORK_MANIFEST_SPECS) - len(find_missing_sources(source_hashes)):
+        resumed = ", ".join(
+            f"{FRAMEWORK_MANIFEST_SPECS[framework]['name']} ({reason})"
+            for framework, reason in stale.items()
+        )
+        reporter.info(f"🔁 Resuming initialization for: {resumed}")
+    
+    # Initialize framework ingestion systems
+    reporter.info(f"🚀 Starting comprehensive multi-framework data ingestion ({max_workers} workers)...")
+    
+    started_at = time.perf_counter()
+    tasks = _build_ingestion_tasks(graph, ingesters, source_hashes, list(stale), reporter)
+    board = reporter.task_board([task.name for task in tasks])
+    orchestrator = IngestionOrchestrator(
+        tasks,
+        max_workers=max_workers,
+        on_event=lambda event, name, result: board.update(name, event, result.duration if result else None),
+        thread_initializer=reporter.thread_initializer()
+    )
+    results = orchestrator.run()
+    invalidate_statistics_cache()
+    
+    total_stats = {}
+    for task in tasks:
+        if task.name.endswith(' load') and results[task.name].succeeded:
+            total_stats[task.framework] = results[task.name].result
+    
+    success_count = len(total_stats)
+    total_frameworks = len({task.framework for task in tasks if task.framework})
+    elapsed = time.perf_counter() - started_at
+    
+    # Display comprehensive results
+    message = f"Successfully initialized {success_count}/{total_frameworks} cybersecurity frameworks in {elapsed:.1f}s"
+    reporter.success(f"✅ {message}!")
+    
+    for task in tasks:
+        result = results[task.name]
+        if not result.succeeded:
+            reporter.warning(f"{task.name}: {result.error}")
+    
+    # Show detailed breakdown
+    durations = orchestrator.framework_durations()
+    details = {}
+    for framework, stats in total_stats.items():
+        section = {'Ingestion Time': f"{durations.get(framework, 0.0):.1f}s"}
+        if isinstance(stats, dict) and durations.get(framework):
+            items = sum(count for count in stats.values() if isinstance(count, (int, float)))
+            ITEMS_PER_SECOND.set(items / durations[framework], framework=framework)
+        if isinstance(stats, dict):
+            for stat_name, count in stats.items():
+                if count > 0:
+                    section[stat_name.replace('_', ' ').title()] = f"{count:,}"
+        else:
+            section['Framework Status'] = stats
+        details[framework] = section
+    reporter.details("📊 Multi-Framework Ingestion Details", details)
+    _report_memory(reporter, list(stale))
+    
+    reporter.celebrate()  # Celebrate successful initialization
+    return success_count == total_frameworks, message
+
+
+def _report_memory(reporter, frameworks):
+    """
+    Report the stages recorded by the memory profiler, if it is enabled.
+    
+    The stages are also appended to MEMORY_PROFILE_PATH when it is set and
+    then cleared, so every ingestion run reports only its own stages.
+    
+    Args:
+        reporter: Progress reporter
+        frameworks: Framework keys ingested in the run
+    """
+    profiler = memory_profiler.current_profiler()
+    if profiler is None or not profiler.records():
+        return
+    reporter.details("🧠 Memory per Stage", profiler.details())
+    if MEMORY_PROFILE_PATH:
+        try:
+            profiler.export(MEMORY_PROFILE_PATH, frameworks=frameworks)
+        except OSError as e:
+            reporter.warning(f"⚠️ Could not write memory profile to {MEMORY_PROFILE_PATH}: {e}")
+    profiler.clear()
+
+
+def _create_ingesters(reporter=None):
+    """Create one ingester per framework, keyed like the ingestion manifest."""
+    return {
+        'attack': AttackIngestion(reporter),
+        'cis': CISIngestion(reporter),
+        'nist': NISTIngestion(reporter),
+        'hipaa': HIPAAIngestion(reporter),
+        'ffiec': FFIECIngestion(reporter),
+        'pci_dss': PCIDSSIngestion(reporter)
+    }
+
+
+def _source_hash(framework, ingester):
+    """
+    Hash the current source of a framework.
+    
+    Document frameworks hash their PDF. ATT&CK is fetched remotely, so its
+    hash covers the bundle URLs rather than their content; pulling a newer
+    ATT&CK release stays an explicit refresh.
+    
+    Args:
+        framework: Framework key
+        ingester: Ingester for the framework
+        
+    Returns:
+        str: Source hash, or None if the framework document is missing
+    """
+    if framework == 'attack':
+        urls = [f"{ingester.base_url}/{domain}-attack/{domain}-attack.json" for domain in ATTACK_DOMAINS]
+        return text_sha256("\n".join(urls))
+    return file_sha256(ingester.document_path)
+
+
+def _current_source_hashes(ingesters):
+    """Hash the current source of every framework, keyed by framework."""
+    return {framework: _source_hash(framework, ingester) for framework, ingester in ingesters.items()}
+
+
+def _adopt_existing_frameworks(graph, source_hashes):
+    """
+    Record manifest entries for a knowledge base populated before manifests existed.
+    
+    Frameworks that already have nodes are recorded with their node counts
+    under the pre-manifest schema version, so they come out stale and are
+    rebuilt by the current ingesters; frameworks without nodes are left out
+    so they get ingested.
+    
+    Args:
+        graph: Neo4j database connection instance
+        source_hashes: Current source hash per framework key
+        
+    Returns:
+        dict: The manifest after adoption
+    """
+    if get_repository(graph).count_nodes() == 0:
+        return {}
+    
+    for framework in FRAMEWORK_MANIFEST_SPECS:
+        if sum(count_framework_nodes(graph, framework).values()) > 0:
+            record_framework_ingestion(
+                graph, framework, source_hashes.get(framework), schema_version=PRE_MANIFEST_SCHEMA_VERSION
+            )
+    
+    return read_manifest(graph)
+
+
+def _build_ingestion_tasks(graph, ingesters, source_hashes, frameworks, reporter):
+    """
+    Build the ingestion dependency graph.
+    
+    Every framework is split into a database-free phase (download or
+    document parsing) and a load phase that writes to Neo4j:
+    
+        ATT&CK fetch -> ATT&CK load -> <framework> load -> Cross-framework links -> Technique profiles
+                        <framework> parse ---^
+    
+    Load tasks receive the output of their fetch/parse task as input and
+    record the framework in the ingestion manifest once they succeed. A
+    document load first deletes the framework's existing nodes, once its
+    document has parsed, so ids dropped from the document do not linger.
+    When ATT&CK is not part of the run, document loads only wait for their parse.
+    
+    Args:
+        graph: Neo4j database connection instance
+        ingesters: Ingesters from _create_ingesters
+        source_hashes: Current source hash per framework key
+        frameworks: Framework keys to ingest
+        reporter: Progress reporter
+        
+    Returns:
+        list: IngestionTask definitions for IngestionOrchestrator
+    """
+    tasks = []
+    
+    if 'attack' in frameworks:
+        attack_ingester = ingesters['attack']
+        
+        def fetch_attack(inputs):
+            stix_data = attack_ingester.fetch_attack_data(ATTACK_DOMAINS)
+            if not stix_data.get('objects'):
+                raise RuntimeError("No STIX data fetched")
+            return attack_ingester.process_attack_objects(stix_data)
+        
+        def load_attack(inputs):
+            stats = attack_ingester.ingest_to_neo4j(graph, inputs['ATT&CK fetch'])
+            record_framework_ingestion(graph, 'attack', source_hashes['attack'])
+            return stats
+        
+        tasks.append(IngestionTask('ATT&CK fetch', fetch_attack, framework='ATT&CK'))
+        tasks.append(IngestionTask('ATT&CK load', load_attack, depends_on=['ATT&CK fetch'], framework='ATT&CK'))
+    
+    cis = ingesters['cis']
+    nist = ingesters['nist']
+    hipaa = ingesters['hipaa']
+    ffiec = ingesters['ffiec']
+    pci = ingesters['pci_dss']
+    document_frameworks = [
+        ('cis', cis, cis._parse_cis_document, cis.ingest_cis_data),
+        ('nist', nist, nist._parse_nist_document, nist.ingest_nist_data),
+        ('hipaa', hipaa, hipaa._parse_hipaa_document, hipaa.ingest_hipaa_data),
+        ('ffiec', ffiec, ffiec._parse_ffiec_document, ffiec.ingest_ffiec_data),
+        ('pci_dss', pci, pci._parse_pci_dss_document, pci.ingest_pci_dss_data)
+    ]
+    
+    for key, ingester, parse, ingest in document_frameworks:
+        if key not in frameworks:
+            continue
+        framework = FRAMEWORK_MANIFEST_SPECS[key]['name']
+        
+        def load(inputs, key=key, framework=framework, ingester=ingester, parse=parse, ingest=ingest):
+            # A failed parse task is retried here, before anything is deleted
+            parsed_data = inputs.get(f"{framework} parse") or parse()
+            delete_framework_nodes(graph, key)
+            success, message = ingest(graph, parsed_data=parsed_data)
+            if not success:
+                raise RuntimeError(message)
+            record_framework_ingestion(graph, key, source_hashes.get(key))
+            return ingester.ingestion_stats
+        
+        # ATT&CK load clears the graph first, so writes wait for it whether or not it succeeded
+        depends_on = [f"{framework} parse"]
+        if 'attack' in frameworks:
+            depends_on.append('ATT&CK load')
+        
+        tasks.append(IngestionTask(f"{framework} parse", lambda inputs, parse=parse: parse(), framework=framework))
+        tasks.append(IngestionTask(
+            f"{framework} load", load,
+            depends_on=depends_on,
+            run_if_dependencies_fail=True,
+            framework=framework
+        ))
+    
+    load_tasks = [task.name for task in tasks if task.name.endswith(' load')]
+    
+    def link_frameworks(inputs):
+        # Only successful dependencies appear in inputs. On a resumed run the
+        # other frameworks are already in the graph, so one reload is enough to relink
+        loaded = len(inputs)
+        if loaded:
+            _create_cross_framework_relationships(graph, reporter)
+        return loaded
+    
+    tasks.append(IngestionTask(
+        'Cross-framework links', link_frameworks,
+        depends_on=load_tasks,
+        run_if_dependencies_fail=True
+    ))
+    
+    def build_profiles(inputs):
+        if inputs.get('Cross-framework links'):
+            return _build_technique_profiles(graph, reporter)
+        return 0
+    
+    tasks.append(IngestionTask(
+        'Technique profiles', build_profiles,
+        depends_on=['Cross-framework links']
+    ))
+    
+    return tasks
+
+
+def _create_cross_framework_relationships(graph, reporter):
     """
     Create relationships between different cybersecurity frameworks.
     
@@ -172,36 +438,57 @@ def _create_cross_framework_relationships(graph):
     
     Args:
         graph: Neo4j database connection instance
+        reporter: Progress reporter
     """
     try:
+        repository = get_repository(graph)
+        
         # Link ATT&CK techniques to CIS Controls (example relationships)
-        graph.query("""
-            MATCH (t:Technique)
-            WHERE t.name CONTAINS 'Network' OR t.name CONTAINS 'Access'
-            MATCH (c:CIS_Control {id: '1'})
-            MERGE (t)-[:MITIGATED_BY]->(c)
-        """)
+        repository.link('MITIGATED_BY', [
+            {'source': technique['id'], 'target': '1'}
+            for technique in repository.nodes('Technique', ['id', 'name'])
+            if 'Network' in (technique['name'] or '') or 'Access' in (technique['name'] or '')
+        ], 'Technique', 'id', 'CIS_Control', 'id')
         
         # Link NIST CSF categories to appropriate controls
-        graph.query("""
-            MATCH (cat:NIST_Category)
-            WHERE cat.id STARTS WITH 'PR.AC'
-            MATCH (c:CIS_Control {id: '5'})
-            MERGE (cat)-[:IMPLEMENTED_BY]->(c)
-        """)
+        repository.link('IMPLEMENTED_BY', [
+            {'source': category['id'], 'target': '5'}
+            for category in repository.nodes('NIST_Category', ['id'])
+            if (category['id'] or '').startswith('PR.AC')
+        ], 'NIST_Category', 'id', 'CIS_Control', 'id')
         
         # Link regulatory requirements to framework functions
-        graph.query("""
-            MATCH (r:HIPAA_Regulation)
-            WHERE r.title CONTAINS 'Security'
-            MATCH (f:NIST_Function {id: 'PR'})
-            MERGE (r)-[:ADDRESSES_FUNCTION]->(f)
-        """)
+        repository.link('ADDRESSES_FUNCTION', [
+            {'source': regulation['id'], 'target': 'PR'}
+            for regulation in repository.nodes('HIPAA_Regulation', ['id', 'title'])
+            if 'Security' in (regulation['title'] or '')
+        ], 'HIPAA_Regulation', 'id', 'NIST_Function', 'id')
         
-        st.success("✅ Cross-framework relationships created successfully!")
+        reporter.success("✅ Cross-framework relationships created successfully!")
+        
+    except Exception as e:
+        reporter.warning(f"⚠️ Cross-framework relationship creation encountered issues: {str(e)}")
+
+
+def _build_technique_profiles(graph, reporter):
+    """
+    Rebuild the precomputed technique profiles after the graph changed.
+    
+    Args:
+        graph: Neo4j database connection instance
+        reporter: Progress reporter
         
+    Returns:
+        int: Number of profiles built (0 if the build failed)
+    """
+    try:
+        count = build_technique_profiles(graph)
+        if count:
+            reporter.success(f"✅ Built {count:,} technique profiles")
+        return count
     except Exception as e:
-        st.warning(f"⚠️ Cross-framework relationship creation encountered issues: {str(e)}")
+        reporter.warning(f"⚠️ Technique profile build encountered issues: {str(e)}")
+        return 0
 
 
 def refresh_knowledge_base(graph):
@@ -234,55 +521,97 @@ def refresh_knowledge_base(graph):
         return False, f"Error during knowledge base refresh: {str(e)}"
 
 
-def ingest_individual_framework(graph, framework_name: str):
+def ingest_individual_framework(graph, framework_name: str, reporter=None):
     """
     Ingest data for a specific cybersecurity framework.
     
     Allows selective ingestion of individual frameworks without affecting
-    the rest of the knowledge base.
+    the rest of the knowledge base. A document framework's existing nodes
+    are deleted once its document has parsed, then loaded again.
     
     Args:
         graph: Neo4j database connection instance
         framework_name: Name of framework to ingest ('attack', 'cis', 'nist', 'hipaa', 'ffiec', 'pci_dss')
+        reporter: Progress reporter (defaults to logging)
         
     Returns:
         tuple: (success_boolean, status_message)
     """
     try:
         framework_name = framework_name.lower()
-        
+
         if framework_name == 'attack':
-            ingester = AttackIngestion()
-            stats = ingester.run_full_ingestion(graph, ['enterprise'])
-            return True, f"ATT&CK ingestion completed: {stats}"
-            
+            ingester = AttackIngestion(reporter)
+            stats = ingester.run_full_ingestion(graph, ATTACK_DOMAINS)
+            success, message = True, f"ATT&CK ingestion completed: {stats}"
+
         elif framework_name == 'cis':
-            ingester = CISIngestion()
-            return ingester.ingest_cis_data(graph)
-            
+            ingester = CISIngestion(reporter)
+            success, message = _reload_document_framework(
+                graph, framework_name, ingester._parse_cis_document, ingester.ingest_cis_data
+            )
+
         elif framework_name == 'nist':
-            ingester = NISTIngestion()
-            return ingester.ingest_nist_data(graph)
-            
+            ingester = NISTIngestion(reporter)
+            success, message = _reload_document_framework(
+                graph, framework_name, ingester._parse_nist_document, ingester.ingest_nist_data
+            )
+
         elif framework_name == 'hipaa':
-            ingester = HIPAAIngestion()
-            return ingester.ingest_hipaa_data(graph)
-            
+            ingester = HIPAAIngestion(reporter)
+            success, message = _reload_document_framework(
+                graph, framework_name, ingester._parse_hipaa_document, ingester.ingest_hipaa_data
+            )
+
         elif framework_name == 'ffiec':
-            ingester = FFIECIngestion()
-            return ingester.ingest_ffiec_data(graph)
-            
+            ingester = FFIECIngestion(reporter)
+            success, message = _reload_document_framework(
+                graph, framework_name, ingester._parse_ffiec_document, ingester.ingest_ffiec_data
+            )
+
         elif framework_name == 'pci_dss':
-            ingester = PCIDSSIngestion()
-            return ingester.ingest_pci_dss_data(graph)
-            
+            ingester = PCIDSSIngestion(reporter)
+            success, message = _reload_document_framework(
+                graph, framework_name, ingester._parse_pci_dss_document, ingester.ingest_pci_dss_data
+            )
+
         else:
             return False, f"Unknown framework: {framework_name}. Supported: attack, cis, nist, hipaa, ffiec, pci_dss"
-            
+
+        if success:
+            record_framework_ingestion(graph, framework_name, _source_hash(framework_name, ingester))
+            if framework_name in PROFILE_FRAMEWORKS:
+                _build_technique_profiles(graph, reporter or ProgressReporter())
+        invalidate_statistics_cache()
+        _report_memory(reporter or ProgressReporter(), [framework_name])
+
+        return success, message
+
     except Exception as e:
         return False, f"Error during {framework_name} ingestion: {str(e)}"
 
 
+def _reload_document_framework(graph, framework, parse, ingest):
+    """
+    Replace a document framework's nodes with a fresh load of its document.
+    
+    The document is parsed before anything is deleted, so a failed parse
+    leaves the existing nodes in place.
+    
+    Args:
+        graph: Neo4j database connection instance
+        framework: Framework key in FRAMEWORK_MANIFEST_SPECS
+        parse: Ingester method parsing the framework document
+        ingest: Ingester method loading parsed data into the graph
+        
+    Returns:
+        tuple: (success_boolean, status_message) from the ingester
+    """
+    parsed_data = parse()
+    delete_framework_nodes(graph, framework)
+    return ingest(graph, parsed_data=parsed_data)
+
+
 def reingest_attack_data(graph):
     """
     Legacy function for re-ingesting ATT&CK data.
@@ -0,0 +1,360 @@
+"""
+Memory Profiling Module
+
+This module measures memory per stage of work, e.g. parsing the ATT&CK STIX
+bundle, building its nodes and relationships, or writing them to the graph,
+so the stages that push small workers over their memory limit can be found
+and memory regressions tracked across releases.
+
+A stage records wall time, resident set size (RSS) at its start, end and
+peak (sampled by a background thread), the peak of memory traced by
+tracemalloc, and the source lines whose allocations were still alive when
+the stage ended. Profiling is opt-in (MEMORY_PROFILE): tracemalloc slows
+allocation down noticeably, so it only runs while a stage is active and
+stage() costs nothing when no profiler is enabled.
+
+tracemalloc and RSS are process-wide. A stage running while another one is
+active (nested, or on another thread) is flagged as overlapped; its figures
+include allocations made by the other stage.
+
+This module has no dependencies on the application settings, so the
+standalone data analyzer can use it too.
+
+Features:
+- Per-stage RSS start/end/peak and tracemalloc peak
+- Top allocation sites retained by each stage
+- Process-wide profiler with a no-op stage() when disabled
+- Per-stage breakdown for progress reporters and JSON lines export
+
+Classes:
+    StageMemory: Memory figures of one stage
+    MemoryProfiler: Records stages
+
+Functions:
+    rss_bytes: Current resident set size of the process
+    enable: Enable the process-wide profiler
+    disable: Disable the process-wide profiler
+    current_profiler: The process-wide profiler, or None
+    stage: Context manager recording a stage with the process-wide profiler
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+MB = 1024 * 1024
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# Allocations of the profiler itself are left out of the top sites
+_IGNORED_FILES = (tracemalloc.__file__, __file__, '<frozen importlib._bootstrap>', '<unknown>')
+
+
+def rss_bytes() -> int:
+    """
+    Resident set size of this process in bytes.
+
+    Reads /proc/self/statm; where it is missing the process-wide maximum
+    from getrusage is returned instead, which never goes down.
+    """
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _site(frames: tracemalloc.Traceback) -> str:
+    """Readable allocation site, innermost frame first, paths relative to the working directory."""
+    parts = []
+    # Tracebacks list the oldest frame first
+    for frame in reversed(frames):
+        filename = frame.filename
+        if filename.startswith(os.getcwd() + os.sep):
+            filename = os.path.relpath(filename)
+        elif 'site-packages' + os.sep in filename:
+            filename = filename.split('site-packages' + os.sep, 1)[1]
+        parts.append(f"{filename}:{frame.lineno}")
+    return " <- ".join(parts)
+
+
+@dataclass
+class StageMemory:
+    """
+    Memory figures of one stage.
+
+    Attributes:
+        stage: Stage name
+        seconds: Wall time
+        rss_start_mb: RSS when the stage started
+        rss_end_mb: RSS when the stage ended
+        rss_peak_mb: Highest RSS sampled during the stage
+        traced_peak_mb: Peak of memory allocated during the stage (tracemalloc)
+        retained_mb: Memory allocated during the stage and still alive at its end
+        overlapped: Whether another stage was active at the same time
+        top_sites: Allocation sites retaining the most memory, as
+            {'site', 'size_mb', 'count'}
+    """
+    stage: str
+    seconds: float
+    rss_start_mb: float
+    rss_end_mb: float
+    rss_peak_mb: float
+    traced_peak_mb: float
+    retained_mb: float
+    overlapped: bool = False
+    top_sites: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class _ActiveStage:
+    """Bookkeeping of a stage in progress."""
+
+    def __init__(self, name: str, traced_at_start: int, snapshot: Optional[tracemalloc.Snapshot]):
+        self.name = name
+        self.started_at = time.perf_counter()
+        self.rss_start = rss_bytes()
+        self.rss_peak = self.rss_start
+        self.traced_at_start = traced_at_start
+        self.snapshot = snapshot
+        self.overlapped = False
+
+
+class MemoryProfiler:
+    """
+    Records RSS and tracemalloc figures per stage.
+
+    tracemalloc is started when the first stage begins and stopped when the
+    last active stage ends, unless it was already tracing (e.g. through
+    PYTHONTRACEMALLOC), in which case it is left running. Before Python 3.9
+    the traced peak cannot be reset, so with tracing already running it
+    covers everything since tracing started.
+    """
+
+    def __init__(self, top: int = 10, frames: int = 1, interval: float = 0.01,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the profiler.
+
+        Args:
+            top: Allocation sites kept per stage
+            frames: Stack frames per allocation site (more frames show the callers)
+            interval: Seconds between RSS samples
+            logger: Logger receiving one line per finished stage
+        """
+        self.top = top
+        self.frames = max(frames, 1)
+        self.interval = interval
+        self.logger = logger or logging.getLogger(__name__)
+        self._records: List[StageMemory] = []
+        self._active: List[_ActiveStage] = []
+        self._owns_tracing = False
+        self._lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+
+    def _sample(self):
+        while not self._stop_sampling.wait(self.interval):
+            current = rss_bytes()
+            with self._lock:
+                for active in self._active:
+                    active.rss_peak = max(active.rss_peak, current)
+
+    def _begin(self, name: str) -> _ActiveStage:
+        with self._lock:
+            if not self._active:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(self.frames)
+                    self._owns_tracing = True
+                if hasattr(tracemalloc, 'reset_peak'):
+                    tracemalloc.reset_peak()
+                self._stop_sampling.clear()
+                self._sampler = threading.Thread(target=self._sample, name='memory-profiler', daemon=True)
+                self._sampler.start()
+            # A stage starting on a fresh trace needs no baseline snapshot
+            fresh = self._owns_tracing and not self._active
+            active = _ActiveStage(
+                name, tracemalloc.get_traced_memory()[0],
+                None if fresh else tracemalloc.take_snapshot()
+            )
+            for other in self._active:
+                other.overlapped = True
+            active.overlapped = bool(self._active)
+            self._active.append(active)
+            return active
+
+    def _end(self, active: _ActiveStage) -> StageMemory:
+        seconds = time.perf_counter() - active.started_at
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+        key_type = 'traceback' if self.frames > 1 else 'lineno'
+        if active.snapshot is None:
+            statistics = [stat for stat in snapshot.statistics(key_type) if stat.size > 0]
+            sizes = [(stat.traceback, stat.size, stat.count) for stat in statistics]
+        else:
+            statistics = snapshot.compare_to(active.snapshot, key_type)
+            sizes = sorted(
+                ((stat.traceback, stat.size_diff, stat.count_diff) for stat in statistics if stat.size_diff > 0),
+                key=lambda item: item[1], reverse=True
+            )
+        rss_end = rss_bytes()
+
+        with self._lock:
+            self._active.remove(active)
+            if not self._active:
+                self._stop_sampling.set()
+                if self._owns_tracing:
+                    tracemalloc.stop()
+                    self._owns_tracing = False
+
+        record = StageMemory(
+            stage=active.name,
+            seconds=round(seconds, 3),
+            rss_start_mb=round(active.rss_start / MB, 1),
+            rss_end_mb=round(rss_end / MB, 1),
+            rss_peak_mb=round(max(active.rss_peak, rss_end) / MB, 1),
+            traced_peak_mb=round(max(traced_peak - active.traced_at_start, 0) / MB, 1),
+            retained_mb=round(max(traced - active.traced_at_start, 0) / MB, 1),
+            overlapped=active.overlapped,
+            top_sites=[
+                {'site': _site(traceback), 'size_mb': round(size / MB, 2), 'count': count}
+                for traceback, size, count in sizes[:self.top]
+            ]
+        )
+        with self._lock:
+            self._records.append(record)
+        top_site = record.top_sites[0] if record.top_sites else None
+        self.logger.info(
+            f"Memory {record.stage}: RSS peak {record.rss_peak_mb} MB "
+            f"({record.rss_end_mb - record.rss_start_mb:+.1f} MB), traced peak {record.traced_peak_mb} MB, "
+            f"retained {record.retained_mb} MB in {record.seconds:.2f}s"
+            + (f"; top site {top_site['site']} ({top_site['size_mb']} MB)" if top_site else "")
+            + (" [overlapped]" if record.overlapped else "")
+        )
+        return record
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Record the memory use of a block.
+
+        Args:
+            name: Stage name
+        """
+        active = self._begin(name)
+        try:
+            yield
+        finally:
+            self._end(active)
+
+    def records(self) -> List[StageMemory]:
+        """Finished stages, oldest first."""
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        """Forget the finished stages."""
+        with self._lock:
+            self._records.clear()
+
+    def details(self, sites: int = 3) -> Dict[str, Dict[str, str]]:
+        """
+        Per-stage breakdown for ProgressReporter.details.
+
+        Args:
+            sites: Allocation sites listed per stage
+
+        Returns:
+            dict: Stage name to label/value pairs
+        """
+        sections = {}
+        for record in self.records():
+            section = {
+                'Time': f"{record.seconds:.1f}s",
+                'RSS Peak': f"{record.rss_peak_mb:,.1f} MB",
+                'RSS Change': f"{record.rss_end_mb - record.rss_start_mb:+,.1f} MB",
+                'Traced Peak': f"{record.traced_peak_mb:,.1f} MB",
+                'Retained': f"{record.retained_mb:,.1f} MB"
+            }
+            if record.top_sites:
+                section['Top Sites'] = "; ".join(
+                    f"{site['site']} ({site['size_mb']:,.1f} MB)" for site in record.top_sites[:sites]
+                )
+            if record.overlapped:
+                section['Overlapped'] = "yes"
+            sections[record.stage] = section
+        return sections
+
+    def export(self, path: str, **attributes: Any):
+        """
+        Append the finished stages to a JSON lines file, one line per run.
+
+        Args:
+            path: Output file
+            **attributes: Extra fields of the line, e.g. the release
+        """
+        line = {'timestamp': time.time(), **attributes, 'stages': [asdict(record) for record in self.records()]}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(line) + "\n")
+
+
+_profiler: Optional[MemoryProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def enable(top: int = 10, frames: int = 1) -> MemoryProfiler:
+    """
+    Enable the process-wide profiler used by stage().
+
+    Args:
+        top: Allocation sites kept per stage
+        frames: Stack frames per allocation site
+
+    Returns:
+        MemoryProfiler: The profiler, existing or new
+    """
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = MemoryProfiler(top=top, frames=frames)
+        return _profiler
+
+
+def disable():
+    """Disable the process-wide profiler."""
+    global _profiler
+    with _profiler_lock:
+        _profiler = None
+
+
+def current_profiler() -> Optional[MemoryProfiler]:
+    """The process-wide profiler, or None when profiling is disabled."""
+    return _profiler
+
+
+def stage(name: str):
+    """
+    Record a stage with the process-wide profiler; does nothing when it is disabled.
+
+    Args:
+        name: Stage name
+
+    Returns:
+        Context manager
+    """
+    profiler = _profiler
+    return profiler.stage(name) if profiler else nullcontext()
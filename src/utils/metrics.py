@@ -0,0 +1,294 @@
+"""
+Runtime Metrics Module
+
+This module keeps process-wide counters, gauges and histograms and exposes
+them in the Prometheus text exposition format: from a small HTTP endpoint
+started next to the Streamlit app (METRICS_PORT), or pushed to a Prometheus
+Pushgateway at the end of a headless ingestion run (METRICS_PUSHGATEWAY_URL).
+
+Metrics are declared at module level where they are recorded (chat
+pipeline, LLM gateway, Neo4j connection, ingestion) and registered here by
+name, so declaring the same metric twice returns the existing one.
+
+Features:
+- Labelled counters, gauges and histograms, safe to update from any thread
+- Prometheus text format rendering
+- Background /metrics HTTP endpoint
+- Pushgateway push for short-lived jobs
+
+Classes:
+    Counter: Monotonically increasing value per label set
+    Gauge: Value that can go up and down per label set
+    Histogram: Bucketed observations per label set
+    MetricsRegistry: Named metrics rendered together
+
+Functions:
+    counter: Declare a counter in the default registry
+    gauge: Declare a gauge in the default registry
+    histogram: Declare a histogram in the default registry
+    start_http_server: Serve the default registry on /metrics
+    push_to_gateway: Push the default registry to a Pushgateway
+"""
+
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from a fast index lookup to a slow LLM answer
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class holding one value (or value set) per label combination."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_text(self, key: Tuple[str, ...], extra: Iterable[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Exposition lines of the metric."""
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        """Add a non-negative amount."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Current value for a label set."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        return [f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down per label set."""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        """Set the value."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        """Add to the value."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        """Subtract from the value."""
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        """Current value for a label set."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        return [f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Bucketed observations per label set, with their count and sum."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][index] += 1
+                    break
+            state['count'] += 1
+            state['sum'] += value
+
+    def _samples(self):
+        lines = []
+        for key, state in self._values.items():
+            cumulative = 0
+            for bound, hits in zip(self.buckets, state['buckets']):
+                cumulative += hits
+                lines.append(f"{self.name}_bucket{self._label_text(key, [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {state['count']}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(state['sum'])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric, or return the one already registered under its name."""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Declare a counter in the default registry."""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Declare a gauge in the default registry."""
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    """Declare a histogram in the default registry."""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the application log
+        pass
+
+
+def start_http_server(port: int, address: str = '0.0.0.0',
+                      registry: MetricsRegistry = REGISTRY) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve metrics on http://address:port/metrics from a daemon thread.
+
+    Args:
+        port: TCP port
+        address: Interface to bind
+        registry: Metrics to serve
+
+    Returns:
+        ThreadingHTTPServer, or None if the port could not be bound
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    try:
+        server = ThreadingHTTPServer((address, port), handler)
+    except OSError as e:
+        logging.warning(f"Metrics endpoint not started on {address}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logging.info(f"Serving metrics on http://{address}:{port}/metrics")
+    return server
+
+
+def push_to_gateway(url: str, job: str, registry: MetricsRegistry = REGISTRY,
+                    timeout: float = 10.0) -> Tuple[bool, str]:
+    """
+    Replace the metrics of a job on a Prometheus Pushgateway.
+
+    Args:
+        url: Pushgateway base URL, e.g. http://pushgateway:9091
+        job: Job name the metrics are grouped under
+        registry: Metrics to push
+        timeout: Request timeout in seconds
+
+    Returns:
+        Tuple of (success_boolean, status_message)
+    """
+    import requests
+
+    target = f"{url.rstrip('/')}/metrics/job/{job}"
+    try:
+        response = requests.put(
+            target, data=registry.render().encode('utf-8'), headers={'Content-Type': CONTENT_TYPE}, timeout=timeout
+        )
+        response.raise_for_status()
+    except Exception as e:
+        return False, f"Failed to push metrics to {target}: {e}"
+    return True, f"Pushed metrics to {target}"
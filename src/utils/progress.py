@@ -0,0 +1,355 @@
+"""
+Ingestion Progress Reporting Module
+
+This module decouples knowledge base ingestion from the user interface.
+Ingesters and the initialization orchestrator report messages, progress
+bars and task status through a ProgressReporter, so the same ingestion code
+runs inside the Streamlit app or headless from the command line (e.g. a
+deployment job that pre-builds the graph).
+
+Features:
+- Logging reporter used when no reporter is given
+- Console reporter with timestamps and stage timings
+- JSON lines reporter for log aggregation
+- Streamlit reporter reproducing the in-app spinners, progress bars and status list
+- Thread-safe output for concurrent ingestion tasks
+
+Classes:
+    ProgressReporter: Base reporter writing to the logging module
+    ConsoleReporter: Human-readable terminal output
+    JSONReporter: One JSON object per event
+    StreamlitReporter: Streamlit elements
+
+Functions:
+    create_reporter: Build a reporter by name
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, TextIO
+
+
+class ProgressTracker:
+    """Progress bar handle returned by ProgressReporter.progress."""
+
+    # Report every 10% so headless logs stay short
+    STEP = 0.1
+
+    def __init__(self, reporter: 'ProgressReporter', label: str):
+        self.reporter = reporter
+        self.label = label
+        self._last_reported = -1.0
+
+    def update(self, fraction: float):
+        """Set the completed fraction (0.0 - 1.0)."""
+        fraction = min(max(fraction, 0.0), 1.0)
+        if fraction >= 1.0 or fraction - self._last_reported >= self.STEP:
+            self._last_reported = fraction
+            self.reporter._report_progress(self.label, fraction)
+
+    def close(self):
+        """Remove the progress bar once the work is done."""
+
+
+class TaskBoard:
+    """Status display for a set of named tasks, returned by ProgressReporter.task_board."""
+
+    def __init__(self, reporter: 'ProgressReporter', task_names: List[str]):
+        self.reporter = reporter
+        self.task_names = list(task_names)
+        self.finished = 0
+
+    def update(self, name: str, event: str, duration: Optional[float] = None):
+        """
+        Record a task event.
+
+        Args:
+            name: Task name
+            event: 'started', 'succeeded', 'failed' or 'skipped'
+            duration: Seconds the task ran, for finished tasks
+        """
+        if event != 'started':
+            self.finished += 1
+        self.reporter._report_task(name, event, duration, self.finished, len(self.task_names))
+
+
+class ProgressReporter:
+    """
+    Base progress reporter writing to the standard logging module.
+
+    Used by ingesters when no reporter is supplied, so library code never
+    depends on a particular user interface.
+    """
+
+    def info(self, message: str):
+        """Report an informational message."""
+        self._message('info', message)
+
+    def success(self, message: str):
+        """Report a completed step."""
+        self._message('success', message)
+
+    def warning(self, message: str):
+        """Report a recoverable problem."""
+        self._message('warning', message)
+
+    def error(self, message: str):
+        """Report a failure."""
+        self._message('error', message)
+
+    def progress(self, label: str) -> ProgressTracker:
+        """Start a progress bar for a long-running loop."""
+        return ProgressTracker(self, label)
+
+    @contextmanager
+    def stage(self, message: str):
+        """Report the start and end of a stage of work."""
+        started_at = time.perf_counter()
+        self._stage(message, 'started', None)
+        try:
+            yield
+        finally:
+            self._stage(message, 'finished', time.perf_counter() - started_at)
+
+    def task_board(self, task_names: List[str]) -> TaskBoard:
+        """Start a status display for orchestrated ingestion tasks."""
+        return TaskBoard(self, task_names)
+
+    def details(self, title: str, sections: Dict[str, Dict[str, Any]]):
+        """
+        Report a breakdown of results.
+
+        Args:
+            title: Heading for the breakdown
+            sections: Mapping of section name to label/value pairs
+        """
+        for section, values in sections.items():
+            summary = ", ".join(f"{label}: {value}" for label, value in values.items())
+            self.info(f"{title} - {section}: {summary}")
+
+    def celebrate(self):
+        """Mark the successful end of a run."""
+
+    def thread_initializer(self):
+        """Return a callable run in each ingestion worker thread, or None."""
+        return None
+
+    # Output hooks overridden by subclasses
+
+    def _message(self, level: str, message: str):
+        log_level = {'success': logging.INFO, 'info': logging.INFO,
+                     'warning': logging.WARNING, 'error': logging.ERROR}[level]
+        logging.log(log_level, message)
+
+    def _report_progress(self, label: str, fraction: float):
+        logging.info(f"{label}: {fraction:.0%}")
+
+    def _stage(self, message: str, status: str, duration: Optional[float]):
+        if status == 'started':
+            logging.info(message)
+        else:
+            logging.info(f"{message} finished in {duration:.1f}s")
+
+    def _report_task(self, name: str, event: str, duration: Optional[float], finished: int, total: int):
+        timing = f" ({duration:.1f}s)" if duration is not None else ""
+        logging.info(f"[{finished}/{total}] {name}: {event}{timing}")
+
+
+class ConsoleReporter(ProgressReporter):
+    """Human-readable progress output for terminals and CI logs."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def _write(self, text: str):
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        with self._lock:
+            self.stream.write(f"{timestamp} {text}\n")
+            self.stream.flush()
+
+    def _message(self, level: str, message: str):
+        prefix = {'warning': 'WARNING: ', 'error': 'ERROR: '}.get(level, '')
+        self._write(f"{prefix}{message}")
+
+    def _report_progress(self, label: str, fraction: float):
+        self._write(f"{label}: {fraction:.0%}")
+
+    def _stage(self, message: str, status: str, duration: Optional[float]):
+        if status == 'started':
+            self._write(message)
+        else:
+            self._write(f"{message} done in {duration:.1f}s")
+
+    def _report_task(self, name: str, event: str, duration: Optional[float], finished: int, total: int):
+        timing = f" in {duration:.1f}s" if duration is not None else ""
+        self._write(f"[{finished}/{total}] {name} {event}{timing}")
+
+    def details(self, title: str, sections: Dict[str, Dict[str, Any]]):
+        lines = [title]
+        for section, values in sections.items():
+            lines.append(f"  {section}")
+            lines.extend(f"    {label}: {value}" for label, value in values.items())
+        self._write("\n".join(lines))
+
+
+class JSONReporter(ProgressReporter):
+    """Structured progress output, one JSON object per line."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def _emit(self, event: str, **fields):
+        record = {'timestamp': datetime.now(timezone.utc).isoformat(), 'event': event, **fields}
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    @staticmethod
+    def _seconds(duration: Optional[float]) -> Optional[float]:
+        return round(duration, 3) if duration is not None else None
+
+    def _message(self, level: str, message: str):
+        self._emit('message', level=level, message=message)
+
+    def _report_progress(self, label: str, fraction: float):
+        self._emit('progress', label=label, fraction=round(fraction, 3))
+
+    def _stage(self, message: str, status: str, duration: Optional[float]):
+        self._emit('stage', stage=message, status=status, duration=self._seconds(duration))
+
+    def _report_task(self, name: str, event: str, duration: Optional[float], finished: int, total: int):
+        self._emit('task', task=name, status=event, duration=self._seconds(duration),
+                   finished=finished, total=total)
+
+    def details(self, title: str, sections: Dict[str, Dict[str, Any]]):
+        self._emit('details', title=title, sections=sections)
+
+
+class _StreamlitProgressTracker(ProgressTracker):
+    """Progress tracker backed by st.progress."""
+
+    def __init__(self, reporter: 'StreamlitReporter', label: str):
+        super().__init__(reporter, label)
+        self.bar = reporter.st.progress(0)
+
+    def update(self, fraction: float):
+        self.bar.progress(min(max(fraction, 0.0), 1.0))
+
+    def close(self):
+        self.bar.empty()
+
+
+class _StreamlitTaskBoard(TaskBoard):
+    """Progress bar and status list for orchestrated ingestion, updated from the main thread."""
+
+    STATUS_ICONS = {
+        'pending': '⏸️',
+        'started': '⏳',
+        'succeeded': '✅',
+        'failed': '❌',
+        'skipped': '⏭️'
+    }
+
+    def __init__(self, reporter: 'StreamlitReporter', task_names: List[str]):
+        super().__init__(reporter, task_names)
+        self.states = {name: ('pending', None) for name in self.task_names}
+        self.progress_bar = reporter.st.progress(0)
+        self.status_area = reporter.st.empty()
+        self._render()
+
+    def update(self, name: str, event: str, duration: Optional[float] = None):
+        self.states[name] = (event, duration)
+        finished = sum(1 for state, _ in self.states.values() if state not in ('pending', 'started'))
+        self.progress_bar.progress(finished / len(self.task_names))
+        self._render()
+
+    def _render(self):
+        lines = []
+        for name in self.task_names:
+            state, duration = self.states[name]
+            timing = f" ({duration:.1f}s)" if duration is not None else ""
+            lines.append(f"{self.STATUS_ICONS[state]} {name}{timing}")
+        self.status_area.markdown("  \n".join(lines))
+
+
+class StreamlitReporter(ProgressReporter):
+    """Progress output rendered with Streamlit elements in the running app."""
+
+    def __init__(self):
+        import streamlit as st
+        self.st = st
+
+    def _message(self, level: str, message: str):
+        getattr(self.st, level)(message)
+
+    def progress(self, label: str) -> ProgressTracker:
+        return _StreamlitProgressTracker(self, label)
+
+    @contextmanager
+    def stage(self, message: str):
+        with self.st.spinner(message):
+            yield
+
+    def task_board(self, task_names: List[str]) -> TaskBoard:
+        return _StreamlitTaskBoard(self, task_names)
+
+    def details(self, title: str, sections: Dict[str, Dict[str, Any]]):
+        with self.st.expander(title):
+            for section, values in sections.items():
+                self.st.markdown(f"### {section}")
+                for label, value in values.items():
+                    self.st.write(f"- **{label}**: {value}")
+
+    def celebrate(self):
+        self.st.balloons()
+
+    def thread_initializer(self):
+        """
+        Attach the Streamlit script context to worker threads.
+
+        Without the context, st.* calls made from a worker thread are dropped.
+        """
+        try:
+            from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+        except ImportError:
+            return None
+
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+        return lambda: add_script_run_ctx(threading.current_thread(), ctx)
+
+
+REPORTERS = {
+    'log': ProgressReporter,
+    'console': ConsoleReporter,
+    'json': JSONReporter,
+    'streamlit': StreamlitReporter
+}
+
+
+def create_reporter(name: str) -> ProgressReporter:
+    """
+    Build a progress reporter by name.
+
+    Args:
+        name: One of 'log', 'console', 'json' or 'streamlit'
+
+    Returns:
+        ProgressReporter instance
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    try:
+        return REPORTERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown progress reporter: {name}. Supported: {', '.join(REPORTERS)}")
@@ -0,0 +1,293 @@
+"""
+Request Tracing Module
+
+This module records nested timing spans for one chat turn: query analysis,
+each knowledge base search, context packing and response generation. Spans
+carry attributes (sizes, labels, outcomes) and counters (Neo4j queries, rows
+returned, LLM calls, cache hits) that roll up into every enclosing span, so
+the root span of a turn holds its totals.
+
+The current span travels in a context variable, which asyncio tasks copy
+(and worker threads receive when started with a copied context, as the chat
+pipeline does), so work started from a span on another thread or task is
+recorded beneath it. Code outside any span pays only a context
+variable lookup.
+
+Finished traces can be exported as OpenTelemetry OTLP/JSON lines (readable
+by the OpenTelemetry Collector's otlpjsonfile receiver) or as one JSON log
+record per trace; the chat UI also shows the latest turn's breakdown.
+
+Features:
+- Nested spans with attributes, roll-up counters and error status
+- Propagation across asyncio tasks and worker threads
+- OTLP/JSON file and JSON log exporters (TRACE_EXPORT)
+- Flat per-span breakdown for display
+
+Classes:
+    Span: One timed operation
+    Trace: The spans of one root operation
+
+Functions:
+    span: Context manager recording a span
+    child_span: Span recorded only within an active trace
+    current_span: Span active in the calling context
+    count: Add to a counter of the current span and its ancestors
+    annotate: Set attributes on the current span
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.settings import TRACE_EXPORT, TRACE_EXPORT_PATH
+
+SERVICE_NAME = "cybersecurity-assistant"
+
+_current: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+_counter_lock = threading.Lock()
+_export_lock = threading.Lock()
+
+
+class Span:
+    """
+    One timed operation within a trace.
+
+    Attributes:
+        name: Operation name
+        trace: Trace the span belongs to
+        parent: Enclosing span, None for the root
+        span_id: 16 hex digit span identifier
+        attributes: Descriptive values set by the instrumented code
+        counters: Counts of this span including its descendants
+        start_ns, end_ns: Wall-clock start and end in epoch nanoseconds
+        error: Exception message if the operation failed
+    """
+
+    def __init__(self, name: str, trace: 'Trace', parent: Optional['Span'], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.span_id = os.urandom(8).hex()
+        self.attributes = dict(attributes)
+        self.counters: Dict[str, float] = {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._started_at = time.perf_counter()
+        self.duration = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Number of enclosing spans."""
+        depth, parent = 0, self.parent
+        while parent is not None:
+            depth, parent = depth + 1, parent.parent
+        return depth
+
+    def set(self, **attributes):
+        """Set attributes of the span."""
+        self.attributes.update(attributes)
+
+    def count(self, key: str, amount: float = 1):
+        """Add to a counter of this span and every enclosing span."""
+        with _counter_lock:
+            span = self
+            while span is not None:
+                span.counters[key] = span.counters.get(key, 0) + amount
+                span = span.parent
+
+    def finish(self):
+        """Record the end time."""
+        self.duration = time.perf_counter() - self._started_at
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+
+
+class Trace:
+    """The finished spans of one root operation, in end order."""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """
+        Flat list of spans for display, each followed by its children in start order.
+
+        Returns:
+            list: {'span' (indented name), 'ms', 'db_queries', 'db_rows', 'details'}
+        """
+        children: Dict[Optional[str], List[Span]] = {}
+        for span in sorted(self.spans, key=lambda span: span.start_ns):
+            children.setdefault(span.parent.span_id if span.parent else None, []).append(span)
+
+        ordered, pending = [], list(reversed(children.get(None, [])))
+        while pending:
+            span = pending.pop()
+            ordered.append(span)
+            pending.extend(reversed(children.get(span.span_id, [])))
+
+        rows = []
+        for span in ordered:
+            details = {**span.attributes, **{key: value for key, value in span.counters.items()
+                                             if not key.startswith('db.')}}
+            rows.append({
+                'span': "  " * span.depth + span.name,
+                'ms': round(span.duration * 1000, 1),
+                'db_queries': int(span.counters.get('db.queries', 0)),
+                'db_rows': int(span.counters.get('db.rows', 0)),
+                'details': ", ".join(f"{key}={value}" for key, value in details.items())
+            })
+        return rows
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Trace as an OTLP/JSON ExportTraceServiceRequest."""
+        return {'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': SERVICE_NAME})},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [{
+                    'traceId': self.trace_id,
+                    'spanId': span.span_id,
+                    'parentSpanId': span.parent.span_id if span.parent else '',
+                    'name': span.name,
+                    'kind': 1,
+                    'startTimeUnixNano': str(span.start_ns),
+                    'endTimeUnixNano': str(span.end_ns),
+                    'attributes': _otlp_attributes({**span.attributes, **span.counters}),
+                    'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+                } for span in self.spans]
+            }]
+        }]}
+
+    def to_log_record(self) -> Dict[str, Any]:
+        """Trace as one flat JSON log record."""
+        return {
+            'trace_id': self.trace_id,
+            'name': self.root.name if self.root else None,
+            'duration_ms': round(self.root.duration * 1000, 1) if self.root else None,
+            'spans': [{
+                'name': span.name,
+                'span_id': span.span_id,
+                'parent_id': span.parent.span_id if span.parent else None,
+                'duration_ms': round(span.duration * 1000, 3),
+                'attributes': span.attributes,
+                'counters': span.counters,
+                'error': span.error
+            } for span in self.spans]
+        }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_otlp_value(item) for item in value]}}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def export_trace(trace: Trace, mode: str = TRACE_EXPORT, path: str = TRACE_EXPORT_PATH):
+    """
+    Export a finished trace.
+
+    Args:
+        trace: Trace to export
+        mode: 'otlp' appends an OTLP/JSON line to ``path``, 'log' writes a
+            JSON record to the 'tracing' logger, anything else does nothing
+        path: OTLP/JSON output file
+    """
+    try:
+        if mode == 'otlp':
+            line = json.dumps(trace.to_otlp(), default=str)
+            with _export_lock:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(path, 'a', encoding='utf-8') as file:
+                    file.write(line + "\n")
+        elif mode == 'log':
+            logging.getLogger('tracing').info(json.dumps(trace.to_log_record(), default=str))
+    except Exception as e:
+        logging.warning(f"Trace export failed: {e}")
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Record a span around a block.
+
+    A span opened outside any other span starts a new trace, which is
+    exported when the span ends.
+
+    Args:
+        name: Operation name
+        **attributes: Initial attributes
+
+    Yields:
+        Span: The running span, for setting attributes and counters
+    """
+    parent = _current.get()
+    trace = parent.trace if parent else Trace()
+    current = Span(name, trace, parent, attributes)
+    if parent is None:
+        trace.root = current
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.finish()
+        trace.spans.append(current)
+        if parent is None:
+            export_trace(trace)
+
+
+@contextmanager
+def child_span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Record a span only when called within an active trace.
+
+    Used by shared lower layers (such as the LLM gateway) that also serve
+    untraced work like document ingestion; outside a trace the yielded span
+    is discarded.
+    """
+    if _current.get() is None:
+        yield Span(name, Trace(), None, attributes)
+        return
+    with span(name, **attributes) as current:
+        yield current
+
+
+def current_span() -> Optional[Span]:
+    """Span active in the calling context, or None."""
+    return _current.get()
+
+
+def count(key: str, amount: float = 1):
+    """Add to a counter of the current span and its ancestors; a no-op outside spans."""
+    current = _current.get()
+    if current is not None:
+        current.count(key, amount)
+
+
+def annotate(**attributes):
+    """Set attributes on the current span; a no-op outside spans."""
+    current = _current.get()
+    if current is not None:
+        current.set(**attributes)
@@ -5,11 +5,27 @@ import streamlit as st
 
 from src.knowledge_base.graph_operations import (
     get_context_from_knowledge_base, get_selective_context_from_knowledge_base, 
-    get_framework_aware_context, get_attack_statistics, get_techniques_by_tactic, 
+    get_attack_statistics, get_techniques_by_tactic, 
     get_threat_group_techniques, search_by_technique_id, get_all_tactics, get_all_threat_groups
 )
-from src.api.llm_service import chat_with_knowledge_base, analyze_user_query
+from src.knowledge_base.statistics import get_knowledge_base_statistics
+from src.api.chat_pipeline import ChatPipeline
 from src.utils.initialization import refresh_knowledge_base, ingest_individual_framework
+from src.utils.progress import StreamlitReporter
+
+def _context_usage(context):
+    """Summarize the token usage of an assembled chat context."""
+    return (f"🧮 Context: ~{context.tokens_used:,}/{context.token_budget:,} tokens, "
+            f"{context.included}/{context.candidates} matches")
+
+def _stage_timings(result):
+    """Summarize the per-stage timings of a chat pipeline run."""
+    stages = " · ".join(
+        f"{stage.replace('_', ' ')} {seconds:.2f}s"
+        for stage, seconds in result.timings.items() if stage != 'total'
+    )
+    speculation = f" (speculative search {result.speculation})" if result.speculation else ""
+    return f"⏱️ {stages} · total {result.timings['total']:.2f}s{speculation}"
 
 def chat_tab(graph, llm):
     """Display the chat tab for interacting with the multi-framework cybersecurity AI assistant."""
@@ -55,69 +71,29 @@ def chat_tab(graph, llm):
         st.session_state.messages.append({"role": "user", "content": user_input})
         
         # Get AI response based on selected search mode and framework scope
+        pipeline = ChatPipeline(graph, llm)
         with st.spinner(f"Analyzing {framework_scope} cybersecurity data..."):
             if search_mode == "Smart Selective Search":
-                # Step 1: Analyze the user query to determine relevant object types within framework scope
-                with st.spinner(f"🔍 Analyzing your question for {framework_scope}..."):
-                    query_analysis = analyze_user_query(llm, user_input, framework_scope)
-                
-                # Step 2: Get selective context from the knowledge base with framework filtering
-                with st.spinner(f"📊 Searching {', '.join(query_analysis['relevant_types'])} in {framework_scope}..."):
-                    context = get_framework_aware_context(
-                        graph, 
-                        query_analysis['keywords'], 
-                        query_analysis['relevant_types'],
-                        framework_scope
-                    )
+                # Query analysis runs alongside a speculative search of the raw question
+                result = pipeline.run_sync(user_input, framework_scope)
+                query_analysis = result.analysis
                 
-                # Step 3: Generate framework-specific response using LLM
-                with st.spinner("🤖 Generating framework-specific response..."):
-                    response = chat_with_knowledge_base(llm, context, user_input, framework_scope)
-                    
                 # Add analysis info to response (for transparency)
-                analysis_info = f"\n\n---\n*🎯 Framework: {framework_scope}*\n*🔍 Query Focus: {query_analysis['focus']}*\n*� Searched: {', '.join(query_analysis['relevant_types'])}*\n*📝 Keywords: {', '.join(query_analysis['keywords'])}*"
-                response = response + analysis_info
+                analysis_info = f"\n\n---\n*🎯 Framework: {framework_scope}*\n*🔍 Query Focus: {query_analysis['focus']}*\n*� Searched: {', '.join(result.relevant_types)}*\n*📝 Keywords: {', '.join(result.keywords)}*\n*{_context_usage(result.context)}*\n*{_stage_timings(result)}*"
+                response = result.response + analysis_info
                 
             else:  # Comprehensive Search
                 # Use comprehensive search across ALL object types within framework scope
-                with st.spinner(f"📊 Searching ALL {framework_scope} object types comprehensively..."):
-                    # For comprehensive search, include all possible object types for the framework
-                    if framework_scope == "ATT&CK Only":
-                        all_types = ["techniques", "malware", "threat_groups", "tools", "mitigations", "data_sources", "campaigns"]
-                    elif framework_scope == "CIS Controls":
-                        all_types = ["cis_controls", "cis_safeguards", "implementation_groups"]
-                    elif framework_scope == "NIST CSF":
-                        all_types = ["nist_functions", "nist_categories", "nist_subcategories"]
-                    elif framework_scope == "HIPAA":
-                        all_types = ["hipaa_regulations", "hipaa_sections", "hipaa_requirements"]
-                    elif framework_scope == "FFIEC":
-                        all_types = ["ffiec_categories", "ffiec_procedures", "ffiec_guidance"]
-                    elif framework_scope == "PCI DSS":
-                        all_types = ["pci_requirements", "pci_procedures", "pci_controls"]
-                    else:  # All Frameworks
-                        all_types = ["techniques", "malware", "threat_groups", "tools", "mitigations", 
-                                   "cis_controls", "cis_safeguards", "nist_functions", "nist_categories",
-                                   "hipaa_regulations", "hipaa_sections", "pci_requirements"]
-                    
-                    # Extract keywords from user input for comprehensive search
-                    keywords = [word.strip() for word in user_input.split() if len(word.strip()) > 2][:5]
-                    
-                    context = get_framework_aware_context(
-                        graph, 
-                        keywords,
-                        all_types,
-                        framework_scope
-                    )
-                
-                with st.spinner("🤖 Generating comprehensive response..."):
-                    response = chat_with_knowledge_base(llm, context, user_input, framework_scope)
+                result = pipeline.run_sync(user_input, framework_scope, comprehensive=True)
+                all_types = result.relevant_types
                     
                 # Add framework info to response
-                framework_info = f"\n\n---\n*🎯 Framework: {framework_scope}*\n*🔍 Search Mode: Comprehensive (all {len(all_types)} object types)*\n*📊 Object Types: {', '.join(all_types)}*"
-                response = response + framework_info
+                framework_info = f"\n\n---\n*🎯 Framework: {framework_scope}*\n*🔍 Search Mode: Comprehensive (all {len(all_types)} object types)*\n*📊 Object Types: {', '.join(all_types)}*\n*{_context_usage(result.context)}*\n*{_stage_timings(result)}*"
+                response = result.response + framework_info
         
         # Add assistant response to chat history
         st.session_state.messages.append({"role": "assistant", "content": response})
+        st.session_state.last_trace = result.trace
         
         # Rerun to update the chat display
         st.rerun()
@@ -141,40 +117,26 @@ def knowledge_base_tab(graph):
     # Statistics section
     with st.expander("📊 Knowledge Base Statistics", expanded=True):
         try:
+            # One cached query serves every framework view
+            counts = get_knowledge_base_statistics(graph)['labels']
+            
             if selected_framework == "All Frameworks":
-                # Get comprehensive multi-framework statistics
-                stats = get_attack_statistics(graph)
-                
-                # Add queries for other frameworks with correct labels
-                try:
-                    cis_stats = graph.query("MATCH (n:CIS_Control) RETURN count(n) as count")[0]['count']
-                except:
-                    cis_stats = 0
-                try:
-                    nist_stats = graph.query("MATCH (n:NIST_Function) RETURN count(n) as count")[0]['count']
-                except:
-                    nist_stats = 0
-                try:
-                    hipaa_stats = graph.query("MATCH (n:HIPAA_Regulation) RETURN count(n) as count")[0]['count']
-                except:
-                    hipaa_stats = 0
-                
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("ATT&CK Techniques", stats.get('techniques', 0))
-                    st.metric("Threat Groups", stats.get('threat_groups', 0))
+                    st.metric("ATT&CK Techniques", counts['Technique'])
+                    st.metric("Threat Groups", counts['ThreatGroup'])
                 
                 with col2:
-                    st.metric("CIS Controls", cis_stats)
-                    st.metric("ATT&CK Malware", stats.get('malware', 0))
+                    st.metric("CIS Controls", counts['CIS_Control'])
+                    st.metric("ATT&CK Malware", counts['Malware'])
                 
                 with col3:
-                    st.metric("NIST Functions", nist_stats)
-                    st.metric("ATT&CK Tools", stats.get('tools', 0))
+                    st.metric("NIST Functions", counts['NIST_Function'])
+                    st.metric("ATT&CK Tools", counts['Tool'])
                 
                 with col4:
-                    st.metric("HIPAA Regulations", hipaa_stats)
-                    st.metric("ATT&CK Tactics", stats.get('tactics', 0))
+                    st.metric("HIPAA Regulations", counts['HIPAA_Regulation'])
+                    st.metric("ATT&CK Tactics", counts['Tactic'])
                     
             elif selected_framework == "ATT&CK":
                 stats = get_attack_statistics(graph)
@@ -192,44 +154,26 @@ def knowledge_base_tab(graph):
                     st.metric("Tactics", stats.get('tactics', 0))
                     st.metric("Relationships", stats.get('relationships', 0))
                     
-            elif selected_framework == "CIS Controls":
-                try:
-                    cis_stats = graph.query("MATCH (n:CIS_Control) RETURN count(n) as count")[0]['count']
-                    safeguards_stats = graph.query("MATCH (n:CIS_Safeguard) RETURN count(n) as count")[0]['count']
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("CIS Controls", cis_stats)
-                    with col2:
-                        st.metric("Safeguards", safeguards_stats)
-                except:
-                    st.info("CIS Controls data not available")
-                    
-            elif selected_framework == "NIST CSF":
-                try:
-                    functions_stats = graph.query("MATCH (n:NIST_Function) RETURN count(n) as count")[0]['count']
-                    categories_stats = graph.query("MATCH (n:NIST_Category) RETURN count(n) as count")[0]['count']
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("Functions", functions_stats)
-                    with col2:
-                        st.metric("Categories", categories_stats)
-                except:
-                    st.info("NIST CSF data not available")
-                    
-            elif selected_framework == "HIPAA":
-                try:
-                    regulations_stats = graph.query("MATCH (n:HIPAA_Regulation) RETURN count(n) as count")[0]['count']
-                    sections_stats = graph.query("MATCH (n:HIPAA_Section) RETURN count(n) as count")[0]['count']
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("Regulations", regulations_stats)
-                    with col2:
-                        st.metric("Sections", sections_stats)
-                except:
-                    st.info("HIPAA data not available")
-                    
             else:
-                st.info(f"Statistics for {selected_framework} not yet implemented")
+                framework_metrics = {
+                    "CIS Controls": [("CIS Controls", 'CIS_Control'), ("Safeguards", 'CIS_Safeguard')],
+                    "NIST CSF": [("Functions", 'NIST_Function'), ("Categories", 'NIST_Category'),
+                                 ("Subcategories", 'NIST_Subcategory')],
+                    "HIPAA": [("Regulations", 'HIPAA_Regulation'), ("Sections", 'HIPAA_Section'),
+                              ("Requirements", 'HIPAA_Requirement')],
+                    "FFIEC": [("Sections", 'FFIEC_Section'), ("Procedures", 'FFIEC_Procedure'),
+                              ("Examination Steps", 'FFIEC_ExaminationStep')],
+                    "PCI DSS": [("Requirements", 'PCI_DSS_Requirement'), ("Sub-Requirements", 'PCI_DSS_SubRequirement'),
+                                ("Testing Procedures", 'PCI_DSS_TestingProcedure')]
+                }[selected_framework]
+                
+                if any(counts[label] for _, label in framework_metrics):
+                    columns = st.columns(len(framework_metrics))
+                    for column, (title, label) in zip(columns, framework_metrics):
+                        with column:
+                            st.metric(title, counts[label])
+                else:
+                    st.info(f"{selected_framework} data not available")
                 
         except Exception as e:
             st.error(f"Error loading statistics: {e}")
@@ -268,6 +212,32 @@ def knowledge_base_tab(graph):
                             malware_list = [malware for malware in result['malware'] if malware]
                             if malware_list:
                                 st.markdown(f"**Associated Malware:** {', '.join(malware_list)}")
+                        
+                        if result.get('parent'):
+                            st.markdown(f"**Sub-technique of:** {result['parent']['technique_id']} - {result['parent']['name']}")
+                        
+                        if result.get('sub_techniques'):
+                            sub_techniques = [f"{sub['technique_id']} - {sub['name']}" for sub in result['sub_techniques']]
+                            st.markdown(f"**Sub-techniques:** {', '.join(sub_techniques)}")
+                        
+                        tools = [s['name'] for s in result.get('software', []) if s['type'] == 'Tool']
+                        if tools:
+                            st.markdown(f"**Associated Tools:** {', '.join(tools)}")
+                        
+                        if result.get('mitigations'):
+                            mitigations = [f"{m['mitigation_id']} - {m['name']}" for m in result['mitigations']]
+                            st.markdown(f"**Mitigations:** {', '.join(mitigations)}")
+                        
+                        data_sources = result.get('data_sources', []) + result.get('data_components', [])
+                        if data_sources:
+                            st.markdown(f"**Data Sources:** {', '.join(dict.fromkeys(data_sources))}")
+                        
+                        if result.get('cis_safeguards') or result.get('cis_controls'):
+                            cis_ids = [item['id'] for item in result.get('cis_controls', []) + result.get('cis_safeguards', [])]
+                            st.markdown(f"**CIS Controls:** {', '.join(cis_ids)}")
+                        
+                        if result.get('nist_subcategories'):
+                            st.markdown(f"**NIST CSF Subcategories:** {', '.join(n['id'] for n in result['nist_subcategories'])}")
                     else:
                         st.warning(f"Technique {technique_id} not found.")
                 except Exception as e:
@@ -330,6 +300,7 @@ def sidebar_components(graph):
     st.sidebar.markdown("### � Knowledge Base Info")
     
     try:
+        # Served from the same cached statistics as the explorer
         stats = get_attack_statistics(graph)
         st.sidebar.markdown(f"**Techniques:** {stats.get('techniques', 0)}")
         st.sidebar.markdown(f"**Threat Groups:** {stats.get('threat_groups', 0)}")
@@ -339,6 +310,36 @@ def sidebar_components(graph):
         st.sidebar.error("Could not load statistics.")
 
     st.sidebar.markdown("---")
+
+    trace = st.session_state.get("last_trace")
+    if trace and trace.root:
+        totals = trace.root.counters
+        with st.sidebar.expander(f"⏱️ Last Answer: {trace.root.duration:.2f}s", expanded=False):
+            st.caption(
+                f"{int(totals.get('db.queries', 0))} Neo4j queries · {int(totals.get('db.rows', 0))} rows · "
+                f"{int(totals.get('llm.calls', 0))} LLM calls"
+            )
+            st.dataframe(trace.breakdown(), hide_index=True, use_container_width=True)
+        st.sidebar.markdown("---")
+
+    profiler = getattr(graph, 'profiler', None)
+    if profiler:
+        with st.sidebar.expander("🐢 Slowest Query Shapes", expanded=False):
+            shapes = profiler.shapes(order_by='total_s', limit=10)
+            if shapes:
+                st.dataframe([{
+                    'id': stats['shape_id'],
+                    'shape': stats['shape'],
+                    'calls': stats['count'],
+                    'total ms': round(stats['total_s'] * 1000, 1),
+                    'max ms': round(stats['max_s'] * 1000, 1),
+                    'rows': stats['rows'],
+                    'slow': stats['slow'],
+                    'db hits': stats['plan']['db_hits'] if stats['plan'] and stats['plan']['mode'] == 'PROFILE' else None
+                } for stats in shapes], hide_index=True, use_container_width=True)
+            else:
+                st.caption("No queries recorded yet.")
+        st.sidebar.markdown("---")
     
     # Multi-framework data management
     st.sidebar.subheader("🔧 Data Management")
@@ -366,7 +367,9 @@ def sidebar_components(graph):
                         "FFIEC": "ffiec",
                         "PCI DSS": "pci_dss"
                     }
-                    success, msg = ingest_individual_framework(graph, framework_map[selected_framework])
+                    success, msg = ingest_individual_framework(
+                        graph, framework_map[selected_framework], StreamlitReporter()
+                    )
                 
                 if success:
                     st.sidebar.success(f"🎉 Successfully re-ingested {selected_framework} data!")
@@ -389,4 +392,5 @@ def sidebar_components(graph):
 
     if st.sidebar.button("💬 Clear Chat History"):
         st.session_state.messages = []
+        st.session_state.last_trace = None
         st.rerun()
@@ -0,0 +1,10 @@
+"""
+Shared test setup.
+
+Tests run offline: the deterministic fake LLM replaces Gemini, so ingesters
+can be constructed without an API key.
+"""
+
+import os
+
+os.environ.setdefault('LLM_PROVIDER', 'fake')
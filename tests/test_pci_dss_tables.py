@@ -0,0 +1,178 @@
+"""
+Tests for the PCI DSS requirement table parser.
+
+The fragments mimic what _extract_pdf_fragments reads from PCI DSS v4.0.1:
+one (x, y, text) tuple per text line, y growing up the page, with the
+running header and footer, the principal requirement heading, the
+three-column table header and rows whose cells wrap over several lines.
+"""
+
+import pytest
+
+from src.cybersecurity.pci_dss_ingestion import PCIDSSIngestion
+
+REQUIREMENT_X = 42.0
+TESTING_X = 302.5
+GUIDANCE_X = 561.0
+LINE_HEIGHT = 11.0
+
+
+def page(*rows, header=True, heading=None):
+    """
+    Build the fragments of one requirement-table page.
+
+    Args:
+        *rows: (requirement lines, testing lines, guidance lines) per table row
+        header: Whether the page repeats the table header
+        heading: Principal requirement heading above the table
+    """
+    fragments = [
+        (36.0, 575.0, 'Payment Card Industry Data Security Standard: Requirements and Testing Procedures, v4.0.1'),
+        (36.0, 20.0, '© 2006 - 2024 PCI Security Standards Council, LLC. All rights reserved.'),
+        (740.0, 20.0, 'Page 40')
+    ]
+    y = 540.0
+    if heading:
+        fragments.append((36.0, y, heading))
+        y -= 2 * LINE_HEIGHT
+    if header:
+        fragments += [
+            (REQUIREMENT_X, y, 'Defined Approach Requirements'),
+            (TESTING_X, y, 'Defined Approach Testing Procedures'),
+            (GUIDANCE_X, y, 'Guidance')
+        ]
+        y -= 2 * LINE_HEIGHT
+
+    for requirement, testing, guidance in rows:
+        # Cells of one row start on the same baseline (give or take a point)
+        for x, lines, jitter in ((REQUIREMENT_X, requirement, 0.0), (TESTING_X, testing, 0.6),
+                                 (GUIDANCE_X, guidance, -0.4)):
+            for offset, line in enumerate(lines):
+                fragments.append((x, y + jitter - offset * LINE_HEIGHT, line))
+        y -= (max(len(requirement), len(testing), len(guidance)) + 1) * LINE_HEIGHT
+    return fragments
+
+
+@pytest.fixture
+def parser():
+    return PCIDSSIngestion()
+
+
+@pytest.fixture
+def pages():
+    return [
+        # Introductory page without a table is ignored
+        [(36.0, 500.0, 'Requirement 1 is described in the following table.')],
+        page(
+            (['1.2 Network security controls (NSCs) are', 'configured and maintained.'], [], []),
+            (
+                ['1.2.1 Configuration standards for NSC', 'rulesets are:', '• Defined.', '• Implemented.'],
+                ['1.2.1.a Examine the configuration standards', 'for NSC rulesets to verify the standards are',
+                 'in accordance with all elements specified in', 'this requirement.'],
+                ['Purpose', 'The implementation of these configuration', 'standards prevents misconfiguration.']
+            ),
+            (
+                [],
+                ['1.2.1.b Examine configuration settings for', 'NSC rulesets.'],
+                []
+            ),
+            (
+                ['1.2.2 All changes to network connections and', 'to configurations of NSCs are approved and',
+                 'managed in accordance with the change control', 'process defined at Requirement 6.5.1.'],
+                ['1.2.2.a Examine documented procedures to', 'verify that changes to network connections',
+                 'are included in the formal change control',
+                 # Wrapped line that starts like a testing row of a later requirement
+                 '1.2.3 and 1.2.4 controls are reviewed together.'],
+                ['Purpose', 'Changes should be approved by individuals', 'with the proper authority.']
+            ),
+            heading='Requirement 1: Install and Maintain Network Security Controls'
+        ),
+        # The next page repeats the table header; the 1.2.3 row starts here
+        page(
+            (
+                ['1.2.3 An accurate network diagram(s) is', 'maintained that shows all connections.',
+                 'Applicability Notes', 'A current diagram can be kept in any form.'],
+                ['1.2.3 Examine diagram(s) and network', 'configurations to verify that an accurate',
+                 'network diagram(s) exists.'],
+                ['Purpose', 'Network diagrams describe how networks', 'are configured.']
+            ),
+            (
+                ['1.2.4 An accurate data-flow diagram(s) is', 'maintained, as also required by 1.2.3 for',
+                 'networks.'],
+                ['1.2.4.a Examine data-flow diagram(s).'],
+                []
+            ),
+            (
+                [],
+                ['1.2.4.b Interview responsible personnel.'],
+                []
+            )
+        )
+    ]
+
+
+def sub_requirements(parsed):
+    return {
+        sub_requirement['number']: sub_requirement
+        for requirement in parsed['requirements']
+        for sub_requirement in requirement['sub_requirements']
+    }
+
+
+def test_rows_are_rebuilt_from_columns(parser, pages):
+    parsed = parser._parse_pci_dss_tables(pages)
+
+    assert [requirement['id'] for requirement in parsed['requirements']] == ['REQ-1']
+    rows = sub_requirements(parsed)
+    assert list(rows) == ['1.2.1', '1.2.2', '1.2.3', '1.2.4']
+    assert rows['1.2.1']['description'] == 'Configuration standards for NSC rulesets are: • Defined. • Implemented.'
+    assert rows['1.2.1']['section_id'] == '1.2'
+    assert rows['1.2.1']['section_title'] == 'Network security controls (NSCs) are configured and maintained.'
+    assert rows['1.2.3']['applicability_notes'] == 'A current diagram can be kept in any form.'
+    assert rows['1.2.3']['page_start'] == 3
+
+
+def test_numbers_quoted_in_requirement_text_do_not_open_rows(parser, pages):
+    rows = sub_requirements(parser._parse_pci_dss_tables(pages))
+
+    assert rows['1.2.4']['description'] == (
+        'An accurate data-flow diagram(s) is maintained, as also required by 1.2.3 for networks.'
+    )
+
+
+def test_testing_procedures_follow_their_rows(parser, pages):
+    rows = sub_requirements(parser._parse_pci_dss_tables(pages))
+
+    procedures = {
+        number: [procedure['id'] for procedure in row['testing_procedures']]
+        for number, row in rows.items()
+    }
+    assert procedures == {
+        '1.2.1': ['TEST-1.2.1.a', 'TEST-1.2.1.b'],
+        '1.2.2': ['TEST-1.2.2.a'],
+        '1.2.3': ['TEST-1.2.3'],
+        '1.2.4': ['TEST-1.2.4.a', 'TEST-1.2.4.b']
+    }
+
+
+def test_wrapped_testing_line_stays_in_its_procedure(parser, pages):
+    rows = sub_requirements(parser._parse_pci_dss_tables(pages))
+
+    assert rows['1.2.2']['testing_procedures'][0]['description'].endswith(
+        'are included in the formal change control 1.2.3 and 1.2.4 controls are reviewed together.'
+    )
+    assert rows['1.2.3']['testing_procedures'][0]['description'].startswith('Examine diagram(s)')
+
+
+def test_guidance_attaches_to_the_row_beside_it(parser, pages):
+    rows = sub_requirements(parser._parse_pci_dss_tables(pages))
+
+    assert rows['1.2.1']['guidance'].startswith('Purpose The implementation')
+    assert rows['1.2.2']['guidance'] == 'Purpose Changes should be approved by individuals with the proper authority.'
+    assert rows['1.2.4']['guidance'] == ''
+
+
+def test_unrecognised_layout_yields_no_requirements(parser):
+    parsed = parser._parse_pci_dss_tables([[(36.0, 500.0, '1.2.1 Text outside any table')]])
+
+    assert parsed['requirements'] == []
@@ -0,0 +1,91 @@
+"""
+Tests for query plan capture.
+
+A slow query's plan is captured by running it again, so the connection is
+given a driver that records the statements it is asked to run instead of
+reaching a database.
+"""
+
+import pytest
+
+from src.knowledge_base.database import Neo4jConnection
+from src.knowledge_base.query_profiler import QueryProfiler, plan_mode, query_shape
+
+PLAN = {'operatorType': 'ProduceResults@neo4j', 'args': {'EstimatedRows': 3.0}, 'children': []}
+
+
+class RecordingSession:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, query, params=None):
+        self.statements.append(('auto', query))
+        return self
+
+    def consume(self):
+        return type('Summary', (), {'plan': PLAN, 'profile': {**PLAN, 'dbHits': 12, 'rows': 3}})()
+
+    def execute_read(self, work):
+        session = self
+
+        class Transaction:
+            def run(self, query, params=None):
+                session.statements.append(('read', query))
+                return session
+
+        return work(Transaction())
+
+
+class RecordingDriver:
+    def __init__(self):
+        self.statements = []
+
+    def session(self):
+        return RecordingSession(self.statements)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def connection():
+    connection = Neo4jConnection('bolt://localhost:7687', 'neo4j', 'neo4j', QueryProfiler(slow_ms=0, plan_shapes=5))
+    connection.driver = RecordingDriver()
+    return connection
+
+
+@pytest.mark.parametrize('query, mode', [
+    ("MATCH (t:Technique) WHERE t.name CONTAINS 'SET' RETURN t.created, t.offset", 'PROFILE'),
+    ("CALL { MATCH (n:Technique) RETURN count(n) AS c0 } RETURN c0", 'PROFILE'),
+    ("MATCH (n) DETACH DELETE n", 'EXPLAIN'),
+    ("UNWIND $rows AS row MERGE (n:Technique {id: row.id}) SET n += row", 'EXPLAIN'),
+    ("MATCH (n:Technique) REMOVE n.profile", 'EXPLAIN'),
+    ("CREATE CONSTRAINT technique_id IF NOT EXISTS FOR (n:Technique) REQUIRE n.id IS UNIQUE", None),
+    ("EXPLAIN MATCH (n) RETURN n", None)
+])
+def test_plan_mode(query, mode):
+    assert plan_mode(query_shape(query)[0]) == mode
+
+
+def test_reads_are_profiled_in_a_read_transaction(connection):
+    query = "MATCH (t:Technique) RETURN t.name"
+    connection._profile(query, None, 1.0, 3, 0)
+
+    assert connection.driver.statements == [('read', f"PROFILE {query}")]
+    plan = connection.profiler.shapes()[0]['plan']
+    assert (plan['mode'], plan['db_hits'], plan['rows']) == ('PROFILE', 12, 3)
+
+
+def test_writes_are_explained_not_run_again(connection):
+    query = "MATCH (n) DETACH DELETE n"
+    connection._profile(query, None, 1.0, 0, 0)
+
+    assert connection.driver.statements == [('auto', f"EXPLAIN {query}")]
+    plan = connection.profiler.shapes()[0]['plan']
+    assert (plan['mode'], plan['db_hits'], plan['rows']) == ('EXPLAIN', 0, 3)
@@ -0,0 +1,170 @@
+"""
+Tests for the graph repository and the explorer queries built on it.
+
+Every test runs once per backend: the in-memory graph, and Neo4j when
+NEO4J_TEST_URI points at a reachable database. The Neo4j database is
+cleared before each test, so never point NEO4J_TEST_URI at a knowledge
+base you want to keep. NEO4J_TEST_USERNAME and NEO4J_TEST_PASSWORD default
+to neo4j/neo4j.
+"""
+
+import os
+
+import pytest
+
+from src.knowledge_base import graph_operations
+from src.knowledge_base.memory_graph import InMemoryGraph
+from src.knowledge_base.repository import get_repository
+
+NEO4J_TEST_URI = os.getenv("NEO4J_TEST_URI")
+
+
+def neo4j_graph():
+    """Connection to the test database, or a skip when none is reachable."""
+    if not NEO4J_TEST_URI:
+        pytest.skip("NEO4J_TEST_URI is not set")
+    from src.knowledge_base.database import Neo4jConnection
+
+    connection = Neo4jConnection(
+        NEO4J_TEST_URI,
+        os.getenv("NEO4J_TEST_USERNAME", "neo4j"),
+        os.getenv("NEO4J_TEST_PASSWORD", "neo4j")
+    )
+    if not connection.is_healthy():
+        connection.close()
+        pytest.skip(f"Neo4j is not reachable at {NEO4J_TEST_URI}")
+    return connection
+
+
+@pytest.fixture(params=['memory', 'neo4j'])
+def graph(request):
+    graph = InMemoryGraph() if request.param == 'memory' else neo4j_graph()
+    repository = get_repository(graph)
+    repository.clear()
+
+    repository.create_nodes('Tactic', [
+        {'id': 'tactic--1', 'name': 'execution'},
+        {'id': 'tactic--2', 'name': 'persistence'}
+    ])
+    repository.create_nodes('Technique', [
+        {'id': 'attack-pattern--1', 'technique_id': 'T1059', 'name': 'Command and Scripting Interpreter',
+         'description': 'Adversaries abuse interpreters.', 'platforms': ['Windows', 'Linux']},
+        {'id': 'attack-pattern--2', 'technique_id': 'T1053', 'name': 'Scheduled Task/Job',
+         'description': 'Adversaries abuse task scheduling.', 'platforms': ['Windows']},
+        {'id': 'attack-pattern--3', 'technique_id': 'T1547', 'name': 'Boot or Logon Autostart Execution',
+         'description': 'Adversaries configure system settings.', 'platforms': ['macOS']}
+    ])
+    repository.create_nodes('ThreatGroup', [
+        {'id': 'intrusion-set--1', 'name': 'APT29', 'aliases': ['Cozy Bear']},
+        {'id': 'intrusion-set--2', 'name': 'APT28', 'aliases': ['Fancy Bear']},
+        {'id': 'intrusion-set--3', 'name': 'Lazarus Group', 'aliases': None}
+    ])
+    repository.create_nodes('Malware', [{'id': 'malware--1', 'name': 'Cobalt Strike'}])
+    repository.create_nodes('Mitigation', [
+        {'id': 'course-of-action--1', 'mitigation_id': 'M1038', 'name': 'Execution Prevention',
+         'description': 'Block execution.'},
+        {'id': 'course-of-action--2', 'mitigation_id': 'M1026', 'name': 'Privileged Account Management',
+         'description': 'Manage privileged accounts.'}
+    ])
+
+    def link(rel_type, source_label, target_label, pairs):
+        repository.link(rel_type, [{'source': source, 'target': target} for source, target in pairs],
+                        source_label, 'id', target_label, 'id')
+
+    link('PART_OF_TACTIC', 'Technique', 'Tactic', [
+        ('attack-pattern--1', 'tactic--1'), ('attack-pattern--2', 'tactic--1'),
+        ('attack-pattern--2', 'tactic--2'), ('attack-pattern--3', 'tactic--2')
+    ])
+    link('USES', 'ThreatGroup', 'Technique', [
+        ('intrusion-set--1', 'attack-pattern--2'), ('intrusion-set--1', 'attack-pattern--1'),
+        ('intrusion-set--2', 'attack-pattern--3')
+    ])
+    link('USES', 'ThreatGroup', 'Malware', [('intrusion-set--1', 'malware--1')])
+    link('USES', 'Malware', 'Technique', [('malware--1', 'attack-pattern--1')])
+    link('MITIGATED_BY', 'Technique', 'Mitigation', [
+        ('attack-pattern--1', 'course-of-action--1'), ('attack-pattern--1', 'course-of-action--2')
+    ])
+
+    yield graph
+
+    if request.param == 'neo4j':
+        repository.clear()
+        graph.close()
+
+
+def test_neighbors_follow_direction_and_type(graph):
+    repository = get_repository(graph)
+
+    used_by = repository.neighbors('Technique', 'technique_id', 'T1059', 'USES', 'in', keys=['name'])
+    assert sorted((rel_type, node['name']) for rel_type, node in used_by) == [
+        ('USES', 'APT29'), ('USES', 'Cobalt Strike')
+    ]
+    assert repository.neighbors('Technique', 'technique_id', 'T1059', 'USES', 'out') == []
+    with pytest.raises(ValueError):
+        repository.neighbors('Technique', 'technique_id', 'T1059', direction='both')
+
+
+def test_relationships_filter_on_labels(graph):
+    pairs = get_repository(graph).relationships(
+        'USES', 'ThreatGroup', 'Technique', source_keys=['name'], target_keys=['technique_id']
+    )
+
+    assert sorted((group['name'], technique['technique_id']) for group, technique in pairs) == [
+        ('APT28', 'T1547'), ('APT29', 'T1053'), ('APT29', 'T1059')
+    ]
+
+
+def test_find_nodes_containing_matches_properties_and_lists(graph):
+    repository = get_repository(graph)
+
+    matches = repository.find_nodes_containing('ThreatGroup', ['bear'], ['name'], ['aliases'], keys=['name'])
+    assert sorted(node['name'] for _, node in matches) == ['APT28', 'APT29']
+    assert repository.find_nodes_containing('ThreatGroup', ['apt'], ['name'], ignore_case=False) == []
+
+
+def test_delete_nodes_removes_their_relationships(graph):
+    repository = get_repository(graph)
+
+    assert repository.delete_nodes(['Mitigation', 'Malware']) == 3
+    assert repository.label_counts(['Mitigation', 'Malware', 'Technique']) == {
+        'Mitigation': 0, 'Malware': 0, 'Technique': 3
+    }
+    assert repository.count_relationships() == 7
+
+
+def test_threat_group_techniques(graph):
+    results = graph_operations.get_threat_group_techniques(graph, 'APT29')
+
+    assert [(row['group_name'], row['technique_id'], row['relationship_type']) for row in results] == [
+        ('APT29', 'T1053', 'USES'), ('APT29', 'T1059', 'USES')
+    ]
+    assert graph_operations.get_threat_group_techniques(graph, 'apt29') == []
+
+
+def test_techniques_by_tactic(graph):
+    assert [row['technique_id'] for row in graph_operations.get_techniques_by_tactic(graph, 'persistence')] == [
+        'T1053', 'T1547'
+    ]
+    assert [(row['tactic'], row['technique_id']) for row in graph_operations.get_techniques_by_tactic(graph)] == [
+        ('execution', 'T1053'), ('execution', 'T1059'), ('persistence', 'T1053'), ('persistence', 'T1547')
+    ]
+
+
+def test_technique_search_without_profiles(graph):
+    technique = graph_operations.search_by_technique_id(graph, 'T1059')
+
+    assert technique['name'] == 'Command and Scripting Interpreter'
+    assert technique['tactics'] == ['execution']
+    assert technique['threat_groups'] == ['APT29']
+    assert technique['malware'] == ['Cobalt Strike']
+    assert graph_operations.search_by_technique_id(graph, 'T9999') is None
+
+
+def test_explorer_listings(graph):
+    assert graph_operations.get_all_tactics(graph) == ['execution', 'persistence']
+    assert [group['name'] for group in graph_operations.get_all_threat_groups(graph)] == [
+        'APT28', 'APT29', 'Lazarus Group'
+    ]
+    assert [mitigation['mitigation_id'] for mitigation in graph_operations.get_technique_mitigations(
+        graph, 'T1059'
+    )] == ['M1026', 'M1038']
@@ -88,9 +88,11 @@ def check_environment_files():
     required_vars = [
         'NEO4J_URI',
         'NEO4J_USERNAME',
-        'NEO4J_PASSWORD',
-        'GEMINI_API_KEY'
+        'NEO4J_PASSWORD'
     ]
+    # The offline fake model needs no API key
+    if os.getenv('LLM_PROVIDER', 'gemini').lower() == 'gemini':
+        required_vars.append('GEMINI_API_KEY')
     
     missing_vars = []
     for var in required_vars: